@@ -2,17 +2,72 @@
 
 import textwrap
 import logging
-from typing import Callable, Type, AsyncContextManager
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional, Type, AsyncContextManager
 from pydantic import BaseModel
+from mcp.server.fastmcp import Context
+
+from omni_task_agent.admission import AdmissionController
+from omni_task_agent.streaming import StreamHandler, stream_agent
+from omni_task_agent.tracing import get_tracer
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def _no_admission(project_root=None):
+    yield
+
+
+class McpProgressHandler(StreamHandler):
+    """Forwards agent streaming events to the MCP client
+
+    Each tool call advances the progress counter (sent when the client supplied a
+    progress token), and model text is relayed as log messages in small batches.
+    """
+
+    def __init__(self, ctx: Context, flush_chars: int = 200):
+        self.ctx = ctx
+        self.flush_chars = flush_chars
+        self.step = 0
+        self._buffer = []
+        self._buffered = 0
+
+    async def _flush(self):
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered = 0
+            await self.ctx.info(text)
+
+    async def on_token(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.flush_chars or "\n" in text:
+            await self._flush()
+
+    async def on_tool_start(self, name: str, arguments: Any):
+        await self._flush()
+        self.step += 1
+        await self.ctx.report_progress(self.step)
+        await self.ctx.info(f"Calling tool {name}")
+
+    async def on_tool_end(self, name: str, output: Any, duration: float):
+        await self.ctx.info(f"Tool {name} finished in {duration:.2f}s")
+
+    async def on_end(self, state):
+        await self._flush()
+
+
 def create_langgraph_async_adapter(
     agent_instance: AsyncContextManager,
     name: str,
     description: str,
     input_schema: Type[BaseModel],
+    stream_progress: bool = True,
+    admission: Optional[AdmissionController] = None,
 ) -> Callable:
     """
     Create a LangGraph adapter that supports async context managers
@@ -22,6 +77,8 @@ def create_langgraph_async_adapter(
         name: Tool name
         description: Tool description
         input_schema: Pydantic model for input data
+        stream_progress: Stream tokens and tool progress to the MCP client while the agent runs
+        admission: Optional controller limiting concurrent runs; rejected requests raise AdmissionRejected
         
     Returns:
         Adapted async function that can be called by MCP server
@@ -38,15 +95,28 @@ def create_langgraph_async_adapter(
 
     # Create function body that directly returns async function
     body_str = textwrap.dedent(f"""
-    async def run_agent({params_str}):
+    async def run_agent({params_str}, ctx: Context = None):
+        received = time.perf_counter()
         inputs = input_schema({', '.join(f'{name}={name}' for name in schema_fields)})
         logger.info(f"Received request with projectRoot: {{inputs.projectRoot}}")
         logger.info(f"File parameter: {{inputs.file if hasattr(inputs, 'file') else None}}")
         
-        async with agent_instance(inputs.projectRoot) as agent:
-            logger.info(f"Invoking agent with prompt: {{inputs.prompt[:50]}}...")
-            result = await agent.ainvoke({{"messages": [{{"role": "user", "content": inputs.prompt}}]}})
-            logger.info("Agent invocation completed")
+        tracer = get_tracer()
+        with tracer.span("agent.request", source="mcp", project_root=inputs.projectRoot) as span:
+            async with admit(inputs.projectRoot):
+                span.set_attribute("admitted_after", time.perf_counter() - received)
+                # A thread ID resumes the saved conversation, so only the new message is sent
+                thread_id = getattr(inputs, "threadId", None)
+                instance = agent_instance(inputs.projectRoot, thread_id=thread_id) if thread_id else agent_instance(inputs.projectRoot)
+                async with instance as agent:
+                    logger.info(f"Invoking agent with prompt: {{inputs.prompt[:50]}}...")
+                    payload = {{"messages": [{{"role": "user", "content": inputs.prompt}}]}}
+                    with tracer.span("agent.invoke"):
+                        if stream_progress and ctx is not None:
+                            result = await stream_agent(agent, payload, McpProgressHandler(ctx))
+                        else:
+                            result = await agent.ainvoke(payload)
+                    logger.info("Agent invocation completed")
         return result
     """)
 
@@ -54,7 +124,14 @@ def create_langgraph_async_adapter(
     namespace = {
         "input_schema": input_schema,
         "agent_instance": agent_instance,
-        "logger": logger
+        "logger": logger,
+        "Context": Context,
+        "McpProgressHandler": McpProgressHandler,
+        "stream_agent": stream_agent,
+        "stream_progress": stream_progress,
+        "admit": admission.admit if admission is not None else _no_admission,
+        "get_tracer": get_tracer,
+        "time": time,
     }
 
     # Execute function definition
@@ -0,0 +1,439 @@
+"""
+Agent Benchmark
+
+Measures the agent pipeline offline: a scripted fake chat model replaces the
+LLM and a Python stand-in replaces shrimp-task-manager, so no API keys or Node
+install are needed. Reports cold-start time, per-request p50/p95/p99 latency and
+throughput at several concurrency levels, and RSS over time for:
+
+- agent: make_graph + ainvoke in this process
+- adapter: the FastMCP tool function built by create_langgraph_async_adapter
+- direct: call_tool, bypassing the LLM
+- server: the run_mcp stdio server driven by an MCP client
+
+Usage:
+    python -m benchmarks.bench_agent --requests 50 --concurrency 1,4,16 --output results.json
+    python -m benchmarks.bench_agent --compare baseline.json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SHRIMP = os.path.join(ROOT, "benchmarks", "fake_shrimp_server.py")
+FAKE_SERVER = os.path.join(ROOT, "benchmarks", "fake_run_mcp.py")
+
+SCENARIOS = ("agent", "adapter", "direct", "server")
+PROMPT = "List all tasks"
+
+
+def benchmark_env(llm_latency: float = 0.0, tool_latency: float = 0.0) -> Dict[str, str]:
+    """Environment pointing the agent at the fake shrimp server and fake model"""
+    return {
+        "SHRIMP_TASK_MANAGER_PATH": FAKE_SHRIMP,
+        "LLM_MODEL": "scripted",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "offline-benchmark"),
+        "FAKE_LLM_LATENCY_MS": str(llm_latency * 1000),
+        "FAKE_SHRIMP_LATENCY_MS": str(tool_latency * 1000),
+    }
+
+
+def set_tool_latency(project_root: str, tool_latency: float):
+    """Tell fake shrimp servers of a project their latency
+
+    Shrimp subprocesses only see DATA_DIR and PATH, so the setting goes through a file.
+    """
+    from benchmarks.fake_shrimp_server import LATENCY_FILE
+
+    data_dir = os.path.join(project_root, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, LATENCY_FILE), "w", encoding="utf-8") as f:
+        f.write(str(tool_latency * 1000))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+    }
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MiB, from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct and indirect child processes of pid, e.g. spawned MCP servers"""
+    parents: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    found, pending = [], [pid]
+    while pending:
+        for child in parents.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+class RssSampler:
+    """Samples the RSS of this process and its children in the background"""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._started = 0.0
+
+    def sample(self):
+        own = read_rss_mb(os.getpid())
+        if own is None:
+            return
+        children = sum(read_rss_mb(pid) or 0.0 for pid in child_pids(os.getpid()))
+        self.samples.append({
+            "t": round(time.perf_counter() - self._started, 3),
+            "rss_mb": round(own, 1),
+            "children_rss_mb": round(children, 1),
+        })
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Any]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.sample()
+        total = [s["rss_mb"] + s["children_rss_mb"] for s in self.samples]
+        return {
+            "peak_mb": max(total, default=None),
+            "final_mb": total[-1] if total else None,
+            "samples": self.samples,
+        }
+
+
+async def run_load(request: Callable[[], Awaitable[Any]], total: int, concurrency: int) -> Dict[str, Any]:
+    """Issue total requests from concurrency clients and time each one"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await request()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "latency_seconds": latency_stats(latencies),
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "errors": errors,
+        "wall_seconds": wall,
+    }
+
+
+async def measure_scenario(request: Callable[[], Awaitable[Any]], total: int, levels: List[int], interval: float) -> Dict[str, Any]:
+    """First-request latency, then the load at each concurrency level"""
+    sampler = RssSampler(interval)
+    sampler.start()
+    started = time.perf_counter()
+    await request()
+    first = time.perf_counter() - started
+    runs = [await run_load(request, total, level) for level in levels]
+    return {"first_request_seconds": first, "runs": runs, "rss": await sampler.stop()}
+
+
+def make_request(scenario: str, project_root: str, session=None) -> Callable[[], Awaitable[Any]]:
+    """Build the request coroutine factory for one scenario"""
+    if scenario == "agent":
+        from omni_task_agent.agent import make_graph
+
+        async def request():
+            async with make_graph(project_root) as agent:
+                return await agent.ainvoke({"messages": [{"role": "user", "content": PROMPT}]})
+        return request
+
+    if scenario == "adapter":
+        from pydantic import BaseModel
+
+        from adapters import create_langgraph_async_adapter
+        from omni_task_agent.admission import AdmissionController
+        from omni_task_agent.agent import make_graph
+
+        class InputSchema(BaseModel):
+            prompt: str
+            projectRoot: str = None
+            file: str = None
+
+        run_agent = create_langgraph_async_adapter(
+            agent_instance=make_graph,
+            name="OmniTask_Agent",
+            description="benchmark",
+            input_schema=InputSchema,
+            stream_progress=False,
+            admission=AdmissionController(),
+        )
+
+        async def request():
+            return await run_agent(prompt=PROMPT, projectRoot=project_root, file="")
+        return request
+
+    if scenario == "direct":
+        from omni_task_agent.agent import call_tool
+
+        async def request():
+            return await call_tool("list_tasks", {"status": "all"}, project_root)
+        return request
+
+    if scenario == "server":
+        async def request():
+            result = await session.call_tool("OmniTask Agent", {"prompt": PROMPT, "projectRoot": project_root, "file": ""})
+            if result.isError:
+                raise RuntimeError(str(result.content))
+            return result
+        return request
+
+    raise ValueError(f"Unknown scenario '{scenario}', expected one of {SCENARIOS}")
+
+
+async def run_in_process(scenarios: List[str], project_root: str, total: int, levels: List[int],
+                         llm_latency: float, interval: float) -> Dict[str, Any]:
+    from benchmarks.fake_llm import ScriptedChatModel
+    from omni_task_agent.graph_cache import get_graph_cache
+    from omni_task_agent.pool import close_session_pool
+
+    get_graph_cache().set_llm(ScriptedChatModel(latency=llm_latency))
+    results = {}
+    try:
+        for scenario in scenarios:
+            results[scenario] = await measure_scenario(make_request(scenario, project_root), total, levels, interval)
+    finally:
+        await close_session_pool()
+    return results
+
+
+async def run_server(project_root: str, total: int, levels: List[int], env: Dict[str, str], interval: float) -> Dict[str, Any]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[FAKE_SERVER],
+        env={**os.environ, **env, "PYTHONPATH": ROOT},
+        cwd=ROOT,
+    )
+    started = time.perf_counter()
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                ready = time.perf_counter() - started
+                result = await measure_scenario(make_request("server", project_root, session), total, levels, interval)
+    result["server_ready_seconds"] = ready
+    return result
+
+
+def cold_start(project_root: str, env: Dict[str, str]) -> Dict[str, float]:
+    """Time a fresh interpreter from launch to its first answered agent request"""
+    code = (
+        "import asyncio, json, time; t0 = time.perf_counter(); "
+        "from benchmarks.fake_llm import ScriptedChatModel; "
+        "from omni_task_agent.agent import make_graph; "
+        "from omni_task_agent.graph_cache import get_graph_cache; "
+        "from omni_task_agent.pool import close_session_pool; "
+        "t1 = time.perf_counter()\n"
+        "async def main():\n"
+        "    get_graph_cache().set_llm(ScriptedChatModel())\n"
+        "    async with make_graph(%r) as agent:\n"
+        "        t2 = time.perf_counter()\n"
+        "        await agent.ainvoke({'messages': [{'role': 'user', 'content': %r}]})\n"
+        "    t3 = time.perf_counter()\n"
+        "    await close_session_pool()\n"
+        "    print(json.dumps({'import_seconds': t1 - t0, 'session_and_graph_seconds': t2 - t1, "
+        "'first_request_seconds': t3 - t2}))\n"
+        "asyncio.run(main())\n"
+    ) % (project_root, PROMPT)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, **env, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - started
+    return result
+
+
+def run(scenarios: List[str] = SCENARIOS, total: int = 20, levels: List[int] = (1, 4),
+        llm_latency: float = 0.0, tool_latency: float = 0.0, interval: float = 0.25,
+        include_cold_start: bool = True) -> Dict[str, Any]:
+    """Run the benchmark and return the JSON-serializable report
+
+    Args:
+        scenarios: Scenarios to run, see SCENARIOS
+        total: Requests per concurrency level
+        levels: Concurrent client counts
+        llm_latency: Simulated seconds per model call
+        tool_latency: Simulated seconds per shrimp tool call
+        interval: RSS sampling interval in seconds
+        include_cold_start: Also time a fresh process to its first answer
+    """
+    from omni_task_agent.resolver import reset_shrimp_resolution
+
+    env = benchmark_env(llm_latency, tool_latency)
+    os.environ.update(env)
+    reset_shrimp_resolution()
+    # Each scenario starts from an empty project so runs are comparable
+    with tempfile.TemporaryDirectory(prefix="omni-bench-") as project_root:
+        report: Dict[str, Any] = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "requests_per_level": total,
+                "concurrency_levels": list(levels),
+                "llm_latency_seconds": llm_latency,
+                "tool_latency_seconds": tool_latency,
+            },
+            "scenarios": {},
+        }
+        for name in ("cold", "in-process", "server"):
+            set_tool_latency(os.path.join(project_root, name), tool_latency)
+        if include_cold_start:
+            report["cold_start"] = cold_start(os.path.join(project_root, "cold"), env)
+        in_process = [s for s in scenarios if s != "server"]
+        if in_process:
+            report["scenarios"].update(asyncio.run(
+                run_in_process(in_process, os.path.join(project_root, "in-process"), total, list(levels), llm_latency, interval)
+            ))
+        if "server" in scenarios:
+            report["scenarios"]["server"] = asyncio.run(
+                run_server(os.path.join(project_root, "server"), total, list(levels), env, interval)
+            )
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Describe latency and throughput changes between two reports"""
+    lines = []
+    for scenario, result in current.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            continue
+        base_runs = {run["concurrency"]: run for run in base["runs"]}
+        for run in result["runs"]:
+            before = base_runs.get(run["concurrency"])
+            if before is None:
+                continue
+            for metric in ("p50", "p95", "p99"):
+                old, new = before["latency_seconds"][metric], run["latency_seconds"][metric]
+                change = (new - old) / old * 100 if old else 0.0
+                lines.append(f"{scenario} c={run['concurrency']} {metric}: {old * 1000:.1f} -> {new * 1000:.1f} ms ({change:+.1f}%)")
+            old, new = before["throughput_rps"], run["throughput_rps"]
+            change = (new - old) / old * 100 if old else 0.0
+            lines.append(f"{scenario} c={run['concurrency']} throughput: {old:.1f} -> {new:.1f} req/s ({change:+.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OmniTask agent benchmark")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenarios")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,4", help="Comma separated concurrent client counts")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated model latency")
+    parser.add_argument("--tool-latency-ms", type=float, default=0.0, help="Simulated shrimp tool latency")
+    parser.add_argument("--rss-interval", type=float, default=0.25, help="RSS sampling interval in seconds")
+    parser.add_argument("--no-cold-start", action="store_true", help="Skip the fresh-process measurement")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+        print("\n".join(compare(baseline, current)))
+        return
+
+    report = run(
+        scenarios=[s.strip() for s in args.scenarios.split(",") if s.strip()],
+        total=args.requests,
+        levels=[int(c) for c in args.concurrency.split(",")],
+        llm_latency=args.llm_latency_ms / 1000,
+        tool_latency=args.tool_latency_ms / 1000,
+        interval=args.rss_interval,
+        include_cold_start=not args.no_cold_start,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup Benchmark
+
+Measures how long importing the CLI and MCP server entry points takes in a fresh
+interpreter, and which heavy dependencies each import pulls in.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["omni_task_agent", "omni_task_agent.cli", "run_mcp"]
+
+# Dependencies that should only load once an agent graph is built
+HEAVY_MODULES = ["langchain_openai", "langgraph", "langchain_mcp_adapters", "langchain_core"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import a module in a fresh interpreter
+
+    Returns:
+        Import time as measured inside the child, total process wall time, and
+        the heavy dependencies loaded by the import
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = wall
+    return result
+
+
+def run(repeat: int = 5) -> dict:
+    """Benchmark every entry point, reporting median and best import times"""
+    results = {}
+    for module in MODULES:
+        samples = [measure(module) for _ in range(repeat)]
+        seconds = [sample["seconds"] for sample in samples]
+        results[module] = {
+            "median_seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "median_process_seconds": statistics.median(s["process_seconds"] for s in samples),
+            "heavy_modules": samples[-1]["heavy_modules"],
+        }
+    return {"python": sys.version.split()[0], "repeat": repeat, "imports": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure OmniTask import times")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
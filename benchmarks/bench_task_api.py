@@ -0,0 +1,116 @@
+"""
+Task API Benchmark
+
+Load-tests the http backend against the reference task service, both running
+locally: the service is started with uvicorn on a free port and driven by
+TaskAPIClient over real HTTP connections. Reports p50/p95/p99 latency and
+throughput of get_task_detail calls per concurrency level, with pipelining
+(calls share bulk requests) and without, plus the time of one bulk read.
+
+Usage:
+    python -m benchmarks.bench_task_api --requests 500 --concurrency 1,8,32 --output api.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_agent import latency_stats, run_load
+
+PROJECT = "bench"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(root: str, port: int):
+    """Run the reference task service in a daemon thread until it answers"""
+    import httpx
+    import uvicorn
+
+    from omni_task_agent.task_api import create_app
+
+    server = uvicorn.Server(uvicorn.Config(create_app(root), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    raise RuntimeError("Task service did not start")
+
+
+async def measure(base_url: str, tasks: int, total: int, levels: List[int]) -> Dict[str, Any]:
+    from omni_task_agent.http_backend import TaskAPIClient
+
+    seed = TaskAPIClient(base_url=base_url)
+    await seed.put_tasks(PROJECT, [{"id": str(i), "title": f"Task {i}"} for i in range(tasks)])
+    started = time.perf_counter()
+    await seed.get_tasks(PROJECT, [str(i) for i in range(tasks)])
+    bulk = time.perf_counter() - started
+    await seed.close()
+
+    report: Dict[str, Any] = {"bulk_get_seconds": bulk, "modes": {}}
+    for mode, window in (("pipelined", None), ("unbatched", 0.0)):
+        client = TaskAPIClient(base_url=base_url, batch_window=window)
+        counter = iter(range(10 ** 9))
+
+        async def request():
+            await client.call(PROJECT, "get_task_detail", {"taskId": str(next(counter) % tasks)})
+
+        runs = [await run_load(request, total, level) for level in levels]
+        report["modes"][mode] = {"runs": runs, "client": client.metrics()}
+        await client.close()
+    return report
+
+
+def run(tasks: int = 100, total: int = 200, levels: List[int] = (1, 8)) -> Dict[str, Any]:
+    """Start the service, run the load and return the JSON-serializable report"""
+    with tempfile.TemporaryDirectory(prefix="omni-api-bench-") as root:
+        port = free_port()
+        server = start_server(root, port)
+        try:
+            report = asyncio.run(measure(f"http://127.0.0.1:{port}", tasks, total, list(levels)))
+        finally:
+            server.should_exit = True
+    report["meta"] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "tasks": tasks,
+        "requests_per_level": total,
+        "concurrency_levels": list(levels),
+        "batch_window_ms": float(os.environ.get("TASK_API_BATCH_WINDOW_MS", 2.0)),
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task API load test")
+    parser.add_argument("--tasks", type=int, default=100, help="Tasks seeded into the project")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma separated concurrent client counts")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = run(args.tasks, args.requests, [int(c) for c in args.concurrency.split(",")])
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Scripted Chat Model
+
+A deterministic stand-in for the OpenAI chat model. For every user message it
+issues the scripted tool calls one after another, then answers with a summary
+of the last tool result. Decisions depend only on the conversation, so one
+instance can serve many concurrent requests.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+DEFAULT_SCRIPT = (("list_tasks", {"status": "all"}),)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake chat model replaying a fixed tool-calling script
+
+    Attributes:
+        script: (tool name, arguments) pairs called in order for every request
+        latency: Seconds each model call takes, simulating provider latency
+    """
+
+    script: Sequence[Tuple[str, Dict[str, Any]]] = DEFAULT_SCRIPT
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        # Tool results received since the latest user message decide the next step
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, ToolMessage):
+                step += 1
+
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 1
+        if step < len(self.script):
+            name, arguments = self.script[step]
+            reply = AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": dict(arguments), "id": f"call_{uuid.uuid4().hex[:12]}"}],
+            )
+        else:
+            result = str(messages[-1].content) if step else ""
+            reply = AIMessage(content=f"Done after {step} tool calls. {result[:80]}")
+        completion_tokens = len(reply.content) // 4 + 8 * len(reply.tool_calls) + 1
+        reply.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return reply
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
@@ -0,0 +1,24 @@
+"""
+MCP Server with Fake LLM
+
+Runs run_mcp.serve_stdio with the scripted chat model installed, so the full
+server path can be benchmarked without API keys. FAKE_LLM_LATENCY_MS sets the
+simulated model latency.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_llm import ScriptedChatModel  # noqa: E402
+from omni_task_agent.graph_cache import get_graph_cache  # noqa: E402
+
+if __name__ == "__main__":
+    latency = float(os.environ.get("FAKE_LLM_LATENCY_MS", "0")) / 1000
+    get_graph_cache().set_llm(ScriptedChatModel(latency=latency))
+
+    import run_mcp
+    run_mcp.serve_stdio()
@@ -0,0 +1,190 @@
+"""
+Fake shrimp-task-manager
+
+A lightweight Python MCP stdio server exposing the core shrimp-task-manager task
+tools over a tasks.json file in DATA_DIR, so benchmarks run without Node.
+Point the agent at it with SHRIMP_TASK_MANAGER_PATH=benchmarks/fake_shrimp_server.py.
+
+FAKE_SHRIMP_LATENCY_MS adds a fixed delay to every tool call. The agent starts
+shrimp with a fixed environment, so the delay can also be given in a
+fake_shrimp_latency_ms file in DATA_DIR.
+"""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(os.getcwd(), "data"))
+LATENCY_FILE = "fake_shrimp_latency_ms"
+
+
+def _latency() -> float:
+    value = os.environ.get("FAKE_SHRIMP_LATENCY_MS")
+    if value is None:
+        try:
+            with open(os.path.join(DATA_DIR, LATENCY_FILE), encoding="utf-8") as f:
+                value = f.read().strip()
+        except FileNotFoundError:
+            value = "0"
+    return float(value or 0) / 1000
+
+
+LATENCY = _latency()
+
+server = FastMCP("fake-shrimp-task-manager")
+
+
+def _path() -> str:
+    return os.path.join(DATA_DIR, "tasks.json")
+
+
+def _load() -> List[dict]:
+    if LATENCY:
+        time.sleep(LATENCY)
+    try:
+        with open(_path(), encoding="utf-8") as f:
+            return json.load(f).get("tasks", [])
+    except FileNotFoundError:
+        return []
+
+
+def _save(tasks: List[dict]):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp = _path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"tasks": tasks}, f)
+    os.replace(tmp, _path())
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _find(tasks: List[dict], task_id: str) -> Optional[dict]:
+    return next((task for task in tasks if task["id"] == task_id), None)
+
+
+@server.tool()
+def plan_task(description: str, requirements: str = "") -> str:
+    """Plan a task from a description"""
+    return f"Plan the task: {description}\nRequirements: {requirements or 'none'}"
+
+
+@server.tool()
+def analyze_task(summary: str, initialConcept: str) -> str:
+    """Analyze a task summary and initial concept"""
+    return f"Analysis of {summary}: {initialConcept}"
+
+
+@server.tool()
+def split_tasks(updateMode: str, tasks: List[dict]) -> str:
+    """Create tasks; updateMode is one of append, overwrite, selective, clearAllTasks"""
+    existing = [] if updateMode in ("overwrite", "clearAllTasks") else _load()
+    for spec in tasks:
+        existing.append({
+            "id": str(uuid.uuid4()),
+            "name": spec.get("name", ""),
+            "description": spec.get("description", ""),
+            "status": "pending",
+            "dependencies": spec.get("dependencies", []),
+            "createdAt": _now(),
+            "updatedAt": _now(),
+        })
+    _save(existing)
+    return f"Created {len(tasks)} tasks, {len(existing)} in total"
+
+
+@server.tool()
+def list_tasks(status: str = "all") -> str:
+    """List tasks, optionally filtered by status (all, pending, in_progress, completed)"""
+    tasks = _load()
+    if status != "all":
+        tasks = [task for task in tasks if task["status"] == status]
+    return json.dumps(tasks)
+
+
+@server.tool()
+def query_task(query: str, isId: bool = False, page: int = 1, pageSize: int = 5) -> str:
+    """Search tasks by ID or keyword"""
+    tasks = _load()
+    if isId:
+        matches = [task for task in tasks if task["id"] == query]
+    else:
+        matches = [task for task in tasks if query.lower() in (task["name"] + task["description"]).lower()]
+    start = (page - 1) * pageSize
+    return json.dumps(matches[start:start + pageSize])
+
+
+@server.tool()
+def get_task_detail(taskId: str) -> str:
+    """Show the full details of a task"""
+    task = _find(_load(), taskId)
+    return json.dumps(task) if task else f"Task {taskId} not found"
+
+
+@server.tool()
+def update_task(taskId: str, name: str = None, description: str = None) -> str:
+    """Update a task's name or description"""
+    tasks = _load()
+    task = _find(tasks, taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    if name is not None:
+        task["name"] = name
+    if description is not None:
+        task["description"] = description
+    task["updatedAt"] = _now()
+    _save(tasks)
+    return f"Task {taskId} updated"
+
+
+@server.tool()
+def execute_task(taskId: str) -> str:
+    """Mark a task as in progress"""
+    tasks = _load()
+    task = _find(tasks, taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    task["status"] = "in_progress"
+    _save(tasks)
+    return f"Executing task {taskId}"
+
+
+@server.tool()
+def verify_task(taskId: str, summary: str = "", score: int = 100) -> str:
+    """Verify a task and mark it completed"""
+    tasks = _load()
+    task = _find(tasks, taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    task["status"] = "completed"
+    task["summary"] = summary
+    _save(tasks)
+    return f"Task {taskId} completed with score {score}"
+
+
+@server.tool()
+def delete_task(taskId: str) -> str:
+    """Delete a task"""
+    tasks = _load()
+    remaining = [task for task in tasks if task["id"] != taskId]
+    _save(remaining)
+    return f"Task {taskId} deleted" if len(remaining) < len(tasks) else f"Task {taskId} not found"
+
+
+@server.tool()
+def clear_all_tasks(confirm: bool) -> str:
+    """Delete every task"""
+    if not confirm:
+        return "Confirmation required"
+    _save([])
+    return "All tasks cleared"
+
+
+if __name__ == "__main__":
+    server.run()
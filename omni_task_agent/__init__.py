@@ -5,12 +5,7 @@ A powerful multi-model task management system that can both integrate with vario
 and help users choose and use the most suitable task management solution.
 """
 
-import os
-import sys
-from pathlib import Path
-
 from omni_task_agent.config import setup_environment
-from omni_task_agent.agent import make_graph
 
 __version__ = "0.1.0"
 __author__ = "OmniTaskAgent Team"
@@ -21,14 +16,15 @@ __all__ = [
     "setup_environment",  # Environment configuration tool
 ]
 
-# Ensure current directory is in path
-if os.getcwd() not in sys.path:
-    sys.path.append(os.getcwd())
 
-# Add project root directory to path
-project_root = Path(__file__).parent.parent.absolute()
-if str(project_root) not in sys.path:
-    sys.path.append(str(project_root))
+def __getattr__(name):
+    # Import the agent stack (LangChain, LangGraph, MCP) on first use, keeping
+    # `import omni_task_agent` cheap for CLI commands and the MCP server
+    if name == "make_graph":
+        from omni_task_agent.agent import make_graph
+        return make_graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     # Run command line interface
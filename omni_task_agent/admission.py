@@ -0,0 +1,185 @@
+"""
+Admission Control
+
+Caps how many agent runs execute at once, globally and per project, and queues
+the rest in a bounded wait queue so request bursts don't fork unbounded numbers
+of Node subprocesses or trip provider rate limits.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from omni_task_agent.config import get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is turned away by the admission controller
+
+    Attributes:
+        reason: "queue_full" when the wait queue is at capacity, "timeout" when
+            the request waited longer than the queue timeout
+    """
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def admission_key(project_root) -> str:
+    """Admission key of a project root: its absolute path, "" for the default project
+
+    "/p", "/p/" and "p" relative to the server's working directory share a key,
+    matching how the data directory and the SSE worker shard are resolved.
+    """
+    if not isinstance(project_root, (str, os.PathLike)) or not str(project_root).strip():
+        return ""
+    return os.path.abspath(project_root)
+
+
+class _ProjectSlot:
+    __slots__ = ("semaphore", "refs")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.refs = 0
+
+
+class AdmissionController:
+    """Global and per-project concurrency limits with a bounded wait queue
+
+    Usage:
+    ```python
+    controller = AdmissionController()
+    async with controller.admit(project_root):
+        ...  # run the agent
+    ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_project_limit: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Concurrent runs across all projects (MAX_CONCURRENT_REQUESTS)
+            per_project_limit: Concurrent runs per project root (MAX_CONCURRENT_PER_PROJECT)
+            max_queue: Requests allowed to wait before new ones are rejected (MAX_QUEUED_REQUESTS)
+            queue_timeout: Seconds a request may wait for a slot (QUEUE_TIMEOUT)
+        """
+        # A limit below 1 would admit nothing, so it is raised to 1
+        self.max_concurrency = max(
+            1, max_concurrency if max_concurrency is not None else get_env_int("MAX_CONCURRENT_REQUESTS", 8)
+        )
+        self.per_project_limit = max(
+            1, per_project_limit if per_project_limit is not None else get_env_int("MAX_CONCURRENT_PER_PROJECT", 2)
+        )
+        self.max_queue = max_queue if max_queue is not None else get_env_int("MAX_QUEUED_REQUESTS", 32)
+        self.queue_timeout = queue_timeout if queue_timeout is not None else get_env_float("QUEUE_TIMEOUT", 30.0)
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._projects: Dict[str, _ProjectSlot] = {}
+        self.queued = 0
+        self.in_flight = 0
+        self.counters = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "max_queue_depth": 0,
+        }
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _project_slot(self, key: str) -> _ProjectSlot:
+        slot = self._projects.get(key)
+        if slot is None:
+            slot = self._projects[key] = _ProjectSlot(self.per_project_limit)
+        slot.refs += 1
+        return slot
+
+    def _release_project_slot(self, key: str, slot: _ProjectSlot):
+        slot.refs -= 1
+        if slot.refs == 0:
+            self._projects.pop(key, None)
+
+    @asynccontextmanager
+    async def admit(self, project_root: Optional[str] = None):
+        """Wait for a slot for the given project, or reject under backpressure
+
+        Args:
+            project_root: Project root the request works on
+
+        Raises:
+            AdmissionRejected: If the wait queue is full or the wait timed out
+        """
+        key = admission_key(project_root)
+        slot = self._project_slot(key)
+        acquired_project = acquired_global = False
+        try:
+            if not slot.semaphore.locked() and not self._global.locked():
+                # Free capacity: take both slots without queueing
+                await slot.semaphore.acquire()
+                acquired_project = True
+                await self._global.acquire()
+                acquired_global = True
+            else:
+                if self.queued >= self.max_queue:
+                    self.counters["rejected_queue_full"] += 1
+                    raise AdmissionRejected(
+                        "queue_full",
+                        f"Server busy: {self.queued} requests already waiting, please retry later",
+                    )
+                self.queued += 1
+                self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], self.queued)
+                started = time.perf_counter()
+                try:
+                    deadline = started + self.queue_timeout
+                    await asyncio.wait_for(slot.semaphore.acquire(), self.queue_timeout)
+                    acquired_project = True
+                    await asyncio.wait_for(self._global.acquire(), max(deadline - time.perf_counter(), 0))
+                    acquired_global = True
+                except asyncio.TimeoutError:
+                    self.counters["rejected_timeout"] += 1
+                    raise AdmissionRejected(
+                        "timeout",
+                        f"Server busy: no capacity within {self.queue_timeout:.0f}s, please retry later",
+                    )
+                finally:
+                    self.queued -= 1
+                    waited = time.perf_counter() - started
+                    self.total_wait += waited
+                    self.max_wait = max(self.max_wait, waited)
+
+            self.counters["admitted"] += 1
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            if acquired_global:
+                self._global.release()
+            if acquired_project:
+                slot.semaphore.release()
+            self._release_project_slot(key, slot)
+
+    def metrics(self) -> Dict[str, float]:
+        """Snapshot of queue depth, wait times and admission counters"""
+        waits = self.counters["admitted"] + self.counters["rejected_timeout"]
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "per_project_limit": self.per_project_limit,
+            "max_queue": self.max_queue,
+            **self.counters,
+            "avg_wait_seconds": self.total_wait / waits if waits else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
@@ -8,20 +8,37 @@ import os
 import logging
 from contextlib import asynccontextmanager
 
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from omni_task_agent.backends import get_data_dir, get_task_backend
+from omni_task_agent.config import get_env_bool, setup_environment
+from omni_task_agent.dependencies import make_dependency_tools
+from omni_task_agent.graph_cache import get_graph_cache
+from omni_task_agent.resolver import resolve_shrimp_command
+from omni_task_agent.resilience import install_tool_resilience
+from omni_task_agent.scheduler import install_tool_scheduler
+from omni_task_agent.tool_cache import install_tool_cache
+from omni_task_agent.tools import (
+    ToolArgumentError,
+    bind_tool_context,
+    describe_tool,
+    format_tool_result,
+    invoke_tool,
+    validate_tool_arguments,
+)
+from omni_task_agent.tracing import get_tracer
 
-from omni_task_agent.config import setup_environment
-
-# Setup logging and environment
+# Setup logging; the environment is loaded on first use rather than at import
 logger = logging.getLogger(__name__)
-setup_environment()
+_environment_ready = False
+
+# Local dependency-graph tools, created on first use
+_dependency_tools = None
 
-# Get configuration
-model_name = os.environ.get("LLM_MODEL", "gpt-4o")
-openai_base_url = os.environ.get("OPENAI_API_BASE")
+def ensure_environment():
+    """Load .env and default settings once, before the first session is opened"""
+    global _environment_ready
+    if not _environment_ready:
+        setup_environment()
+        _environment_ready = True
 
 # Define server configuration
 def get_server_config(project_root=None):
@@ -34,75 +51,42 @@ def get_server_config(project_root=None):
     # if not project_root:
     #     raise ValueError("Project root directory must be provided")
     
-    # Server directory - OmniTask Agent's own directory, used to find dependencies
-    server_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Find shrimp-task-manager executable path in the server directory
-    # 1. First try to find in server node_modules
-    node_modules_path = os.path.join(server_root, "node_modules", "mcp-shrimp-task-manager", "dist", "index.js")
+    ensure_environment()
     
-    # 2. If not found, try global npm path
-    npx_path = "npx"
-    
-    if os.path.exists(node_modules_path):
-        logger.info(f"Using locally installed shrimp-task-manager: {node_modules_path}")
-        command = "node"
-        args = [node_modules_path]
-    else:
-        logger.info("Using npx to run shrimp-task-manager")
-        command = npx_path
-        args = ["-y", "mcp-shrimp-task-manager"]
+    # shrimp-task-manager location is resolved once per process (local, global or npx fallback)
+    shrimp = resolve_shrimp_command()
     
     # Data directory in the user's project directory - used to store task data
-    # Handle cases where project_root might be a dict or other non-string type
-    if not project_root or not isinstance(project_root, (str, bytes, os.PathLike)):
-        project_root = os.path.join(server_root, "tmp")
-        logger.info(f"No valid project root provided, using temporary directory: {project_root}")
-    
-    data_dir = os.path.join(project_root, "data")
-    os.makedirs(os.path.abspath(data_dir), exist_ok=True)
-    
-    logger.info(f"Using data directory: {data_dir} for user project: {project_root}")
+    data_dir = get_data_dir(project_root)
     
     env = {
         "DATA_DIR": data_dir,
         "PATH": os.environ.get("PATH", ""),
-        "ENABLE_THOUGHT_CHAIN": "false",
+        "ENABLE_THOUGHT_CHAIN": os.environ.get("ENABLE_THOUGHT_CHAIN", "false"),
         "TEMPLATES_USE": "en"
     }
     
     return {
         "shrimp-task-manager": {
             "transport": "stdio",
-            "command": command,
-            "args": args,
+            "command": shrimp.command,
+            "args": list(shrimp.args),
             "env": env,
             "encoding": "utf-8",                # Ensure UTF-8 encoding
             "encoding_error_handler": "replace" # Key modification: change strict to replace
         }
     }
 
-# Create graph using asynccontextmanager
-@asynccontextmanager
-async def make_graph(project_root=None):
+def normalize_project_root(project_root=None):
     """
-    Create and provide agent graph following langgraph-api standard
+    Normalize the project root received from callers
     
     Args:
-        project_root: User-provided project root directory
+        project_root: User-provided project root directory, or a LangGraph Studio config dict
     
-    Usage:
-    ```python
-    async with make_graph(project_root) as agent:
-        response = await agent.ainvoke({"messages": messages})
-    ```
+    Returns:
+        Project root path, or None to let get_server_config pick its default
     """
-    # if not project_root:
-    #     raise ValueError("Project root directory must be provided")
-    
-    # Log what we received to help debug
-    logger.info(f"Creating MCP client with project root: {project_root}")
-    
     # Handle case where project_root is not a string (e.g., dict from LangGraph Studio)
     if not isinstance(project_root, (str, bytes, os.PathLike)) and project_root is not None:
         logger.info(f"Project root is not a string type: {type(project_root)}")
@@ -114,44 +98,135 @@ async def make_graph(project_root=None):
         else:
             project_root = None
             logger.info("Setting project_root to None for get_server_config to handle")
+    return project_root
+
+def get_dependency_tools():
+    """Return the shared dependency-graph tools (ready_tasks, critical_path, ...)"""
+    global _dependency_tools
+    if _dependency_tools is None:
+        _dependency_tools = make_dependency_tools()
+    return _dependency_tools
+
+@asynccontextmanager
+async def open_tool_session(project_root=None):
+    """
+    Open a session of the task backend and bind its tools to the current context
     
-    async with MultiServerMCPClient(get_server_config(project_root)) as client:
+    TASK_BACKEND selects the backend: a warm shrimp-task-manager subprocess
+    (shrimp, the default) or the in-process task tools (local).
+    
+    Args:
+        project_root: User-provided project root directory
+    
+    Yields:
+        List of LangChain tools loaded from the session
+    """
+    ensure_environment()
+    # Memoize read-only tool results per data directory (no-op once installed)
+    install_tool_cache()
+    # Deadlines for every tool call; retries and hedging for reads
+    install_tool_resilience()
+    # Spread overlapping reads over sibling sessions, serialize mutations per project
+    install_tool_scheduler()
+    
+    project_root = normalize_project_root(project_root)
+    
+    # The shrimp backend reuses a warm subprocess for this data directory
+    async with get_task_backend().session(project_root) as session:
         logger.info("Getting tools list...")
-        tools = client.get_tools()
+        with get_tracer().span("tools.load") as span:
+            tools = list(session.tools)
+            if get_env_bool("DEPENDENCY_TOOLS", True):
+                # Backends that serve the dependency tools themselves keep theirs
+                names = {tool.name for tool in tools}
+                tools += [tool for tool in get_dependency_tools() if tool.name not in names]
+            span.set_attribute("tools", len(tools))
         tool_count = len(tools) if tools else 0
         logger.info(f"Got {tool_count} tools")
         
-        logger.info("Creating LLM...")
-        # Create LLM directly in function
-        llm_args = {"model": model_name}
-        if openai_base_url:
-            llm_args["openai_api_base"] = openai_base_url
-        
-        llm = ChatOpenAI(**llm_args)
-        
-        logger.info("Creating prompt template...")
-        # Create prompt template directly in function
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a Task Master Assistant, designed to help users create, manage, and analyze project tasks.
+        with bind_tool_context(session.data_dir, tools, session.server_config):
+            yield tools
+
+# Create graph using asynccontextmanager
+@asynccontextmanager
+async def make_graph(project_root=None, thread_id=None):
+    """
+    Create and provide agent graph following langgraph-api standard
+    
+    Args:
+        project_root: User-provided project root directory
+        thread_id: Conversation to resume; its state is saved in the project data directory
+    
+    Usage:
+    ```python
+    async with make_graph(project_root) as agent:
+        response = await agent.ainvoke({"messages": messages})
+    
+    # Follow-up requests of a thread send only the new message
+    async with make_graph(project_root, thread_id="chat-1") as agent:
+        response = await agent.ainvoke({"messages": [new_message]})
+    ```
+    """
+    # if not project_root:
+    #     raise ValueError("Project root directory must be provided")
+    
+    # Log what we received to help debug
+    logger.info(f"Creating MCP client with project root: {project_root}")
+    
+    async with open_tool_session(project_root) as tools:
+        # Compiled graphs are shared across sessions; tool calls are routed
+        # to this session's tools through the bound tool context
+        if thread_id and get_env_bool("CHECKPOINTS", True):
+            from omni_task_agent.checkpoints import get_checkpointer
 
-            You can perform the following operations:
-            - Create Tasks: Create new tasks from scratch
-            - List Tasks: View all current tasks
-            - Update Tasks: Modify task details or status
-            - Decompose Tasks: Break down large tasks into subtasks
-            - Set Dependencies: Establish relationships between tasks
-            - Analyze Projects: Analyze project complexity and task structure
+            graph = get_graph_cache().get_graph(tools, checkpointer=get_checkpointer())
+            yield graph.with_config(configurable={"thread_id": str(thread_id)})
+        else:
+            yield get_graph_cache().get_graph(tools)
 
-            Based on the user's request, choose the most appropriate tool and provide clear, concise responses.
-            Always prioritize helping users efficiently achieve their task management goals."""),
-            MessagesPlaceholder(variable_name="messages"),
-        ])
-        
-        logger.info("Creating agent...")
-        agent = create_react_agent(
-            model=llm,
-            tools=tools,
-            prompt=prompt
-        )
-        
-        yield agent
+async def list_tools(project_root=None):
+    """
+    List the task tools available for direct calls
+    
+    Args:
+        project_root: User-provided project root directory
+    
+    Returns:
+        List of {"name", "description", "input_schema"} dictionaries
+    """
+    async with open_tool_session(project_root) as tools:
+        return [describe_tool(tool) for tool in tools]
+
+async def call_tool(tool_name, arguments=None, project_root=None):
+    """
+    Call a task tool directly, bypassing the LLM
+    
+    Deterministic operations such as listing tasks or fetching a task by ID
+    take one tool round-trip instead of a full ReAct loop and cost no tokens.
+    
+    Args:
+        tool_name: Name of the shrimp-task-manager tool, e.g. "list_tasks"
+        arguments: Tool arguments, validated against the tool's input schema
+        project_root: User-provided project root directory
+    
+    Returns:
+        Tool output text
+    
+    Raises:
+        ToolArgumentError: If the tool does not exist or the arguments are invalid
+    
+    Usage:
+    ```python
+    output = await call_tool("get_task_detail", {"taskId": "1"}, project_root)
+    ```
+    """
+    arguments = dict(arguments or {})
+    with get_tracer().span("direct.request", tool=tool_name, project_root=project_root):
+        async with open_tool_session(project_root) as tools:
+            tool = next((t for t in tools if t.name == tool_name), None)
+            if tool is None:
+                available = ", ".join(sorted(t.name for t in tools))
+                raise ToolArgumentError(f"Unknown tool '{tool_name}'. Available tools: {available}")
+            validate_tool_arguments(tool, arguments)
+            result = await invoke_tool(tool_name, arguments)
+    return format_tool_result(result)
@@ -0,0 +1,172 @@
+"""
+Task Backends
+
+Where the agent's task tools come from. The shrimp backend borrows a pooled
+shrimp-task-manager subprocess and talks to it over stdio; the local backend
+serves the same tools in-process from the project's TaskStore; the http backend
+calls a shared task service. TASK_BACKEND picks the backend, and
+register_backend adds others.
+"""
+
+import abc
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
+
+from omni_task_agent.pool import get_session_pool
+from omni_task_agent.resolver import SERVER_ROOT
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "shrimp"
+
+# Data directories already created by get_data_dir
+_created_data_dirs = set()
+
+
+def get_data_dir(project_root=None) -> str:
+    """Return the task data directory of a project, creating it on first use
+
+    Args:
+        project_root: User-provided project root directory; anything that is not
+            a path falls back to the server's tmp directory
+
+    Returns:
+        Absolute path of <project_root>/data
+    """
+    # Handle cases where project_root might be a dict or other non-string type
+    if not project_root or not isinstance(project_root, (str, bytes, os.PathLike)):
+        project_root = os.path.join(SERVER_ROOT, "tmp")
+        logger.info(f"No valid project root provided, using temporary directory: {project_root}")
+
+    data_dir = os.path.abspath(os.path.join(project_root, "data"))
+    if data_dir not in _created_data_dirs:
+        os.makedirs(data_dir, exist_ok=True)
+        _created_data_dirs.add(data_dir)
+        logger.info(f"Using data directory: {data_dir} for user project: {project_root}")
+    return data_dir
+
+
+@dataclass
+class BackendSession:
+    """Tools of one project, ready to bind to a request
+
+    Attributes:
+        data_dir: Absolute project data directory, the key of caches and locks
+        tools: LangChain tools with the shrimp-task-manager names
+        server_config: MCP connection configuration, or None for backends the
+            scheduler cannot spread over sibling sessions
+    """
+
+    data_dir: str
+    tools: List["BaseTool"]
+    server_config: Optional[Dict[str, Any]] = None
+
+
+class TaskBackend(abc.ABC):
+    """Source of the task tools
+
+    Subclasses implement session(); preflight() runs once when a server starts
+    and metrics() adds to the server metrics.
+    """
+
+    name = ""
+
+    def preflight(self):
+        """Check that the backend can serve requests, raising if it cannot"""
+
+    @abc.abstractmethod
+    def session(self, project_root=None) -> AsyncIterator[BackendSession]:
+        """Async context manager yielding the tools of a project"""
+
+    def metrics(self) -> Dict[str, Any]:
+        """Backend statistics for the server metrics"""
+        return {}
+
+
+class ShrimpBackend(TaskBackend):
+    """shrimp-task-manager over stdio, one warm pooled subprocess per data directory"""
+
+    name = "shrimp"
+
+    def preflight(self):
+        from omni_task_agent.resolver import preflight
+
+        preflight()
+
+    @asynccontextmanager
+    async def session(self, project_root=None):
+        # Imported here because the agent module imports this one
+        from omni_task_agent.agent import get_server_config
+
+        server_config = get_server_config(project_root)
+        data_dir = os.path.abspath(server_config["shrimp-task-manager"]["env"]["DATA_DIR"])
+        async with get_session_pool().acquire(data_dir, server_config) as client:
+            yield BackendSession(data_dir, list(client.get_tools() or []), server_config)
+
+
+class LocalBackend(TaskBackend):
+    """The shrimp-task-manager tools implemented in Python over the project's TaskStore
+
+    Tool calls are plain coroutine calls: no subprocess, pipe or JSON encoding.
+    Tasks are kept in <data_dir>/omni_tasks.json.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self._tools: Optional[List["BaseTool"]] = None
+
+    @asynccontextmanager
+    async def session(self, project_root=None):
+        if self._tools is None:
+            from omni_task_agent.local_backend import make_local_tools
+
+            self._tools = make_local_tools()
+        yield BackendSession(get_data_dir(project_root), list(self._tools))
+
+
+def _http_backend() -> TaskBackend:
+    # httpx is only imported when the backend is used
+    from omni_task_agent.http_backend import HttpBackend
+
+    return HttpBackend()
+
+
+BACKENDS: Dict[str, Callable[[], TaskBackend]] = {
+    "shrimp": ShrimpBackend,
+    "local": LocalBackend,
+    "http": _http_backend,
+}
+
+_backends: Dict[str, TaskBackend] = {}
+
+
+def register_backend(name: str, factory: Callable[[], TaskBackend]):
+    """Make a backend selectable with TASK_BACKEND=<name>"""
+    BACKENDS[name] = factory
+    _backends.pop(name, None)
+
+
+def get_task_backend(name: Optional[str] = None) -> TaskBackend:
+    """Return the process-wide instance of a backend
+
+    Args:
+        name: Backend name, defaults to TASK_BACKEND (shrimp)
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    name = (name or os.environ.get("TASK_BACKEND") or DEFAULT_BACKEND).strip().lower()
+    backend = _backends.get(name)
+    if backend is None:
+        factory = BACKENDS.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown TASK_BACKEND '{name}', expected one of {', '.join(sorted(BACKENDS))}")
+        backend = _backends[name] = factory()
+    return backend
@@ -0,0 +1,168 @@
+"""
+Batch Execution
+
+Runs many prompts without the interactive loop. Prompts are grouped by project
+root, each project shares one warm make_graph session, and a fixed number of
+workers process the prompts concurrently. No more projects than workers hold a
+session at once, so a batch over many projects doesn't spawn a backend
+subprocess for each of them up front. Results are written as JSON lines in
+completion order, each with its own timing.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from omni_task_agent.agent import make_graph
+from omni_task_agent.config import get_env_int
+from omni_task_agent.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One prompt of a batch
+
+    Attributes:
+        index: Zero-based position in the input
+        prompt: User prompt sent to the agent
+        project_root: Project the prompt works on, None for the default project
+        id: Caller-supplied identifier echoed in the result
+    """
+
+    index: int
+    prompt: str
+    project_root: Optional[str] = None
+    id: Any = None
+
+
+def parse_prompts(lines: Iterable[str], project_root: Optional[str] = None) -> Iterator[BatchItem]:
+    """Parse JSON lines into batch items
+
+    Each non-empty line is either a JSON string (the prompt) or an object with
+    "prompt" and optional "projectRoot" and "id" keys.
+
+    Args:
+        lines: Input lines
+        project_root: Project root for items that don't name one
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    index = 0
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e.msg})")
+        if isinstance(entry, str):
+            entry = {"prompt": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("prompt"), str):
+            raise ValueError(f"Line {number}: expected a string or an object with a 'prompt' string")
+        yield BatchItem(
+            index=index,
+            prompt=entry["prompt"],
+            project_root=entry.get("projectRoot", project_root),
+            id=entry.get("id"),
+        )
+        index += 1
+
+
+def final_output(state: Dict[str, Any]) -> str:
+    """Text of the last message of an agent result"""
+    messages = state.get("messages") or []
+    return messages[-1].content if messages else ""
+
+
+async def run_prompt(agent, prompt: str) -> str:
+    """Send one prompt to an agent graph and return its final answer"""
+    with get_tracer().span("agent.request", source="batch"):
+        state = await agent.ainvoke({"messages": [{"role": "user", "content": prompt}]})
+    return final_output(state)
+
+
+async def run_batch(
+    items: List[BatchItem],
+    output: TextIO,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run prompts concurrently and write one JSON line per result as each finishes
+
+    Args:
+        items: Prompts to run
+        output: Stream receiving the JSON lines
+        workers: Prompts in flight across all projects, and project sessions open
+            at once (BATCH_WORKERS)
+        on_result: Optional callback invoked with every result
+
+    Returns:
+        Summary with counts, wall time and throughput
+    """
+    workers = workers or get_env_int("BATCH_WORKERS", 4)
+    slots = asyncio.Semaphore(workers)
+    sessions = asyncio.Semaphore(workers)
+    groups: Dict[Optional[str], List[BatchItem]] = {}
+    for item in items:
+        groups.setdefault(item.project_root, []).append(item)
+
+    counts = {"ok": 0, "error": 0}
+    done = set()
+    batch_started = time.perf_counter()
+
+    def emit(item: BatchItem, started: float, output_text: Optional[str] = None, error: Optional[str] = None):
+        result = {
+            "index": item.index,
+            "id": item.id,
+            "projectRoot": item.project_root,
+            "status": "error" if error is not None else "ok",
+            "output": output_text,
+            "error": error,
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        counts[result["status"]] += 1
+        done.add(item.index)
+        output.write(json.dumps(result, default=str) + "\n")
+        output.flush()
+        if on_result is not None:
+            on_result(result)
+
+    async def run_item(agent, item: BatchItem):
+        async with slots:
+            started = time.perf_counter()
+            try:
+                emit(item, started, output_text=await run_prompt(agent, item.prompt))
+            except Exception as e:
+                logger.error(f"Batch item {item.index} failed: {str(e)}")
+                emit(item, started, error=str(e))
+
+    async def run_project(project_root: Optional[str], project_items: List[BatchItem]):
+        # Projects beyond the worker count wait here before spawning a session
+        async with sessions:
+            started = time.perf_counter()
+            try:
+                # One warm session per project; items run as tasks inside its tool context
+                async with make_graph(project_root) as agent:
+                    await asyncio.gather(*(run_item(agent, item) for item in project_items))
+            except Exception as e:
+                logger.error(f"Could not open a session for {project_root}: {str(e)}")
+                for item in project_items:
+                    if item.index not in done:
+                        emit(item, started, error=f"Could not run agent - {str(e)}")
+
+    await asyncio.gather(*(run_project(root, group) for root, group in groups.items()))
+    wall = time.perf_counter() - batch_started
+    return {
+        "total": len(items),
+        **counts,
+        "workers": workers,
+        "seconds": round(wall, 4),
+        "prompts_per_second": round(len(items) / wall, 2) if wall else 0.0,
+    }
@@ -0,0 +1,442 @@
+"""
+Thread Checkpoints
+
+Persists agent conversation state per thread in a SQLite file in the project
+data directory, so MCP clients continue a conversation by sending a thread ID
+and the new message instead of the whole history. Channel values are stored
+once per version and compressed, and old checkpoints are pruned as threads grow.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from omni_task_agent.config import get_env_float, get_env_int
+from omni_task_agent.tools import get_tool_context
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_FILE = "checkpoints.sqlite"
+
+# Serialized values at least this large are zlib-compressed
+COMPRESS_MIN_BYTES = 512
+_COMPRESSED_SUFFIX = "+zlib"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata BLOB NOT NULL,
+    versions TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_created ON checkpoints (thread_id, created_at);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer storing threads in one SQLite file
+
+    Checkpoints hold channel versions only; each channel value is written once
+    per version to the blobs table, so steps that leave the message list
+    unchanged add no message data. The database uses WAL mode and one
+    connection guarded by a lock, which serves the concurrent requests of a
+    single process.
+
+    Args:
+        path: SQLite file, created with its directory on first use
+        keep_last: Checkpoints kept per thread (CHECKPOINT_KEEP_LAST)
+        max_age_days: Threads idle longer than this are deleted (CHECKPOINT_MAX_AGE_DAYS)
+    """
+
+    def __init__(self, path: str, keep_last: Optional[int] = None, max_age_days: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.keep_last = max(1, keep_last if keep_last is not None else get_env_int("CHECKPOINT_KEEP_LAST", 20))
+        self.max_age_days = max_age_days if max_age_days is not None else get_env_float("CHECKPOINT_MAX_AGE_DAYS", 30.0)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.prune_expired()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Serialization
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return type_ + _COMPRESSED_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(_COMPRESSED_SUFFIX):
+            type_, data = type_[:-len(_COMPRESSED_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # Reads
+
+    def _tuple(self, row: sqlite3.Row) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, checkpoint_b, metadata_b = row
+        checkpoint: Checkpoint = self._load(type_, checkpoint_b)
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob is not None and blob[0] != "empty":
+                channel_values[channel] = self._load(*blob)
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=json.loads(metadata_b),
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            pending_writes=[(task_id, channel, self._load(t, v)) for task_id, channel, t, v in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._tuple(row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns=?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id=?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id<?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                item = self._tuple(row)
+                if filter and not all(item.metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    # Writes
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+        blobs = [
+            (thread_id, checkpoint_ns, channel, str(version), *(
+                self._dump(values[channel]) if channel in values else ("empty", None)
+            ))
+            for channel, version in new_versions.items()
+        ]
+        type_, data = self._dump(stored)
+        metadata_json = json.dumps(get_checkpoint_metadata(config, metadata), default=str).encode("utf-8")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id, checkpoint_ns, checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        type_, data, metadata_json,
+                        json.dumps({k: str(v) for k, v in checkpoint["channel_versions"].items()}),
+                        time.time(),
+                    ),
+                )
+                self._prune_thread(thread_id, checkpoint_ns)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, *self._dump(value), task_path))
+        # Special writes (errors, interrupts) are kept from their first occurrence
+        statement = "INSERT OR REPLACE" if all(row[4] >= 0 for row in rows) else "INSERT OR IGNORE"
+        with self._lock:
+            self._conn.executemany(f"{statement} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+
+    # Pruning
+
+    def _prune_thread(self, thread_id: str, checkpoint_ns: str):
+        """Keep the newest keep_last checkpoints of a thread and the blobs they use"""
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last),
+        )]
+        if not stale:
+            return
+        for checkpoint_id in stale:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+            self._conn.execute(
+                "DELETE FROM writes WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+        referenced = set()
+        for (versions,) in self._conn.execute(
+            "SELECT versions FROM checkpoints WHERE thread_id=? AND checkpoint_ns=?", (thread_id, checkpoint_ns)
+        ):
+            referenced.update(json.loads(versions).items())
+        blobs = self._conn.execute(
+            "SELECT channel, version FROM blobs WHERE thread_id=? AND checkpoint_ns=?", (thread_id, checkpoint_ns)
+        ).fetchall()
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+            [(thread_id, checkpoint_ns, channel, version) for channel, version in blobs if (channel, version) not in referenced],
+        )
+
+    def prune_expired(self) -> List[str]:
+        """Delete threads whose newest checkpoint is older than max_age_days
+
+        Returns:
+            IDs of the deleted threads
+        """
+        if self.max_age_days <= 0:
+            return []
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+            )]
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        if expired:
+            logger.info(f"Pruned {len(expired)} expired threads from {self.path}")
+        return expired
+
+    # Async API: SQLite calls are short local transactions, run in a worker thread
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+
+class ProjectCheckpointer(BaseCheckpointSaver):
+    """Checkpointer that stores each thread in the data directory of the current project
+
+    Compiled graphs are shared across projects, so this dispatches every call to
+    the SqliteCheckpointSaver of the data directory bound by bind_tool_context,
+    the same way routed tools reach the current project's session.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._savers: Dict[str, SqliteCheckpointSaver] = {}
+        self._lock = threading.Lock()
+
+    def saver_for(self, data_dir: str) -> SqliteCheckpointSaver:
+        data_dir = os.path.abspath(data_dir)
+        with self._lock:
+            saver = self._savers.get(data_dir)
+            if saver is None:
+                saver = self._savers[data_dir] = SqliteCheckpointSaver(os.path.join(data_dir, CHECKPOINTS_FILE))
+        return saver
+
+    def _current(self) -> SqliteCheckpointSaver:
+        context = get_tool_context()
+        if context is None or not context.data_dir:
+            raise RuntimeError("Thread checkpoints need a project data directory bound by make_graph")
+        return self.saver_for(context.data_dir)
+
+    def get_tuple(self, config):
+        return self._current().get_tuple(config)
+
+    def list(self, config, **kwargs):
+        return self._current().list(config, **kwargs)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self._current().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return self._current().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        return self._current().delete_thread(thread_id)
+
+    async def aget_tuple(self, config):
+        return await self._current().aget_tuple(config)
+
+    async def alist(self, config, **kwargs):
+        async for item in self._current().alist(config, **kwargs):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self._current().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await self._current().aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await self._current().adelete_thread(thread_id)
+
+    def close(self):
+        with self._lock:
+            savers, self._savers = list(self._savers.values()), {}
+        for saver in savers:
+            saver.close()
+
+
+_checkpointer: Optional[ProjectCheckpointer] = None
+
+
+def get_checkpointer() -> ProjectCheckpointer:
+    """Return the process-wide project checkpointer"""
+    global _checkpointer
+    if _checkpointer is None:
+        _checkpointer = ProjectCheckpointer()
+    return _checkpointer
@@ -4,13 +4,35 @@ OmniTask Command Line Interface
 This module provides a command line interface for interacting with the OmniTask agent.
 """
 
+import argparse
+import json
 import logging
 import os
 import asyncio
+import sys
+import time
 
-from langchain_core.messages import AIMessage, HumanMessage
-from omni_task_agent.config import setup_environment
+from omni_task_agent import __version__
+from omni_task_agent.config import get_env_bool, setup_environment
 from omni_task_agent.agent import make_graph
+from omni_task_agent.pool import close_session_pool
+from omni_task_agent.streaming import ConsoleStreamHandler, stream_agent
+from omni_task_agent.tracing import InMemoryExporter, get_tracer
+
+def print_timings(trace_id):
+    """Print per-phase timings of a traced request"""
+    exporter = get_tracer().get_exporter(InMemoryExporter)
+    if exporter is None:
+        print("\nTimings are recorded when TRACE_EXPORTERS includes 'memory'.")
+        return
+    if trace_id is None:
+        print("\nNo request traced yet.")
+        return
+    print("\nTimings of the last request:")
+    for name, entry in exporter.summary(trace_id).items():
+        tokens = f", {entry['total_tokens']} tokens" if "total_tokens" in entry else ""
+        print(f"- {name}: {entry['count']}x, {entry['total_seconds'] * 1000:.1f} ms{tokens}")
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,11 +41,21 @@ logger = logging.getLogger("omni_task_cli")
 
 async def async_main():
     """Command line interface main function"""
+    # LangChain is only needed once a session starts, not for `ota version`
+    from langchain_core.messages import AIMessage, HumanMessage
+    from omni_task_agent.history import SUMMARIZE, HistoryManager, make_llm_summarizer
+    
     # Set up environment
     setup_environment()
     
-    # Initialize chat history
-    messages = []
+    # Stream tokens by default; STREAM_OUTPUT=false prints the full reply at the end
+    stream_output = get_env_bool("STREAM_OUTPUT", True)
+    
+    # Initialize chat history, kept under the configured token budget
+    history = HistoryManager()
+    if history.strategy == SUMMARIZE:
+        from omni_task_agent.graph_cache import get_graph_cache
+        history.summarizer = make_llm_summarizer(get_graph_cache().get_llm())
     
     # Display welcome message
     print("\n=== OmniTask Command Line Interface ===")
@@ -33,6 +65,7 @@ async def async_main():
     try:
         has_tools = True
         agent = None
+        last_trace_id = None
         
         # Use an async context manager to ensure proper resource management
         async with make_graph() as agent_instance:
@@ -61,6 +94,7 @@ async def async_main():
                         print("- help: Show this help message")
                         print("- exit/quit: Exit program")
                         print("- version: Show version information")
+                        print("- timings: Show per-phase timings of the last request")
                         
                         if has_tools:
                             # Get tools list
@@ -72,25 +106,39 @@ async def async_main():
                                 print(f"- {name}: {desc}")
                         continue
                         
+                    if user_input.lower() == "timings":
+                        print_timings(last_trace_id)
+                        continue
+                    
                     if user_input.lower() == "version":
                         print("\nVersion information:")
-                        print("OmniTask CLI v0.1.0")
+                        print(f"OmniTask CLI v{__version__}")
                         print(f"Working directory: {os.getcwd()}")
                         continue
                     
                     # Process user input
                     if has_tools:
                         # Add user message to history
-                        messages.append(HumanMessage(content=user_input))
+                        history.add(HumanMessage(content=user_input))
                         
-                        # Call agent - Reuse the created instance
-                        response = await agent.ainvoke({"messages": messages})
+                        # Call agent - Reuse the created instance, sending only the budgeted window
+                        inputs = {"messages": await history.prepare()}
+                        handler = None
+                        with get_tracer().span("agent.request", source="cli") as span:
+                            last_trace_id = span.trace_id
+                            if stream_output:
+                                # Print tokens and tool progress as they arrive
+                                handler = ConsoleStreamHandler()
+                                response = await stream_agent(agent, inputs, handler)
+                            else:
+                                response = await agent.ainvoke(inputs)
                         
                         # Process response
                         if "messages" in response and response["messages"]:
                             output = response["messages"][-1].content
-                            print(f"Assistant: {output}")
-                            messages.append(AIMessage(content=output))
+                            if handler is None or not handler.streamed(output):
+                                print(f"Assistant: {output}")
+                            history.add(AIMessage(content=output))
                         else:
                             print("Assistant: Unable to generate valid response, please try again.")
                     else:
@@ -105,10 +153,221 @@ async def async_main():
         logger.error(f"Error loading agent: {str(e)}")
         print(f"Error: Could not initialize agent - {str(e)}")
         has_tools = False
+    finally:
+        # Shut down pooled shrimp-task-manager subprocesses
+        await close_session_pool()
+
+
+async def run_once(prompt, project_root=None, as_json=False):
+    """Answer a single prompt and exit
+    
+    Args:
+        prompt: User prompt
+        project_root: Project root directory, defaults to the temporary project
+        as_json: Print one JSON result line instead of the assistant's text
+    
+    Returns:
+        Process exit code
+    """
+    from omni_task_agent.batch import final_output
+    
+    setup_environment()
+    stream_output = get_env_bool("STREAM_OUTPUT", True) and not as_json
+    started = time.perf_counter()
+    try:
+        async with make_graph(project_root) as agent:
+            inputs = {"messages": [{"role": "user", "content": prompt}]}
+            handler = None
+            with get_tracer().span("agent.request", source="cli"):
+                if stream_output:
+                    handler = ConsoleStreamHandler(prefix="")
+                    response = await stream_agent(agent, inputs, handler)
+                else:
+                    response = await agent.ainvoke(inputs)
+        output = final_output(response)
+        if as_json:
+            print(json.dumps({"status": "ok", "output": output, "seconds": round(time.perf_counter() - started, 4)}))
+        elif handler is None or not handler.streamed(output):
+            print(output)
+        return 0
+    except Exception as e:
+        logger.error(f"Run error: {str(e)}")
+        if as_json:
+            print(json.dumps({"status": "error", "error": str(e), "seconds": round(time.perf_counter() - started, 4)}))
+        else:
+            print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        await close_session_pool()
+
+
+async def run_batch_file(path, output_path=None, workers=None, project_root=None):
+    """Run every prompt of a JSON lines file, writing results in completion order
+    
+    Returns:
+        Process exit code, 1 if any prompt failed
+    """
+    from omni_task_agent.batch import parse_prompts, run_batch
+    
+    setup_environment()
+    try:
+        with open(sys.stdin.fileno() if path == "-" else path, encoding="utf-8", closefd=path != "-") as f:
+            items = list(parse_prompts(f, project_root))
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    
+    output = open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+    try:
+        summary = await run_batch(items, output, workers=workers)
+    finally:
+        if output_path:
+            output.close()
+        await close_session_pool()
+    print(
+        f"Completed {summary['total']} prompts ({summary['error']} failed) in {summary['seconds']:.2f}s "
+        f"with {summary['workers']} workers, {summary['prompts_per_second']} prompts/s",
+        file=sys.stderr,
+    )
+    return 1 if summary["error"] else 0
+
+
+def run_command(args):
+    """ota run "<prompt>" """
+    parser = argparse.ArgumentParser(prog="ota run", description="Answer one prompt and exit")
+    parser.add_argument("prompt", help="Prompt to send to the agent")
+    parser.add_argument("--project-root", help="Project root directory")
+    parser.add_argument("--json", action="store_true", help="Print the result as a JSON line")
+    options = parser.parse_args(args)
+    return asyncio.run(run_once(options.prompt, options.project_root, options.json))
+
+
+def batch_command(args):
+    """ota batch prompts.jsonl"""
+    parser = argparse.ArgumentParser(prog="ota batch", description="Run prompts from a JSON lines file concurrently")
+    parser.add_argument("file", help='JSON lines file of prompts or {"prompt", "projectRoot", "id"} objects, - for stdin')
+    parser.add_argument("-w", "--workers", type=int, help="Prompts run at once (default: BATCH_WORKERS or 4)")
+    parser.add_argument("-o", "--output", help="Write results here instead of stdout")
+    parser.add_argument("--project-root", help="Project root for prompts that don't set projectRoot")
+    options = parser.parse_args(args)
+    return asyncio.run(run_batch_file(options.file, options.output, options.workers, options.project_root))
+
+
+def open_text(path, mode):
+    """Open a file, or stdin/stdout for "-", without closing the standard stream"""
+    if path == "-":
+        return open((sys.stdin if mode == "r" else sys.stdout).fileno(), mode, encoding="utf-8", newline="", closefd=False)
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def transfer_data_dir(options):
+    """Data directory named by --data-dir, or the one of --project-root"""
+    from omni_task_agent.backends import get_data_dir
+    
+    return os.path.abspath(options.data_dir) if options.data_dir else get_data_dir(options.project_root)
+
+
+def import_command(args):
+    """ota import tasks.jsonl"""
+    from omni_task_agent.task_io import FORMATS, detect_format, import_tasks
+    
+    parser = argparse.ArgumentParser(prog="ota import", description="Load tasks from a JSON lines or CSV file without the LLM")
+    parser.add_argument("file", help="Task file, - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension, else jsonl)")
+    parser.add_argument("--project-root", help="Project whose data directory receives the tasks")
+    parser.add_argument("--data-dir", help="Data directory to write, instead of <project-root>/data")
+    parser.add_argument("--chunk-size", type=int, help="Rows per write (default: TASK_IO_CHUNK_SIZE or 1000)")
+    parser.add_argument("--strict", action="store_true", help="Stop at the first invalid row instead of skipping it")
+    options = parser.parse_args(args)
+    
+    setup_environment()
+    data_dir = transfer_data_dir(options)
+    try:
+        with open_text(options.file, "r") as source:
+            summary = import_tasks(
+                source,
+                data_dir,
+                detect_format(options.file, options.format),
+                chunk_size=options.chunk_size,
+                strict=options.strict,
+            )
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    for error in summary["errors"]:
+        print(f"Rejected: {error}", file=sys.stderr)
+    print(
+        f"Imported {summary['rows']} rows ({summary['created']} created, {summary['updated']} updated, "
+        f"{summary['rejected']} rejected) into {data_dir} in {summary['seconds']:.2f}s, "
+        f"{summary['rows_per_second']} rows/s",
+        file=sys.stderr,
+    )
+    return 1 if summary["rejected"] else 0
+
+
+def export_command(args):
+    """ota export tasks.csv"""
+    from omni_task_agent.task_io import FORMATS, detect_format, export_tasks
+    
+    parser = argparse.ArgumentParser(prog="ota export", description="Write a project's tasks to a JSON lines or CSV file")
+    parser.add_argument("file", nargs="?", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension, else jsonl)")
+    parser.add_argument("--status", help="Only export tasks with this status")
+    parser.add_argument("--project-root", help="Project whose tasks are exported")
+    parser.add_argument("--data-dir", help="Data directory to read, instead of <project-root>/data")
+    options = parser.parse_args(args)
+    
+    setup_environment()
+    data_dir = transfer_data_dir(options)
+    try:
+        with open_text(options.file, "w") as output:
+            summary = export_tasks(output, data_dir, detect_format(options.file, options.format), status=options.status)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    print(f"Exported {summary['rows']} rows from {data_dir} in {summary['seconds']:.2f}s, {summary['rows_per_second']} rows/s", file=sys.stderr)
+    return 0
+
+
+def print_usage(args=None):
+    """Print command line usage"""
+    print("Usage: ota [command]")
+    print("\nCommands:")
+    print("  (none)                Start the interactive session")
+    print('  run "<prompt>"        Answer one prompt and exit')
+    print("  batch prompts.jsonl   Run many prompts concurrently, JSON lines out")
+    print("  import tasks.jsonl    Load tasks from a JSON lines or CSV file")
+    print("  export [tasks.csv]    Write the project's tasks as JSON lines or CSV")
+    print("  help                  Show this help message")
+    print("  version               Show version information")
+
+
+def print_version(args=None):
+    """Print version information"""
+    print(f"OmniTask CLI v{__version__}")
+
+
+# Non-interactive commands, called with the remaining arguments
+COMMANDS = {
+    "run": run_command,
+    "batch": batch_command,
+    "import": import_command,
+    "export": export_command,
+    "help": print_usage,
+    "version": print_version,
+}
 
 
 def main():
     """CLI entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        try:
+            code = COMMANDS[sys.argv[1]](sys.argv[2:])
+        except KeyboardInterrupt:
+            code = 130
+        if code:
+            sys.exit(code)
+        return
     try:
         asyncio.run(async_main())
     except KeyboardInterrupt:
@@ -89,4 +89,54 @@ def setup_environment(interactive=False) -> Dict[str, str]:
         "OMNI_TASK_API_URL": os.environ["OMNI_TASK_API_URL"],
         "LLM_MODEL": os.environ["LLM_MODEL"],
         "OPENAI_API_BASE": os.environ.get("OPENAI_API_BASE", "default")
-    } 
\ No newline at end of file
+    }
+
+
+def get_env_int(name: str, default: int) -> int:
+    """Read an integer environment variable
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is missing or not a valid integer
+
+    Returns:
+        Parsed integer value
+    """
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_env_float(name: str, default: float) -> float:
+    """Read a float environment variable
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is missing or not a valid number
+
+    Returns:
+        Parsed float value
+    """
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean environment variable
+
+    Accepts "1", "true", "yes" and "on" (case-insensitive) as true values.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is missing
+
+    Returns:
+        Parsed boolean value
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,502 @@
+"""
+Dependency Engine
+
+Keeps the dependency DAG of a project's tasks and subtasks and answers "what can
+I work on next" questions without the LLM reading the whole task list. Unmet
+dependency counts and the ready set are updated incrementally as statuses and
+dependencies change, edges that would close a cycle are rejected when inserted,
+and the critical path is computed in linear time.
+"""
+
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from omni_task_agent.tools import get_tool_context
+from omni_task_agent.utils.state import TASKS_FILE, Task, TaskCollection, TaskStore
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Statuses meaning the task no longer blocks its dependents
+COMPLETED_STATUSES = frozenset({"done", "completed"})
+
+# shrimp-task-manager's own task file in the project data directory
+SHRIMP_TASKS_FILE = "tasks.json"
+
+_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a dependency would make tasks wait on each other
+
+    Attributes:
+        cycle: Task IDs forming the cycle, starting and ending with the same ID
+    """
+
+    def __init__(self, cycle: List[str]):
+        super().__init__("Dependency cycle: " + " -> ".join(cycle))
+        self.cycle = cycle
+
+
+def is_completed(task: Task) -> bool:
+    return task.status in COMPLETED_STATUSES
+
+
+class DependencyGraph:
+    """Incrementally maintained dependency DAG over a TaskCollection
+
+    An edge ``task -> dependency`` means the dependency has to be completed
+    before the task can start. Dependencies on unknown task IDs count as unmet.
+    The graph registers itself as a collection listener, so changes made through
+    the collection (or by setting ``task.status`` / ``task.dependencies``) keep
+    it current.
+
+    Usage:
+    ```python
+    graph = DependencyGraph(collection)
+    graph.ready()            # unblocked tasks
+    graph.critical_path()    # longest chain of remaining work
+    graph.add_dependency("2", "1")
+    ```
+    """
+
+    def __init__(self, collection: TaskCollection):
+        self.collection = collection
+        self._unmet: Dict[str, int] = {}
+        # Ordered set of incomplete tasks whose dependencies are all completed
+        self._ready: Dict[str, None] = {}
+        # Order tasks were first seen in, to break priority ties deterministically
+        self._positions: Dict[str, int] = {}
+        for task in collection:
+            self._track(task)
+        collection.add_listener(self)
+
+    def close(self):
+        """Stop following changes of the collection"""
+        self.collection.remove_listener(self)
+
+    # Incremental maintenance
+
+    def _count_unmet(self, task: Task) -> int:
+        unmet = 0
+        for dependency_id in set(task.dependencies):
+            dependency = self.collection.get(dependency_id)
+            if dependency is None or not is_completed(dependency):
+                unmet += 1
+        return unmet
+
+    def _refresh_ready(self, task: Task):
+        if self._unmet.get(task.id) == 0 and not is_completed(task):
+            self._ready[task.id] = None
+        else:
+            self._ready.pop(task.id, None)
+
+    def _track(self, task: Task):
+        self._positions.setdefault(task.id, len(self._positions))
+        self._unmet[task.id] = self._count_unmet(task)
+        self._refresh_ready(task)
+
+    def _shift_dependents(self, task_id: str, delta: int):
+        """Adjust unmet counts of the tasks depending on task_id"""
+        for dependent in self.collection.dependents_of(task_id):
+            self._unmet[dependent.id] += delta
+            self._refresh_ready(dependent)
+
+    def on_task_added(self, task: Task):
+        self._track(task)
+        # Dependents that referenced this ID before it existed counted it as unmet
+        if is_completed(task):
+            for dependent in self.collection.dependents_of(task.id):
+                if dependent.id in self._unmet:
+                    self._track(dependent)
+
+    def on_task_removed(self, task: Task):
+        self._unmet.pop(task.id, None)
+        self._ready.pop(task.id, None)
+        self._positions.pop(task.id, None)
+        if is_completed(task):
+            # Its dependents now point at an unknown ID, which counts as unmet
+            self._shift_dependents(task.id, +1)
+
+    def on_status_changed(self, task: Task, old: str):
+        was_completed, now_completed = old in COMPLETED_STATUSES, is_completed(task)
+        if was_completed != now_completed:
+            self._shift_dependents(task.id, -1 if now_completed else +1)
+        self._refresh_ready(task)
+
+    def on_dependencies_changed(self, task: Task, old: Tuple[str, ...]):
+        self._track(task)
+
+    def validate_dependencies(self, task: Task, new: Tuple[str, ...]):
+        overrides = {task.id: new}
+        for dependency_id in set(new) - set(task.dependencies):
+            self._check_edge(task.id, dependency_id, overrides)
+
+    def validate_add(self, tasks: Sequence[Task]):
+        self.check_dependencies({task.id: task.dependencies for task in tasks})
+
+    def check_dependencies(self, dependencies: Dict[str, Sequence[str]]):
+        """Check new dependency lists of several tasks before applying any of them
+
+        Raises:
+            DependencyCycleError: If the lists, taken together, would close a cycle
+        """
+        overrides = {str(task_id): tuple(str(d) for d in new) for task_id, new in dependencies.items()}
+        for task_id, new in overrides.items():
+            for dependency_id in set(new):
+                self._check_edge(task_id, dependency_id, overrides)
+
+    # Cycle detection
+
+    def _dependencies_of(self, task_id: str, overrides: Dict[str, Tuple[str, ...]]) -> Iterable[str]:
+        if task_id in overrides:
+            return overrides[task_id]
+        task = self.collection.get(task_id)
+        return task.dependencies if task is not None else ()
+
+    def _check_edge(self, task_id: str, dependency_id: str, overrides: Optional[Dict[str, Tuple[str, ...]]] = None):
+        """Raise DependencyCycleError if dependency_id already (transitively) depends on task_id"""
+        path = self._find_path(dependency_id, task_id, overrides or {})
+        if path is not None:
+            raise DependencyCycleError([task_id] + path)
+
+    def _find_path(self, start: str, target: str, overrides: Dict[str, Tuple[str, ...]]) -> Optional[List[str]]:
+        """Dependency chain from start to target, or None; iterative DFS"""
+        if start == target:
+            return [start]
+        parents: Dict[str, str] = {start: start}
+        stack = [start]
+        while stack:
+            current = stack.pop()
+            for dependency_id in self._dependencies_of(current, overrides):
+                if dependency_id in parents:
+                    continue
+                parents[dependency_id] = current
+                if dependency_id == target:
+                    path = [target]
+                    while path[-1] != start:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                stack.append(dependency_id)
+        return None
+
+    def would_create_cycle(self, task_id: str, dependency_id: str) -> Optional[List[str]]:
+        """Return the cycle adding ``task_id -> dependency_id`` would create, if any"""
+        path = self._find_path(str(dependency_id), str(task_id), {})
+        return [str(task_id)] + path if path is not None else None
+
+    # Mutation helpers
+
+    def add_dependency(self, task_id: str, dependency_id: str):
+        """Make task_id wait for dependency_id
+
+        Raises:
+            KeyError: If task_id is unknown
+            DependencyCycleError: If the edge would close a cycle
+        """
+        task = self.collection[task_id]
+        if str(dependency_id) not in task.dependencies:
+            task.dependencies = task.dependencies + (str(dependency_id),)
+
+    def remove_dependency(self, task_id: str, dependency_id: str):
+        task = self.collection[task_id]
+        task.dependencies = [d for d in task.dependencies if d != str(dependency_id)]
+
+    # Queries
+
+    def ready(self, limit: Optional[int] = None) -> List[Task]:
+        """Incomplete tasks whose dependencies are all completed, highest priority first"""
+        tasks = sorted(
+            (self.collection[task_id] for task_id in self._ready),
+            key=lambda task: (_PRIORITY_ORDER.get(task.priority, len(_PRIORITY_ORDER)), self._positions[task.id]),
+        )
+        return tasks[:limit] if limit is not None else tasks
+
+    def is_ready(self, task_id: str) -> bool:
+        return str(task_id) in self._ready
+
+    def unmet_count(self, task_id: str) -> int:
+        return self._unmet[str(task_id)]
+
+    def blockers(self, task_id: str) -> List[str]:
+        """IDs of unmet dependencies of a task, unknown IDs included"""
+        return [
+            dependency_id
+            for dependency_id in dict.fromkeys(self.collection[task_id].dependencies)
+            if dependency_id not in self.collection or not is_completed(self.collection[dependency_id])
+        ]
+
+    def blocked(self, limit: Optional[int] = None) -> List[Tuple[Task, List[str]]]:
+        """Incomplete tasks waiting on other tasks, with their blockers"""
+        result = []
+        for task_id, unmet in self._unmet.items():
+            if unmet and not is_completed(self.collection[task_id]):
+                result.append((self.collection[task_id], self.blockers(task_id)))
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def critical_path(self) -> List[Task]:
+        """Longest dependency chain of incomplete tasks, first task to do first
+
+        Kahn's algorithm over incomplete tasks, O(tasks + dependencies). Tasks on
+        a cycle never become schedulable and are left out.
+        """
+        pending = [task for task in self.collection if not is_completed(task)]
+        pending_ids = {task.id for task in pending}
+        indegree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        for task in pending:
+            dependencies = [d for d in set(task.dependencies) if d in pending_ids]
+            indegree[task.id] = len(dependencies)
+            for dependency_id in dependencies:
+                dependents.setdefault(dependency_id, []).append(task.id)
+
+        length: Dict[str, int] = {}
+        previous: Dict[str, Optional[str]] = {}
+        queue = [task_id for task_id, degree in indegree.items() if degree == 0]
+        for task_id in queue:
+            length[task_id] = 1
+            previous[task_id] = None
+        best: Optional[str] = None
+        while queue:
+            task_id = queue.pop()
+            if best is None or length[task_id] > length[best]:
+                best = task_id
+            for dependent_id in dependents.get(task_id, ()):
+                if length[task_id] + 1 > length.get(dependent_id, 0):
+                    length[dependent_id] = length[task_id] + 1
+                    previous[dependent_id] = task_id
+                indegree[dependent_id] -= 1
+                if indegree[dependent_id] == 0:
+                    queue.append(dependent_id)
+
+        path = []
+        while best is not None:
+            path.append(self.collection[best])
+            best = previous[best]
+        return path[::-1]
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of tasks that wait on each other (strongly connected components)
+
+        Only data loaded from disk can contain cycles; edges added later are checked.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in (task.id for task in self.collection):
+            if root in index:
+                continue
+            work = [(root, iter(self._known_dependencies(root)))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self._known_dependencies(child))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.collection[node].dependencies:
+                        components.append(component[::-1])
+        return components
+
+    def _known_dependencies(self, task_id: str) -> List[str]:
+        return [d for d in dict.fromkeys(self.collection[task_id].dependencies) if d in self.collection]
+
+
+# Per data directory: (source file, file signature, graph)
+_graphs: Dict[str, Tuple[str, Any, DependencyGraph]] = {}
+_stores: Dict[str, TaskStore] = {}
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_task_store(data_dir: str) -> TaskStore:
+    """Return the shared TaskStore of a data directory
+
+    Saving through this store keeps the project's dependency graph current
+    without re-reading the file.
+    """
+    data_dir = os.path.abspath(data_dir)
+    store = _stores.get(data_dir)
+    if store is None:
+        store = _stores[data_dir] = TaskStore(data_dir)
+    return store
+
+
+def load_project_tasks(data_dir: str) -> Tuple[TaskCollection, str]:
+    """Load a project's tasks from its data directory
+
+    Prefers the in-process TaskStore file (omni_tasks.json) and falls back to
+    shrimp-task-manager's tasks.json.
+
+    Returns:
+        The collection and the path it was read from
+    """
+    store = get_task_store(data_dir)
+    if os.path.exists(store.path):
+        # TaskStore.load returns the same collection object until the file changes
+        return store.load(), store.path
+
+    path = os.path.join(data_dir, SHRIMP_TASKS_FILE)
+    if not os.path.exists(path):
+        return TaskCollection(), path
+    with open(path, encoding="utf-8") as f:
+        return TaskCollection.from_shrimp(json.load(f)), path
+
+
+def get_dependency_graph(data_dir: str) -> DependencyGraph:
+    """Return the dependency graph of a project data directory
+
+    In-process TaskStore collections are followed incrementally. Task files
+    written by another process (such as shrimp-task-manager) are re-read only
+    when their modification time or size changes.
+    """
+    data_dir = os.path.abspath(data_dir)
+    store_path = os.path.join(data_dir, TASKS_FILE)
+    source = store_path if os.path.exists(store_path) else os.path.join(data_dir, SHRIMP_TASKS_FILE)
+    signature = _file_signature(source)
+    cached = _graphs.get(data_dir)
+    if cached is not None and cached[:2] == (source, signature):
+        return cached[2]
+
+    collection, source = load_project_tasks(data_dir)
+    if cached is not None and cached[2].collection is collection:
+        # Saved by this process: the graph already followed the changes
+        graph = cached[2]
+    else:
+        if cached is not None:
+            cached[2].close()
+        graph = DependencyGraph(collection)
+        logger.info(f"Built dependency graph for {data_dir}: {len(collection)} tasks from {os.path.basename(source)}")
+    _graphs[data_dir] = (source, _file_signature(source), graph)
+    return graph
+
+
+def clear_dependency_graphs():
+    """Forget cached graphs and stores, e.g. between tests"""
+    for _, _, graph in _graphs.values():
+        graph.close()
+    _graphs.clear()
+    _stores.clear()
+
+
+# Agent tools
+
+def _task_summary(task: Task) -> Dict[str, Any]:
+    return {"id": task.id, "title": task.title, "status": task.status, "priority": task.priority}
+
+
+def _graph_for_context() -> DependencyGraph:
+    context = get_tool_context()
+    if context is None or not context.data_dir:
+        raise RuntimeError("Dependency tools need a project data directory bound by make_graph")
+    return get_dependency_graph(context.data_dir)
+
+
+async def ready_tasks(limit: int = 20) -> str:
+    graph = _graph_for_context()
+    return json.dumps({"tasks": [_task_summary(task) for task in graph.ready(limit)]}, ensure_ascii=False)
+
+
+async def blocked_tasks(limit: int = 20) -> str:
+    graph = _graph_for_context()
+    blocked = [dict(_task_summary(task), blockedBy=blockers) for task, blockers in graph.blocked(limit)]
+    return json.dumps({"tasks": blocked}, ensure_ascii=False)
+
+
+async def critical_path() -> str:
+    path = _graph_for_context().critical_path()
+    return json.dumps({"length": len(path), "tasks": [_task_summary(task) for task in path]}, ensure_ascii=False)
+
+
+async def dependency_cycles() -> str:
+    return json.dumps({"cycles": _graph_for_context().cycles()})
+
+
+async def check_dependency(taskId: str, dependsOn: str) -> str:
+    graph = _graph_for_context()
+    for task_id in (taskId, dependsOn):
+        if task_id not in graph.collection:
+            return json.dumps({"allowed": False, "error": f"Unknown task ID '{task_id}'"})
+    cycle = graph.would_create_cycle(taskId, dependsOn)
+    return json.dumps({"allowed": cycle is None, "cycle": cycle})
+
+
+DEPENDENCY_TOOLS = {
+    "ready_tasks": (
+        ready_tasks,
+        "List incomplete tasks whose dependencies are all completed, highest priority first. "
+        "Use this to decide what to work on next instead of reading the whole task list.",
+    ),
+    "blocked_tasks": (
+        blocked_tasks,
+        "List incomplete tasks that are waiting on other tasks, with the IDs of the tasks blocking each one.",
+    ),
+    "critical_path": (
+        critical_path,
+        "Return the longest chain of incomplete dependent tasks, in the order they have to be done.",
+    ),
+    "dependency_cycles": (
+        dependency_cycles,
+        "Find groups of tasks that depend on each other in a cycle and can never start.",
+    ),
+    "check_dependency": (
+        check_dependency,
+        "Check whether task taskId can depend on task dependsOn without creating a dependency cycle. "
+        "Call before setting dependencies with update_task.",
+    ),
+}
+
+
+def make_dependency_tools() -> List["BaseTool"]:
+    """Create LangChain tools answering dependency questions from the local task graph
+
+    The tools read the data directory bound by bind_tool_context, so they are
+    added to the session's tools and routed like the shrimp-task-manager tools.
+    """
+    from langchain_core.tools import StructuredTool
+
+    return [
+        StructuredTool.from_function(coroutine=coroutine, name=name, description=description)
+        for name, (coroutine, description) in DEPENDENCY_TOOLS.items()
+    ]
@@ -0,0 +1,260 @@
+"""
+Graph Cache
+
+Caches LLM clients and compiled ReAct agent graphs so only the first request for
+a configuration pays the construction cost.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.tool_router import route_tools
+from omni_task_agent.tools import make_routed_tools
+from omni_task_agent.tracing import get_tracer, make_llm_callback
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = """You are a Task Master Assistant, designed to help users create, manage, and analyze project tasks.
+
+            You can perform the following operations:
+            - Create Tasks: Create new tasks from scratch
+            - List Tasks: View all current tasks
+            - Update Tasks: Modify task details or status
+            - Decompose Tasks: Break down large tasks into subtasks
+            - Set Dependencies: Establish relationships between tasks
+            - Analyze Projects: Analyze project complexity and task structure
+
+            Based on the user's request, choose the most appropriate tool and provide clear, concise responses.
+            Always prioritize helping users efficiently achieve their task management goals."""
+
+# Environment settings get_llm builds the chat model from; a change to any of
+# them yields a new cache entry
+LLM_SETTINGS = (
+    "TEMPERATURE",
+    "MAX_TOKENS",
+    "LLM_CACHE",
+    "LLM_STREAM_USAGE",
+    "MODEL_ROUTER",
+    "MODEL_ROUTER_TIMEOUT",
+    "LLM_TIMEOUT",
+    "OPENAI_API_KEY",
+    "OPENAI_FAST_MODEL",
+    "ANTHROPIC_API_KEY",
+    "ANTHROPIC_MODEL",
+    "ANTHROPIC_FAST_MODEL",
+)
+
+# Environment settings get_graph reads while wrapping the model; a change to any
+# of them yields a new graph. TOOL_ROUTER_MAX_TOOLS and TOOL_ROUTER_MIN_SCORE are
+# not listed: the process-wide tool router reads them once, when first used.
+GRAPH_SETTINGS = (
+    "TOOL_ROUTER",
+    "LLM_RESILIENCE",
+    "LLM_TIMEOUT",
+    "LLM_RETRIES",
+    "LLM_HEDGE",
+)
+
+
+def _settings_digest(names: Sequence[str]) -> str:
+    # Hashed so API keys are not kept in cache keys
+    settings = json.dumps([os.environ.get(name) for name in names])
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+
+def tool_fingerprint(tools: Sequence["BaseTool"]) -> str:
+    """Compute a stable fingerprint of tool names, descriptions and argument schemas
+
+    Args:
+        tools: Tools as returned by client.get_tools()
+
+    Returns:
+        Hex digest identifying the tool set
+    """
+    schemas = sorted(
+        (
+            {"name": tool.name, "description": tool.description, "args": tool.args}
+            for tool in tools
+        ),
+        key=lambda schema: schema["name"],
+    )
+    payload = json.dumps(schemas, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GraphCache:
+    """Cache of LLM clients and compiled agent graphs
+
+    LLM clients are keyed by ``(LLM_MODEL, OPENAI_API_BASE, settings digest)``,
+    the digest covering the other ``LLM_SETTINGS``, and graphs by that key plus
+    ``(GRAPH_SETTINGS digest, tool fingerprint, checkpointer)``. Graphs are compiled with
+    routed tools, so a cached graph dispatches each call to the session bound by
+    ``bind_tool_context`` rather than the session it was first built from.
+    """
+
+    def __init__(self, max_graphs: Optional[int] = None):
+        """
+        Args:
+            max_graphs: Maximum number of compiled graphs kept (GRAPH_CACHE_MAX_SIZE)
+        """
+        self.max_graphs = max_graphs if max_graphs is not None else get_env_int("GRAPH_CACHE_MAX_SIZE", 16)
+        self.stats = {"hits": 0, "misses": 0}
+        self._llms: Dict[Tuple[str, Optional[str], str], Any] = {}
+        self._graphs: "OrderedDict[Tuple[str, Optional[str], str, str, str, Optional[int]], Any]" = OrderedDict()
+        self._prompt = None
+
+    @staticmethod
+    def _llm_key() -> Tuple[str, Optional[str], str]:
+        return os.environ.get("LLM_MODEL", "gpt-4o"), os.environ.get("OPENAI_API_BASE"), _settings_digest(LLM_SETTINGS)
+
+    def get_llm(self):
+        """Return the chat model for the current configuration, creating it once
+
+        With API keys for several providers, or a fast-tier model configured, this
+        is a model router choosing a model per call (MODEL_ROUTER).
+        """
+        key = self._llm_key()
+        llm = self._llms.get(key)
+        if llm is None:
+            from omni_task_agent.llm_cache import get_llm_cache
+            from omni_task_agent.model_router import ModelRouter, make_candidates
+
+            model_name, openai_base_url, _ = key
+            # Records an llm.call span with token counts for every model call
+            model_args: Dict[str, Any] = {"callbacks": [make_llm_callback()]}
+            # Sampling settings from the environment (defaults set by setup_environment)
+            if "TEMPERATURE" in os.environ:
+                model_args["temperature"] = get_env_float("TEMPERATURE", 0.2)
+            if "MAX_TOKENS" in os.environ:
+                model_args["max_tokens"] = get_env_int("MAX_TOKENS", 4000)
+            # Replays identical calls from disk when LLM_CACHE=true
+            llm_cache = get_llm_cache()
+            if llm_cache is not None:
+                model_args["cache"] = llm_cache
+
+            candidates = make_candidates(openai_base_url, model_args) if get_env_bool("MODEL_ROUTER", True) else []
+            if len(candidates) > 1:
+                logger.info(f"Routing LLM calls between {', '.join(c.name for c in candidates)}")
+                llm = ModelRouter(candidates).as_runnable()
+            elif candidates:
+                llm = candidates[0].model
+            else:
+                from langchain_openai import ChatOpenAI
+
+                logger.info(f"Creating LLM for model {model_name}...")
+                # stream_usage asks the provider for token counts when streaming too
+                llm_args = {
+                    "model": model_name,
+                    "stream_usage": get_env_bool("LLM_STREAM_USAGE", True),
+                    **model_args,
+                }
+                if openai_base_url:
+                    llm_args["openai_api_base"] = openai_base_url
+                llm = ChatOpenAI(**llm_args)
+            self._llms[key] = llm
+        return llm
+
+    def set_llm(self, llm: Any):
+        """Use the given chat model for the current configuration, e.g. a fake model in benchmarks
+
+        Graphs already built for the configuration are dropped so they pick up the new model.
+        """
+        key = self._llm_key()
+        self.invalidate(model=key[0], base_url=key[1])
+        self._llms[key] = llm
+
+    def get_prompt(self) -> "ChatPromptTemplate":
+        """Return the shared system prompt template"""
+        if self._prompt is None:
+            from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+            self._prompt = ChatPromptTemplate.from_messages([
+                ("system", SYSTEM_PROMPT),
+                MessagesPlaceholder(variable_name="messages"),
+            ])
+        return self._prompt
+
+    def get_graph(self, tools: Sequence["BaseTool"], checkpointer: Any = None):
+        """Return a compiled agent graph for the current configuration and tool set
+
+        Args:
+            tools: Tools as returned by client.get_tools()
+            checkpointer: LangGraph checkpointer for graphs that resume threads
+
+        Returns:
+            Compiled ReAct agent graph
+        """
+        key = self._llm_key() + (
+            _settings_digest(GRAPH_SETTINGS),
+            tool_fingerprint(tools),
+            id(checkpointer) if checkpointer is not None else None,
+        )
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self.stats["hits"] += 1
+            self._graphs.move_to_end(key)
+            return graph
+
+        with get_tracer().span("graph.build", model=key[0], tools=len(tools)):
+            from langgraph.prebuilt import create_react_agent
+
+            from omni_task_agent.resilience import with_resilience
+
+            self.stats["misses"] += 1
+            logger.info("Creating agent...")
+            graph = create_react_agent(
+                # Binds only the tools relevant to each request (TOOL_ROUTER);
+                # every call gets a deadline and retries (LLM_TIMEOUT, LLM_RETRIES)
+                model=route_tools(with_resilience(self.get_llm())),
+                tools=make_routed_tools(tools),
+                prompt=self.get_prompt(),
+                checkpointer=checkpointer,
+            )
+        self._graphs[key] = graph
+        while len(self._graphs) > self.max_graphs:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def invalidate(self, model: Optional[str] = None, base_url: Optional[str] = None):
+        """Drop cached LLM clients and graphs
+
+        Args:
+            model: Only drop entries for this model, defaults to all models
+            base_url: Only drop entries for this API base URL, defaults to all URLs
+        """
+        def matches(key) -> bool:
+            return (model is None or key[0] == model) and (base_url is None or key[1] == base_url)
+
+        for cache in (self._llms, self._graphs):
+            for key in [k for k in cache if matches(k)]:
+                del cache[key]
+
+
+_graph_cache: Optional[GraphCache] = None
+
+
+def get_graph_cache() -> GraphCache:
+    """Return the process-wide graph cache"""
+    global _graph_cache
+    if _graph_cache is None:
+        _graph_cache = GraphCache()
+    return _graph_cache
+
+
+def clear_graph_cache(model: Optional[str] = None, base_url: Optional[str] = None):
+    """Invalidate cached graphs, e.g. after changing LLM configuration at runtime
+
+    Args:
+        model: Only drop entries for this model, defaults to all models
+        base_url: Only drop entries for this API base URL, defaults to all URLs
+    """
+    get_graph_cache().invalidate(model=model, base_url=base_url)
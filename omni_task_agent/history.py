@@ -0,0 +1,204 @@
+"""
+Conversation History
+
+Keeps the messages sent to the agent under a token budget so prompt size does
+not grow with session length.
+"""
+
+import json
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from omni_task_agent.config import get_env_int
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW = "sliding_window"
+SYSTEM_PLUS_LAST_N = "system_plus_last_n"
+SUMMARIZE = "summarize"
+STRATEGIES = (SLIDING_WINDOW, SYSTEM_PLUS_LAST_N, SUMMARIZE)
+
+MEMO_PREFIX = "Summary of earlier conversation:"
+
+Summarizer = Callable[[Sequence[BaseMessage], Optional[str]], Awaitable[str]]
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate the token count of a message (about four characters per token)
+
+    Args:
+        message: Message to measure
+
+    Returns:
+        Estimated token count including a small per-message overhead
+    """
+    chars = len(_content_text(message))
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        chars += len(tool_call.get("name", "")) + len(json.dumps(tool_call.get("args", {}), default=str))
+    return chars // 4 + 4
+
+
+async def extractive_summarizer(messages: Sequence[BaseMessage], previous_memo: Optional[str]) -> str:
+    """Fold messages into a compact memo without calling a model
+
+    Keeps the first line of each turn, truncated, appended to the previous memo.
+    """
+    lines = [previous_memo] if previous_memo else []
+    for message in messages:
+        text = " ".join(_content_text(message).split())
+        if not text:
+            continue
+        role = "User" if isinstance(message, HumanMessage) else "Assistant"
+        lines.append(f"- {role}: {text[:160]}{'...' if len(text) > 160 else ''}")
+    return "\n".join(lines)
+
+
+def make_llm_summarizer(llm) -> Summarizer:
+    """Create a summarizer that asks a chat model for a short memo
+
+    Args:
+        llm: LangChain chat model
+
+    Returns:
+        Async summarizer callable
+    """
+    async def summarize(messages: Sequence[BaseMessage], previous_memo: Optional[str]) -> str:
+        transcript = "\n".join(
+            f"{'User' if isinstance(m, HumanMessage) else 'Assistant'}: {_content_text(m)}"
+            for m in messages
+        )
+        prompt = (
+            "Update the memo of a task management conversation. Keep task IDs, decisions "
+            "and open questions, drop pleasantries. Reply with the memo only.\n\n"
+            f"Current memo:\n{previous_memo or '(empty)'}\n\nNew turns:\n{transcript}"
+        )
+        response = await llm.ainvoke([HumanMessage(content=prompt)])
+        return _content_text(response)
+
+    return summarize
+
+
+class HistoryManager:
+    """Token-budgeted conversation history
+
+    Strategies:
+        sliding_window: send the most recent turns that fit the budget
+        system_plus_last_n: send system messages plus the last ``keep_last`` messages
+        summarize: fold turns that fall out of the window into a memo system message
+
+    Usage:
+    ```python
+    history = HistoryManager()
+    history.add(HumanMessage(content=user_input))
+    response = await agent.ainvoke({"messages": await history.prepare()})
+    ```
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        strategy: Optional[str] = None,
+        keep_last: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+        token_counter: Callable[[BaseMessage], int] = estimate_tokens,
+    ):
+        """
+        Args:
+            max_tokens: Token budget for sent history (HISTORY_MAX_TOKENS, then MAX_TOKENS)
+            strategy: One of STRATEGIES (HISTORY_STRATEGY, default sliding_window)
+            keep_last: Messages kept by system_plus_last_n (HISTORY_KEEP_LAST)
+            summarizer: Memo builder for the summarize strategy, defaults to extractive_summarizer
+            token_counter: Function estimating tokens per message
+        """
+        self.max_tokens = max_tokens if max_tokens is not None else get_env_int(
+            "HISTORY_MAX_TOKENS", get_env_int("MAX_TOKENS", 4000)
+        )
+        self.strategy = strategy or os.environ.get("HISTORY_STRATEGY", SLIDING_WINDOW)
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown history strategy: {self.strategy}. Must be one of {STRATEGIES}")
+        self.keep_last = keep_last if keep_last is not None else get_env_int("HISTORY_KEEP_LAST", 10)
+        self.summarizer = summarizer or extractive_summarizer
+        self.token_counter = token_counter
+        self.messages: List[BaseMessage] = []
+        self.memo: Optional[str] = None
+
+    def add(self, message: BaseMessage):
+        """Append a message to the history"""
+        self.messages.append(message)
+
+    def clear(self):
+        """Forget all messages and the memo"""
+        self.messages = []
+        self.memo = None
+
+    def count_tokens(self, messages: Sequence[BaseMessage]) -> int:
+        """Estimate the tokens of a message list"""
+        return sum(self.token_counter(m) for m in messages)
+
+    def _split(self, messages: Sequence[BaseMessage]):
+        system = [m for m in messages if isinstance(m, SystemMessage)]
+        conversation = [m for m in messages if not isinstance(m, SystemMessage)]
+        return system, conversation
+
+    def _fit(self, conversation: Sequence[BaseMessage], budget: int) -> int:
+        """Return the index of the first message kept so that the tail fits the budget
+
+        The window always starts at a human message so tool results and
+        assistant replies are never sent without the request that caused them.
+        The latest human message is always kept, even when it alone exceeds the budget.
+        """
+        start = len(conversation)
+        used = 0
+        for index in range(len(conversation) - 1, -1, -1):
+            used += self.token_counter(conversation[index])
+            if used > budget and start < len(conversation):
+                break
+            if isinstance(conversation[index], HumanMessage):
+                start = index
+        return start
+
+    async def prepare(self) -> List[BaseMessage]:
+        """Build the message list to send for the next agent call
+
+        Returns:
+            Messages within the token budget, according to the strategy
+        """
+        system, conversation = self._split(self.messages)
+
+        if self.strategy == SYSTEM_PLUS_LAST_N:
+            tail = conversation[-self.keep_last:] if self.keep_last > 0 else conversation[-1:]
+            offset = len(conversation) - len(tail)
+            start = offset + self._fit(tail, self.max_tokens - self.count_tokens(system))
+            return system + conversation[start:]
+
+        if self.strategy == SUMMARIZE:
+            memo_message = [SystemMessage(content=f"{MEMO_PREFIX}\n{self.memo}")] if self.memo else []
+            budget = self.max_tokens - self.count_tokens(system + memo_message)
+            start = self._fit(conversation, budget)
+            if start > 0:
+                dropped = conversation[:start]
+                try:
+                    self.memo = await self.summarizer(dropped, self.memo)
+                except Exception as e:
+                    logger.warning(f"History summarization failed, keeping previous memo: {str(e)}")
+                else:
+                    # Folded turns now live in the memo and are not sent again
+                    self.messages = system + conversation[start:]
+                    conversation = conversation[start:]
+                memo_message = [SystemMessage(content=f"{MEMO_PREFIX}\n{self.memo}")] if self.memo else []
+                budget = self.max_tokens - self.count_tokens(system + memo_message)
+                conversation = conversation[self._fit(conversation, budget):]
+            return system + memo_message + conversation
+
+        start = self._fit(conversation, self.max_tokens - self.count_tokens(system))
+        return system + conversation[start:]
@@ -0,0 +1,281 @@
+"""
+HTTP Task Backend
+
+Serves the task tools from a shared task service at OMNI_TASK_API_URL (see
+task_api for the reference server) instead of per-project Node processes.
+
+One keep-alive connection pool is shared by every request of the process, and
+HTTP/2 multiplexes requests over it when the h2 package is installed. Tool
+calls for the same project that are issued within a few milliseconds of each
+other are pipelined into one bulk request, so a step that reads five tasks
+costs one round trip; get_tasks and put_tasks read and write many tasks at once.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from omni_task_agent.backends import BackendSession, TaskBackend, get_data_dir
+from omni_task_agent.config import get_env_float, get_env_int
+from omni_task_agent.tools import get_tool_context
+from omni_task_agent.tracing import get_tracer
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "http://localhost:8000"
+
+
+class TaskAPIError(RuntimeError):
+    """Raised when the task service rejects a call"""
+
+
+def project_id(data_dir: str) -> str:
+    """Service-side name of a project: its directory name and a hash of the data directory path"""
+    data_dir = os.path.abspath(data_dir)
+    name = re.sub(r"[^A-Za-z0-9._-]", "-", os.path.basename(os.path.dirname(data_dir)))[:48].strip(".-")
+    digest = hashlib.sha256(data_dir.encode("utf-8")).hexdigest()[:12]
+    return f"{name or 'project'}-{digest}"
+
+
+class TaskAPIClient:
+    """Pooled, pipelining client of the task service
+
+    Args:
+        base_url: Service URL (OMNI_TASK_API_URL)
+        max_connections: Size of the keep-alive pool (TASK_API_MAX_CONNECTIONS)
+        batch_window: Seconds calls wait for others to share their request,
+            0 to send every call on its own (TASK_API_BATCH_WINDOW_MS)
+        batch_max: Most calls sent in one request (TASK_API_BATCH_MAX)
+        timeout: Seconds per HTTP request (TASK_API_TIMEOUT)
+        transport: httpx transport, e.g. an ASGI transport in tests
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        batch_window: Optional[float] = None,
+        batch_max: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.base_url = (base_url or os.environ.get("OMNI_TASK_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.max_connections = max_connections if max_connections is not None else get_env_int("TASK_API_MAX_CONNECTIONS", 20)
+        self.batch_window = batch_window if batch_window is not None else get_env_float("TASK_API_BATCH_WINDOW_MS", 2.0) / 1000
+        self.batch_max = max(1, batch_max if batch_max is not None else get_env_int("TASK_API_BATCH_MAX", 32))
+        self.timeout = timeout if timeout is not None else get_env_float("TASK_API_TIMEOUT", 30.0)
+        self.transport = transport
+        self.stats = {"requests": 0, "calls": 0, "batched_calls": 0, "largest_batch": 0}
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, List[Tuple[str, Dict[str, Any], asyncio.Future]]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._sending: Set[asyncio.Future] = set()
+
+    async def _client(self) -> "httpx.AsyncClient":
+        """The pooled client of the running event loop; connections cannot cross loops"""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        if self._http is not None and self._loop is not loop:
+            await self._discard_client()
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=self.timeout,
+                http2=self.transport is None and importlib.util.find_spec("h2") is not None,
+                transport=self.transport,
+            )
+            self._loop = loop
+        return self._http
+
+    async def _discard_client(self):
+        """Close the client of a previous event loop so its connections are not leaked"""
+        http, loop = self._http, self._loop
+        self._http = self._loop = None
+        if loop is not None and loop.is_running():
+            # The loop still runs in another thread: close the client there
+            asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+            return
+        try:
+            await http.aclose()
+        except Exception as e:
+            # Connections of a closed loop cannot be shut down cleanly, only dropped
+            logger.debug(f"Closing the task service client of a finished event loop failed: {str(e)}")
+
+    async def _post(self, path: str, body: Any) -> Any:
+        self.stats["requests"] += 1
+        response = await (await self._client()).post(path, json=body)
+        if response.status_code in (400, 404, 422):
+            raise TaskAPIError(f"{path}: {response.json().get('detail', response.text)}")
+        # Other errors raise httpx.HTTPStatusError, which resilience retries when transient
+        response.raise_for_status()
+        return response.json()
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Name, description and input schema of every tool the service offers"""
+        self.stats["requests"] += 1
+        response = await (await self._client()).get("/tools")
+        response.raise_for_status()
+        return response.json()["tools"]
+
+    async def health(self) -> bool:
+        try:
+            response = await (await self._client()).get("/health")
+        except Exception:
+            return False
+        return response.status_code == 200
+
+    async def call(self, project: str, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool, sharing the request with calls issued around the same time
+
+        Calls sharing a request run in the order they were made; the tool
+        scheduler already keeps mutations of a project from overlapping.
+
+        Raises:
+            TaskAPIError: If the service rejected the call
+        """
+        self.stats["calls"] += 1
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(project, [])
+        pending.append((name, arguments, future))
+        if len(pending) >= self.batch_max or self.batch_window <= 0:
+            self._flush(project)
+        elif project not in self._flush_handles:
+            self._flush_handles[project] = asyncio.get_running_loop().call_later(self.batch_window, self._flush, project)
+        return await future
+
+    def _flush(self, project: str):
+        handle = self._flush_handles.pop(project, None)
+        if handle is not None:
+            handle.cancel()
+        batch = self._pending.pop(project, [])
+        if batch:
+            # Keep a reference so the request is not garbage collected mid-flight
+            sending = asyncio.ensure_future(self._send(project, batch))
+            self._sending.add(sending)
+            sending.add_done_callback(self._sending.discard)
+
+    async def _send(self, project: str, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        with get_tracer().span("task_api.request", project=project, calls=len(batch)):
+            try:
+                if len(batch) == 1:
+                    name, arguments, _ = batch[0]
+                    results = [await self._post(f"/projects/{project}/tools/{name}", arguments)]
+                else:
+                    self.stats["batched_calls"] += len(batch)
+                    body = {"calls": [{"name": name, "arguments": arguments} for name, arguments, _ in batch]}
+                    results = (await self._post(f"/projects/{project}/calls", body))["results"]
+            except BaseException as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+                return
+        if len(results) != len(batch):
+            logger.warning(f"Task service answered {len(results)} of {len(batch)} calls for {project}")
+        for index, (name, _, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index >= len(results):
+                future.set_exception(TaskAPIError(f"{name}: no result in the task service's response"))
+                continue
+            result = results[index]
+            if "error" in result:
+                future.set_exception(TaskAPIError(f"{name}: {result['error']}"))
+            else:
+                future.set_result(result["result"])
+
+    async def get_tasks(self, project: str, ids: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Full records of several tasks in one request, None for unknown IDs"""
+        return (await self._post(f"/projects/{project}/tasks/get", {"ids": list(ids)}))["tasks"]
+
+    async def put_tasks(self, project: str, tasks: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+        """Create or update several tasks (Task.model_dump form) in one request
+
+        Returns:
+            Counts of created and updated tasks and the project's total
+        """
+        return await self._post(f"/projects/{project}/tasks/put", {"tasks": list(tasks)})
+
+    async def close(self):
+        for project in list(self._pending):
+            self._flush(project)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "base_url": self.base_url}
+
+
+class HttpBackend(TaskBackend):
+    """Task tools served by the task service, one shared client per process
+
+    Checkpoints and other local state still live in <project_root>/data; the
+    service names the project after that directory (see project_id).
+    """
+
+    name = "http"
+
+    def __init__(self, client: Optional[TaskAPIClient] = None):
+        self.client = client or TaskAPIClient()
+        self._tools: Optional[List["BaseTool"]] = None
+
+    def preflight(self):
+        import httpx
+
+        try:
+            httpx.get(f"{self.client.base_url}/health", timeout=5.0).raise_for_status()
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Task service at {self.client.base_url} is not reachable: {e}") from e
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.client.metrics()
+
+    async def _load_tools(self) -> List["BaseTool"]:
+        from langchain_core.tools import StructuredTool
+
+        client = self.client
+        tools = []
+        for spec in await client.list_tools():
+            def make_call(name: str):
+                async def call(**arguments):
+                    context = get_tool_context()
+                    if context is None or not context.data_dir:
+                        raise RuntimeError("Task service tools need a project data directory bound by make_graph")
+                    return await client.call(project_id(context.data_dir), name, arguments)
+                return call
+
+            tools.append(StructuredTool(
+                name=spec["name"],
+                description=spec["description"],
+                args_schema=spec["input_schema"],
+                coroutine=make_call(spec["name"]),
+            ))
+        return tools
+
+    @asynccontextmanager
+    async def session(self, project_root=None):
+        if self._tools is None:
+            self._tools = await self._load_tools()
+            logger.info(f"Loaded {len(self._tools)} tools from {self.client.base_url}")
+        yield BackendSession(get_data_dir(project_root), list(self._tools))
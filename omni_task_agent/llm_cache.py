@@ -0,0 +1,198 @@
+"""
+LLM Response Cache
+
+Persistent, opt-in cache of chat model responses in a SQLite file, so replaying
+the same prompts against the same task state (development, CI) skips the paid
+model call. Entries are keyed by the model configuration, the bound tool schemas
+and the normalized conversation, expire after a TTL and are evicted least
+recently used first once the file outgrows its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from omni_task_agent.config import get_env_bool, get_env_float
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join("~", ".cache", "omni_task_agent", "llm_cache.sqlite")
+
+# Message fields that differ between otherwise identical conversations
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Drop message IDs and provider metadata from a serialized message list
+
+    Args:
+        prompt: Messages as serialized by the chat model for its cache lookup
+
+    Returns:
+        Canonical JSON of the messages, or the prompt unchanged if it is not JSON
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if isinstance(messages, list):
+        for message in messages:
+            kwargs = message.get("kwargs") if isinstance(message, dict) else None
+            if isinstance(kwargs, dict):
+                for field in _VOLATILE_FIELDS:
+                    kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True)
+
+
+def make_key(prompt: str, llm_string: str) -> str:
+    """Cache key of a model call
+
+    The llm string holds the serialized model (name, temperature, ...) and the
+    call's keyword arguments, which include the bound tool schemas.
+    """
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain cache storing chat model responses in SQLite
+
+    The file is opened in WAL mode with a busy timeout, so the FastMCP server's
+    concurrent requests and other processes sharing the file (parallel CI jobs)
+    can read and write it safely. Within a process one connection is shared
+    under a lock; LangChain runs the async lookups in a worker thread.
+
+    Args:
+        path: SQLite file (LLM_CACHE_PATH), defaults to ~/.cache/omni_task_agent/llm_cache.sqlite
+        ttl: Seconds a response stays valid, 0 for no expiry (LLM_CACHE_TTL)
+        max_mb: Size limit of the stored responses in megabytes (LLM_CACHE_MAX_MB)
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None, max_mb: Optional[float] = None):
+        self.path = os.path.expanduser(path or os.environ.get("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else get_env_float("LLM_CACHE_TTL", 7 * 86400.0)
+        max_mb = max_mb if max_mb is not None else get_env_float("LLM_CACHE_MAX_MB", 256.0)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key=?", (key,)).fetchone()
+            if row is not None and self.ttl > 0 and row[1] + self.ttl < now:
+                self._conn.execute("DELETE FROM responses WHERE key=?", (key,))
+                self.stats["expired"] += 1
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at=? WHERE key=?", (now, key))
+            self.stats["hits"] += 1
+        try:
+            return [
+                loads(item, allowed_objects="core", secrets_from_env=False)
+                for item in json.loads(zlib.decompress(row[0]))
+            ]
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM cache entry: {e}")
+            with self._lock:
+                self._conn.execute("DELETE FROM responses WHERE key=?", (key,))
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = zlib.compress(json.dumps([dumps(generation) for generation in return_val]).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (make_key(prompt, llm_string), value, len(value), now, now),
+            )
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Delete expired entries, then least recently used ones until under the size limit"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.ttl > 0:
+                self.stats["expired"] += self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+                ).rowcount
+            excess = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                victims = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                    if excess <= 0:
+                        break
+                    victims.append((key,))
+                    excess -= size
+                self._conn.executemany("DELETE FROM responses WHERE key=?", victims)
+                self.stats["evictions"] += len(victims)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit ratio, stored entries and bytes"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None unless LLM_CACHE=true"""
+    global _llm_cache
+    if not get_env_bool("LLM_CACHE", False):
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache()
+        logger.info(f"Caching LLM responses in {_llm_cache.path}")
+    return _llm_cache
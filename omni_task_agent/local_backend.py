@@ -0,0 +1,350 @@
+"""
+Local Task Tools
+
+Pure-Python implementations of the shrimp-task-manager task tools over the
+project's TaskStore. They have the same names and arguments as the shrimp tools,
+so the agent, the tool router and direct calls work unchanged, but a call costs
+a function call instead of a JSON round trip to a Node subprocess.
+"""
+
+import json
+import logging
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from omni_task_agent.dependencies import (
+    SHRIMP_TASKS_FILE,
+    DependencyCycleError,
+    DependencyGraph,
+    get_dependency_graph,
+    get_task_store,
+    is_completed,
+    load_project_tasks,
+)
+from omni_task_agent.tools import get_tool_context
+from omni_task_agent.utils.state import Task, TaskCollection, TaskStore
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# verify_task scores at or above this complete the task, as in shrimp-task-manager
+PASSING_SCORE = 80
+
+UPDATE_MODES = ("append", "overwrite", "selective", "clearAllTasks")
+
+
+def _imported_tasks(data_dir: str) -> TaskCollection:
+    """Tasks a project without omni_tasks.json starts from"""
+    collection, source = load_project_tasks(data_dir)
+    if os.path.basename(source) == SHRIMP_TASKS_FILE and os.path.exists(source):
+        logger.info(f"Importing {len(collection)} shrimp-task-manager tasks into {get_task_store(data_dir).path}")
+    return collection
+
+
+def load_project_store(data_dir: str) -> Tuple[TaskStore, TaskCollection]:
+    """A project's shared store and tasks, with its dependency graph attached
+
+    A project without omni_tasks.json starts from shrimp-task-manager's
+    tasks.json, if any, so switching backends keeps existing tasks.
+    """
+    store = get_task_store(data_dir)
+    if not os.path.exists(store.path):
+        store.save(_imported_tasks(data_dir))
+    # Attaches the dependency graph, which rejects changes that would create a cycle
+    get_dependency_graph(data_dir)
+    return store, store.load()
+
+
+async def aload_project_store(data_dir: str) -> Tuple[TaskStore, TaskCollection]:
+    """load_project_store() for coroutines: the first save runs off the event loop"""
+    store = get_task_store(data_dir)
+    if not os.path.exists(store.path):
+        await store.asave(_imported_tasks(data_dir))
+    return load_project_store(data_dir)
+
+
+async def _load() -> Tuple[TaskStore, TaskCollection]:
+    context = get_tool_context()
+    if context is None or not context.data_dir:
+        raise RuntimeError("Local task tools need a project data directory bound by make_graph")
+    return await aload_project_store(context.data_dir)
+
+
+def _graph() -> DependencyGraph:
+    """Dependency graph of the project bound to the current tool call; call after _load()"""
+    return get_dependency_graph(get_tool_context().data_dir)
+
+
+def task_record(task: Task, full: bool = False) -> Dict[str, Any]:
+    """A task in shrimp-task-manager's field names"""
+    record = {
+        "id": task.id,
+        "name": task.title,
+        "description": task.description,
+        "status": task.status,
+        "dependencies": list(task.dependencies),
+    }
+    if full:
+        record.update(
+            priority=task.priority,
+            implementationGuide=task.details,
+            verificationCriteria=task.test_strategy,
+            subtasks=[task_record(subtask) for subtask in task.subtasks],
+        )
+    return record
+
+
+def _resolve_dependencies(collection: TaskCollection, names: List[str], by_name: Dict[str, str]) -> List[str]:
+    """Map dependency task IDs or names to IDs; unknown references are dropped"""
+    resolved = []
+    for reference in names or []:
+        reference = reference.get("taskId", "") if isinstance(reference, dict) else str(reference)
+        task_id = reference if reference in collection else by_name.get(reference)
+        if task_id is None:
+            logger.warning(f"Ignoring unknown dependency '{reference}'")
+        elif task_id not in resolved:
+            resolved.append(task_id)
+    return resolved
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+# Planning tools: prompt-only, like shrimp's
+
+async def plan_task(description: str, requirements: str = "", existingTasksReference: bool = False) -> str:
+    context = ""
+    if existingTasksReference:
+        _, collection = await _load()
+        context = f"\nExisting tasks: {_dumps([task_record(task) for task in collection.tasks])}"
+    return (
+        f"Plan the task: {description}\nRequirements: {requirements or 'none'}{context}\n"
+        "Analyze the approach with analyze_task, then create the tasks with split_tasks."
+    )
+
+
+async def analyze_task(summary: str, initialConcept: str, previousAnalysis: str = "") -> str:
+    previous = f"\nPrevious analysis: {previousAnalysis}" if previousAnalysis else ""
+    return (
+        f"Task summary: {summary}\nInitial concept: {initialConcept}{previous}\n"
+        "Check feasibility, risks and edge cases, then call reflect_task with your analysis."
+    )
+
+
+async def reflect_task(summary: str, analysis: str) -> str:
+    return (
+        f"Task summary: {summary}\nAnalysis: {analysis}\n"
+        "Review the analysis for gaps and simplifications, then call split_tasks with the final tasks."
+    )
+
+
+# Task state tools
+
+async def split_tasks(updateMode: str, tasks: List[Dict[str, Any]]) -> str:
+    if updateMode not in UPDATE_MODES:
+        return f"Unknown updateMode '{updateMode}', expected one of {', '.join(UPDATE_MODES)}"
+    store, collection = await _load()
+    if updateMode == "clearAllTasks":
+        for task in list(collection.tasks):
+            collection.remove(task.id)
+    elif updateMode == "overwrite":
+        # Completed work is kept; everything unfinished is replaced
+        for task in [task for task in collection.tasks if not is_completed(task)]:
+            collection.remove(task.id)
+
+    by_name = {task.title: task.id for task in collection}
+    created, updated = [], []
+    for spec in tasks:
+        name = spec.get("name", "")
+        existing = collection.get(by_name[name]) if updateMode == "selective" and name in by_name else None
+        if existing is not None:
+            collection.update(
+                existing.id,
+                description=spec.get("description", existing.description),
+                details=spec.get("implementationGuide", existing.details),
+                test_strategy=spec.get("verificationCriteria", existing.test_strategy),
+            )
+            updated.append(existing)
+            continue
+        task = collection.add(Task(
+            id=str(uuid.uuid4()),
+            title=name,
+            description=spec.get("description", ""),
+            details=spec.get("implementationGuide", ""),
+            test_strategy=spec.get("verificationCriteria", ""),
+        ))
+        by_name[name] = task.id
+        created.append((task, spec))
+    # Dependencies may name tasks created later in the same batch
+    graph = _graph()
+    rejected = []
+    for task, spec in created:
+        dependencies = _resolve_dependencies(collection, spec.get("dependencies"), by_name)
+        try:
+            graph.check_dependencies({task.id: dependencies})
+        except DependencyCycleError as e:
+            rejected.append({"id": task.id, "name": task.title, "cycle": e.cycle})
+            continue
+        task.dependencies = dependencies
+    await store.asave(collection)
+    result = {
+        "created": [task_record(task) for task, _ in created],
+        "updated": [task_record(task) for task in updated],
+        "total": len(collection),
+    }
+    if rejected:
+        result["rejectedDependencies"] = rejected
+    return _dumps(result)
+
+
+async def list_tasks(status: str = "all") -> str:
+    _, collection = await _load()
+    tasks = collection.filter(status=None if status == "all" else status)
+    return _dumps({"tasks": [task_record(task) for task in tasks], "counts": collection.status_counts()})
+
+
+async def query_task(query: str, isId: bool = False, page: int = 1, pageSize: int = 5) -> str:
+    _, collection = await _load()
+    if isId:
+        matches = [collection[query]] if query in collection else []
+    else:
+        words = query.lower().split()
+        matches = [
+            task for task in collection
+            if all(word in f"{task.title} {task.description}".lower() for word in words)
+        ]
+    start = (max(page, 1) - 1) * pageSize
+    return _dumps({
+        "tasks": [task_record(task) for task in matches[start:start + pageSize]],
+        "page": page,
+        "total": len(matches),
+    })
+
+
+async def get_task_detail(taskId: str) -> str:
+    _, collection = await _load()
+    task = collection.get(taskId)
+    return _dumps(task_record(task, full=True)) if task else f"Task {taskId} not found"
+
+
+async def update_task(
+    taskId: str,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    dependencies: Optional[List[str]] = None,
+    implementationGuide: Optional[str] = None,
+    verificationCriteria: Optional[str] = None,
+) -> str:
+    store, collection = await _load()
+    task = collection.get(taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    if is_completed(task):
+        return f"Task {taskId} is completed and can no longer be updated"
+    fields = {
+        "title": name,
+        "description": description,
+        "details": implementationGuide,
+        "test_strategy": verificationCriteria,
+    }
+    if dependencies is not None:
+        by_name = {other.title: other.id for other in collection}
+        fields["dependencies"] = _resolve_dependencies(collection, dependencies, by_name)
+        try:
+            # Checked up front so a rejected update changes no field at all
+            _graph().check_dependencies({taskId: fields["dependencies"]})
+        except DependencyCycleError as e:
+            return f"Task {taskId} not changed: {e}"
+    collection.update(taskId, **{key: value for key, value in fields.items() if value is not None})
+    await store.asave(collection)
+    return _dumps(task_record(task, full=True))
+
+
+async def execute_task(taskId: str) -> str:
+    store, collection = await _load()
+    task = collection.get(taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    pending = [d.id for d in collection.dependencies_of(taskId) if not is_completed(d)]
+    if pending:
+        return f"Task {taskId} is waiting on unfinished dependencies: {', '.join(pending)}"
+    task.status = "in_progress"
+    await store.asave(collection)
+    return (
+        f"Executing task {taskId}: {task.title}\n{task.description}\n"
+        f"Implementation guide: {task.details or 'none'}\n"
+        "When done, check the result with verify_task."
+    )
+
+
+async def verify_task(taskId: str, summary: str, score: int) -> str:
+    store, collection = await _load()
+    task = collection.get(taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    if score < PASSING_SCORE:
+        return f"Task {taskId} scored {score}, below {PASSING_SCORE}: fix the issues and verify again"
+    task.status = "completed"
+    await store.asave(collection)
+    return f"Task {taskId} completed with score {score}: {summary}"
+
+
+async def delete_task(taskId: str) -> str:
+    store, collection = await _load()
+    task = collection.get(taskId)
+    if task is None:
+        return f"Task {taskId} not found"
+    if is_completed(task):
+        return f"Task {taskId} is completed and cannot be deleted"
+    collection.remove(taskId)
+    await store.asave(collection)
+    return f"Task {taskId} deleted"
+
+
+async def clear_all_tasks(confirm: bool) -> str:
+    if not confirm:
+        return "Set confirm to true to delete every task"
+    store, collection = await _load()
+    count = len(collection)
+    for task in list(collection.tasks):
+        collection.remove(task.id)
+    await store.asave(collection)
+    return f"Deleted {count} tasks"
+
+
+LOCAL_TOOLS = {
+    "plan_task": (plan_task, "Start planning a task from a description and requirements."),
+    "analyze_task": (analyze_task, "Analyze a task summary and initial concept for feasibility and risks."),
+    "reflect_task": (reflect_task, "Reflect on an analysis and refine the solution before splitting it into tasks."),
+    "split_tasks": (
+        split_tasks,
+        "Create tasks. Each task has name, description, implementationGuide, verificationCriteria and "
+        "dependencies (names or IDs of other tasks). updateMode is append, overwrite (replace unfinished "
+        "tasks), selective (update tasks with the same name, add the rest) or clearAllTasks.",
+    ),
+    "list_tasks": (list_tasks, "List tasks, optionally filtered by status (all, pending, in_progress, completed, blocked)."),
+    "query_task": (query_task, "Search tasks by keywords in name and description, or by ID with isId=true."),
+    "get_task_detail": (get_task_detail, "Get the complete details of a task by ID."),
+    "update_task": (
+        update_task,
+        "Update the name, description, dependencies, implementation guide or verification criteria of an unfinished task.",
+    ),
+    "execute_task": (execute_task, "Start a task whose dependencies are completed and get its implementation guide."),
+    "verify_task": (verify_task, f"Score a finished task from 0 to 100; {PASSING_SCORE} or more marks it completed."),
+    "delete_task": (delete_task, "Delete an unfinished task."),
+    "clear_all_tasks": (clear_all_tasks, "Delete every task. Requires confirm=true."),
+}
+
+
+def make_local_tools() -> List["BaseTool"]:
+    """Create LangChain tools over the TaskStore of the data directory bound by bind_tool_context"""
+    from langchain_core.tools import StructuredTool
+
+    return [
+        StructuredTool.from_function(coroutine=coroutine, name=name, description=description)
+        for name, (coroutine, description) in LOCAL_TOOLS.items()
+    ]
@@ -0,0 +1,324 @@
+"""
+Model Router
+
+Spreads LLM calls over every configured provider. Each call goes to the model
+with the best recent latency and error rate, tracked as exponentially weighted
+moving averages; short, simple requests can be sent to a cheaper, faster tier;
+and a call that errors or times out is retried on the next model in line.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.tool_router import _current_request
+from omni_task_agent.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+FAST = "fast"
+
+DEFAULT_ANTHROPIC_MODEL = "claude-3-5-sonnet-latest"
+
+# Requests mentioning these need the primary tier even when they are short
+COMPLEX_TERMS = frozenset((
+    "plan analyze analyse analysis reflect split decompose breakdown design architecture "
+    "research investigate refactor estimate why compare"
+).split())
+
+
+@dataclass
+class ModelCandidate:
+    """One chat model the router may call"""
+
+    name: str
+    model: Any
+    tier: str = PRIMARY
+
+
+class ProviderHealth:
+    """EWMA latency and error rate per model, shared by every router in the process
+
+    Args:
+        alpha: Weight of the newest sample (MODEL_ROUTER_EWMA_ALPHA)
+        cooldown: Seconds a model is passed over after an error (MODEL_ROUTER_COOLDOWN)
+        error_penalty: Latency multiplier per unit of error rate (MODEL_ROUTER_ERROR_PENALTY)
+    """
+
+    def __init__(self, alpha: Optional[float] = None, cooldown: Optional[float] = None, error_penalty: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else get_env_float("MODEL_ROUTER_EWMA_ALPHA", 0.3)
+        self.cooldown = cooldown if cooldown is not None else get_env_float("MODEL_ROUTER_COOLDOWN", 30.0)
+        self.error_penalty = error_penalty if error_penalty is not None else get_env_float("MODEL_ROUTER_ERROR_PENALTY", 10.0)
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = {
+                "calls": 0, "errors": 0, "timeouts": 0,
+                "latency": None, "error_rate": 0.0, "failed_at": None,
+            }
+        return entry
+
+    def record_success(self, name: str, latency: float):
+        entry = self._entry(name)
+        entry["calls"] += 1
+        previous = entry["latency"]
+        entry["latency"] = latency if previous is None else self.alpha * latency + (1 - self.alpha) * previous
+        entry["error_rate"] *= 1 - self.alpha
+
+    def record_failure(self, name: str, latency: float, timeout: bool = False):
+        entry = self._entry(name)
+        entry["calls"] += 1
+        entry["errors"] += 1
+        entry["timeouts"] += int(timeout)
+        entry["error_rate"] = self.alpha + (1 - self.alpha) * entry["error_rate"]
+        entry["failed_at"] = time.monotonic()
+        # A slow failure still says how long the provider took to answer
+        previous = entry["latency"]
+        if previous is None or latency > previous:
+            entry["latency"] = latency if previous is None else self.alpha * latency + (1 - self.alpha) * previous
+
+    def cooling_down(self, name: str) -> bool:
+        failed_at = self._entry(name)["failed_at"]
+        return failed_at is not None and time.monotonic() - failed_at < self.cooldown
+
+    def score(self, name: str) -> float:
+        """Expected cost of a call; untried models score 0 so they get measured"""
+        entry = self._entry(name)
+        if entry["latency"] is None:
+            return 0.0
+        return entry["latency"] * (1 + self.error_penalty * entry["error_rate"])
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {key: value for key, value in entry.items() if key != "failed_at"}
+            for name, entry in self._stats.items()
+        }
+
+
+def is_simple_request(messages: Sequence["BaseMessage"], max_chars: Optional[int] = None) -> bool:
+    """Whether the latest user message is short and asks for nothing analytical
+
+    Args:
+        messages: Messages sent to the model
+        max_chars: Longest simple request (MODEL_ROUTER_SIMPLE_CHARS)
+    """
+    max_chars = max_chars if max_chars is not None else get_env_int("MODEL_ROUTER_SIMPLE_CHARS", 200)
+    request, _ = _current_request(messages, ())
+    if not request or len(request) > max_chars:
+        return False
+    return not COMPLEX_TERMS.intersection(re.findall(r"[a-z]+", request.lower()))
+
+
+class ModelRouter:
+    """Chooses the model for each call and falls back through the others
+
+    Args:
+        candidates: Models to route between, in order of preference until measured
+        health: Latency and error tracker, defaults to the process-wide one
+        timeout: Seconds before an async call is abandoned for the next model
+            (MODEL_ROUTER_TIMEOUT), defaults to half of LLM_TIMEOUT so a hung
+            model leaves time to fall back
+    """
+
+    def __init__(self, candidates: Sequence[ModelCandidate], health: Optional[ProviderHealth] = None, timeout: Optional[float] = None):
+        if not candidates:
+            raise ValueError("ModelRouter needs at least one model")
+        self.candidates = list(candidates)
+        self.health = health or get_provider_health()
+        self.timeout = timeout if timeout is not None else get_env_float("MODEL_ROUTER_TIMEOUT", get_env_float("LLM_TIMEOUT", 120.0) / 2)
+        self.stats = {"calls": 0, "fast": 0, "fallbacks": 0}
+
+    def order(self, messages: Sequence["BaseMessage"]) -> List[ModelCandidate]:
+        """Models to try for a call, best first
+
+        Simple requests try the fast tier first and other requests the primary
+        tier; the other tier follows as a fallback. Within a tier models are
+        ranked by score, and models that recently failed go last.
+        """
+        simple = any(c.tier == FAST for c in self.candidates) and is_simple_request(messages)
+        preferred = FAST if simple else PRIMARY
+        position = {id(candidate): index for index, candidate in enumerate(self.candidates)}
+        return sorted(self.candidates, key=lambda c: (
+            self.health.cooling_down(c.name),
+            c.tier != preferred,
+            self.health.score(c.name),
+            position[id(c)],
+        ))
+
+    def _begin(self, messages: Sequence["BaseMessage"]) -> List[ModelCandidate]:
+        ordered = self.order(messages)
+        self.stats["calls"] += 1
+        self.stats["fast"] += int(ordered[0].tier == FAST)
+        return ordered
+
+    def _failed(self, candidate: ModelCandidate, started: float, error: BaseException):
+        timeout = isinstance(error, asyncio.TimeoutError)
+        self.health.record_failure(candidate.name, time.perf_counter() - started, timeout=timeout)
+        self.stats["fallbacks"] += 1
+        reason = "timed out" if timeout else f"failed: {error!r}"
+        logger.warning(f"Model {candidate.name} {reason}; trying the next model")
+
+    def call(self, messages: Sequence["BaseMessage"], invoke: Callable[[ModelCandidate], Any]) -> Any:
+        """Run a call on the best model, falling back on errors
+
+        Args:
+            messages: Messages sent to the model, used to pick the tier
+            invoke: Makes the call with a candidate's model
+
+        Raises:
+            The last model's error when every model failed
+        """
+        error: Optional[BaseException] = None
+        for attempt, candidate in enumerate(self._begin(messages)):
+            started = time.perf_counter()
+            with get_tracer().span("llm.route", model=candidate.name, tier=candidate.tier, attempt=attempt):
+                try:
+                    result = invoke(candidate)
+                except Exception as e:
+                    self._failed(candidate, started, e)
+                    error = e
+                    continue
+            self.health.record_success(candidate.name, time.perf_counter() - started)
+            return result
+        raise error
+
+    async def acall(self, messages: Sequence["BaseMessage"], invoke: Callable[[ModelCandidate], Awaitable[Any]]) -> Any:
+        """Async call; a model that exceeds the timeout counts as failed
+
+        A call cancelled from outside, e.g. by a caller's deadline, also counts
+        as a timeout of the model it was waiting on before the cancellation
+        propagates, so the next call starts with another model.
+        """
+        error: Optional[BaseException] = None
+        timeout = self.timeout if self.timeout > 0 else None
+        for attempt, candidate in enumerate(self._begin(messages)):
+            started = time.perf_counter()
+            with get_tracer().span("llm.route", model=candidate.name, tier=candidate.tier, attempt=attempt):
+                try:
+                    result = await asyncio.wait_for(invoke(candidate), timeout)
+                except asyncio.CancelledError:
+                    self.health.record_failure(candidate.name, time.perf_counter() - started, timeout=True)
+                    logger.warning(f"Model {candidate.name} was cancelled after {time.perf_counter() - started:.1f}s")
+                    raise
+                except Exception as e:
+                    self._failed(candidate, started, e)
+                    error = e
+                    continue
+            self.health.record_success(candidate.name, time.perf_counter() - started)
+            return result
+        raise error
+
+    def bind_tools(self, tools: Sequence["BaseTool"], **kwargs: Any):
+        """Bind tools to every model; the result routes each call like the router itself"""
+        bound = ModelRouter(
+            [ModelCandidate(c.name, c.model.bind_tools(tools, **kwargs), c.tier) for c in self.candidates],
+            self.health,
+            self.timeout,
+        )
+        # Calls through bound copies count towards this router
+        bound.stats = self.stats
+        return _routed_runnable()(bound)
+
+    def as_runnable(self):
+        """Runnable calling the routed models, usable wherever a chat model is"""
+        return _routed_runnable()(self)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "models": {c.name: c.tier for c in self.candidates}}
+
+
+_runnable_class = None
+
+
+def _routed_runnable():
+    """Define the Runnable class lazily so importing this module stays light"""
+    global _runnable_class
+    if _runnable_class is not None:
+        return _runnable_class
+
+    from langchain_core.runnables import Runnable
+
+    class RoutedModel(Runnable):
+        """Runnable dispatching each call through a ModelRouter"""
+
+        def __init__(self, router: ModelRouter):
+            self.router = router
+
+        @staticmethod
+        def _messages(input: Any):
+            if hasattr(input, "to_messages"):
+                return input.to_messages()
+            return input if isinstance(input, list) else []
+
+        def invoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            return self.router.call(self._messages(input), lambda c: c.model.invoke(input, config, **kwargs))
+
+        async def ainvoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            return await self.router.acall(self._messages(input), lambda c: c.model.ainvoke(input, config, **kwargs))
+
+        def bind_tools(self, tools, **kwargs):
+            return self.router.bind_tools(tools, **kwargs)
+
+    _runnable_class = RoutedModel
+    return _runnable_class
+
+
+def make_candidates(base_url: Optional[str] = None, model_args: Optional[Dict[str, Any]] = None) -> List[ModelCandidate]:
+    """Build a chat model for every provider with an API key
+
+    OpenAI uses LLM_MODEL (and OPENAI_FAST_MODEL for the fast tier); Anthropic
+    uses ANTHROPIC_MODEL (and ANTHROPIC_FAST_MODEL).
+
+    Args:
+        base_url: OpenAI-compatible API base URL
+        model_args: Extra arguments for every model, e.g. callbacks and cache
+
+    Returns:
+        Candidates in preference order, empty when no API key is set
+    """
+    model_args = model_args or {}
+    candidates = []
+    if os.environ.get("OPENAI_API_KEY"):
+        from langchain_openai import ChatOpenAI
+
+        # stream_usage asks the provider for token counts when streaming too
+        openai_args = {**model_args, "stream_usage": get_env_bool("LLM_STREAM_USAGE", True)}
+        if base_url:
+            openai_args["openai_api_base"] = base_url
+        for name, tier in ((os.environ.get("LLM_MODEL", "gpt-4o"), PRIMARY), (os.environ.get("OPENAI_FAST_MODEL"), FAST)):
+            if name:
+                candidates.append(ModelCandidate(f"openai:{name}", ChatOpenAI(model=name, **openai_args), tier))
+    if os.environ.get("ANTHROPIC_API_KEY"):
+        from langchain_anthropic import ChatAnthropic
+
+        models = (
+            (os.environ.get("ANTHROPIC_MODEL", DEFAULT_ANTHROPIC_MODEL), PRIMARY),
+            (os.environ.get("ANTHROPIC_FAST_MODEL"), FAST),
+        )
+        for name, tier in models:
+            if name:
+                candidates.append(ModelCandidate(f"anthropic:{name}", ChatAnthropic(model=name, **model_args), tier))
+    return candidates
+
+
+_provider_health: Optional[ProviderHealth] = None
+
+
+def get_provider_health() -> ProviderHealth:
+    """Return the process-wide provider health tracker"""
+    global _provider_health
+    if _provider_health is None:
+        _provider_health = ProviderHealth()
+    return _provider_health
@@ -0,0 +1,337 @@
+"""
+Session Pool
+
+Keeps shrimp-task-manager MCP subprocesses alive between requests, keyed by project data directory.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from omni_task_agent.config import get_env_float, get_env_int
+from omni_task_agent.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """A warm MCP client owned by a dedicated background task
+
+    The client context is entered and exited inside the same task, which keeps
+    the anyio task groups used by the stdio transport happy while the session
+    is shared across requests.
+    """
+
+    def __init__(self, key: str, server_config: Dict[str, Any], client_factory: Callable, spare: bool = False):
+        self.key = key
+        self.server_config = server_config
+        self.spare = spare
+        self.client = None
+        self.in_use = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self._client_factory = client_factory
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def start(self, timeout: float):
+        """Spawn the subprocess and wait for the MCP handshake to finish
+
+        Args:
+            timeout: Maximum seconds to wait for the session to become ready
+        """
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session:{self.key}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(f"Timed out starting MCP session for {self.key}")
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with self._client_factory(self.server_config) as client:
+                self.client = client
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning(f"MCP session for {self.key} terminated: {str(e)}")
+        finally:
+            self.client = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the owner task is still running with a connected client"""
+        return self._task is not None and not self._task.done() and self.client is not None
+
+    async def ping(self, timeout: float) -> bool:
+        """Check that the subprocess still answers MCP pings
+
+        Args:
+            timeout: Maximum seconds to wait for the ping response
+
+        Returns:
+            True if every underlying session answered in time
+        """
+        if not self.alive:
+            return False
+        try:
+            for session in self.client.sessions.values():
+                await asyncio.wait_for(session.send_ping(), timeout)
+        except Exception as e:
+            logger.warning(f"Health check failed for {self.key}: {str(e)}")
+            return False
+        self.last_checked = time.monotonic()
+        return True
+
+    async def close(self, timeout: float = 5.0):
+        """Stop the owner task, tearing down the subprocess"""
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class SessionPool:
+    """LRU pool of warm MCP sessions
+
+    Sessions are keyed by the resolved data directory. Idle sessions expire after
+    ``idle_ttl`` seconds, checked on every checkout and by a background reaper
+    every ``reap_interval`` seconds so an idle server does not keep subprocesses
+    alive. The least recently used idle session is evicted when the pool is full,
+    and sessions that have been idle longer than ``health_check_interval`` are
+    pinged before reuse and respawned if they crashed.
+
+    Spare sessions, such as extra read sessions of a project, are limited by
+    ``max_spare`` on their own and only ever evict other spare sessions, so
+    they cannot push another project's own session out of the pool.
+
+    Usage:
+    ```python
+    async with get_session_pool().acquire(data_dir, server_config) as client:
+        tools = client.get_tools()
+    ```
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        health_check_interval: Optional[float] = None,
+        start_timeout: Optional[float] = None,
+        client_factory: Optional[Callable] = None,
+        reap_interval: Optional[float] = None,
+        max_spare: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_size: Maximum number of live sessions, 0 disables pooling (SESSION_POOL_MAX_SIZE)
+            idle_ttl: Seconds an unused session is kept alive (SESSION_POOL_IDLE_TTL)
+            health_check_interval: Idle seconds after which a session is pinged before reuse
+                (SESSION_POOL_HEALTH_CHECK_INTERVAL)
+            start_timeout: Seconds allowed for spawn and handshake (SESSION_POOL_START_TIMEOUT)
+            client_factory: Async context manager factory taking a server configuration,
+                defaults to MultiServerMCPClient
+            reap_interval: Seconds between background sweeps for idle sessions, 0 disables
+                the reaper (SESSION_POOL_REAP_INTERVAL)
+            max_spare: Maximum number of live spare sessions, on top of max_size
+                (SESSION_POOL_MAX_SPARE)
+        """
+        if client_factory is None:
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+            client_factory = MultiServerMCPClient
+        self.max_size = max_size if max_size is not None else get_env_int("SESSION_POOL_MAX_SIZE", 8)
+        self.max_spare = max_spare if max_spare is not None else get_env_int("SESSION_POOL_MAX_SPARE", 8)
+        self.idle_ttl = idle_ttl if idle_ttl is not None else get_env_float("SESSION_POOL_IDLE_TTL", 600.0)
+        self.health_check_interval = (
+            health_check_interval
+            if health_check_interval is not None
+            else get_env_float("SESSION_POOL_HEALTH_CHECK_INTERVAL", 30.0)
+        )
+        self.start_timeout = (
+            start_timeout if start_timeout is not None else get_env_float("SESSION_POOL_START_TIMEOUT", 60.0)
+        )
+        self.reap_interval = (
+            reap_interval if reap_interval is not None else get_env_float("SESSION_POOL_REAP_INTERVAL", 60.0)
+        )
+        self.client_factory = client_factory
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "respawns": 0}
+        self._sessions: "OrderedDict[str, PooledSession]" = OrderedDict()
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._loop = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def is_warm(self, key: str) -> bool:
+        """Whether a live session for the key is pooled, so acquire won't spawn one"""
+        session = self._sessions.get(key)
+        return session is not None and session.alive
+
+    async def warm(self, key: str, server_config: Dict[str, Any], spare: bool = False):
+        """Start a session for the key in advance and leave it idle in the pool"""
+        async with self.acquire(key, server_config, spare=spare):
+            pass
+
+    @asynccontextmanager
+    async def acquire(self, key: str, server_config: Dict[str, Any], spare: bool = False):
+        """Borrow a warm client for the given key, spawning one if needed
+
+        Args:
+            key: Pool key, normally the absolute data directory
+            server_config: MultiServerMCPClient connection configuration
+            spare: Whether a new session counts against max_spare instead of max_size
+
+        Yields:
+            Connected MultiServerMCPClient
+        """
+        if self.max_size <= 0 or (spare and self.max_spare <= 0):
+            async with self.client_factory(server_config) as client:
+                yield client
+            return
+
+        session = await self._checkout(key, server_config, spare)
+        try:
+            yield session.client
+        finally:
+            session.in_use -= 1
+            session.last_used = time.monotonic()
+
+    async def _checkout(self, key: str, server_config: Dict[str, Any], spare: bool = False) -> PooledSession:
+        self._start_reaper()
+        await self._expire_idle()
+
+        tracer = get_tracer()
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            with tracer.span("pool.checkout", key=key) as span:
+                session = self._sessions.get(key)
+                if session is not None and not await self._is_healthy(session):
+                    logger.info(f"Respawning MCP session for {key}")
+                    self.stats["respawns"] += 1
+                    if self._sessions.get(key) is session:
+                        del self._sessions[key]
+                    await session.close()
+                    session = None
+
+                if session is None:
+                    self.stats["misses"] += 1
+                    span.set_attribute("reused", False)
+                    await self._make_room(spare)
+                    session = PooledSession(key, server_config, self.client_factory, spare)
+                    logger.info(f"Starting pooled MCP session for {key}")
+                    # Covers the subprocess spawn, MCP handshake and tool listing
+                    with tracer.span("session.start", key=key):
+                        await session.start(self.start_timeout)
+                    self._sessions[key] = session
+                else:
+                    self.stats["hits"] += 1
+                    span.set_attribute("reused", True)
+
+                self._sessions.move_to_end(key)
+                session.in_use += 1
+                return session
+
+    async def _is_healthy(self, session: PooledSession) -> bool:
+        if not session.alive:
+            return False
+        idle_for = time.monotonic() - max(session.last_used, session.last_checked)
+        if session.in_use == 0 and idle_for >= self.health_check_interval:
+            return await session.ping(timeout=min(self.start_timeout, 10.0))
+        return True
+
+    async def _make_room(self, spare: bool = False):
+        """Evict least recently used idle sessions of the same kind until there is space for one more"""
+        limit = self.max_spare if spare else self.max_size
+        while sum(1 for s in self._sessions.values() if s.spare == spare) >= limit:
+            victim_key = next((k for k, s in self._sessions.items() if s.spare == spare and s.in_use == 0), None)
+            if victim_key is None:
+                # Every session is busy; allow a temporary overflow rather than blocking
+                logger.warning("Session pool is full with busy sessions, exceeding max size")
+                return
+            logger.info(f"Evicting pooled MCP session for {victim_key}")
+            await self._evict(victim_key)
+
+    async def _evict(self, key: str):
+        """Close a pooled session and forget its key lock unless a checkout holds it"""
+        session = self._sessions.pop(key, None)
+        lock = self._key_locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._key_locks[key]
+        if session is not None:
+            self.stats["evictions"] += 1
+            await session.close()
+
+    async def _expire_idle(self):
+        now = time.monotonic()
+        # Skip keys a checkout is working on, e.g. pinging the idle session
+        expired = [
+            k for k, s in self._sessions.items()
+            if s.in_use == 0 and now - s.last_used > self.idle_ttl
+            and not (k in self._key_locks and self._key_locks[k].locked())
+        ]
+        for key in expired:
+            logger.info(f"Closing idle MCP session for {key}")
+            await self._evict(key)
+
+    def _start_reaper(self):
+        if self.reap_interval > 0 and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.create_task(self._reap(), name="mcp-session-reaper")
+
+    async def _reap(self):
+        """Expire idle sessions periodically, also while no request comes in"""
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self._expire_idle()
+            except Exception as e:
+                logger.warning(f"Session reaper failed: {str(e)}")
+
+    async def close(self):
+        """Stop the reaper and close every pooled session"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._key_locks.clear()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+
+_pool: Optional[SessionPool] = None
+
+
+def get_session_pool() -> SessionPool:
+    """Return the process-wide session pool for the running event loop
+
+    A pool is bound to the event loop that created its sessions, so a new pool
+    is created when called from a different loop (e.g. successive asyncio.run calls).
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool._loop is not loop:
+        _pool = SessionPool()
+        _pool._loop = loop
+    return _pool
+
+
+async def close_session_pool():
+    """Close the process-wide session pool, if any"""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        if pool._loop is asyncio.get_running_loop():
+            await pool.close()
@@ -0,0 +1,336 @@
+"""
+Resilience
+
+Deadlines, retries and hedged requests for LLM and task tool calls. Every
+attempt runs under a per-phase timeout; transient failures are retried with
+jittered exponential backoff; and calls that run past the phase's recent p95
+latency can get a duplicate request whose answer is used if it arrives first.
+"""
+
+import asyncio
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.dependencies import DEPENDENCY_TOOLS
+from omni_task_agent.tool_cache import READ_ONLY_TOOLS, STATELESS_TOOLS
+from omni_task_agent.tools import ToolContext, ToolHandler, add_tool_middleware
+from omni_task_agent.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors, overload
+TRANSIENT_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# Exception class names of provider and transport errors worth retrying, matched by
+# name so the provider SDKs need not be imported
+TRANSIENT_ERRORS = frozenset({
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailableError", "OverloadedError",
+    "ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "RemoteProtocolError",
+    "ClosedResourceError", "BrokenResourceError", "EndOfStream",
+})
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed call may succeed when retried"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status in TRANSIENT_STATUS:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+@dataclass
+class PhasePolicy:
+    """Deadline, retry and hedging settings of one call phase
+
+    Attributes:
+        timeout: Seconds an attempt may take, 0 for no limit
+        retries: Extra attempts after a transient failure
+        hedge: Whether slow attempts get a duplicate request
+    """
+
+    timeout: float
+    retries: int
+    hedge: bool
+
+    @classmethod
+    def from_env(cls, prefix: str, timeout: float, retries: int, hedge: bool) -> "PhasePolicy":
+        """Read <PREFIX>_TIMEOUT, <PREFIX>_RETRIES and <PREFIX>_HEDGE"""
+        return cls(
+            timeout=get_env_float(f"{prefix}_TIMEOUT", timeout),
+            retries=max(0, get_env_int(f"{prefix}_RETRIES", retries)),
+            hedge=get_env_bool(f"{prefix}_HEDGE", hedge),
+        )
+
+
+class Resilience:
+    """Runs calls with deadlines, retries and hedging, and counts what happened
+
+    Args:
+        backoff_initial: First retry delay in seconds (RETRY_BACKOFF_INITIAL)
+        backoff_max: Longest retry delay in seconds (RETRY_BACKOFF_MAX)
+        hedge_percentile: Latency percentile after which a hedge is sent (HEDGE_PERCENTILE)
+        hedge_min_samples: Latencies recorded before hedging starts (HEDGE_MIN_SAMPLES)
+        window: Latencies kept per phase for the percentile
+    """
+
+    def __init__(
+        self,
+        backoff_initial: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+        window: int = 200,
+    ):
+        self.backoff_initial = backoff_initial if backoff_initial is not None else get_env_float("RETRY_BACKOFF_INITIAL", 0.5)
+        self.backoff_max = backoff_max if backoff_max is not None else get_env_float("RETRY_BACKOFF_MAX", 8.0)
+        self.hedge_percentile = hedge_percentile if hedge_percentile is not None else get_env_float("HEDGE_PERCENTILE", 95.0)
+        self.hedge_min_samples = hedge_min_samples if hedge_min_samples is not None else get_env_int("HEDGE_MIN_SAMPLES", 20)
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, phase: str, counter: str):
+        counters = self.stats.setdefault(phase, {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "hedges": 0, "hedge_wins": 0})
+        counters[counter] += 1
+
+    def _record(self, key: str, latency: float):
+        self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Recent latency percentile of a call key, or None until enough calls were seen"""
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(self.hedge_percentile / 100 * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+    async def run(
+        self,
+        phase: str,
+        call: Callable[[bool], Awaitable[Any]],
+        policy: PhasePolicy,
+        key: Optional[str] = None,
+    ) -> Any:
+        """Run a call under a policy
+
+        Args:
+            phase: Counter group, e.g. "llm" or "tool"
+            call: Makes one request; its argument is True for hedged duplicates
+            policy: Deadline, retry and hedging settings
+            key: Latency group for the hedge delay, defaults to the phase
+
+        Raises:
+            asyncio.TimeoutError: If the last attempt ran out of time
+        """
+        from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+        key = key or phase
+        self._count(phase, "calls")
+
+        def before_sleep(state):
+            self._count(phase, "retries")
+            logger.warning(f"Retrying {key} after {state.outcome.exception()!r} (attempt {state.attempt_number})")
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(policy.retries + 1),
+            wait=wait_exponential_jitter(multiplier=self.backoff_initial, max=self.backoff_max, jitter=self.backoff_initial),
+            retry=retry_if_exception(is_transient),
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    return await self._attempt(phase, key, call, policy)
+        except Exception:
+            self._count(phase, "failures")
+            raise
+
+    async def _attempt(self, phase: str, key: str, call: Callable[[bool], Awaitable[Any]], policy: PhasePolicy) -> Any:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if policy.timeout > 0:
+                result = await asyncio.wait_for(self._hedged(phase, key, call, policy.hedge), policy.timeout)
+            else:
+                result = await self._hedged(phase, key, call, policy.hedge)
+        except asyncio.TimeoutError:
+            self._count(phase, "timeouts")
+            current_span().set_attribute("timed_out", True)
+            raise
+        self._record(key, loop.time() - started)
+        return result
+
+    async def _hedged(self, phase: str, key: str, call: Callable[[bool], Awaitable[Any]], hedge: bool) -> Any:
+        primary = asyncio.ensure_future(call(False))
+        delay = self.hedge_delay(key) if hedge else None
+        if delay is None:
+            try:
+                return await primary
+            finally:
+                primary.cancel()
+
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._count(phase, "hedges")
+                tasks.add(asyncio.ensure_future(call(True)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count(phase, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters per phase and the current hedge delay of every call key"""
+        return {
+            "phases": {phase: dict(counters) for phase, counters in self.stats.items()},
+            "hedge_delays": {key: self.hedge_delay(key) for key in self._latencies},
+        }
+
+
+_resilience: Optional[Resilience] = None
+
+
+def get_resilience() -> Resilience:
+    """Return the process-wide resilience layer"""
+    global _resilience
+    if _resilience is None:
+        _resilience = Resilience()
+    return _resilience
+
+
+class ToolResilience:
+    """Tool middleware applying the tool phase policy
+
+    Reads and prompt-only tools are retried and hedged; a hedge goes through the
+    scheduler below, which serves it from another warm session of the project.
+    Mutating tools only get the deadline, since repeating them is not safe.
+    """
+
+    def __init__(self, policy: Optional[PhasePolicy] = None, resilience: Optional[Resilience] = None):
+        self.policy = policy or PhasePolicy.from_env("TOOL", timeout=60.0, retries=2, hedge=True)
+        self.resilience = resilience or get_resilience()
+        self._write_policy = PhasePolicy(timeout=self.policy.timeout, retries=0, hedge=False)
+
+    async def __call__(self, context: ToolContext, name: str, arguments: Dict[str, Any], call_next: ToolHandler) -> Any:
+        idempotent = name in READ_ONLY_TOOLS or name in STATELESS_TOOLS or name in DEPENDENCY_TOOLS
+        return await self.resilience.run(
+            "tool",
+            lambda hedged: call_next(name, arguments),
+            self.policy if idempotent else self._write_policy,
+            key=f"tool:{name}",
+        )
+
+
+_tool_resilience: Optional[ToolResilience] = None
+
+
+def install_tool_resilience():
+    """Register deadlines and retries for tool calls unless TOOL_RESILIENCE=false
+
+    Registered after the result cache and before the scheduler, so cache hits
+    skip it and hedged reads can run on sibling sessions. Safe to call repeatedly.
+    """
+    global _tool_resilience
+    if not get_env_bool("TOOL_RESILIENCE", True):
+        return
+    if _tool_resilience is None:
+        _tool_resilience = ToolResilience()
+    add_tool_middleware(_tool_resilience)
+
+
+_resilient_class = None
+
+
+def with_resilience(model: Any, policy: Optional[PhasePolicy] = None):
+    """Wrap a chat model so every call gets the LLM phase policy
+
+    Hedged duplicates and retried attempts run without the caller's callbacks,
+    so they do not stream a second copy of the answer. A model router gets no
+    outer deadline: its own per-model timeout (MODEL_ROUTER_TIMEOUT, below
+    LLM_TIMEOUT) fires first and falls back to the next model, which an outer
+    cancellation would prevent. Returns the model unchanged if LLM_RESILIENCE=false.
+
+    Args:
+        model: Chat model or model router
+        policy: Defaults to LLM_TIMEOUT, LLM_RETRIES and LLM_HEDGE
+    """
+    global _resilient_class
+    if not get_env_bool("LLM_RESILIENCE", True):
+        return model
+    if _resilient_class is None:
+        _resilient_class = _make_resilient_model()
+    policy = policy or PhasePolicy.from_env("LLM", timeout=120.0, retries=2, hedge=False)
+    if _is_router(model):
+        policy = replace(policy, timeout=0)
+    return _resilient_class(model, policy)
+
+
+def _is_router(model: Any) -> bool:
+    from omni_task_agent.model_router import ModelRouter
+
+    return isinstance(getattr(model, "router", None), ModelRouter)
+
+
+def _make_resilient_model():
+    """Define the Runnable class lazily so importing this module stays light"""
+    from langchain_core.runnables import Runnable
+
+    class ResilientModel(Runnable):
+        """Chat model wrapper adding deadlines, retries and hedging
+
+        Synchronous calls, such as history summaries, are retried but have no deadline.
+        """
+
+        def __init__(self, model, policy: PhasePolicy):
+            self.model = model
+            self.policy = policy
+
+        def invoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+            resilience = get_resilience()
+            resilience._count("llm", "calls")
+            retrying = Retrying(
+                stop=stop_after_attempt(self.policy.retries + 1),
+                wait=wait_exponential_jitter(multiplier=resilience.backoff_initial, max=resilience.backoff_max, jitter=resilience.backoff_initial),
+                retry=retry_if_exception(is_transient),
+                before_sleep=lambda state: resilience._count("llm", "retries"),
+                reraise=True,
+            )
+            return retrying(self.model.invoke, input, config, **kwargs)
+
+        async def ainvoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            attempts = 0
+
+            def call(hedged: bool):
+                nonlocal attempts
+                attempts += 1
+                # Only the first attempt streams; an abandoned one may already have sent tokens
+                call_config = {**(config or {}), "callbacks": None} if attempts > 1 else config
+                return self.model.ainvoke(input, call_config, **kwargs)
+
+            return await get_resilience().run("llm", call, self.policy)
+
+        def bind_tools(self, tools, **kwargs):
+            return ResilientModel(self.model.bind_tools(tools, **kwargs), self.policy)
+
+    return ResilientModel
@@ -0,0 +1,167 @@
+"""
+Shrimp Task Manager Resolver
+
+Locates the shrimp-task-manager entry script and the node binary once per process,
+so spawning a session never goes through ``npx -y`` package resolution.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+from omni_task_agent.config import get_env_bool
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_NAME = "mcp-shrimp-task-manager"
+ENTRY_SCRIPT = os.path.join("dist", "index.js")
+
+# Server directory - OmniTask Agent's own directory, used to find dependencies
+SERVER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ShrimpNotFoundError(RuntimeError):
+    """Raised by preflight when no usable shrimp-task-manager install is found"""
+
+
+@dataclass(frozen=True)
+class ShrimpCommand:
+    """Resolved command used to spawn shrimp-task-manager"""
+
+    command: str
+    args: List[str]
+    source: str  # "env", "local", "global" or "npx"
+
+    @property
+    def uses_npx(self) -> bool:
+        return self.source == "npx"
+
+
+_resolved: Optional[ShrimpCommand] = None
+
+
+def _global_node_modules_dirs() -> List[str]:
+    """Candidate global node_modules directories, cheapest checks first"""
+    dirs = []
+    prefix = os.environ.get("NPM_CONFIG_PREFIX")
+    if prefix:
+        dirs.append(os.path.join(prefix, "lib", "node_modules"))
+    dirs.extend([
+        "/usr/local/lib/node_modules",
+        "/usr/lib/node_modules",  # Dockerfile: nodesource + npm install -g
+        os.path.expanduser("~/.npm-global/lib/node_modules"),
+    ])
+    return dirs
+
+
+def _npm_global_root() -> Optional[str]:
+    """Ask npm for its global root, used only when the common locations miss"""
+    npm = shutil.which("npm")
+    if not npm:
+        return None
+    try:
+        result = subprocess.run(
+            [npm, "root", "-g"], capture_output=True, text=True, timeout=10, check=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"npm root -g failed: {str(e)}")
+        return None
+    return result.stdout.strip() or None
+
+
+def _find_script() -> Optional[tuple]:
+    override = os.environ.get("SHRIMP_TASK_MANAGER_PATH")
+    if override:
+        return os.path.abspath(override), "env"
+
+    local_path = os.path.join(SERVER_ROOT, "node_modules", PACKAGE_NAME, ENTRY_SCRIPT)
+    if os.path.exists(local_path):
+        return local_path, "local"
+
+    for modules_dir in _global_node_modules_dirs():
+        candidate = os.path.join(modules_dir, PACKAGE_NAME, ENTRY_SCRIPT)
+        if os.path.exists(candidate):
+            return candidate, "global"
+
+    npm_root = _npm_global_root()
+    if npm_root:
+        candidate = os.path.join(npm_root, PACKAGE_NAME, ENTRY_SCRIPT)
+        if os.path.exists(candidate):
+            return candidate, "global"
+
+    return None
+
+
+def resolve_shrimp_command(refresh: bool = False) -> ShrimpCommand:
+    """Resolve how to spawn shrimp-task-manager, caching the result for the process
+
+    Search order: ``SHRIMP_TASK_MANAGER_PATH``, the server's ``node_modules``,
+    global npm installs. Falls back to ``npx -y`` only when nothing is installed.
+
+    Args:
+        refresh: Ignore the cached result and search again
+
+    Returns:
+        Resolved ShrimpCommand with absolute paths where available
+    """
+    global _resolved
+    if _resolved is not None and not refresh:
+        return _resolved
+
+    found = _find_script()
+    if found is None:
+        logger.warning(
+            f"{PACKAGE_NAME} is not installed locally or globally, falling back to npx "
+            f"(run `npm install` or `npm install -g {PACKAGE_NAME}` to avoid per-spawn resolution)"
+        )
+        _resolved = ShrimpCommand(command="npx", args=["-y", PACKAGE_NAME], source="npx")
+        return _resolved
+
+    script, source = found
+    if script.endswith(".py"):
+        # Python stand-in servers (e.g. for benchmarks) run under the current interpreter
+        command = sys.executable
+    else:
+        command = shutil.which("node") or "node"
+    logger.info(f"Using {source} shrimp-task-manager: {script}")
+    _resolved = ShrimpCommand(command=command, args=[script], source=source)
+    return _resolved
+
+
+def reset_shrimp_resolution():
+    """Forget the cached resolution, e.g. after installing the package"""
+    global _resolved
+    _resolved = None
+
+
+def preflight(allow_npx: Optional[bool] = None) -> ShrimpCommand:
+    """Verify shrimp-task-manager can be spawned without npx resolution
+
+    Args:
+        allow_npx: Accept the npx fallback, defaults to SHRIMP_ALLOW_NPX (false)
+
+    Returns:
+        Resolved ShrimpCommand
+
+    Raises:
+        ShrimpNotFoundError: If no install is found and npx is not allowed, or node is missing
+    """
+    if allow_npx is None:
+        allow_npx = get_env_bool("SHRIMP_ALLOW_NPX", False)
+
+    resolved = resolve_shrimp_command()
+    if resolved.uses_npx:
+        if not allow_npx:
+            raise ShrimpNotFoundError(
+                f"{PACKAGE_NAME} is not installed. Run `npm install` in {SERVER_ROOT} "
+                f"or `npm install -g {PACKAGE_NAME}`, or set SHRIMP_ALLOW_NPX=true"
+            )
+        if not shutil.which("npx"):
+            raise ShrimpNotFoundError("npx was not found on PATH")
+    elif not os.path.isabs(resolved.command):
+        raise ShrimpNotFoundError("node was not found on PATH")
+    return resolved
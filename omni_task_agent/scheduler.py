@@ -0,0 +1,214 @@
+"""
+Tool Scheduler
+
+Lets the tool calls of one agent step run in parallel. The ReAct graph already
+starts every tool call of a step at once, but a shrimp-task-manager stdio
+session answers one request at a time. This middleware spreads overlapping
+read-only calls over extra pooled sessions of the same project and runs
+mutating calls one by one per project, in the order they were issued.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from omni_task_agent.config import get_env_bool, get_env_int
+from omni_task_agent.dependencies import DEPENDENCY_TOOLS
+from omni_task_agent.pool import get_session_pool
+from omni_task_agent.tool_cache import READ_ONLY_TOOLS, STATELESS_TOOLS
+from omni_task_agent.tools import ToolContext, ToolHandler, add_tool_middleware
+from omni_task_agent.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectLock:
+    """Reader-writer lock that admits writers in arrival order
+
+    Any number of readers may hold the lock together. A writer waits for the
+    readers ahead of it and readers arriving after a queued writer wait for it,
+    so a read issued after a mutation observes that mutation.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._next_ticket = 0
+        self._serving = 0
+        # Tickets of writers cancelled while queued
+        self._abandoned = set()
+
+    async def acquire_read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and self._serving == self._next_ticket)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._condition:
+            self._readers -= 1
+            self._condition.notify_all()
+
+    async def acquire_write(self):
+        async with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: self._serving == ticket and not self._writing and self._readers == 0
+                )
+            except BaseException:
+                self._abandoned.add(ticket)
+                self._advance()
+                raise
+            self._writing = True
+
+    async def release_write(self):
+        async with self._condition:
+            self._writing = False
+            self._serving += 1
+            self._advance()
+
+    def _advance(self):
+        # Skip tickets whose writers gave up, then wake everyone to re-check
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+        self._condition.notify_all()
+
+
+class ToolScheduler:
+    """Tool middleware running reads concurrently and mutations serially per project
+
+    Read-only shrimp tools go to the least busy of up to ``read_sessions``
+    sessions of the project: the request's own session, plus sibling sessions
+    kept in the session pool under ``<data_dir>#read<n>`` keys as spare sessions,
+    so they never evict another project's own session. Siblings are
+    started in the background the first time reads overlap, so no call ever
+    waits for a subprocess to spawn. Local dependency tools read under the same
+    lock, stateless prompt tools bypass it.
+    """
+
+    def __init__(self, read_sessions: Optional[int] = None):
+        """
+        Args:
+            read_sessions: Sessions per project serving concurrent reads, 1 keeps
+                every call on the request's session (TOOL_READ_SESSIONS)
+        """
+        self.read_sessions = max(1, read_sessions if read_sessions is not None else get_env_int("TOOL_READ_SESSIONS", 4))
+        self.stats = {"reads": 0, "writes": 0, "sibling_reads": 0, "max_parallel_reads": 0}
+        self._locks: Dict[str, ProjectLock] = {}
+        # In-flight reads per session slot; slot 0 is the request's own session
+        self._slots: Dict[str, List[int]] = {}
+        self._warming: Dict[str, asyncio.Task] = {}
+        self._loop = None
+
+    def _lock_for(self, data_dir: str) -> ProjectLock:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio primitives belong to one event loop
+            self._locks.clear()
+            self._slots.clear()
+            self._warming.clear()
+            self._loop = loop
+        lock = self._locks.get(data_dir)
+        if lock is None:
+            lock = self._locks[data_dir] = ProjectLock()
+        return lock
+
+    @staticmethod
+    def sibling_key(data_dir: str, slot: int) -> str:
+        return f"{data_dir}#read{slot}"
+
+    def _pick_slot(self, context: ToolContext, can_fan_out: bool) -> int:
+        data_dir = context.data_dir or ""
+        slots = self._slots.setdefault(data_dir, [0] * self.read_sessions)
+        pool = get_session_pool() if can_fan_out else None
+        if pool is not None and pool.max_spare <= 0:
+            pool = None
+        usable = [0] + [i for i in range(1, len(slots)) if pool is not None and pool.is_warm(self.sibling_key(data_dir, i))]
+        slot = min(usable, key=slots.__getitem__)
+        if slots[slot] and pool is not None:
+            # Every session is busy: start one more sibling for the next overlap
+            cold = [i for i in range(1, len(slots)) if i not in usable and not self._is_warming(data_dir, i)]
+            if cold:
+                self._warm_sibling(pool, context, cold[0])
+        slots[slot] += 1
+        self.stats["max_parallel_reads"] = max(self.stats["max_parallel_reads"], sum(slots))
+        return slot
+
+    def _is_warming(self, data_dir: str, slot: int) -> bool:
+        task = self._warming.get(self.sibling_key(data_dir, slot))
+        return task is not None and not task.done()
+
+    def _warm_sibling(self, pool, context: ToolContext, slot: int):
+        key = self.sibling_key(context.data_dir or "", slot)
+
+        async def warm():
+            try:
+                await pool.warm(key, context.server_config, spare=True)
+            except Exception as e:
+                logger.warning(f"Could not start read session {key}: {str(e)}")
+
+        logger.info(f"Starting read session {key}")
+        self._warming[key] = asyncio.create_task(warm(), name=f"warm:{key}")
+
+    async def _read(self, context: ToolContext, name: str, arguments: Dict[str, Any], call_next: ToolHandler) -> Any:
+        data_dir = context.data_dir or ""
+        can_fan_out = name in READ_ONLY_TOOLS and context.server_config is not None
+        slot = self._pick_slot(context, can_fan_out)
+        current_span().set_attribute("session_slot", slot)
+        try:
+            if slot == 0:
+                return await call_next(name, arguments)
+            self.stats["sibling_reads"] += 1
+            async with get_session_pool().acquire(self.sibling_key(data_dir, slot), context.server_config, spare=True) as client:
+                tool = next((t for t in client.get_tools() if t.name == name), None)
+                if tool is None:
+                    return await call_next(name, arguments)
+                return await tool.coroutine(**arguments)
+        finally:
+            slots = self._slots.get(data_dir)
+            if slots is not None and slot < len(slots):
+                slots[slot] -= 1
+
+    async def __call__(self, context: ToolContext, name: str, arguments: Dict[str, Any], call_next: ToolHandler) -> Any:
+        if name in STATELESS_TOOLS:
+            return await call_next(name, arguments)
+
+        lock = self._lock_for(context.data_dir or "")
+        if name in READ_ONLY_TOOLS or name in DEPENDENCY_TOOLS:
+            self.stats["reads"] += 1
+            await lock.acquire_read()
+            try:
+                return await self._read(context, name, arguments, call_next)
+            finally:
+                await lock.release_read()
+
+        self.stats["writes"] += 1
+        await lock.acquire_write()
+        try:
+            return await call_next(name, arguments)
+        finally:
+            await lock.release_write()
+
+
+_tool_scheduler: Optional[ToolScheduler] = None
+
+
+def get_tool_scheduler() -> ToolScheduler:
+    """Return the process-wide tool scheduler"""
+    global _tool_scheduler
+    if _tool_scheduler is None:
+        _tool_scheduler = ToolScheduler()
+    return _tool_scheduler
+
+
+def install_tool_scheduler():
+    """Register the tool scheduler as a tool middleware unless TOOL_CONCURRENCY=false
+
+    Registered after the result cache, so cache hits never wait for the lock.
+    Safe to call repeatedly.
+    """
+    if get_env_bool("TOOL_CONCURRENCY", True):
+        add_tool_middleware(get_tool_scheduler())
@@ -0,0 +1,411 @@
+"""
+SSE Worker Sharding
+
+Runs the SSE server as several worker processes behind a front dispatcher, so
+agent runs use more than one core. The dispatcher is itself an MCP server: it
+lists the workers' tools and forwards each tool call to the worker that owns
+the call's projectRoot on a consistent hash ring. A project's warm sessions,
+caches and checkpoints therefore stay in one process. Each worker is
+supervised on its own: a worker that exits is restarted on the same port and
+keeps its share of the ring, while the other workers keep serving.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from omni_task_agent.admission import admission_key
+from omni_task_agent.config import get_env_float, get_env_int
+from omni_task_agent.pool import PooledSession
+from omni_task_agent.resolver import SERVER_ROOT
+from omni_task_agent.warmup import add_health_routes
+
+logger = logging.getLogger(__name__)
+
+# Answered by the dispatcher with the metrics of every worker
+METRICS_TOOL = "OmniTask Metrics"
+
+# Longest wait between restarts of a worker that keeps exiting
+MAX_RESTART_DELAY = 30.0
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to nodes
+
+    Each node is placed at ``replicas`` points of the ring, so keys spread
+    evenly and adding or removing a node moves only that node's share of keys.
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 64):
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node")
+        self._points = sorted((self._hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big")
+
+    def node_for(self, key: str) -> str:
+        """Node owning a key: the first point clockwise from the key's hash"""
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._points)
+        return self._points[index][1]
+
+
+def project_key(arguments: Any) -> str:
+    """Shard key of a tool call: its absolute projectRoot, "" for the default project"""
+    return admission_key(arguments.get("projectRoot") if isinstance(arguments, dict) else None)
+
+
+@asynccontextmanager
+async def connect_worker(url: str, **session_args: Any):
+    """Open an initialized MCP client session to a worker's SSE endpoint"""
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    async with sse_client(url, sse_read_timeout=get_env_float("SSE_WORKER_READ_TIMEOUT", 600.0)) as streams:
+        async with ClientSession(*streams, **session_args) as session:
+            await session.initialize()
+            yield session
+
+
+def worker_client(server_config: Dict[str, Dict[str, Any]]):
+    """PooledSession client factory: an MCP session to the worker named in the configuration
+
+    The configuration has MultiServerMCPClient's shape, e.g.
+    ``{"worker-0": {"transport": "sse", "url": "http://127.0.0.1:8001/sse"}}``.
+    """
+    (connection,) = server_config.values()
+    return connect_worker(connection["url"])
+
+
+class Worker:
+    """One run_mcp SSE process listening on a local port"""
+
+    def __init__(self, index: int, port: int, command: Sequence[str], sse_path: str = "/sse"):
+        self.name = f"worker-{index}"
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.command = list(command)
+        self.sse_path = sse_path
+        self.server_config = {self.name: {"transport": "sse", "url": self.url + sse_path}}
+        self.process: Optional[subprocess.Popen] = None
+        self.ready = False
+        self.restarts = 0
+        self.calls = 0
+        # Restarts since the worker was last ready, and when the next may happen
+        self.failures = 0
+        self.next_start = 0.0
+        self._session: Optional[PooledSession] = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Spawn the worker process; it warms up and then reports ready"""
+        env = {
+            **os.environ,
+            "FASTMCP_HOST": "127.0.0.1",
+            "FASTMCP_PORT": str(self.port),
+            # Workers serve directly instead of dispatching again
+            "SSE_WORKERS": "1",
+        }
+        self.ready = False
+        self.process = subprocess.Popen(self.command, env=env)
+        logger.info(f"Started {self.name} (pid {self.process.pid}) on port {self.port}")
+
+    async def check(self, http) -> bool:
+        """Poll the worker's /ready endpoint"""
+        try:
+            response = await http.get(f"{self.url}/ready")
+            self.ready = response.status_code == 200
+        except Exception:
+            self.ready = False
+        return self.ready
+
+    async def drop_session(self):
+        """Close the shared client session, e.g. after the process exited"""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def session(self, timeout: float):
+        """Shared client session to the worker, reconnected after a restart"""
+        async with self._connect_lock:
+            if self._session is None or not self._session.alive:
+                session = PooledSession(self.name, self.server_config, worker_client)
+                await session.start(timeout)
+                self._session = session
+            return self._session.client
+
+    async def call_streaming(self, name: str, arguments: Dict[str, Any], progress_token: Any, downstream) -> Any:
+        """Call a tool on a session of its own, relaying its progress and log notifications"""
+        from mcp import types
+
+        async def relay_progress(message):
+            if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ProgressNotification):
+                params = message.root.params
+                await downstream.send_progress_notification(progress_token, params.progress, params.total)
+
+        async def relay_log(params: types.LoggingMessageNotificationParams):
+            await downstream.send_log_message(params.level, params.data, params.logger)
+
+        request = types.ClientRequest(types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams.model_validate({
+                "name": name,
+                "arguments": arguments,
+                "_meta": {"progressToken": progress_token},
+            }),
+        ))
+        async with connect_worker(self.url + self.sse_path, message_handler=relay_progress, logging_callback=relay_log) as session:
+            return await session.send_request(request, types.CallToolResult)
+
+    async def stop(self, timeout: float = 10.0):
+        """Close the client session and terminate the process"""
+        self.ready = False
+        await self.drop_session()
+        if self.alive:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self.process.wait), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await asyncio.to_thread(self.process.wait)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "port": self.port,
+            "pid": self.process.pid if self.alive else None,
+            "ready": self.ready,
+            "restarts": self.restarts,
+            "calls": self.calls,
+        }
+
+
+class Dispatcher:
+    """Front MCP server sharding tool calls over worker processes by projectRoot
+
+    Usage:
+    ```python
+    dispatcher = Dispatcher(workers=4, command=[sys.executable, "run_mcp.py", "sse"])
+    await dispatcher.serve("0.0.0.0", 8000)
+    ```
+    """
+
+    def __init__(
+        self,
+        command: Optional[Sequence[str]] = None,
+        workers: Optional[int] = None,
+        base_port: Optional[int] = None,
+        start_timeout: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        name: str = "OmniTask Agent MCP Server",
+    ):
+        """
+        Args:
+            command: Command running one SSE server, defaults to run_mcp.py sse
+            workers: Number of worker processes (SSE_WORKERS)
+            base_port: Port of the first worker; the others follow (SSE_WORKER_BASE_PORT)
+            start_timeout: Seconds a call waits for its worker to be ready (SSE_WORKER_START_TIMEOUT)
+            check_interval: Seconds between worker health checks (SSE_WORKER_CHECK_INTERVAL)
+            name: MCP server name announced to clients
+        """
+        if command is None:
+            command = [sys.executable, os.path.join(SERVER_ROOT, "run_mcp.py"), "sse"]
+        count = max(1, workers if workers is not None else get_env_int("SSE_WORKERS", 2))
+        base_port = base_port if base_port is not None else get_env_int("SSE_WORKER_BASE_PORT", 8001)
+        self.start_timeout = (
+            start_timeout if start_timeout is not None else get_env_float("SSE_WORKER_START_TIMEOUT", 120.0)
+        )
+        self.check_interval = (
+            check_interval if check_interval is not None else get_env_float("SSE_WORKER_CHECK_INTERVAL", 1.0)
+        )
+        self.name = name
+        self.workers = [Worker(index, base_port + index, command) for index in range(count)]
+        self._by_name = {worker.name: worker for worker in self.workers}
+        self.ring = HashRing([worker.name for worker in self.workers])
+        self.stats = {"calls": 0, "restarts": 0, "errors": 0}
+        self._tools: Optional[List[Any]] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether every worker is warm, so no project is routed to a cold process"""
+        return all(worker.ready for worker in self.workers)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "starting",
+            **self.stats,
+            "workers": [worker.report() for worker in self.workers],
+        }
+
+    def worker_for(self, arguments: Any) -> Worker:
+        """Worker owning the project of a tool call"""
+        return self._by_name[self.ring.node_for(project_key(arguments))]
+
+    async def start(self):
+        """Spawn every worker and start supervising them"""
+        for worker in self.workers:
+            worker.start()
+        self._supervisor = asyncio.create_task(self._supervise(), name="sse-supervisor")
+
+    async def _supervise(self):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=max(self.check_interval, 2.0)) as http:
+            while True:
+                for worker in self.workers:
+                    try:
+                        if worker.alive:
+                            was_ready = worker.ready
+                            if await worker.check(http) and not was_ready:
+                                logger.info(f"{worker.name} is ready")
+                                worker.failures = 0
+                        elif time.monotonic() >= worker.next_start:
+                            await self._restart(worker)
+                    except Exception:
+                        # One worker failing to restart must not stop supervision of the others
+                        logger.exception(f"Supervising {worker.name} failed")
+                await asyncio.sleep(self.check_interval)
+
+    async def _restart(self, worker: Worker):
+        code = worker.process.returncode if worker.process is not None else None
+        logger.warning(f"{worker.name} exited with code {code}, restarting")
+        worker.ready = False
+        worker.restarts += 1
+        worker.failures += 1
+        self.stats["restarts"] += 1
+        # Back off when a worker keeps exiting before it becomes ready, or fails to restart at all
+        worker.next_start = time.monotonic() + min(2.0 ** worker.failures, MAX_RESTART_DELAY)
+        await worker.drop_session()
+        worker.start()
+
+    async def _wait_ready(self, worker: Worker):
+        deadline = time.monotonic() + self.start_timeout
+        # A worker that exited stays marked ready until the supervisor notices
+        while not (worker.ready and worker.alive):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"{worker.name} is not ready")
+            await asyncio.sleep(min(remaining, 0.05))
+
+    async def list_tools(self) -> List[Any]:
+        """Tools of the workers, listed once from the first worker"""
+        if self._tools is None:
+            worker = self.workers[0]
+            await self._wait_ready(worker)
+            session = await worker.session(self.start_timeout)
+            self._tools = list((await session.list_tools()).tools)
+        return self._tools
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any], progress_token: Any = None, downstream=None) -> Any:
+        """Forward a tool call to the worker owning its project
+
+        Returns:
+            The worker's CallToolResult
+        """
+        worker = self.worker_for(arguments)
+        await self._wait_ready(worker)
+        worker.calls += 1
+        self.stats["calls"] += 1
+        try:
+            if progress_token is not None and downstream is not None:
+                return await worker.call_streaming(name, arguments, progress_token, downstream)
+            session = await worker.session(self.start_timeout)
+            return await session.call_tool(name, arguments)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Dispatcher statistics and the metrics of every ready worker"""
+        async def worker_metrics(worker: Worker):
+            if not worker.ready:
+                return None
+            try:
+                result = await (await worker.session(self.start_timeout)).call_tool(METRICS_TOOL, {})
+                return json.loads(result.content[0].text)
+            except Exception as e:
+                return {"error": str(e)}
+
+        results = await asyncio.gather(*(worker_metrics(worker) for worker in self.workers))
+        return {
+            "dispatcher": self.report(),
+            "workers": {worker.name: result for worker, result in zip(self.workers, results)},
+        }
+
+    def make_app(self):
+        """Starlette app serving MCP over SSE plus /health and /ready"""
+        from mcp import types
+        from mcp.server.lowlevel import Server
+        from mcp.server.sse import SseServerTransport
+        from starlette.applications import Starlette
+        from starlette.routing import Mount, Route
+
+        server = Server(self.name)
+
+        @server.list_tools()
+        async def list_tools():
+            return await self.list_tools()
+
+        @server.call_tool()
+        async def call_tool(name: str, arguments: Dict[str, Any]):
+            if name == METRICS_TOOL:
+                return [types.TextContent(type="text", text=json.dumps(await self.metrics()))]
+            context = server.request_context
+            progress_token = context.meta.progressToken if context.meta else None
+            result = await self.call_tool(name, arguments, progress_token, context.session)
+            if result.isError:
+                raise RuntimeError(" ".join(getattr(item, "text", "") for item in result.content))
+            return result.content
+
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+                await server.run(streams[0], streams[1], server.create_initialization_options())
+
+        app = Starlette(routes=[
+            Route("/sse", endpoint=handle_sse),
+            Mount("/messages/", app=sse.handle_post_message),
+        ])
+        add_health_routes(app, self)
+        return app
+
+    async def serve(self, host: str, port: int, log_level: str = "info"):
+        """Start the workers and serve the dispatcher until it is stopped"""
+        import uvicorn
+
+        await self.start()
+        server = uvicorn.Server(uvicorn.Config(
+            self.make_app(),
+            host=host,
+            port=port,
+            log_level=log_level,
+            timeout_graceful_shutdown=get_env_float("SSE_SHUTDOWN_TIMEOUT", 5.0),
+        ))
+        logger.info(f"Dispatching to {len(self.workers)} SSE workers on ports {self.workers[0].port}-{self.workers[-1].port}")
+        try:
+            await server.serve()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop supervising and terminate every worker"""
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+        await asyncio.gather(*(worker.stop() for worker in self.workers), return_exceptions=True)
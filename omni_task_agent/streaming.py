@@ -0,0 +1,126 @@
+"""
+Streaming Module
+
+Runs the agent graph with ``astream_events`` and forwards tokens and tool-call
+progress to a handler as they arrive, instead of waiting for the whole ReAct loop.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_text(chunk: Any) -> str:
+    """Extract printable text from a chat model chunk
+
+    Handles plain string content as well as content block lists (e.g. Anthropic).
+    """
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return ""
+
+
+class StreamHandler:
+    """Receives streaming events; override the methods you need"""
+
+    async def on_token(self, text: str):
+        """Called for each token (or token group) produced by the model"""
+
+    async def on_tool_start(self, name: str, arguments: Any):
+        """Called when the agent starts a tool call"""
+
+    async def on_tool_end(self, name: str, output: Any, duration: float):
+        """Called when a tool call finishes"""
+
+    async def on_end(self, state: Dict[str, Any]):
+        """Called once with the final graph state"""
+
+
+async def stream_agent(agent, inputs: Dict[str, Any], handler: StreamHandler, config: Optional[Dict] = None) -> Dict[str, Any]:
+    """Run the agent, streaming events to the handler
+
+    Args:
+        agent: Compiled agent graph
+        inputs: Graph input, e.g. {"messages": [...]}
+        handler: StreamHandler receiving tokens and tool progress
+        config: Optional runnable config
+
+    Returns:
+        Final graph state, the same value ainvoke would return
+    """
+    final_state: Dict[str, Any] = {}
+    tool_started: Dict[str, float] = {}
+
+    async for event in agent.astream_events(inputs, config=config, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = chunk_text(event["data"].get("chunk"))
+            if text:
+                await handler.on_token(text)
+        elif kind == "on_tool_start":
+            tool_started[event["run_id"]] = time.perf_counter()
+            await handler.on_tool_start(event["name"], event["data"].get("input"))
+        elif kind == "on_tool_end":
+            started = tool_started.pop(event["run_id"], time.perf_counter())
+            await handler.on_tool_end(event["name"], event["data"].get("output"), time.perf_counter() - started)
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # Top-level graph run finished
+            output = event["data"].get("output")
+            if isinstance(output, dict):
+                final_state = output
+
+    await handler.on_end(final_state)
+    return final_state
+
+
+class ConsoleStreamHandler(StreamHandler):
+    """Prints tokens and tool progress to stdout for the CLI"""
+
+    def __init__(self, prefix: str = "Assistant: "):
+        self.prefix = prefix
+        self.started = False
+        self.printed_any = False
+        # Text streamed since the last tool call, i.e. of the latest model turn
+        self.turn_text = ""
+
+    def _start_line(self):
+        if not self.started:
+            print(self.prefix, end="", flush=True)
+            self.started = True
+
+    async def on_token(self, text: str):
+        self._start_line()
+        print(text, end="", flush=True)
+        self.printed_any = True
+        self.turn_text += text
+
+    async def on_tool_start(self, name: str, arguments: Any):
+        if self.started:
+            print()
+            self.started = False
+        self.turn_text = ""
+        print(f"  ... calling {name}", flush=True)
+
+    async def on_tool_end(self, name: str, output: Any, duration: float):
+        print(f"  ... {name} finished in {duration:.2f}s", flush=True)
+
+    async def on_end(self, state: Dict[str, Any]):
+        if self.started:
+            print()
+            self.started = False
+
+    def streamed(self, output: Any) -> bool:
+        """Whether the final answer was printed in full as it streamed
+
+        A retried model call runs without callbacks, so its answer is not
+        streamed and has to be printed by the caller.
+        """
+        return self.printed_any and chunk_text(output).strip() == self.turn_text.strip()
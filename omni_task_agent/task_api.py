@@ -0,0 +1,165 @@
+"""
+Task API Server
+
+Reference HTTP task service for the http backend. It serves the in-process task
+and dependency tools per project, so the whole HTTP path can be run and
+load-tested locally:
+
+- GET  /health
+- GET  /tools: name, description and input schema of every tool
+- POST /projects/{project}/tools/{name}: one tool call, the body holds its arguments
+- POST /projects/{project}/calls: several tool calls, run in order
+- POST /projects/{project}/tasks/get: tasks by ID
+- POST /projects/{project}/tasks/put: create or update tasks, saved once
+
+Usage:
+    python -m omni_task_agent.task_api   # listens on OMNI_TASK_API_URL
+"""
+
+import logging
+import os
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from pydantic import BaseModel
+
+from omni_task_agent.dependencies import DEPENDENCY_TOOLS, make_dependency_tools
+from omni_task_agent.local_backend import LOCAL_TOOLS, aload_project_store, make_local_tools, task_record
+from omni_task_agent.resolver import SERVER_ROOT
+from omni_task_agent.tools import bind_tool_context, describe_tool
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "http://localhost:8000"
+
+TOOLS = {**LOCAL_TOOLS, **DEPENDENCY_TOOLS}
+
+_PROJECT_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class ToolCall(BaseModel):
+    name: str
+    arguments: Dict[str, Any] = {}
+
+
+class CallBatch(BaseModel):
+    calls: List[ToolCall]
+
+
+class TaskIds(BaseModel):
+    ids: List[str]
+
+
+class TaskBatch(BaseModel):
+    tasks: List[Dict[str, Any]]
+
+
+async def run_tool(data_dir: str, name: str, arguments: Dict[str, Any]) -> Any:
+    """Call a task or dependency tool on a project's data directory
+
+    Raises:
+        KeyError: If the tool does not exist
+        TypeError: If the arguments do not fit the tool
+    """
+    coroutine, _ = TOOLS[name]
+    with bind_tool_context(data_dir, []):
+        return await coroutine(**arguments)
+
+
+def create_app(root: Optional[str] = None) -> "FastAPI":
+    """Build the task API application
+
+    The tools do not await between reading and saving a project's tasks, so
+    each call runs atomically on the event loop and calls need no locking.
+
+    Args:
+        root: Directory holding one data directory per project (OMNI_TASK_API_DATA),
+            defaults to tmp/task_api under the server root
+    """
+    from fastapi import FastAPI, HTTPException
+
+    root = os.path.abspath(root or os.environ.get("OMNI_TASK_API_DATA") or os.path.join(SERVER_ROOT, "tmp", "task_api"))
+    app = FastAPI(title="OmniTask Task API")
+    schemas = [describe_tool(tool) for tool in make_local_tools() + make_dependency_tools()]
+
+    def data_dir(project: str) -> str:
+        if not _PROJECT_ID.match(project) or project.strip(".") == "":
+            raise HTTPException(status_code=400, detail=f"Invalid project ID '{project}'")
+        return os.path.join(root, project)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/tools")
+    async def list_tools():
+        return {"tools": schemas}
+
+    @app.post("/projects/{project}/tools/{name}")
+    async def call_tool(project: str, name: str, arguments: Dict[str, Any]):
+        if name not in TOOLS:
+            raise HTTPException(status_code=404, detail=f"Unknown tool: {name}")
+        directory = data_dir(project)
+        try:
+            return {"result": await run_tool(directory, name, arguments)}
+        except Exception as e:
+            # Tool errors are deterministic; a 5xx would be retried by the client
+            raise HTTPException(status_code=422, detail=f"{type(e).__name__}: {e}")
+
+    @app.post("/projects/{project}/calls")
+    async def call_batch(project: str, batch: CallBatch):
+        directory = data_dir(project)
+        results = []
+        for call in batch.calls:
+            if call.name not in TOOLS:
+                results.append({"error": f"Unknown tool: {call.name}"})
+                continue
+            try:
+                results.append({"result": await run_tool(directory, call.name, call.arguments)})
+            except Exception as e:
+                results.append({"error": f"{type(e).__name__}: {e}"})
+        return {"results": results}
+
+    @app.post("/projects/{project}/tasks/get")
+    async def get_tasks(project: str, body: TaskIds):
+        _, collection = await aload_project_store(data_dir(project))
+        tasks = [collection.get(task_id) for task_id in body.ids]
+        return {"tasks": [task_record(task, full=True) if task else None for task in tasks]}
+
+    @app.post("/projects/{project}/tasks/put")
+    async def put_tasks(project: str, body: TaskBatch):
+        store, collection = await aload_project_store(data_dir(project))
+        created = updated = 0
+        try:
+            for entry in body.tasks:
+                if collection.upsert(entry):
+                    created += 1
+                else:
+                    updated += 1
+        except (KeyError, ValueError) as e:
+            # Tasks before the rejected one are kept, as the tools would keep them
+            await store.asave(collection)
+            raise HTTPException(status_code=422, detail=f"Task {created + updated}: {e!r}")
+        await store.asave(collection)
+        return {"created": created, "updated": updated, "total": len(collection)}
+
+    return app
+
+
+def main():
+    """Serve the task API on the host and port of OMNI_TASK_API_URL"""
+    import uvicorn
+
+    from omni_task_agent.config import setup_environment
+
+    setup_environment()
+    url = urlparse(os.environ.get("OMNI_TASK_API_URL") or DEFAULT_API_URL)
+    uvicorn.run(create_app(), host=url.hostname or "localhost", port=url.port or 8000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Task Import and Export
+
+Moves tasks between JSON lines or CSV files and a project's data directory
+without going through the agent. Files are read and written as streams: rows
+are validated against the task shape and applied in chunks of a fixed size, so
+memory does not grow with the size of the file, and each chunk is saved with a
+single atomic write of omni_tasks.json.
+
+JSON lines files hold one task per line in TaskStore form (id, title,
+description, status, priority, dependencies, details, test_strategy, subtasks).
+CSV files hold one row per task or subtask with the same columns, dependencies
+separated by ";" and subtasks pointing at their parent through parent_id.
+"""
+
+import csv
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from omni_task_agent.config import get_env_int
+from omni_task_agent.dependencies import COMPLETED_STATUSES, get_dependency_graph, load_project_tasks
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+
+CSV_COLUMNS = (
+    "id", "title", "description", "status", "priority", "dependencies",
+    "details", "test_strategy", "parent_id",
+)
+
+PRIORITIES = frozenset({"high", "medium", "low"})
+
+STATUSES = frozenset({"pending", "in_progress", "blocked"}) | COMPLETED_STATUSES
+
+_TEXT_FIELDS = ("description", "status", "details", "test_strategy")
+_RECORD_FIELDS = frozenset(("id", "title", "priority", "dependencies", "subtasks") + _TEXT_FIELDS)
+
+
+class TaskValidationError(ValueError):
+    """Raised for a row that is not a valid task
+
+    Attributes:
+        row: One-based line (JSON lines) or row (CSV, after the header) number
+    """
+
+    def __init__(self, row: int, message: str):
+        super().__init__(f"Row {row}: {message}")
+        self.row = row
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """File format from an explicit choice or the file extension, JSON lines by default"""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def validate_task(record: Any, row: int, path: str = "task") -> Dict[str, Any]:
+    """Check a record against the task shape and return it normalized
+
+    IDs and dependencies may be numbers; they are converted to strings.
+    Subtasks are validated the same way.
+
+    Raises:
+        TaskValidationError: If a field is missing, unknown or of the wrong type
+    """
+    if not isinstance(record, dict):
+        raise TaskValidationError(row, f"{path} must be an object")
+    unknown = set(record) - _RECORD_FIELDS
+    if unknown:
+        raise TaskValidationError(row, f"{path} has unknown fields: {', '.join(sorted(unknown))}")
+
+    task_id = record.get("id")
+    if isinstance(task_id, bool) or not isinstance(task_id, (str, int)) or str(task_id).strip() == "":
+        raise TaskValidationError(row, f"{path} needs a string or integer 'id'")
+    title = record.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise TaskValidationError(row, f"{path} {task_id} needs a non-empty 'title'")
+
+    task: Dict[str, Any] = {"id": str(task_id).strip(), "title": title}
+    for field in _TEXT_FIELDS:
+        if field in record:
+            if not isinstance(record[field], str):
+                raise TaskValidationError(row, f"{path} {task_id}: '{field}' must be a string")
+            task[field] = record[field]
+    if "status" in task and task["status"] not in STATUSES:
+        raise TaskValidationError(row, f"{path} {task_id}: 'status' must be one of {', '.join(sorted(STATUSES))}")
+    if "priority" in record:
+        if record["priority"] not in PRIORITIES:
+            raise TaskValidationError(row, f"{path} {task_id}: 'priority' must be one of high, medium, low")
+        task["priority"] = record["priority"]
+    if "dependencies" in record:
+        dependencies = record["dependencies"]
+        if not isinstance(dependencies, list) or any(
+            isinstance(d, bool) or not isinstance(d, (str, int)) for d in dependencies
+        ):
+            raise TaskValidationError(row, f"{path} {task_id}: 'dependencies' must be a list of task IDs")
+        task["dependencies"] = [str(d) for d in dependencies]
+    if "subtasks" in record:
+        if not isinstance(record["subtasks"], list):
+            raise TaskValidationError(row, f"{path} {task_id}: 'subtasks' must be a list")
+        task["subtasks"] = [
+            validate_task(subtask, row, f"subtask {index} of {task_id}")
+            for index, subtask in enumerate(record["subtasks"])
+        ]
+    return task
+
+
+def _walk_records(task: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield task
+    for subtask in task.get("subtasks", ()):
+        yield from _walk_records(subtask)
+
+
+def _check_applicable(task: Dict[str, Any], row: int, graph) -> None:
+    """Check that a validated task can be upserted as a whole
+
+    Upserting changes fields one at a time, so a row rejected halfway would
+    leave part of it applied; everything that can reject it is checked first.
+
+    Raises:
+        TaskValidationError: If the row repeats an ID or its dependencies would
+            close a cycle
+    """
+    records = list(_walk_records(task))
+    ids = [record["id"] for record in records]
+    if len(set(ids)) != len(ids):
+        raise TaskValidationError(row, f"task {task['id']} repeats a task ID among its subtasks")
+    try:
+        graph.check_dependencies({
+            record["id"]: record["dependencies"] for record in records if "dependencies" in record
+        })
+    except ValueError as e:
+        raise TaskValidationError(row, str(e))
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Yield (row, record, parent_id) for every non-empty line
+
+    A line that is not JSON yields a TaskValidationError as its record, so the
+    caller can skip it and read on.
+    """
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            record = TaskValidationError(number, f"invalid JSON ({e.msg})")
+        yield number, record, None
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Yield (row, record, parent_id) for every CSV row; empty cells are left out
+
+    Raises:
+        TaskValidationError: If the header lacks id or title
+    """
+    reader = csv.DictReader(lines)
+    missing = {"id", "title"} - set(reader.fieldnames or ())
+    if missing:
+        raise TaskValidationError(0, f"CSV header lacks {', '.join(sorted(missing))}")
+    for number, row in enumerate(reader, start=1):
+        if None in row:
+            yield number, TaskValidationError(number, "more cells than header columns"), None
+            continue
+        record = {key: value for key, value in row.items() if value not in (None, "")}
+        parent_id = record.pop("parent_id", None)
+        if "dependencies" in record:
+            record["dependencies"] = [d.strip() for d in record["dependencies"].split(";") if d.strip()]
+        yield number, record, parent_id
+
+
+def _chunks(rows: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _summary(started: float, **counts: Any) -> Dict[str, Any]:
+    seconds = time.perf_counter() - started
+    return {
+        **counts,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(counts["rows"] / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def import_tasks(
+    source: TextIO,
+    data_dir: str,
+    fmt: str = "jsonl",
+    chunk_size: Optional[int] = None,
+    strict: bool = False,
+    max_errors: int = 20,
+) -> Dict[str, Any]:
+    """Stream tasks from a file into a project's TaskStore
+
+    Existing tasks with the same ID are updated in place. Each chunk of rows is
+    applied and then saved with one write. Dependencies that would create a
+    cycle reject their row, which then leaves the project unchanged.
+
+    Args:
+        source: Open JSON lines or CSV text stream
+        data_dir: Project data directory
+        fmt: "jsonl" or "csv"
+        chunk_size: Rows applied per write (TASK_IO_CHUNK_SIZE)
+        strict: Stop at the first invalid row instead of skipping it; the rows
+            before it are kept
+        max_errors: Error messages kept in the summary
+
+    Returns:
+        Summary with rows read, tasks created and updated, rejected rows, the
+        first errors, wall time and rows per second
+
+    Raises:
+        TaskValidationError: In strict mode, or when a CSV header lacks id or title
+        ValueError: For an unknown format
+    """
+    # Imported here because the local backend module pulls in the tool context
+    from omni_task_agent.local_backend import load_project_store
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+    chunk_size = max(1, chunk_size or get_env_int("TASK_IO_CHUNK_SIZE", 1000))
+    rows = read_csv(source) if fmt == "csv" else read_jsonl(source)
+    store, collection = load_project_store(data_dir)
+    graph = get_dependency_graph(data_dir)
+    counts = {"rows": 0, "created": 0, "updated": 0, "rejected": 0, "chunks": 0}
+    errors: List[str] = []
+    started = time.perf_counter()
+
+    def reject(error: ValueError):
+        counts["rejected"] += 1
+        if len(errors) < max_errors:
+            errors.append(str(error))
+
+    for chunk in _chunks(rows, chunk_size):
+        for number, record, parent_id in chunk:
+            counts["rows"] += 1
+            try:
+                if isinstance(record, TaskValidationError):
+                    raise record
+                task = validate_task(record, number)
+                if parent_id is not None and parent_id not in collection:
+                    raise TaskValidationError(number, f"unknown parent_id '{parent_id}'")
+                _check_applicable(task, number, graph)
+                created = collection.upsert(task, parent_id)
+            except ValueError as e:
+                error = e if isinstance(e, TaskValidationError) else TaskValidationError(number, str(e))
+                if strict:
+                    # Keep the rows of this chunk applied before the error
+                    store.save(collection)
+                    raise error
+                reject(error)
+                continue
+            counts["created" if created else "updated"] += 1
+        store.save(collection)
+        counts["chunks"] += 1
+
+    summary = _summary(started, total=len(collection), errors=errors, **counts)
+    logger.info(f"Imported {counts['rows']} rows into {data_dir} at {summary['rows_per_second']} rows/s")
+    return summary
+
+
+def _csv_rows(tasks: Iterable[Any], collection) -> Iterator[Dict[str, Any]]:
+    for task in tasks:
+        parent = collection.parent_of(task.id)
+        yield {
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "priority": task.priority,
+            "dependencies": ";".join(task.dependencies),
+            "details": task.details,
+            "test_strategy": task.test_strategy,
+            "parent_id": parent.id if parent else "",
+        }
+
+
+def export_tasks(
+    output: TextIO,
+    data_dir: str,
+    fmt: str = "jsonl",
+    status: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Stream a project's tasks to a file
+
+    Reads omni_tasks.json, or shrimp-task-manager's tasks.json when the project
+    has no TaskStore file. JSON lines get one top-level task per line with its
+    subtasks nested; CSV gets one row per task and subtask, parents first.
+
+    Args:
+        output: Text stream receiving the file
+        data_dir: Project data directory
+        fmt: "jsonl" or "csv"
+        status: Only export tasks with this status
+        chunk_size: Rows written between flushes (TASK_IO_CHUNK_SIZE)
+
+    Returns:
+        Summary with rows written, wall time and rows per second
+    """
+    chunk_size = max(1, chunk_size or get_env_int("TASK_IO_CHUNK_SIZE", 1000))
+    collection, _ = load_project_tasks(data_dir)
+    started = time.perf_counter()
+    rows = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        tasks = collection.filter(status=status)
+        for chunk in _chunks(_csv_rows(tasks, collection), chunk_size):
+            writer.writerows(chunk)
+            output.flush()
+            rows += len(chunk)
+    else:
+        tasks = collection.filter(status=status, top_level=True)
+        for chunk in _chunks(iter(tasks), chunk_size):
+            output.write("".join(json.dumps(task.model_dump(), ensure_ascii=False) + "\n" for task in chunk))
+            output.flush()
+            rows += len(chunk)
+    return _summary(started, rows=rows)
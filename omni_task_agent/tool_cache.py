@@ -0,0 +1,174 @@
+"""
+Tool Result Cache
+
+Memoizes results of read-only task tools per project data directory and drops a
+project's entries whenever a tool that may change its tasks runs.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.dependencies import DEPENDENCY_TOOLS
+from omni_task_agent.tools import ToolContext, ToolHandler, add_tool_middleware
+from omni_task_agent.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+# shrimp-task-manager tools that only read task state
+READ_ONLY_TOOLS = frozenset({"list_tasks", "query_task", "get_task_detail"})
+
+# Tools that only build prompts and neither read nor write task state
+STATELESS_TOOLS = frozenset({"analyze_task", "reflect_task", "process_thought", "research_mode"})
+
+# Any other tool (split_tasks, update_task, delete_task, complete_task, ...) is
+# treated as mutating and invalidates the project's cached results.
+
+CacheKey = Tuple[str, str, str]
+
+
+class ToolResultCache:
+    """TTL and size-bounded LRU cache of read-only tool results
+
+    Installed as a tool middleware, so it applies to agent and direct tool calls alike.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            ttl: Seconds a cached result stays valid (TOOL_CACHE_TTL)
+            max_entries: Maximum cached results across all projects (TOOL_CACHE_MAX_ENTRIES)
+        """
+        self.ttl = ttl if ttl is not None else get_env_float("TOOL_CACHE_TTL", 30.0)
+        self.max_entries = max_entries if max_entries is not None else get_env_int("TOOL_CACHE_MAX_ENTRIES", 256)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._project_keys: Dict[str, Set[CacheKey]] = {}
+        # Bumped before and after every mutating call, so reads overlapping a
+        # mutation are never stored. Kept only while a project has calls in
+        # flight, since no read can compare against it afterwards.
+        self._generations: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(data_dir: str, name: str, arguments: Dict[str, Any]) -> CacheKey:
+        return data_dir, name, json.dumps(arguments, sort_keys=True, default=str)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: CacheKey, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self._project_keys.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        keys = self._project_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._project_keys[key[0]]
+
+    def invalidate(self, data_dir: Optional[str] = None, count: bool = True):
+        """Drop cached results for one project, or for all projects
+
+        Args:
+            data_dir: Project data directory, defaults to every project
+            count: Whether to count this call in the invalidation statistics
+        """
+        if data_dir is None:
+            self._entries.clear()
+            self._project_keys.clear()
+        else:
+            for key in list(self._project_keys.get(data_dir, ())):
+                self._remove(key)
+        if count:
+            self.stats["invalidations"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit ratio and current size"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    async def __call__(self, context: ToolContext, name: str, arguments: Dict[str, Any], call_next: ToolHandler) -> Any:
+        data_dir = context.data_dir or ""
+
+        # Local dependency tools read the task file directly and are cheap enough uncached
+        if name in STATELESS_TOOLS or name in DEPENDENCY_TOOLS:
+            return await call_next(name, arguments)
+
+        self._in_flight[data_dir] = self._in_flight.get(data_dir, 0) + 1
+        try:
+            return await self._call(data_dir, name, arguments, call_next)
+        finally:
+            self._in_flight[data_dir] -= 1
+            if not self._in_flight[data_dir]:
+                del self._in_flight[data_dir]
+                self._generations.pop(data_dir, None)
+
+    async def _call(self, data_dir: str, name: str, arguments: Dict[str, Any], call_next: ToolHandler) -> Any:
+        if name in READ_ONLY_TOOLS:
+            key = self.make_key(data_dir, name, arguments)
+            found, value = self.get(key)
+            current_span().set_attribute("cache_hit", found)
+            if found:
+                self.stats["hits"] += 1
+                return value
+            self.stats["misses"] += 1
+            generation = self._generations.get(data_dir, 0)
+            value = await call_next(name, arguments)
+            if self._generations.get(data_dir, 0) == generation:
+                self.put(key, value)
+            return value
+
+        # Mutating tool: invalidate before and after so no stale read survives
+        self._generations[data_dir] = self._generations.get(data_dir, 0) + 1
+        self.invalidate(data_dir, count=False)
+        try:
+            return await call_next(name, arguments)
+        finally:
+            self._generations[data_dir] += 1
+            self.invalidate(data_dir)
+
+
+_tool_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache"""
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ToolResultCache()
+    return _tool_cache
+
+
+def install_tool_cache():
+    """Register the tool result cache as a tool middleware unless TOOL_CACHE_ENABLED=false
+
+    Safe to call repeatedly.
+    """
+    if get_env_bool("TOOL_CACHE_ENABLED", True):
+        add_tool_middleware(get_tool_cache())
@@ -0,0 +1,293 @@
+"""
+Tool Router
+
+Binds only the tools relevant to the current request to each LLM call. Every
+tool schema sent with a call costs prompt tokens, and a simple request such as
+"list my pending tasks" needs one or two of the twenty task tools. Tools are
+scored against the latest user message with a keyword index built once per
+agent graph; when nothing scores well the full tool set is bound.
+"""
+
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Request words pointing at a tool beyond the words of its name and description
+TOOL_KEYWORDS = {
+    "plan_task": ("plan", "create", "new", "add", "build", "implement", "feature", "goal", "project"),
+    "analyze_task": ("analyze", "analyse", "analysis", "complexity", "feasibility", "assess"),
+    "reflect_task": ("reflect", "review", "critique", "improve"),
+    "split_tasks": ("split", "decompose", "break", "breakdown", "subtask"),
+    "list_tasks": ("list", "show", "all", "overview", "status", "pending", "progress", "what"),
+    "query_task": ("find", "search", "query", "look", "lookup", "which", "named", "called"),
+    "get_task_detail": ("detail", "describe", "info", "information", "about", "explain"),
+    "update_task": ("update", "change", "edit", "modify", "rename", "set", "priority", "dependency"),
+    "execute_task": ("execute", "start", "run", "work", "begin", "implement"),
+    "verify_task": ("verify", "check", "test", "validate", "score"),
+    "complete_task": ("complete", "finish", "finished", "done", "mark", "close"),
+    "delete_task": ("delete", "remove", "drop"),
+    "clear_all_tasks": ("clear", "reset", "wipe", "everything"),
+    "init_project_rules": ("rule", "rules", "standard", "convention", "guideline"),
+    "research_mode": ("research", "investigate", "explore"),
+    "process_thought": ("think", "thought", "reason", "reasoning"),
+    "ready_tasks": ("next", "ready", "unblocked", "available", "now"),
+    "blocked_tasks": ("blocked", "blocking", "waiting", "stuck", "blocker"),
+    "critical_path": ("critical", "path", "longest", "schedule", "timeline", "order"),
+    "dependency_cycles": ("cycle", "circular", "loop", "deadlock"),
+    "check_dependency": ("depend", "dependency", "prerequisite"),
+}
+
+# Tools shrimp-task-manager's answers ask the model to call next in the same turn
+COMPANION_TOOLS = {
+    "plan_task": ("analyze_task", "reflect_task", "split_tasks"),
+    "analyze_task": ("reflect_task", "split_tasks"),
+    "reflect_task": ("split_tasks",),
+    "execute_task": ("verify_task", "complete_task", "get_task_detail"),
+    "verify_task": ("complete_task",),
+    "update_task": ("get_task_detail", "check_dependency"),
+}
+
+# Bound whenever routing applies: most requests refer to tasks by name and need their IDs
+ALWAYS_TOOLS = ("list_tasks", "query_task")
+
+_STOPWORDS = frozenset((
+    "the a an and or of to for in on with is are be by it this that as at from can use "
+    "you your my me i we our please will would should when if all any not no but into "
+    "which their its tool tools task tasks"
+).split())
+
+# Rough characters per prompt token of JSON schemas
+CHARS_PER_TOKEN = 4
+
+
+def _terms(text: str) -> List[str]:
+    """Lowercase words with plurals folded, stopwords dropped"""
+    words = []
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in _STOPWORDS and len(word) > 1:
+            words.append(word)
+    return words
+
+
+def schema_tokens(tool: "BaseTool") -> int:
+    """Approximate prompt tokens of a tool's function schema"""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    return len(json.dumps(convert_to_openai_tool(tool))) // CHARS_PER_TOKEN
+
+
+@dataclass(frozen=True)
+class ToolEntry:
+    """Precomputed routing data of one tool"""
+
+    name: str
+    name_terms: FrozenSet[str]
+    terms: FrozenSet[str]
+    tokens: int
+
+
+class ToolIndex:
+    """Keyword index and schema token counts of a tool set, built once per graph
+
+    Args:
+        tools: Tools bound to the agent
+    """
+
+    def __init__(self, tools: Sequence["BaseTool"]):
+        self.names = [tool.name for tool in tools]
+        self.entries: Dict[str, ToolEntry] = {}
+        for tool in tools:
+            name_terms = frozenset(_terms(tool.name.replace("_", " ")) + _terms(" ".join(TOOL_KEYWORDS.get(tool.name, ()))))
+            self.entries[tool.name] = ToolEntry(
+                name=tool.name,
+                name_terms=name_terms,
+                terms=name_terms | frozenset(_terms(tool.description or "")),
+                tokens=schema_tokens(tool),
+            )
+        self.total_tokens = sum(entry.tokens for entry in self.entries.values())
+        document_frequency: Dict[str, int] = {}
+        for entry in self.entries.values():
+            for term in entry.terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        count = max(len(self.entries), 1)
+        self.idf = {term: math.log(1 + count / frequency) for term, frequency in document_frequency.items()}
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Relevance of every tool to a request; name and keyword matches count double"""
+        words = set(_terms(text))
+        scores = {}
+        for entry in self.entries.values():
+            score = sum(self.idf[word] * (2 if word in entry.name_terms else 1) for word in words & entry.terms)
+            if score > 0:
+                scores[entry.name] = score
+        return scores
+
+    def tokens(self, names: Iterable[str]) -> int:
+        return sum(self.entries[name].tokens for name in names)
+
+
+class ToolRouter:
+    """Chooses the tools to bind for each LLM call
+
+    Args:
+        max_tools: Most tools chosen by score, before companions (TOOL_ROUTER_MAX_TOOLS)
+        min_score: Best score below which the full tool set is bound (TOOL_ROUTER_MIN_SCORE)
+    """
+
+    def __init__(self, max_tools: Optional[int] = None, min_score: Optional[float] = None):
+        self.max_tools = max_tools if max_tools is not None else get_env_int("TOOL_ROUTER_MAX_TOOLS", 5)
+        self.min_score = min_score if min_score is not None else get_env_float("TOOL_ROUTER_MIN_SCORE", 1.5)
+        self.stats = {"calls": 0, "fallbacks": 0, "tools_bound": 0, "tokens_total": 0, "tokens_saved": 0}
+
+    def select(self, index: ToolIndex, messages: Sequence["BaseMessage"]) -> Tuple[List[str], bool]:
+        """Choose the tools for a call
+
+        Args:
+            index: Index of the agent's tools
+            messages: Messages sent to the model
+
+        Returns:
+            Names of the chosen tools in their original order, and whether the
+            router fell back to the full set
+        """
+        request, mentioned = _current_request(messages, index.names)
+        scores = index.score(request)
+        best = max(scores.values(), default=0.0)
+        if best < self.min_score:
+            return list(index.names), True
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        chosen = set(name for name in ranked[:self.max_tools] if scores[name] >= best / 2)
+        for name in list(chosen):
+            chosen.update(COMPANION_TOOLS.get(name, ()))
+        chosen.update(ALWAYS_TOOLS)
+        # Keep tools already in use this turn, e.g. ones a shrimp answer asked for
+        chosen.update(mentioned)
+        return [name for name in index.names if name in chosen], False
+
+    def record(self, index: ToolIndex, names: Sequence[str], fallback: bool) -> int:
+        """Count a routed call and return the prompt tokens it saved"""
+        saved = index.total_tokens - index.tokens(names)
+        self.stats["calls"] += 1
+        self.stats["fallbacks"] += int(fallback)
+        self.stats["tools_bound"] += len(names)
+        self.stats["tokens_total"] += index.total_tokens
+        self.stats["tokens_saved"] += saved
+        return saved
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus the average share of schema tokens saved per call"""
+        total = self.stats["tokens_total"]
+        return {**self.stats, "saved_ratio": self.stats["tokens_saved"] / total if total else 0.0}
+
+
+def _current_request(messages: Sequence["BaseMessage"], names: Sequence[str]) -> Tuple[str, List[str]]:
+    """Text of the latest user message and tool names used or named after it"""
+    request_at = -1
+    for position, message in enumerate(messages):
+        if getattr(message, "type", None) == "human":
+            request_at = position
+    if request_at < 0:
+        return "", []
+    content = messages[request_at].content
+    request = content if isinstance(content, str) else json.dumps(content, default=str)
+
+    later = []
+    for message in messages[request_at + 1:]:
+        later.extend(call.get("name", "") for call in getattr(message, "tool_calls", None) or [])
+        later.append(message.content if isinstance(message.content, str) else json.dumps(message.content, default=str))
+    tail = "\n".join(later)
+    return request, [name for name in names if name in tail]
+
+
+def _make_routed_binding():
+    """Define the Runnable class lazily so importing this module stays light"""
+    from langchain_core.runnables import Runnable
+
+    class RoutedToolBinding(Runnable):
+        """Model runnable that binds the routed tool subset on every call"""
+
+        def __init__(self, model, router: ToolRouter, tools: Sequence["BaseTool"], bind_kwargs: Dict[str, Any]):
+            self.model = model
+            self.router = router
+            self.tools = {tool.name: tool for tool in tools}
+            self.index = ToolIndex(tools)
+            self.bind_kwargs = bind_kwargs
+            self._bound: Dict[Tuple[str, ...], Any] = {}
+
+        def _route(self, input: Any):
+            messages = input.to_messages() if hasattr(input, "to_messages") else input
+            with get_tracer().span("tool.route") as span:
+                names, fallback = self.router.select(self.index, messages)
+                saved = self.router.record(self.index, names, fallback)
+                span.set_attributes(tools=len(names), fallback=fallback, tokens_saved=saved)
+            key = tuple(names)
+            bound = self._bound.get(key)
+            if bound is None:
+                bound = self._bound[key] = self.model.bind_tools([self.tools[name] for name in names], **self.bind_kwargs)
+            return bound
+
+        def invoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            return self._route(input).invoke(input, config, **kwargs)
+
+        async def ainvoke(self, input: Any, config=None, **kwargs: Any) -> Any:
+            return await self._route(input).ainvoke(input, config, **kwargs)
+
+    return RoutedToolBinding
+
+
+class RoutedChatModel:
+    """Chat model wrapper whose bind_tools routes tools per call
+
+    create_react_agent calls ``bind_tools`` with every tool once, at graph build
+    time; the returned runnable binds the routed subset of them to the wrapped
+    model at each call. The graph's tool node still holds every tool.
+
+    Usage:
+    ```python
+    agent = create_react_agent(model=RoutedChatModel(llm), tools=tools)
+    ```
+    """
+
+    _binding_class = None
+
+    def __init__(self, model, router: Optional[ToolRouter] = None):
+        self.model = model
+        self.router = router or get_tool_router()
+
+    def bind_tools(self, tools: Sequence["BaseTool"], **kwargs: Any):
+        if RoutedChatModel._binding_class is None:
+            RoutedChatModel._binding_class = _make_routed_binding()
+        return RoutedChatModel._binding_class(self.model, self.router, tools, kwargs)
+
+
+_tool_router: Optional[ToolRouter] = None
+
+
+def get_tool_router() -> ToolRouter:
+    """Return the process-wide tool router"""
+    global _tool_router
+    if _tool_router is None:
+        _tool_router = ToolRouter()
+    return _tool_router
+
+
+def route_tools(model):
+    """Wrap a chat model for tool routing unless TOOL_ROUTER=false"""
+    if get_env_bool("TOOL_ROUTER", True):
+        return RoutedChatModel(model)
+    return model
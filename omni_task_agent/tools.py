@@ -0,0 +1,263 @@
+"""
+Tool Routing
+
+Lets a single compiled agent graph serve many projects. The graph is built with
+routed proxy tools whose calls are dispatched to the tools of the session bound
+to the current request context. Also validates arguments and formats results for
+direct tool calls that bypass the LLM.
+"""
+
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from omni_task_agent.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolContext:
+    """Tools of the backend session serving the current request"""
+
+    data_dir: Optional[str]
+    tools: Dict[str, "BaseTool"] = field(default_factory=dict)
+    # Connection configuration of the session, for middlewares opening sibling sessions
+    server_config: Optional[Dict[str, Any]] = None
+
+
+_tool_context: ContextVar[Optional[ToolContext]] = ContextVar("omni_task_tool_context", default=None)
+
+# A middleware receives (context, tool name, arguments, call_next) and returns the tool result
+ToolHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+ToolMiddleware = Callable[[ToolContext, str, Dict[str, Any], ToolHandler], Awaitable[Any]]
+
+_middlewares: List[ToolMiddleware] = []
+
+
+def add_tool_middleware(middleware: ToolMiddleware):
+    """Register a middleware wrapping every routed and direct tool call
+
+    Middlewares run in registration order, the first registered being outermost.
+    Registering the same middleware twice has no effect.
+    """
+    if middleware not in _middlewares:
+        _middlewares.append(middleware)
+
+
+def remove_tool_middleware(middleware: ToolMiddleware):
+    """Unregister a tool middleware"""
+    if middleware in _middlewares:
+        _middlewares.remove(middleware)
+
+
+def get_tool_context() -> Optional[ToolContext]:
+    """Return the tool context bound to the current request, if any"""
+    return _tool_context.get()
+
+
+@contextmanager
+def bind_tool_context(
+    data_dir: Optional[str],
+    tools: Sequence["BaseTool"],
+    server_config: Optional[Dict[str, Any]] = None,
+):
+    """Bind session tools to the current context
+
+    Args:
+        data_dir: Project data directory the tools operate on
+        tools: Tools loaded from the backend session
+        server_config: Configuration the session was started with
+
+    Yields:
+        The bound ToolContext
+    """
+    context = ToolContext(
+        data_dir=data_dir,
+        tools={tool.name: tool for tool in tools},
+        server_config=server_config,
+    )
+    token = _tool_context.set(context)
+    try:
+        yield context
+    finally:
+        _tool_context.reset(token)
+
+
+async def invoke_tool(name: str, arguments: Dict[str, Any]) -> Any:
+    """Call a tool of the session bound to the current context
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+
+    Returns:
+        Raw tool coroutine result, a (content, artifact) tuple for MCP tools
+    """
+    context = _tool_context.get()
+    if context is None:
+        raise RuntimeError(f"Tool '{name}' called outside of a make_graph context")
+
+    async def call_tool(tool_name: str, tool_arguments: Dict[str, Any]) -> Any:
+        tool = context.tools.get(tool_name)
+        if tool is None:
+            from langchain_core.tools import ToolException
+            raise ToolException(f"Unknown tool: {tool_name}")
+        return await tool.coroutine(**tool_arguments)
+
+    handler = call_tool
+    for middleware in reversed(_middlewares):
+        handler = _wrap(middleware, context, handler)
+    with get_tracer().span("tool.call", tool=name):
+        return await handler(name, arguments)
+
+
+def _wrap(middleware: ToolMiddleware, context: ToolContext, call_next: ToolHandler) -> ToolHandler:
+    async def handler(name: str, arguments: Dict[str, Any]) -> Any:
+        return await middleware(context, name, arguments, call_next)
+    return handler
+
+
+def make_routed_tool(tool: "BaseTool") -> "BaseTool":
+    """Create a proxy with the same schema that dispatches through invoke_tool
+
+    Args:
+        tool: Template tool providing name, description and argument schema
+
+    Returns:
+        Routed StructuredTool
+    """
+    from langchain_core.tools import StructuredTool
+
+    name = tool.name
+
+    async def call_tool(**arguments: Any) -> Any:
+        return await invoke_tool(name, arguments)
+
+    return StructuredTool(
+        name=name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        coroutine=call_tool,
+        response_format=tool.response_format,
+    )
+
+
+def make_routed_tools(tools: Sequence["BaseTool"]) -> List["BaseTool"]:
+    """Create routed proxies for a list of tools"""
+    return [make_routed_tool(tool) for tool in tools]
+
+
+class ToolArgumentError(ValueError):
+    """Raised when a direct tool call names an unknown tool or has invalid arguments"""
+
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+
+def get_input_schema(tool: "BaseTool") -> Dict[str, Any]:
+    """Return the JSON schema of a tool's arguments
+
+    MCP tools carry a JSON schema dict, native tools a pydantic model.
+    """
+    schema = tool.args_schema
+    if isinstance(schema, dict):
+        return schema
+    if isinstance(schema, type) and hasattr(schema, "model_json_schema"):
+        # pydantic model
+        return schema.model_json_schema()
+    return {"type": "object", "properties": tool.args}
+
+
+def describe_tool(tool: "BaseTool") -> Dict[str, Any]:
+    """Summarize a tool for listings: name, description and input schema"""
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "input_schema": get_input_schema(tool),
+    }
+
+
+def _check_type(value: Any, expected: Any) -> bool:
+    types = expected if isinstance(expected, list) else [expected]
+    for name in types:
+        python_type = _JSON_TYPES.get(name)
+        if python_type is None:
+            return True
+        # bool is a subclass of int but is not a JSON number
+        if isinstance(value, bool) and name in ("integer", "number"):
+            continue
+        if isinstance(value, python_type):
+            return True
+    return False
+
+
+def validate_tool_arguments(tool: "BaseTool", arguments: Dict[str, Any]):
+    """Validate arguments against the tool's input schema
+
+    Checks required properties, unknown properties (when additionalProperties is
+    false), top-level JSON types and enum values. Nested values are left to the tool.
+
+    Args:
+        tool: Tool to validate against
+        arguments: Arguments of the call
+
+    Raises:
+        ToolArgumentError: Describing every problem found
+    """
+    if not isinstance(arguments, dict):
+        raise ToolArgumentError(f"Arguments for '{tool.name}' must be an object")
+
+    schema = get_input_schema(tool)
+    properties = schema.get("properties", {})
+    errors = []
+
+    for name in schema.get("required", []):
+        if name not in arguments:
+            errors.append(f"missing required argument '{name}'")
+
+    for name, value in arguments.items():
+        spec = properties.get(name)
+        if spec is None:
+            if schema.get("additionalProperties") is False:
+                errors.append(f"unknown argument '{name}'")
+            continue
+        if "type" in spec and not _check_type(value, spec["type"]):
+            errors.append(f"argument '{name}' must be of type {spec['type']}")
+        if "enum" in spec and value not in spec["enum"]:
+            errors.append(f"argument '{name}' must be one of {spec['enum']}")
+
+    if errors:
+        raise ToolArgumentError(f"Invalid arguments for '{tool.name}': " + "; ".join(errors))
+
+
+def format_tool_result(result: Any) -> str:
+    """Convert a raw tool result into text
+
+    Args:
+        result: Value returned by invoke_tool, a (content, artifact) tuple for MCP tools
+
+    Returns:
+        Tool output as a string
+    """
+    if isinstance(result, tuple) and len(result) == 2:
+        result = result[0]
+    if isinstance(result, list):
+        return "\n".join(item if isinstance(item, str) else json.dumps(item, default=str) for item in result)
+    if isinstance(result, str):
+        return result
+    return json.dumps(result, default=str)
@@ -0,0 +1,414 @@
+"""
+Tracing
+
+Named timing spans for each phase of a request (session spawn and MCP handshake,
+tool discovery, graph build, LLM calls, tool calls) with token counts per LLM
+call. Spans are handed to pluggable exporters: in memory, a JSON lines file or
+an OpenTelemetry tracer. Tracing is off, and nearly free, until an exporter is
+configured through TRACE_EXPORTERS or Tracer.add_exporter.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from omni_task_agent.config import get_env_int
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A timed operation with attributes, linked to its parent by trace and span IDs"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_time", "duration",
+        "attributes", "status", "error", "_tracer", "_started",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._tracer = tracer
+        self._started = time.perf_counter()
+
+    @property
+    def end_time(self) -> Optional[float]:
+        return self.start_time + self.duration if self.duration is not None else None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        """Stop the clock and hand the span to the exporters; later calls are ignored"""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            self._tracer._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled"""
+
+    __slots__ = ()
+    name = trace_id = span_id = parent_id = error = None
+    status = "ok"
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("omni_task_current_span", default=None)
+
+
+def current_span():
+    """Return the span active in the current context, or a no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+class SpanExporter:
+    """Receives finished spans; on_start is optional and called when a span opens"""
+
+    def on_start(self, span: Span):
+        pass
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps the most recent finished spans for inspection and summaries"""
+
+    def __init__(self, max_spans: Optional[int] = None):
+        """
+        Args:
+            max_spans: Spans retained before the oldest are dropped (TRACE_MEMORY_MAX_SPANS)
+        """
+        self.max_spans = max_spans or get_env_int("TRACE_MEMORY_MAX_SPANS", 1000)
+        self._spans: deque = deque(maxlen=self.max_spans)
+
+    def export(self, span: Span):
+        self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+    def trace(self, trace_id: str) -> List[Span]:
+        """Spans of one trace in start order"""
+        return sorted((s for s in self._spans if s.trace_id == trace_id), key=lambda s: s.start_time)
+
+    def summary(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Count, total, average and maximum duration per span name
+
+        Args:
+            trace_id: Only summarize this trace, defaults to every retained span
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in self._spans:
+            if trace_id is not None and span.trace_id != trace_id:
+                continue
+            entry = summary.setdefault(span.name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["total_seconds"] += span.duration
+            entry["max_seconds"] = max(entry["max_seconds"], span.duration)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                if isinstance(span.attributes.get(key), int):
+                    entry[key] = entry.get(key, 0) + span.attributes[key]
+        for entry in summary.values():
+            entry["avg_seconds"] = entry["total_seconds"] / entry["count"]
+        return summary
+
+
+class JsonLinesExporter(SpanExporter):
+    """Appends each finished span as one JSON object per line"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Output file (TRACE_FILE), defaults to omni_task_traces.jsonl
+        """
+        self.path = path or os.environ.get("TRACE_FILE", "omni_task_traces.jsonl")
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """Mirrors spans onto an OpenTelemetry tracer, keeping the parent/child structure
+
+    Requires opentelemetry-api; spans go wherever the application's
+    TracerProvider sends them (e.g. an OTLP exporter configured through the SDK).
+    """
+
+    def __init__(self, tracer_provider: Any = None):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetry export requires `pip install opentelemetry-api`") from e
+        self._trace = trace
+        self._tracer = trace.get_tracer("omni_task_agent", tracer_provider=tracer_provider)
+        self._open: Dict[str, Any] = {}
+
+    def on_start(self, span: Span):
+        parent = self._open.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._open[span.span_id] = self._tracer.start_span(
+            span.name,
+            context=context,
+            start_time=int(span.start_time * 1e9),
+        )
+
+    def export(self, span: Span):
+        otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        if span.status == "error":
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+
+EXPORTERS = {
+    "memory": InMemoryExporter,
+    "jsonl": JsonLinesExporter,
+    "otel": OpenTelemetryExporter,
+}
+
+
+class Tracer:
+    """Creates spans and dispatches finished ones to the registered exporters
+
+    Usage:
+    ```python
+    tracer = get_tracer()
+    with tracer.span("graph.build", model="gpt-4o") as span:
+        ...
+        span.set_attribute("cache_hit", True)
+    ```
+    """
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        self.exporters: List[SpanExporter] = list(exporters or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: SpanExporter):
+        if exporter not in self.exporters:
+            self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter: SpanExporter):
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+
+    def get_exporter(self, exporter_type: type) -> Optional[SpanExporter]:
+        """Return the first registered exporter of the given type"""
+        return next((e for e in self.exporters if isinstance(e, exporter_type)), None)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any):
+        """Open a span that the caller ends explicitly
+
+        Args:
+            name: Span name, e.g. "tool.call"
+            parent: Parent span, defaults to the span active in the current context
+            **attributes: Initial span attributes
+
+        Returns:
+            The new span, or a no-op span while tracing is disabled
+        """
+        if not self.exporters:
+            return NOOP_SPAN
+        span = Span(self, name, parent if parent is not None else _current_span.get(), attributes)
+        for exporter in self.exporters:
+            try:
+                exporter.on_start(span)
+            except Exception as e:
+                logger.warning(f"Trace exporter {type(exporter).__name__} failed: {str(e)}")
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Time a block as a child of the current span
+
+        Errors raised inside the block are recorded on the span and re-raised.
+        """
+        span = self.start_span(name, **attributes)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Trace exporter {type(exporter).__name__} failed: {str(e)}")
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def exporters_from_env() -> List[SpanExporter]:
+    """Build exporters named in TRACE_EXPORTERS, e.g. "memory,jsonl" """
+    exporters = []
+    for name in filter(None, (n.strip().lower() for n in os.environ.get("TRACE_EXPORTERS", "").split(","))):
+        factory = EXPORTERS.get(name)
+        if factory is None:
+            logger.warning(f"Unknown trace exporter '{name}', expected one of {sorted(EXPORTERS)}")
+            continue
+        try:
+            exporters.append(factory())
+        except ImportError as e:
+            logger.warning(str(e))
+    return exporters
+
+
+def make_llm_callback(tracer: Optional[Tracer] = None):
+    """Create a LangChain callback handler recording an "llm.call" span per model call
+
+    Spans carry the model name, token usage reported by the provider and the
+    number of messages sent.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LLMTracingCallback(BaseCallbackHandler):
+        run_inline = True
+
+        def __init__(self):
+            self._spans: Dict[Any, Any] = {}
+
+        def _tracer(self) -> Tracer:
+            return tracer if tracer is not None else get_tracer()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            active = self._tracer()
+            if not active.enabled:
+                return
+            params = kwargs.get("invocation_params") or {}
+            metadata = kwargs.get("metadata") or {}
+            self._spans[run_id] = active.start_span(
+                "llm.call",
+                model=params.get("model") or params.get("model_name") or metadata.get("ls_model_name"),
+                messages=sum(len(batch) for batch in messages),
+            )
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            span = self._spans.pop(run_id, None)
+            if span is None:
+                return
+            span.set_attributes(**_token_usage(response))
+            span.end()
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            span = self._spans.pop(run_id, None)
+            if span is None:
+                return
+            span.record_error(error)
+            span.end()
+
+    return LLMTracingCallback()
+
+
+def _token_usage(response) -> Dict[str, int]:
+    """Extract prompt/completion token counts from an LLMResult"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0),
+                }
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return {
+        key: usage[key]
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+        if isinstance(usage.get(key), int)
+    }
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from TRACE_EXPORTERS on first use"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(exporters_from_env())
+    return _tracer
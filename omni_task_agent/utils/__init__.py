@@ -0,0 +1,5 @@
+"""
+Utilities
+
+Helpers shared across OmniTaskAgent modules.
+"""
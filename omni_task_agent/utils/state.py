@@ -0,0 +1,486 @@
+"""
+Task State
+
+In-process task model: compact records, a collection indexed by ID, status and
+dependency edges (tasks and subtasks alike), and a store persisting collections
+atomically to the project data directory.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TASKS_FILE = "omni_tasks.json"
+
+TaskLike = Union["Task", Dict[str, Any]]
+
+
+class Task:
+    """A task or subtask
+
+    Changing ``status`` or ``dependencies`` on a task that belongs to a
+    TaskCollection keeps the collection's indexes up to date.
+    """
+
+    __slots__ = (
+        "id", "title", "description", "_status", "priority", "_dependencies",
+        "details", "test_strategy", "subtasks", "_collection",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        description: str = "",
+        status: str = "pending",
+        priority: str = "medium",
+        dependencies: Iterable[str] = (),
+        details: str = "",
+        test_strategy: str = "",
+        subtasks: Iterable[TaskLike] = (),
+    ):
+        self.id = str(id)
+        self.title = title
+        self.description = description
+        self._status = status
+        self.priority = priority
+        self._dependencies: Tuple[str, ...] = tuple(str(d) for d in dependencies)
+        self.details = details
+        self.test_strategy = test_strategy
+        self.subtasks: List[Task] = [Task.from_dict(s) if isinstance(s, dict) else s for s in subtasks]
+        self._collection: Optional["TaskCollection"] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """Build a task from its dumped form, ignoring unknown keys"""
+        return cls(**{key: data[key] for key in _FIELDS if key in data})
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        old, self._status = self._status, value
+        if self._collection is not None and old != value:
+            self._collection._reindex_status(self, old)
+
+    @property
+    def dependencies(self) -> Tuple[str, ...]:
+        return self._dependencies
+
+    @dependencies.setter
+    def dependencies(self, value: Iterable[str]):
+        new = tuple(str(d) for d in value)
+        if self._collection is not None and new != self._dependencies:
+            # Listeners may veto the change, e.g. when it would create a cycle
+            self._collection._notify("validate_dependencies", self, new)
+        old, self._dependencies = self._dependencies, new
+        if self._collection is not None and old != new:
+            self._collection._reindex_dependencies(self, old)
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Plain dict form, nesting subtasks"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self._status,
+            "priority": self.priority,
+            "dependencies": list(self._dependencies),
+            "details": self.details,
+            "test_strategy": self.test_strategy,
+            "subtasks": [subtask.model_dump() for subtask in self.subtasks],
+        }
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id!r}, title={self.title!r}, status={self._status!r})"
+
+
+_FIELDS = (
+    "id", "title", "description", "status", "priority", "dependencies",
+    "details", "test_strategy", "subtasks",
+)
+
+
+class TaskCollection:
+    """Tasks with ID, status and dependency indexes
+
+    ``tasks`` holds the top-level tasks; lookups, filters and dependency queries
+    cover subtasks too, so IDs must be unique across both.
+
+    Listeners registered with add_listener are told about changes through
+    optional methods: on_task_added(task), on_task_removed(task),
+    on_status_changed(task, old), on_dependencies_changed(task, old), and may
+    reject changes by raising from validate_add(tasks) or
+    validate_dependencies(task, new).
+
+    Usage:
+    ```python
+    collection = TaskCollection(tasks=[Task(id="1", title="Write docs")])
+    collection.get("1").status = "done"
+    collection.by_status("done")
+    ```
+    """
+
+    def __init__(self, tasks: Iterable[TaskLike] = ()):
+        self._listeners: List[Any] = []
+        self.tasks: List[Task] = []
+        self._by_id: Dict[str, Task] = {}
+        self._parents: Dict[str, Optional[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        # Reverse dependency edges: task ID -> IDs of tasks depending on it
+        self._dependents: Dict[str, Set[str]] = {}
+        for task in tasks:
+            self.add(task)
+
+    # Listeners
+
+    def add_listener(self, listener: Any):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Any):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, *args: Any):
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(*args)
+
+    # Indexing
+
+    def _index(self, task: Task, parent_id: Optional[str]):
+        if task._collection is not None and task._collection is not self:
+            raise ValueError(f"Task '{task.id}' already belongs to another collection")
+        task._collection = self
+        self._by_id[task.id] = task
+        self._parents[task.id] = parent_id
+        self._by_status.setdefault(task.status, set()).add(task.id)
+        for dependency in task.dependencies:
+            self._dependents.setdefault(dependency, set()).add(task.id)
+        for subtask in task.subtasks:
+            self._index(subtask, task.id)
+
+    def _unindex(self, task: Task):
+        for subtask in task.subtasks:
+            self._unindex(subtask)
+        del self._by_id[task.id]
+        del self._parents[task.id]
+        self._discard(self._by_status, task.status, task.id)
+        for dependency in task.dependencies:
+            self._discard(self._dependents, dependency, task.id)
+        task._collection = None
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, task_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del index[key]
+
+    def _reindex_status(self, task: Task, old: str):
+        self._discard(self._by_status, old, task.id)
+        self._by_status.setdefault(task.status, set()).add(task.id)
+        self._notify("on_status_changed", task, old)
+
+    def _reindex_dependencies(self, task: Task, old: Tuple[str, ...]):
+        for dependency in old:
+            self._discard(self._dependents, dependency, task.id)
+        for dependency in task.dependencies:
+            self._dependents.setdefault(dependency, set()).add(task.id)
+        self._notify("on_dependencies_changed", task, old)
+
+    # Mutation
+
+    def add(self, task: TaskLike, parent_id: Optional[str] = None) -> Task:
+        """Add a task, or a subtask of parent_id, with all of its subtasks
+
+        Raises:
+            KeyError: If parent_id is unknown
+            ValueError: If an ID is already taken
+        """
+        task = Task.from_dict(task) if isinstance(task, dict) else task
+        parent = self._by_id[str(parent_id)] if parent_id is not None else None
+        # Check the whole subtree first so a rejected add leaves no partial index
+        subtree = list(_walk([task]))
+        seen: Set[str] = set()
+        for new in subtree:
+            if new.id in self._by_id or new.id in seen:
+                raise ValueError(f"Duplicate task ID '{new.id}'")
+            seen.add(new.id)
+        self._notify("validate_add", subtree)
+        self._index(task, parent.id if parent else None)
+        (parent.subtasks if parent else self.tasks).append(task)
+        for new in subtree:
+            self._notify("on_task_added", new)
+        return task
+
+    def update(self, task_id: str, **fields: Any) -> Task:
+        """Change fields of a task, keeping indexes consistent
+
+        Raises:
+            KeyError: If the task does not exist
+            AttributeError: If a field is unknown or not updatable
+        """
+        task = self._by_id[str(task_id)]
+        for name, value in fields.items():
+            if name in ("id", "subtasks") or name not in _FIELDS:
+                raise AttributeError(f"Cannot update field '{name}'")
+            setattr(task, name, value)
+        return task
+
+    def upsert(self, task: TaskLike, parent_id: Optional[str] = None) -> bool:
+        """Add a task, or update it in place if its ID exists, recursing into subtasks
+
+        Updating keeps other tasks' dependencies on it; existing subtasks missing
+        from the new version are kept.
+
+        Returns:
+            True if the task was added
+
+        Raises:
+            KeyError: If parent_id is unknown
+            ValueError: If a new subtask's ID is taken by another task
+        """
+        data = task.model_dump() if isinstance(task, Task) else task
+        existing = self.get(data["id"])
+        if existing is None:
+            self.add(Task.from_dict(data), parent_id)
+            return True
+        self.update(existing.id, **{
+            name: data[name] for name in _FIELDS
+            if name in data and name not in ("id", "subtasks")
+        })
+        for subtask in data.get("subtasks", ()):
+            self.upsert(subtask, existing.id)
+        return False
+
+    def remove(self, task_id: str) -> Task:
+        """Remove a task with its subtasks and drop it from other tasks' dependencies
+
+        Raises:
+            KeyError: If the task does not exist
+        """
+        task = self._by_id[str(task_id)]
+        parent_id = self._parents[task.id]
+        subtree = list(_walk([task]))
+        removed = {t.id for t in subtree}
+        self._unindex(task)
+        siblings = self._by_id[parent_id].subtasks if parent_id is not None else self.tasks
+        siblings.remove(task)
+        for old in subtree:
+            self._notify("on_task_removed", old)
+        for removed_id in removed:
+            for dependent_id in list(self._dependents.get(removed_id, ())):
+                dependent = self._by_id[dependent_id]
+                dependent.dependencies = [d for d in dependent.dependencies if d != removed_id]
+        return task
+
+    # Queries
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._by_id.get(str(task_id))
+
+    def __getitem__(self, task_id: str) -> Task:
+        return self._by_id[str(task_id)]
+
+    def __contains__(self, task_id: object) -> bool:
+        return str(task_id) in self._by_id
+
+    def __len__(self) -> int:
+        """Number of tasks including subtasks"""
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Task]:
+        """Iterate over every task and subtask, parents first"""
+        return _walk(self.tasks)
+
+    def parent_of(self, task_id: str) -> Optional[Task]:
+        parent_id = self._parents[str(task_id)]
+        return self._by_id[parent_id] if parent_id is not None else None
+
+    def by_status(self, status: str) -> List[Task]:
+        """Tasks and subtasks with the given status"""
+        return [self._by_id[task_id] for task_id in self._by_status.get(status, ())]
+
+    def status_counts(self) -> Dict[str, int]:
+        return {status: len(ids) for status, ids in self._by_status.items()}
+
+    def filter(self, status: Optional[str] = None, priority: Optional[str] = None, top_level: bool = False) -> List[Task]:
+        """Tasks matching every given criterion, in document order"""
+        candidates = self.tasks if top_level else self
+        if status is not None:
+            matching = self._by_status.get(status, set())
+            candidates = [task for task in candidates if task.id in matching]
+        if priority is not None:
+            candidates = [task for task in candidates if task.priority == priority]
+        return list(candidates)
+
+    def dependencies_of(self, task_id: str) -> List[Task]:
+        """Known tasks the given task depends on"""
+        return [self._by_id[d] for d in self[task_id].dependencies if d in self._by_id]
+
+    def dependents_of(self, task_id: str) -> List[Task]:
+        """Tasks that depend on the given task"""
+        return [self._by_id[d] for d in self._dependents.get(str(task_id), ())]
+
+    def missing_dependencies(self) -> Dict[str, List[str]]:
+        """Dependency IDs that don't name a known task, by dependent task ID"""
+        missing: Dict[str, List[str]] = {}
+        for dependency, dependents in self._dependents.items():
+            if dependency not in self._by_id:
+                for dependent in dependents:
+                    missing.setdefault(dependent, []).append(dependency)
+        return missing
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {"tasks": [task.model_dump() for task in self.tasks]}
+
+    @classmethod
+    def from_shrimp(cls, data: Dict[str, Any]) -> "TaskCollection":
+        """Convert shrimp-task-manager's tasks.json content
+
+        shrimp tasks have a ``name`` and ``dependencies`` of ``{"taskId": ...}``
+        objects; statuses are kept as they are (pending, in_progress, completed, blocked).
+        """
+        tasks = []
+        for entry in data.get("tasks", []):
+            tasks.append(Task(
+                id=entry["id"],
+                title=entry.get("name", entry.get("title", "")),
+                description=entry.get("description", ""),
+                status=entry.get("status", "pending"),
+                dependencies=[
+                    d["taskId"] if isinstance(d, dict) else d
+                    for d in entry.get("dependencies", [])
+                ],
+                details=entry.get("implementationGuide", ""),
+                test_strategy=entry.get("verificationCriteria", ""),
+            ))
+        return cls(tasks=tasks)
+
+
+def _walk(tasks: Iterable[Task]) -> Iterator[Task]:
+    for task in tasks:
+        yield task
+        yield from _walk(task.subtasks)
+
+
+class TaskStore:
+    """Loads and atomically saves a project's task collection
+
+    Tasks live in ``<data_dir>/omni_tasks.json``. Saves write a temporary file in
+    the same directory, fsync it and rename it over the old file, so readers see
+    either the previous or the new state, never a partial write. Loads are cached
+    until the file changes on disk.
+    """
+
+    def __init__(self, data_dir: str):
+        """
+        Args:
+            data_dir: Project data directory, created on first save
+        """
+        self.data_dir = os.path.abspath(data_dir)
+        self.path = os.path.join(self.data_dir, TASKS_FILE)
+        self._lock = threading.RLock()
+        self._collection: Optional[TaskCollection] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        # Snapshots taken and the newest one written, so saves land in order
+        self._generation = 0
+        self._written = 0
+
+    @classmethod
+    def for_project(cls, project_root: str) -> "TaskStore":
+        """Store in the project's data directory, the same one shrimp-task-manager uses"""
+        return cls(os.path.join(project_root, "data"))
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> TaskCollection:
+        """Return the project's tasks, re-reading the file only if it changed
+
+        The returned collection is shared; call save() after modifying it.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if self._collection is not None and signature == self._signature:
+                return self._collection
+            if signature is None:
+                collection = TaskCollection()
+            else:
+                with open(self.path, encoding="utf-8") as f:
+                    collection = TaskCollection(**json.load(f))
+            self._collection, self._signature = collection, signature
+            return collection
+
+    def save(self, collection: Optional[TaskCollection] = None):
+        """Persist a collection atomically, defaulting to the last loaded one"""
+        with self._lock:
+            collection = collection if collection is not None else self.load()
+            self._write(collection, *self._snapshot(collection))
+
+    async def asave(self, collection: Optional[TaskCollection] = None):
+        """save() for coroutines: the file is written and fsynced in a worker thread
+
+        The collection is serialized before control returns to the event loop,
+        so later changes wait for the next save, and an older snapshot never
+        replaces a newer one.
+        """
+        with self._lock:
+            collection = collection if collection is not None else self.load()
+            snapshot = self._snapshot(collection)
+        await asyncio.to_thread(self._write, collection, *snapshot)
+
+    def _snapshot(self, collection: TaskCollection) -> Tuple[int, str]:
+        self._generation += 1
+        return self._generation, json.dumps(collection.model_dump(), ensure_ascii=False)
+
+    def _write(self, collection: TaskCollection, generation: int, data: str):
+        os.makedirs(self.data_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".omni_tasks.", suffix=".tmp", dir=self.data_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                if generation < self._written:
+                    # A newer snapshot was written while this one was in flight
+                    os.unlink(tmp_path)
+                    return
+                os.replace(tmp_path, self.path)
+                self._written = generation
+                self._collection, self._signature = collection, self._file_signature()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._fsync_dir()
+
+    def _fsync_dir(self):
+        # Make the rename itself durable; not supported on every platform
+        try:
+            fd = os.open(self.data_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
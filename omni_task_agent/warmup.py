@@ -0,0 +1,173 @@
+"""
+Server Warm-up
+
+Pays the cold-start costs of the MCP server before it takes traffic: the first
+session of the default project (subprocess spawn, MCP handshake and tool
+listing for the shrimp backend), extra read sessions for that project, the
+tool schemas, the compiled agent graph with its LLM client and, optionally, one
+tiny LLM call. The server reports ready only once warm-up has finished, so a
+load balancer polling /ready never routes requests to a cold instance.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.pool import get_session_pool
+from omni_task_agent.scheduler import get_tool_scheduler
+from omni_task_agent.tools import describe_tool, get_tool_context
+from omni_task_agent.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROMPT = "Reply with the single word: ready"
+
+
+class Warmup:
+    """Warm-up of one server process and its readiness state
+
+    The state goes from "pending" to "warming" to "ready". A failed step is
+    logged and reported but does not hold readiness back: the backend was
+    already checked by its preflight, and the step's cost is then simply paid by
+    the first request.
+    """
+
+    def __init__(
+        self,
+        project_root: Optional[str] = None,
+        sessions: Optional[int] = None,
+        llm: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            project_root: Project warmed up, defaults to the project of requests
+                without a projectRoot (WARMUP_PROJECT_ROOT)
+            sessions: Backend sessions started for that project, including the
+                request session; extra ones serve concurrent reads (WARMUP_SESSIONS)
+            llm: Send one tiny prompt to the chat model (WARMUP_LLM)
+            timeout: Seconds allowed for each step (WARMUP_TIMEOUT)
+        """
+        self.project_root = project_root if project_root is not None else os.environ.get("WARMUP_PROJECT_ROOT") or None
+        self.sessions = max(1, sessions if sessions is not None else get_env_int("WARMUP_SESSIONS", 1))
+        self.llm = llm if llm is not None else get_env_bool("WARMUP_LLM", False)
+        self.timeout = timeout if timeout is not None else get_env_float("WARMUP_TIMEOUT", 120.0)
+        self.state = "pending"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.tool_schemas: List[Dict[str, Any]] = []
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def skip(self):
+        """Report ready without warming up (WARMUP=false)"""
+        self.state = "ready"
+
+    async def _step(self, name: str, coroutine) -> bool:
+        started = time.perf_counter()
+        with get_tracer().span(f"warmup.{name}"):
+            try:
+                detail = await asyncio.wait_for(coroutine, self.timeout)
+            except Exception as e:
+                error = "timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {str(e)}"
+                logger.warning(f"Warm-up step {name} failed: {error}")
+                self.steps[name] = {"seconds": round(time.perf_counter() - started, 4), "error": error}
+                return False
+        self.steps[name] = {"seconds": round(time.perf_counter() - started, 4), **(detail or {})}
+        logger.info(f"Warm-up step {name} took {self.steps[name]['seconds']}s")
+        return True
+
+    async def _tools(self) -> Dict[str, Any]:
+        # Imported here because the agent module is the one importing the backends
+        from omni_task_agent.agent import open_tool_session
+        from omni_task_agent.graph_cache import get_graph_cache
+
+        async with open_tool_session(self.project_root) as tools:
+            self.tool_schemas = [describe_tool(tool) for tool in tools]
+            # Imports LangGraph and builds the LLM client and the shared graph
+            get_graph_cache().get_graph(tools)
+            context = get_tool_context()
+            extra = await self._read_sessions(context.data_dir, context.server_config)
+        return {"tools": len(tools), "sessions": 1 + extra}
+
+    async def _read_sessions(self, data_dir: str, server_config: Optional[Dict[str, Any]]) -> int:
+        """Start the sibling sessions the tool scheduler spreads concurrent reads over"""
+        if server_config is None:
+            # Only pooled stdio sessions serve one request at a time
+            return 0
+        count = min(self.sessions, get_tool_scheduler().read_sessions) - 1
+        pool = get_session_pool()
+        await asyncio.gather(*(
+            pool.warm(get_tool_scheduler().sibling_key(data_dir, slot), server_config)
+            for slot in range(1, count + 1)
+        ))
+        return max(count, 0)
+
+    async def _llm(self) -> Dict[str, Any]:
+        from omni_task_agent.graph_cache import get_graph_cache
+
+        await get_graph_cache().get_llm().ainvoke(WARMUP_PROMPT)
+        return {}
+
+    async def run(self):
+        """Run the warm-up steps once and flip to ready"""
+        if self.state != "pending":
+            return
+        self.state = "warming"
+        started = time.perf_counter()
+        logger.info(f"Warming up {self.sessions} session(s) for project {self.project_root or '(default)'}")
+        try:
+            await self._step("tools", self._tools())
+            if self.llm:
+                await self._step("llm", self._llm())
+        finally:
+            self.seconds = round(time.perf_counter() - started, 4)
+            self.state = "ready"
+        logger.info(f"Warm-up finished in {self.seconds}s")
+
+    def report(self) -> Dict[str, Any]:
+        """Readiness state and per-step timings"""
+        return {
+            "status": self.state,
+            "seconds": self.seconds,
+            "steps": dict(self.steps),
+        }
+
+
+def add_health_routes(app: Any, readiness: Any):
+    """Add /health (process is up) and /ready to a Starlette app
+
+    Args:
+        app: Starlette application
+        readiness: Warmup, or any object with a ``ready`` flag and a ``report()``
+            dict; /ready answers 503 while it is not ready
+    """
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    async def health(request):
+        return JSONResponse({"status": "ok"})
+
+    async def ready(request):
+        return JSONResponse(readiness.report(), status_code=200 if readiness.ready else 503)
+
+    app.router.routes.extend([
+        Route("/health", health, methods=["GET"]),
+        Route("/ready", ready, methods=["GET"]),
+    ])
+
+
+_warmup: Optional[Warmup] = None
+
+
+def get_warmup() -> Warmup:
+    """Return the process-wide warm-up state"""
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup()
+    return _warmup
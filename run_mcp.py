@@ -1,10 +1,24 @@
+import asyncio
+import json
+import sys
 import warnings
+
+import anyio
 # from automcp.adapters.langgraph import create_langgraph_adapter  # Comment out original import
 from pydantic import BaseModel
 from mcp.server.fastmcp import FastMCP
 
 # Import LangGraph instance from omni_task_agent
-from omni_task_agent.agent import make_graph
+from omni_task_agent.admission import AdmissionController
+from omni_task_agent.agent import call_tool, ensure_environment, list_tools, make_graph
+from omni_task_agent.backends import get_task_backend
+from omni_task_agent.config import get_env_bool, get_env_float, get_env_int
+from omni_task_agent.pool import get_session_pool
+from omni_task_agent.resolver import ShrimpNotFoundError
+from omni_task_agent.tool_cache import get_tool_cache
+from omni_task_agent.tool_router import get_tool_router
+from omni_task_agent.tracing import InMemoryExporter, get_tracer
+from omni_task_agent.warmup import add_health_routes, get_warmup
 # Import our custom adapter implementation
 from adapters import create_langgraph_async_adapter
 
@@ -19,10 +33,14 @@ class InputSchema(BaseModel):
     prompt: str
     projectRoot: str = None
     file: str = None
+    threadId: str = None
 
 name = "OmniTask Agent"
 description = "A powerful multi-model task management system that can both integrate with various task management systems and help users choose and use the most suitable task management solution"
 
+# Limit concurrent agent runs; excess requests wait in a bounded queue or are rejected
+admission = AdmissionController()
+
 # Create LangGraph adapter
 # Use make_graph as async context manager
 # Note: This returns an async function, FastMCP supports registering async tool functions
@@ -31,6 +49,8 @@ mcp_langgraph_agent = create_langgraph_async_adapter(
     name="OmniTask_Agent",
     description=description,
     input_schema=InputSchema,
+    stream_progress=get_env_bool("MCP_STREAM_PROGRESS", True),
+    admission=admission,
 )
 
 # Register async tool to FastMCP
@@ -41,14 +61,153 @@ mcp.add_tool(
     description=description
 )
 
+async def direct_tool(toolName: str, arguments: dict = None, projectRoot: str = None) -> str:
+    """Call a task tool directly with validated arguments, bypassing the LLM"""
+    async with admission.admit(projectRoot):
+        return await call_tool(toolName, arguments or {}, projectRoot)
+
+mcp.add_tool(
+    direct_tool,
+    name="OmniTask Direct Tool",
+    description=(
+        "Run a single task management tool (e.g. list_tasks, get_task_detail, query_task) directly "
+        "without the LLM. Fast and token-free for deterministic operations. "
+        "Use 'OmniTask Tool Schemas' to discover tool names and argument schemas."
+    )
+)
+
+async def tool_schemas(projectRoot: str = None) -> str:
+    """List the task tools available for direct calls with their argument schemas as JSON"""
+    warmup = get_warmup()
+    if warmup.tool_schemas and projectRoot in (None, warmup.project_root):
+        # Listed during warm-up
+        return json.dumps(warmup.tool_schemas)
+    return json.dumps(await list_tools(projectRoot))
+
+mcp.add_tool(
+    tool_schemas,
+    name="OmniTask Tool Schemas",
+    description="List task management tools available to 'OmniTask Direct Tool' with their JSON argument schemas"
+)
+
+async def server_metrics() -> str:
+    """Report warm-up, task backend, admission, session pool, tool cache, tool routing, LLM cache, LLM provider and retry/timeout statistics as JSON"""
+    from omni_task_agent.llm_cache import get_llm_cache
+    from omni_task_agent.model_router import get_provider_health
+    from omni_task_agent.resilience import get_resilience
+
+    llm_cache = get_llm_cache()
+    backend = get_task_backend()
+    return json.dumps({
+        "warmup": get_warmup().report(),
+        "task_backend": {"name": backend.name, **backend.metrics()},
+        "admission": admission.metrics(),
+        "session_pool": {"size": len(get_session_pool()), **get_session_pool().stats},
+        "tool_cache": get_tool_cache().metrics(),
+        "tool_router": get_tool_router().metrics(),
+        "llm_cache": llm_cache.metrics() if llm_cache is not None else None,
+        "llm_providers": get_provider_health().metrics(),
+        "resilience": get_resilience().metrics(),
+    })
+
+mcp.add_tool(
+    server_metrics,
+    name="OmniTask Metrics",
+    description="Server metrics: warm-up and readiness, request queue depth, wait times, rejections, warm session pool, tool cache hit/miss, tool routing token savings, LLM response cache per-provider LLM latency/error, and retry/timeout/hedge statistics"
+)
+
+async def recent_traces(limit: int = 20) -> str:
+    """Report per-phase timing summaries and the most recent spans as JSON"""
+    exporter = get_tracer().get_exporter(InMemoryExporter)
+    if exporter is None:
+        return json.dumps({"error": "In-memory tracing is disabled; set TRACE_EXPORTERS=memory"})
+    return json.dumps({
+        "summary": exporter.summary(),
+        "spans": [span.to_dict() for span in exporter.spans[-limit:]],
+    }, default=str)
+
+mcp.add_tool(
+    recent_traces,
+    name="OmniTask Traces",
+    description="Per-phase latency breakdown (session spawn, tool loading, graph build, LLM calls with token counts, tool calls) of recent requests"
+)
+
+def check_shrimp_installation():
+    """Check the task backend once at startup and exit if it cannot serve requests
+
+    For the shrimp backend this resolves shrimp-task-manager and makes sure it can be spawned.
+    """
+    ensure_environment()
+    try:
+        get_task_backend().preflight()
+    except (ShrimpNotFoundError, ValueError, ConnectionError) as e:
+        print(f"Startup error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+def start_warmup():
+    """Warm the server up in the background of the running event loop, unless WARMUP=false"""
+    warmup = get_warmup()
+    if not get_env_bool("WARMUP", True):
+        warmup.skip()
+        return None
+    return asyncio.create_task(warmup.run(), name="warmup")
+
+async def run_sse_async():
+    """FastMCP's SSE server plus /health and /ready, warming up while it starts listening"""
+    import uvicorn
+
+    app = mcp.sse_app()
+    add_health_routes(app, get_warmup())
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+        # Open SSE streams would otherwise hold shutdown forever
+        timeout_graceful_shutdown=get_env_float("SSE_SHUTDOWN_TIMEOUT", 5.0),
+    ))
+    warmup = start_warmup()
+    try:
+        await server.serve()
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+
+async def run_stdio_async():
+    """Warm up, then serve MCP over stdio; the client's first request waits for warm-up"""
+    warmup = start_warmup()
+    if warmup is not None:
+        await warmup
+    await mcp.run_stdio_async()
+
+async def run_dispatcher_async(workers: int):
+    """Shard SSE requests by projectRoot over worker processes each running run_sse_async"""
+    import os
+
+    from omni_task_agent.sharding import Dispatcher
+
+    dispatcher = Dispatcher(
+        command=[sys.executable, os.path.abspath(__file__), "sse"],
+        workers=workers,
+        base_port=get_env_int("SSE_WORKER_BASE_PORT", mcp.settings.port + 1),
+        name=mcp.name,
+    )
+    await dispatcher.serve(mcp.settings.host, mcp.settings.port, mcp.settings.log_level.lower())
+
 # Server entrypoints
 def serve_sse():
-    mcp.run(transport="sse")
+    check_shrimp_installation()
+    workers = get_env_int("SSE_WORKERS", 1)
+    if workers > 1:
+        anyio.run(run_dispatcher_async, workers)
+    else:
+        anyio.run(run_sse_async)
 
 def serve_stdio():
+    check_shrimp_installation()
+
     # Redirect stderr to suppress warnings that bypass the filters
     import os
-    import sys
 
     class NullWriter:
         def write(self, *args, **kwargs):
@@ -66,13 +225,12 @@ def serve_stdio():
     os.environ["PYTHONWARNINGS"] = "ignore"
 
     try:
-        mcp.run(transport="stdio")
+        anyio.run(run_stdio_async)
     finally:
         # Restore stderr for normal operation
         sys.stderr = original_stderr
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1 and sys.argv[1] == "sse":
         serve_sse()
     else:
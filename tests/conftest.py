@@ -5,14 +5,12 @@ Provides test fixtures and shared resources
 """
 import os
 import pytest
-from pathlib import Path
 
 
 @pytest.fixture
-def test_data_dir():
-    """Return test data directory path"""
-    base_dir = Path(__file__).parent
-    data_dir = base_dir / "test_data"
+def test_data_dir(tmp_path):
+    """Return a per-test data directory, so test runs leave no files in the tree"""
+    data_dir = tmp_path / "test_data"
     os.makedirs(data_dir, exist_ok=True)
     return data_dir
 
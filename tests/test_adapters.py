@@ -0,0 +1,103 @@
+"""
+MCP Adapter Tests
+"""
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from mcp.server.fastmcp.tools import Tool
+from pydantic import BaseModel
+
+from adapters import create_langgraph_async_adapter
+
+
+class InputSchema(BaseModel):
+    prompt: str
+    projectRoot: str = None
+
+
+def make_agent_instance(agent):
+    """Wrap an agent in a make_graph-like async context manager"""
+    @asynccontextmanager
+    async def agent_instance(project_root=None):
+        yield agent
+    return agent_instance
+
+
+class TestAdapters:
+    """Adapter Test Class"""
+
+    def test_context_parameter_is_injected(self):
+        """FastMCP recognises the ctx parameter and hides it from the tool schema"""
+        run_agent = create_langgraph_async_adapter(
+            make_agent_instance(MagicMock()), "OmniTask_Agent", "desc", InputSchema
+        )
+        tool = Tool.from_function(run_agent)
+
+        assert tool.context_kwarg == "ctx"
+        assert "ctx" not in tool.parameters["properties"]
+
+    @pytest.mark.asyncio
+    async def test_streams_progress_to_context(self):
+        """Tool calls advance progress and tokens are relayed as log messages"""
+        final_state = {"messages": [AIMessage(content="done")]}
+
+        async def fake_events(inputs, config=None, version=None):
+            yield {"event": "on_tool_start", "name": "list_tasks", "run_id": "t1", "data": {"input": {}}}
+            yield {"event": "on_tool_end", "name": "list_tasks", "run_id": "t1", "data": {"output": "[]"}}
+            yield {"event": "on_chat_model_stream", "run_id": "m1", "data": {"chunk": AIMessageChunk(content="done")}}
+            yield {"event": "on_chain_end", "run_id": "g1", "parent_ids": [], "data": {"output": final_state}}
+
+        agent = MagicMock()
+        agent.astream_events = fake_events
+        ctx = MagicMock()
+        ctx.report_progress = AsyncMock()
+        ctx.info = AsyncMock()
+        run_agent = create_langgraph_async_adapter(
+            make_agent_instance(agent), "OmniTask_Agent", "desc", InputSchema
+        )
+
+        result = await run_agent(prompt="list tasks", projectRoot="/tmp/project", ctx=ctx)
+
+        assert result == final_state
+        ctx.report_progress.assert_awaited_once_with(1)
+        messages = [call.args[0] for call in ctx.info.await_args_list]
+        assert "Calling tool list_tasks" in messages
+        assert "done" in messages
+
+    @pytest.mark.asyncio
+    async def test_without_context_uses_ainvoke(self):
+        """Direct calls without an MCP context fall back to ainvoke"""
+        agent = MagicMock()
+        agent.ainvoke = AsyncMock(return_value={"messages": []})
+        run_agent = create_langgraph_async_adapter(
+            make_agent_instance(agent), "OmniTask_Agent", "desc", InputSchema
+        )
+
+        await run_agent(prompt="list tasks", projectRoot="/tmp/project")
+
+        agent.ainvoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_thread_id_resumes_thread(self):
+        """A thread ID is passed to the agent factory and only the new message is sent"""
+        class ThreadInput(InputSchema):
+            threadId: str = None
+
+        agent = MagicMock()
+        agent.ainvoke = AsyncMock(return_value={"messages": []})
+        threads = []
+
+        @asynccontextmanager
+        async def agent_instance(project_root=None, thread_id=None):
+            threads.append(thread_id)
+            yield agent
+
+        run_agent = create_langgraph_async_adapter(agent_instance, "OmniTask_Agent", "desc", ThreadInput)
+        await run_agent(prompt="and the next one?", projectRoot="/tmp/project", threadId="chat-1")
+        await run_agent(prompt="list tasks", projectRoot="/tmp/project", threadId="")
+
+        assert threads == ["chat-1", None]
+        payload = agent.ainvoke.await_args_list[0].args[0]
+        assert payload == {"messages": [{"role": "user", "content": "and the next one?"}]}
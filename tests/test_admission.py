@@ -0,0 +1,123 @@
+"""
+Admission Control Tests
+"""
+import asyncio
+import pytest
+
+from omni_task_agent.admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller, project, started, release):
+    async with controller.admit(project):
+        started.set()
+        await release.wait()
+
+
+class TestAdmissionController:
+    """Admission Controller Test Class"""
+
+    @pytest.mark.asyncio
+    async def test_global_limit(self):
+        """No more than max_concurrency requests run at once"""
+        controller = AdmissionController(max_concurrency=2, per_project_limit=2, max_queue=10, queue_timeout=1)
+        release = asyncio.Event()
+        events = [asyncio.Event() for _ in range(3)]
+        tasks = [
+            asyncio.create_task(hold(controller, f"/p{i}", events[i], release))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.05)
+
+        assert controller.in_flight == 2
+        assert controller.queued == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.metrics()["admitted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_per_project_limit(self):
+        """A single project cannot take more than its share of slots"""
+        controller = AdmissionController(max_concurrency=4, per_project_limit=1, max_queue=10, queue_timeout=1)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(controller, "/same", asyncio.Event(), release))
+            for _ in range(2)
+        ]
+        other = asyncio.Event()
+        tasks.append(asyncio.create_task(hold(controller, "/other", other, release)))
+        await asyncio.sleep(0.05)
+
+        assert controller.in_flight == 2
+        assert other.is_set()
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_queue_full_rejects_immediately(self):
+        """Requests beyond the queue bound are rejected with backpressure"""
+        controller = AdmissionController(max_concurrency=1, per_project_limit=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(controller, "/p", asyncio.Event(), release))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AdmissionRejected) as error:
+            async with controller.admit("/p"):
+                pass
+        assert error.value.reason == "queue_full"
+        assert controller.metrics()["rejected_queue_full"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Waiting longer than the queue timeout rejects the request and frees its place"""
+        controller = AdmissionController(max_concurrency=1, per_project_limit=1, max_queue=5, queue_timeout=0.05)
+        release = asyncio.Event()
+        task = asyncio.create_task(hold(controller, "/p", asyncio.Event(), release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as error:
+            async with controller.admit("/p"):
+                pass
+        assert error.value.reason == "timeout"
+
+        metrics = controller.metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["max_wait_seconds"] >= 0.05
+
+        release.set()
+        await task
+        async with controller.admit("/p"):
+            assert controller.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_equivalent_project_roots_share_a_limit(self):
+        """Spellings of one project root count against the same per-project limit"""
+        controller = AdmissionController(max_concurrency=4, per_project_limit=1, max_queue=10, queue_timeout=1)
+        release = asyncio.Event()
+        first, second = asyncio.Event(), asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(controller, "/same", first, release)),
+            asyncio.create_task(hold(controller, "/same/", second, release)),
+        ]
+        await asyncio.sleep(0.05)
+
+        assert controller.in_flight == 1
+        assert controller.queued == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert second.is_set()
+
+    def test_explicit_zero_limits_are_not_replaced_by_settings(self, monkeypatch):
+        """An explicit limit of 0 is raised to 1 instead of falling back to the environment"""
+        monkeypatch.setenv("MAX_CONCURRENT_REQUESTS", "50")
+        monkeypatch.setenv("MAX_CONCURRENT_PER_PROJECT", "50")
+        controller = AdmissionController(max_concurrency=0, per_project_limit=0)
+        assert (controller.max_concurrency, controller.per_project_limit) == (1, 1)
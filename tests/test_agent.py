@@ -1,30 +1,52 @@
+import json
 import os
+import pytest
 from unittest.mock import patch
 
-from omni_task_agent.agent import make_graph, get_server_config
+from langchain_core.tools import StructuredTool
+
+from omni_task_agent.agent import call_tool, list_tools, make_graph, get_server_config
+from omni_task_agent.pool import SessionPool
+from omni_task_agent.tools import ToolArgumentError
+from omni_task_agent.resolver import SERVER_ROOT, reset_shrimp_resolution
 
 
 class TestAgent:
     """Agent Module Tests"""
     
+    def setup_method(self):
+        """Resolve shrimp-task-manager afresh for each test"""
+        reset_shrimp_resolution()
+    
+    def teardown_method(self):
+        reset_shrimp_resolution()
+    
     @patch.dict(os.environ, {"PROJECT_ROOT": "/test/path"})
     @patch("os.path.exists", return_value=True)
     @patch("os.makedirs")  # Mock makedirs to avoid filesystem errors
     def test_get_server_config(self, mock_makedirs, mock_exists):
         """Test server configuration generation"""
-        config = get_server_config()
+        config = get_server_config("/test/path")
         
         # Verify configuration structure
         assert "shrimp-task-manager" in config
         assert config["shrimp-task-manager"]["transport"] == "stdio"
-        assert config["shrimp-task-manager"]["command"] == "node"
-        assert "/test/path/node_modules/mcp-shrimp-task-manager/dist/index.js" in config["shrimp-task-manager"]["args"][0]
+        assert os.path.basename(config["shrimp-task-manager"]["command"]) == "node"
+        assert os.path.join(SERVER_ROOT, "node_modules/mcp-shrimp-task-manager/dist/index.js") in config["shrimp-task-manager"]["args"][0]
         
         # Verify environment variables
         env = config["shrimp-task-manager"]["env"]
         assert "DATA_DIR" in env
         assert "/test/path/data" in env["DATA_DIR"]
-        assert env["ENABLE_THOUGHT_CHAIN"] == "true"
+        assert env["ENABLE_THOUGHT_CHAIN"] == "false"
+    
+    @patch.dict(os.environ, {"ENABLE_THOUGHT_CHAIN": "true"})
+    @patch("os.makedirs")  # Mock makedirs to avoid filesystem errors
+    def test_get_server_config_thought_chain(self, mock_makedirs):
+        """Test ENABLE_THOUGHT_CHAIN is passed through from the environment"""
+        config = get_server_config("/test/path")
+        
+        assert config["shrimp-task-manager"]["env"]["ENABLE_THOUGHT_CHAIN"] == "true"
     
     @patch.dict(os.environ, {"PROJECT_ROOT": "/test/path"})
     @patch("os.path.exists", return_value=False)
@@ -39,4 +61,55 @@ class TestAgent:
     
     def test_make_graph_exists(self):
         """Test make_graph function existence"""
-        assert callable(make_graph) 
\ No newline at end of file
+        assert callable(make_graph) 
+    
+    @pytest.mark.asyncio
+    async def test_call_tool_direct(self, tmp_path):
+        """Test direct tool calls bypass the LLM and validate arguments"""
+        calls = []
+        
+        async def get_task_detail(**arguments):
+            calls.append(arguments)
+            return f"Task {arguments['taskId']}", None
+        
+        tool = StructuredTool(
+            name="get_task_detail",
+            description="Get task detail",
+            args_schema={
+                "type": "object",
+                "properties": {"taskId": {"type": "string"}},
+                "required": ["taskId"],
+                "additionalProperties": False,
+            },
+            coroutine=get_task_detail,
+            response_format="content_and_artifact",
+        )
+        
+        class FakeClient:
+            def __init__(self, config):
+                pass
+            async def __aenter__(self):
+                return self
+            async def __aexit__(self, *exc):
+                pass
+            def get_tools(self):
+                return [tool]
+        
+        pool = SessionPool(max_size=2, client_factory=FakeClient)
+        with patch("omni_task_agent.backends.get_session_pool", return_value=pool):
+            output = await call_tool("get_task_detail", {"taskId": "1"}, str(tmp_path))
+            schemas = await list_tools(str(tmp_path))
+            with pytest.raises(ToolArgumentError):
+                await call_tool("get_task_detail", {"id": "1"}, str(tmp_path))
+            with pytest.raises(ToolArgumentError):
+                await call_tool("missing_tool", {}, str(tmp_path))
+            ready = await call_tool("ready_tasks", {}, str(tmp_path))
+        await pool.close()
+        
+        assert output == "Task 1"
+        assert calls == [{"taskId": "1"}]
+        assert schemas[0]["name"] == "get_task_detail"
+        assert schemas[0]["input_schema"]["required"] == ["taskId"]
+        # Dependency-graph tools are served locally next to the session's tools
+        assert "critical_path" in {schema["name"] for schema in schemas}
+        assert json.loads(ready) == {"tasks": []}
\ No newline at end of file
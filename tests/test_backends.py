@@ -0,0 +1,178 @@
+"""
+Task Backends Module Tests
+"""
+import json
+import os
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+
+from omni_task_agent.agent import call_tool, list_tools
+from omni_task_agent.backends import (
+    BackendSession,
+    LocalBackend,
+    ShrimpBackend,
+    TaskBackend,
+    get_data_dir,
+    get_task_backend,
+    register_backend,
+)
+from omni_task_agent.dependencies import SHRIMP_TASKS_FILE, clear_dependency_graphs
+from omni_task_agent.local_backend import LOCAL_TOOLS
+from omni_task_agent.tool_cache import get_tool_cache
+from omni_task_agent.utils.state import TASKS_FILE
+
+
+@pytest.fixture(autouse=True)
+def local_backend(monkeypatch):
+    monkeypatch.setenv("TASK_BACKEND", "local")
+    clear_dependency_graphs()
+    get_tool_cache().invalidate()
+    yield
+    clear_dependency_graphs()
+    get_tool_cache().invalidate()
+
+
+async def call(tool, arguments, project_root):
+    return json.loads(await call_tool(tool, arguments, project_root))
+
+
+async def split(project_root, tasks, mode="append"):
+    return await call("split_tasks", {"updateMode": mode, "tasks": tasks}, project_root)
+
+
+class TestBackendSelection:
+    """Backend registry test class"""
+
+    def test_default_is_shrimp(self, monkeypatch):
+        """Test the shrimp backend is used unless TASK_BACKEND says otherwise"""
+        monkeypatch.delenv("TASK_BACKEND")
+        assert isinstance(get_task_backend(), ShrimpBackend)
+        assert isinstance(get_task_backend("LOCAL"), LocalBackend)
+        assert get_task_backend() is get_task_backend("shrimp")
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected with the choices"""
+        with pytest.raises(ValueError, match="local"):
+            get_task_backend("carrier-pigeon")
+
+    def test_register_backend(self):
+        """Test registered backends become selectable"""
+        class NullBackend(TaskBackend):
+            name = "null"
+
+            @asynccontextmanager
+            async def session(self, project_root=None):
+                yield BackendSession(get_data_dir(project_root), [])
+
+        class IncompleteBackend(TaskBackend):
+            name = "incomplete"
+
+        register_backend("null", NullBackend)
+        assert isinstance(get_task_backend("null"), NullBackend)
+        with pytest.raises(TypeError, match="session"):
+            IncompleteBackend()
+
+    def test_data_dir(self, tmp_path):
+        """Test data directories are created under the project root"""
+        data_dir = get_data_dir(str(tmp_path / "project"))
+        assert data_dir == os.path.abspath(str(tmp_path / "project" / "data"))
+        assert os.path.isdir(data_dir)
+
+
+class TestLocalBackend:
+    """In-process task tools test class"""
+
+    @pytest.mark.asyncio
+    async def test_same_tool_surface(self, tmp_path):
+        """Test the local tools keep the shrimp-task-manager names next to the dependency tools"""
+        with patch("omni_task_agent.backends.get_session_pool") as pool:
+            names = {schema["name"] for schema in await list_tools(str(tmp_path))}
+        pool.assert_not_called()
+        assert set(LOCAL_TOOLS) <= names
+        assert "ready_tasks" in names
+
+    @pytest.mark.asyncio
+    async def test_task_lifecycle(self, tmp_path):
+        """Test tasks can be split, listed, queried, started, verified and deleted"""
+        root = str(tmp_path)
+        created = await split(root, [
+            {"name": "Schema", "description": "Design the schema"},
+            {"name": "API", "description": "Build the API", "dependencies": ["Schema"]},
+        ])
+        schema_id, api_id = (task["id"] for task in created["created"])
+        assert created["created"][1]["dependencies"] == [schema_id]
+        assert os.path.exists(os.path.join(root, "data", TASKS_FILE))
+
+        listed = await call("list_tasks", {"status": "pending"}, root)
+        assert [task["name"] for task in listed["tasks"]] == ["Schema", "API"]
+        found = await call("query_task", {"query": "api"}, root)
+        assert [task["id"] for task in found["tasks"]] == [api_id]
+
+        assert "waiting on unfinished dependencies" in await call_tool("execute_task", {"taskId": api_id}, root)
+        assert "Executing task" in await call_tool("execute_task", {"taskId": schema_id}, root)
+        assert "below 80" in await call_tool("verify_task", {"taskId": schema_id, "summary": "Partial", "score": 50}, root)
+        await call_tool("verify_task", {"taskId": schema_id, "summary": "Done", "score": 90}, root)
+        detail = await call("get_task_detail", {"taskId": schema_id}, root)
+        assert detail["status"] == "completed"
+
+        # The dependency tools see the local changes without a reload
+        ready = await call("ready_tasks", {}, root)
+        assert [task["id"] for task in ready["tasks"]] == [api_id]
+
+        assert "cannot be deleted" in await call_tool("delete_task", {"taskId": schema_id}, root)
+        assert "deleted" in await call_tool("delete_task", {"taskId": api_id}, root)
+        assert (await call("list_tasks", {}, root))["counts"] == {"completed": 1}
+
+    @pytest.mark.asyncio
+    async def test_update_modes(self, tmp_path):
+        """Test selective updates by name and overwrites that keep completed tasks"""
+        root = str(tmp_path)
+        first = await split(root, [{"name": "A"}, {"name": "B"}])
+        a_id = first["created"][0]["id"]
+        await call_tool("verify_task", {"taskId": a_id, "summary": "Done", "score": 100}, root)
+
+        selective = await split(root, [{"name": "B", "description": "Changed"}, {"name": "C"}], mode="selective")
+        assert [task["name"] for task in selective["updated"]] == ["B"]
+        assert selective["total"] == 3
+
+        overwritten = await split(root, [{"name": "D", "dependencies": [a_id]}], mode="overwrite")
+        names = [task["name"] for task in (await call("list_tasks", {}, root))["tasks"]]
+        assert names == ["A", "D"]
+        assert overwritten["created"][0]["dependencies"] == [a_id]
+
+        assert "confirm" in await call_tool("clear_all_tasks", {"confirm": False}, root)
+        await call_tool("clear_all_tasks", {"confirm": True}, root)
+        assert (await call("list_tasks", {}, root))["tasks"] == []
+
+    @pytest.mark.asyncio
+    async def test_cycles_rejected(self, tmp_path):
+        """Test dependency changes that would create a cycle are refused"""
+        root = str(tmp_path)
+        created = await split(root, [{"name": "A"}, {"name": "B", "dependencies": ["A"]}])
+        a_id, b_id = (task["id"] for task in created["created"])
+        output = await call_tool("update_task", {"taskId": a_id, "name": "Renamed", "dependencies": [b_id]}, root)
+        assert "not changed" in output
+        detail = await call("get_task_detail", {"taskId": a_id}, root)
+        assert detail["dependencies"] == [] and detail["name"] == "A"
+
+        clear_dependency_graphs()  # Reload from disk: the rejected update was not saved either
+        assert (await call("get_task_detail", {"taskId": a_id}, root))["name"] == "A"
+
+        created = await split(root, [{"name": "C", "dependencies": ["D"]}, {"name": "D", "dependencies": ["C"]}])
+        c_id, d_id = (task["id"] for task in created["created"])
+        assert [task["dependencies"] for task in created["created"]] == [[d_id], []]
+        assert [task["id"] for task in created["rejectedDependencies"]] == [d_id]
+
+    @pytest.mark.asyncio
+    async def test_imports_shrimp_tasks(self, tmp_path):
+        """Test a project with only shrimp-task-manager's tasks.json keeps its tasks"""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / SHRIMP_TASKS_FILE).write_text(json.dumps({
+            "tasks": [{"id": "t1", "name": "Existing", "description": "From shrimp", "status": "pending"}]
+        }))
+        detail = await call("get_task_detail", {"taskId": "t1"}, str(tmp_path))
+        assert detail["name"] == "Existing"
+        assert (data_dir / TASKS_FILE).exists()
@@ -0,0 +1,146 @@
+"""
+Batch Execution Module Tests
+"""
+import asyncio
+import io
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from omni_task_agent.batch import BatchItem, parse_prompts, run_batch
+
+
+class FakeAgent:
+    """Agent answering after a per-prompt delay"""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    async def ainvoke(self, inputs):
+        prompt = inputs["messages"][0]["content"]
+        if prompt == "fail":
+            raise RuntimeError("model unavailable")
+        await asyncio.sleep(self.delays.get(prompt, 0))
+        return {"messages": [AIMessage(content=f"answer to {prompt}")]}
+
+
+def fake_make_graph(agent, opened):
+    @asynccontextmanager
+    async def make_graph(project_root=None):
+        opened.append(project_root)
+        yield agent
+    return make_graph
+
+
+class TestParsePrompts:
+    """Prompt parsing test class"""
+
+    def test_strings_and_objects(self):
+        """Test plain string lines and objects with projectRoot and id"""
+        lines = ['"first"', "", '{"prompt": "second", "projectRoot": "/p", "id": 7}']
+        items = list(parse_prompts(lines, project_root="/default"))
+        assert items == [
+            BatchItem(index=0, prompt="first", project_root="/default"),
+            BatchItem(index=1, prompt="second", project_root="/p", id=7),
+        ]
+
+    @pytest.mark.parametrize("line", ["{not json", '{"id": 1}', "42"])
+    def test_invalid_lines(self, line):
+        """Test invalid lines are reported with their line number"""
+        with pytest.raises(ValueError, match="Line 2"):
+            list(parse_prompts(['"ok"', line]))
+
+
+class TestRunBatch:
+    """Batch runner test class"""
+
+    @pytest.mark.asyncio
+    async def test_completion_order_and_shared_sessions(self):
+        """Test results stream in completion order with one session per project"""
+        opened = []
+        agent = FakeAgent({"slow": 0.05, "fast": 0.0})
+        items = [
+            BatchItem(index=0, prompt="slow", project_root="/a"),
+            BatchItem(index=1, prompt="fast", project_root="/a"),
+            BatchItem(index=2, prompt="fast", project_root="/b"),
+        ]
+        output = io.StringIO()
+
+        with patch("omni_task_agent.batch.make_graph", fake_make_graph(agent, opened)):
+            summary = await run_batch(items, output, workers=3)
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert results[-1]["index"] == 0
+        assert {r["index"] for r in results} == {0, 1, 2}
+        assert all(r["status"] == "ok" and r["seconds"] >= 0 for r in results)
+        assert results[-1]["output"] == "answer to slow"
+        assert sorted(opened) == ["/a", "/b"]
+        assert summary["total"] == 3 and summary["ok"] == 3 and summary["workers"] == 3
+
+    @pytest.mark.asyncio
+    async def test_worker_limit(self):
+        """Test no more than the configured number of prompts run at once"""
+        running = peak = 0
+
+        class CountingAgent:
+            async def ainvoke(self, inputs):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return {"messages": [AIMessage(content="ok")]}
+
+        items = [BatchItem(index=i, prompt=str(i), project_root=f"/p{i % 2}") for i in range(6)]
+        with patch("omni_task_agent.batch.make_graph", fake_make_graph(CountingAgent(), [])):
+            await run_batch(items, io.StringIO(), workers=2)
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_session_limit(self):
+        """Test no more project sessions than workers are open at once"""
+        open_sessions = peak = 0
+
+        @asynccontextmanager
+        async def make_graph(project_root=None):
+            nonlocal open_sessions, peak
+            open_sessions += 1
+            peak = max(peak, open_sessions)
+            try:
+                yield FakeAgent({"slow": 0.01})
+            finally:
+                open_sessions -= 1
+
+        items = [BatchItem(index=i, prompt="slow", project_root=f"/p{i}") for i in range(6)]
+        output = io.StringIO()
+        with patch("omni_task_agent.batch.make_graph", make_graph):
+            summary = await run_batch(items, output, workers=2)
+        assert peak == 2
+        assert summary["ok"] == 6
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported(self):
+        """Test a failing prompt and a failing session become error lines"""
+        @asynccontextmanager
+        async def make_graph(project_root=None):
+            if project_root == "/broken":
+                raise RuntimeError("shrimp not found")
+            yield FakeAgent({})
+
+        items = [
+            BatchItem(index=0, prompt="fail", project_root="/a"),
+            BatchItem(index=1, prompt="ok", project_root="/a"),
+            BatchItem(index=2, prompt="ok", project_root="/broken"),
+        ]
+        output = io.StringIO()
+        with patch("omni_task_agent.batch.make_graph", make_graph):
+            summary = await run_batch(items, output, workers=2)
+
+        results = {r["index"]: r for r in map(json.loads, output.getvalue().splitlines())}
+        assert results[0]["error"] == "model unavailable"
+        assert results[1]["status"] == "ok"
+        assert "shrimp not found" in results[2]["error"]
+        assert summary["error"] == 2
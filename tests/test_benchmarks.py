@@ -0,0 +1,93 @@
+"""
+Benchmark Harness Tests
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from benchmarks.bench_agent import compare, percentile, run
+from benchmarks.fake_llm import ScriptedChatModel
+from omni_task_agent.resolver import reset_shrimp_resolution
+
+
+class TestScriptedChatModel:
+    """Fake chat model test class"""
+
+    def test_follows_script_then_answers(self):
+        """Test the model calls each scripted tool once, then answers"""
+        model = ScriptedChatModel(script=[("list_tasks", {"status": "all"}), ("get_task_detail", {"taskId": "1"})])
+        messages = [HumanMessage(content="show task 1")]
+
+        first = model.invoke(messages)
+        assert first.tool_calls[0]["name"] == "list_tasks"
+        messages += [first, ToolMessage(content="[]", tool_call_id=first.tool_calls[0]["id"])]
+
+        second = model.invoke(messages)
+        assert second.tool_calls[0]["args"] == {"taskId": "1"}
+        messages += [second, ToolMessage(content="{}", tool_call_id=second.tool_calls[0]["id"])]
+
+        final = model.invoke(messages)
+        assert not final.tool_calls
+        assert final.content.startswith("Done after 2 tool calls")
+        assert final.usage_metadata["total_tokens"] > 0
+
+    def test_new_user_message_restarts_script(self):
+        """Test only tool results after the latest user message count"""
+        model = ScriptedChatModel()
+        messages = [HumanMessage(content="a"), ToolMessage(content="[]", tool_call_id="1"), HumanMessage(content="b")]
+        assert model.invoke(messages).tool_calls
+
+
+class TestBenchAgent:
+    """Benchmark harness test class"""
+
+    def test_percentile(self):
+        """Test interpolated percentiles"""
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+        assert percentile([], 95) == 0.0
+
+    def test_compare(self):
+        """Test regressions are reported per scenario and concurrency"""
+        def report(p50, rps):
+            stats = {"p50": p50, "p95": p50, "p99": p50}
+            return {"scenarios": {"agent": {"runs": [{"concurrency": 1, "latency_seconds": stats, "throughput_rps": rps}]}}}
+
+        lines = compare(report(0.010, 100.0), report(0.020, 50.0))
+        assert "agent c=1 p50: 10.0 -> 20.0 ms (+100.0%)" in lines
+        assert "agent c=1 throughput: 100.0 -> 50.0 req/s (-50.0%)" in lines
+
+    @pytest.mark.integration
+    @patch.dict(os.environ, {})
+    def test_offline_run(self):
+        """Test an offline run against the fake shrimp server produces a full report"""
+        try:
+            report = run(scenarios=["agent", "direct"], total=3, levels=[2], interval=0.05, include_cold_start=False)
+        finally:
+            reset_shrimp_resolution()
+
+        for scenario in ("agent", "direct"):
+            result = report["scenarios"][scenario]
+            (load,) = result["runs"]
+            assert load["errors"] == 0
+            assert load["latency_seconds"]["count"] == 3
+            assert load["throughput_rps"] > 0
+            assert result["rss"]["samples"]
+
+
+class TestBenchTaskAPI:
+    """Task API load test class"""
+
+    @pytest.mark.integration
+    def test_local_service_run(self):
+        """Test the load test runs against a local task service and pipelines concurrent calls"""
+        from benchmarks.bench_task_api import run as run_api
+
+        report = run_api(tasks=5, total=8, levels=[4])
+        pipelined = report["modes"]["pipelined"]
+        assert pipelined["runs"][0]["errors"] == 0
+        assert pipelined["client"]["requests"] < pipelined["client"]["calls"]
+        assert report["modes"]["unbatched"]["client"]["batched_calls"] == 0
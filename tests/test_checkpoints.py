@@ -0,0 +1,124 @@
+"""
+Thread Checkpoints Tests
+"""
+import os
+import sqlite3
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from omni_task_agent.checkpoints import CHECKPOINTS_FILE, ProjectCheckpointer, SqliteCheckpointSaver
+from omni_task_agent.tools import bind_tool_context
+
+
+def make_graph(checkpointer):
+    """Echo graph answering with the number of messages it has seen"""
+    def reply(state):
+        return {"messages": [AIMessage(content=f"seen {len(state['messages'])}")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def thread(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / CHECKPOINTS_FILE), keep_last=3)
+    yield saver
+    saver.close()
+
+
+class TestSqliteCheckpointSaver:
+    """SQLite checkpointer test class"""
+
+    def test_thread_resumes_with_new_message_only(self, saver):
+        """A follow-up request sends one message and the graph sees the whole conversation"""
+        graph = make_graph(saver)
+        graph.invoke({"messages": [HumanMessage("first")]}, thread("a"))
+        result = graph.invoke({"messages": [HumanMessage("second")]}, thread("a"))
+
+        assert [message.content for message in result["messages"]] == ["first", "seen 1", "second", "seen 3"]
+        other = graph.invoke({"messages": [HumanMessage("hello")]}, thread("b"))
+        assert other["messages"][-1].content == "seen 1"
+
+    def test_state_survives_reopen(self, saver, tmp_path):
+        """Threads are read back from the file by a new saver"""
+        make_graph(saver).invoke({"messages": [HumanMessage("first")]}, thread("a"))
+        reopened = SqliteCheckpointSaver(str(tmp_path / CHECKPOINTS_FILE))
+        try:
+            state = make_graph(reopened).get_state(thread("a"))
+            assert [message.content for message in state.values["messages"]] == ["first", "seen 1"]
+        finally:
+            reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_async_api(self, saver):
+        """The async graph API uses the same store"""
+        graph = make_graph(saver)
+        await graph.ainvoke({"messages": [HumanMessage("first")]}, thread("a"))
+        result = await graph.ainvoke({"messages": [HumanMessage("second")]}, thread("a"))
+        assert result["messages"][-1].content == "seen 3"
+        assert len([item async for item in saver.alist(thread("a"))]) == 3
+
+    def test_prunes_old_checkpoints_and_blobs(self, saver):
+        """Only the newest keep_last checkpoints and the values they use are kept"""
+        graph = make_graph(saver)
+        for turn in range(5):
+            graph.invoke({"messages": [HumanMessage(f"turn {turn}")]}, thread("a"))
+
+        assert len(list(saver.list(thread("a")))) == 3
+        assert graph.get_state(thread("a")).values["messages"][-1].content == "seen 9"
+        blobs = saver._conn.execute("SELECT COUNT(*) FROM blobs WHERE channel='messages'").fetchone()[0]
+        assert blobs <= 3
+
+    def test_prunes_expired_threads(self, saver):
+        """Threads idle longer than max_age_days are deleted"""
+        make_graph(saver).invoke({"messages": [HumanMessage("old")]}, thread("old"))
+        make_graph(saver).invoke({"messages": [HumanMessage("new")]}, thread("new"))
+        saver._conn.execute("UPDATE checkpoints SET created_at=? WHERE thread_id='old'", (time.time() - 40 * 86400,))
+
+        assert saver.prune_expired() == ["old"]
+        assert saver.get_tuple(thread("old")) is None
+        assert saver.get_tuple(thread("new")) is not None
+
+    def test_large_values_are_compressed(self, saver):
+        """Long message histories are stored compressed"""
+        make_graph(saver).invoke({"messages": [HumanMessage("x" * 5000)]}, thread("a"))
+        type_, size = saver._conn.execute(
+            "SELECT type, LENGTH(blob) FROM blobs WHERE channel='messages' ORDER BY LENGTH(blob) DESC LIMIT 1"
+        ).fetchone()
+        assert type_.endswith("+zlib")
+        assert size < 1000
+
+
+class TestProjectCheckpointer:
+    """Per-project checkpointer test class"""
+
+    def test_threads_stored_per_data_dir(self, tmp_path):
+        """The bound project's data directory holds its threads"""
+        checkpointer = ProjectCheckpointer()
+        graph = make_graph(checkpointer)
+        try:
+            for project in ("a", "b"):
+                with bind_tool_context(str(tmp_path / project), []):
+                    graph.invoke({"messages": [HumanMessage(project)]}, thread("chat"))
+            with bind_tool_context(str(tmp_path / "a"), []):
+                state = graph.get_state(thread("chat"))
+        finally:
+            checkpointer.close()
+
+        assert [message.content for message in state.values["messages"]] == ["a", "seen 1"]
+        assert os.path.exists(tmp_path / "b" / CHECKPOINTS_FILE)
+
+    def test_requires_project(self):
+        """Without a bound project there is nowhere to store the thread"""
+        with pytest.raises(RuntimeError):
+            make_graph(ProjectCheckpointer()).invoke({"messages": [HumanMessage("hi")]}, thread("chat"))
@@ -1,8 +1,11 @@
 """
 CLI Module Tests
 """
+import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from langchain_core.messages import AIMessage, AIMessageChunk
 
 from omni_task_agent.cli import main, async_main
 
@@ -63,6 +66,150 @@ class TestCLI:
         mock_setup_env.assert_called_once()
         assert mock_input.call_count == 2
     
+    @pytest.mark.asyncio
+    @patch.dict("os.environ", {"HISTORY_MAX_TOKENS": "8", "HISTORY_STRATEGY": "sliding_window", "STREAM_OUTPUT": "false"})
+    @patch("omni_task_agent.cli.input", side_effect=["first " * 40, "second", "exit"])
+    @patch("omni_task_agent.cli.make_graph")
+    @patch("omni_task_agent.cli.setup_environment")
+    async def test_async_main_history_window(self, mock_setup_env, mock_make_graph, mock_input):
+        """Test CLI main function - Only the budgeted history window is sent"""
+        # Setup mocks
+        mock_agent_context = MagicMock()
+        mock_agent_context.ainvoke = AsyncMock(return_value={"messages": [AIMessage(content="ok")]})
+        mock_make_graph.return_value.__aenter__.return_value = mock_agent_context
+        
+        # Execute test
+        await async_main()
+        
+        # The long first turn no longer fits the budget on the second call
+        sent = mock_agent_context.ainvoke.call_args_list[-1].args[0]["messages"]
+        assert [m.content for m in sent] == ["second"]
+    
+    @pytest.mark.asyncio
+    @patch.dict("os.environ", {"STREAM_OUTPUT": "true"})
+    @patch("omni_task_agent.cli.input", side_effect=["list tasks", "exit"])
+    @patch("omni_task_agent.cli.make_graph")
+    @patch("omni_task_agent.cli.setup_environment")
+    async def test_async_main_streaming(self, mock_setup_env, mock_make_graph, mock_input, capsys):
+        """Test CLI main function - Tokens and tool progress are printed as they stream"""
+        final_state = {"messages": [AIMessage(content="Two tasks")]}
+        
+        async def fake_events(inputs, config=None, version=None):
+            yield {"event": "on_tool_start", "name": "list_tasks", "run_id": "t1", "data": {"input": {}}}
+            yield {"event": "on_tool_end", "name": "list_tasks", "run_id": "t1", "data": {"output": "[]"}}
+            for token in ["Two ", "tasks"]:
+                yield {"event": "on_chat_model_stream", "run_id": "m1", "data": {"chunk": AIMessageChunk(content=token)}}
+            yield {"event": "on_chain_end", "run_id": "g1", "parent_ids": [], "data": {"output": final_state}}
+        
+        # Setup mocks
+        mock_agent_context = MagicMock()
+        mock_agent_context.astream_events = fake_events
+        mock_make_graph.return_value.__aenter__.return_value = mock_agent_context
+        
+        # Execute test
+        await async_main()
+        
+        output = capsys.readouterr().out
+        assert "calling list_tasks" in output
+        assert "Assistant: Two tasks" in output
+        assert output.count("Two tasks") == 1
+        mock_agent_context.ainvoke.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch.dict("os.environ", {"STREAM_OUTPUT": "true"})
+    @patch("omni_task_agent.cli.input", side_effect=["list tasks", "exit"])
+    @patch("omni_task_agent.cli.make_graph")
+    @patch("omni_task_agent.cli.setup_environment")
+    async def test_async_main_streaming_retried_answer(self, mock_setup_env, mock_make_graph, mock_input, capsys):
+        """Test CLI main function - An answer from a retried, unstreamed model call is still printed"""
+        final_state = {"messages": [AIMessage(content="Two tasks")]}
+        
+        async def fake_events(inputs, config=None, version=None):
+            # The first attempt streams a token and times out; the retry streams nothing
+            yield {"event": "on_chat_model_stream", "run_id": "m1", "data": {"chunk": AIMessageChunk(content="Tw")}}
+            yield {"event": "on_chain_end", "run_id": "g1", "parent_ids": [], "data": {"output": final_state}}
+        
+        mock_agent_context = MagicMock()
+        mock_agent_context.astream_events = fake_events
+        mock_make_graph.return_value.__aenter__.return_value = mock_agent_context
+        
+        await async_main()
+        
+        assert "Assistant: Two tasks" in capsys.readouterr().out
+    
+    @patch("omni_task_agent.cli.close_session_pool", new_callable=AsyncMock)
+    @patch("omni_task_agent.cli.make_graph")
+    @patch("omni_task_agent.cli.setup_environment")
+    def test_run_command(self, mock_setup_env, mock_make_graph, mock_close, capsys):
+        """Test `ota run` answers one prompt as JSON"""
+        mock_agent_context = MagicMock()
+        mock_agent_context.ainvoke = AsyncMock(return_value={"messages": [AIMessage(content="Two tasks")]})
+        mock_make_graph.return_value.__aenter__.return_value = mock_agent_context
+        
+        with patch("sys.argv", ["ota", "run", "list tasks", "--json", "--project-root", "/p"]):
+            main()
+        
+        result = json.loads(capsys.readouterr().out)
+        assert result["status"] == "ok" and result["output"] == "Two tasks"
+        mock_make_graph.assert_called_once_with("/p")
+        mock_close.assert_awaited_once()
+    
+    @patch("omni_task_agent.batch.make_graph")
+    @patch("omni_task_agent.cli.close_session_pool", new_callable=AsyncMock)
+    @patch("omni_task_agent.cli.setup_environment")
+    def test_batch_command(self, mock_setup_env, mock_close, mock_make_graph, tmp_path):
+        """Test `ota batch` writes one JSON line per prompt"""
+        mock_agent_context = MagicMock()
+        mock_agent_context.ainvoke = AsyncMock(return_value={"messages": [AIMessage(content="done")]})
+        mock_make_graph.return_value.__aenter__.return_value = mock_agent_context
+        prompts = tmp_path / "prompts.jsonl"
+        prompts.write_text('"first"\n{"prompt": "second", "id": "x"}\n')
+        results = tmp_path / "results.jsonl"
+        
+        with patch("sys.argv", ["ota", "batch", str(prompts), "-w", "2", "-o", str(results)]):
+            main()
+        
+        lines = [json.loads(line) for line in results.read_text().splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1]
+        assert all(line["output"] == "done" for line in lines)
+        mock_make_graph.assert_called_once()
+    
+    @patch("omni_task_agent.cli.setup_environment")
+    def test_batch_command_invalid_file(self, mock_setup_env, tmp_path):
+        """Test `ota batch` exits with an error for malformed input"""
+        prompts = tmp_path / "prompts.jsonl"
+        prompts.write_text("{oops\n")
+        with patch("sys.argv", ["ota", "batch", str(prompts)]):
+            with pytest.raises(SystemExit) as exc:
+                main()
+        assert exc.value.code == 2
+    
+    @patch("omni_task_agent.cli.setup_environment")
+    def test_import_export_commands(self, mock_setup_env, tmp_path, sample_task_json, capsys):
+        """Test `ota import` and `ota export` move tasks without the LLM and report rows/s"""
+        from omni_task_agent.dependencies import clear_dependency_graphs
+        
+        source = tmp_path / "tasks.jsonl"
+        source.write_text(json.dumps(sample_task_json) + "\n")
+        exported = tmp_path / "tasks.csv"
+        try:
+            with patch("sys.argv", ["ota", "import", str(source), "--project-root", str(tmp_path)]):
+                main()
+            assert "Imported 1 rows (1 created, 0 updated, 0 rejected)" in capsys.readouterr().err
+            with patch("sys.argv", ["ota", "export", str(exported), "--data-dir", str(tmp_path / "data")]):
+                main()
+            assert "rows/s" in capsys.readouterr().err
+        finally:
+            clear_dependency_graphs()
+        assert exported.read_text().splitlines()[1].startswith("1,Test Task,")
+        
+        source.write_text('{"id": "2"}\n')
+        with patch("sys.argv", ["ota", "import", str(source), "--project-root", str(tmp_path)]):
+            with pytest.raises(SystemExit) as exc:
+                main()
+        assert exc.value.code == 1
+        clear_dependency_graphs()
+    
     @patch("omni_task_agent.cli.asyncio.run")
     def test_main(self, mock_run):
         """Test main function"""
@@ -0,0 +1,206 @@
+"""
+Dependency Engine Module Tests
+"""
+import json
+import os
+
+import pytest
+
+from omni_task_agent.dependencies import (
+    DependencyCycleError,
+    DependencyGraph,
+    check_dependency,
+    clear_dependency_graphs,
+    critical_path,
+    get_dependency_graph,
+    get_task_store,
+    make_dependency_tools,
+    ready_tasks,
+)
+from omni_task_agent.tools import bind_tool_context
+from omni_task_agent.utils.state import Task, TaskCollection, TaskStore
+
+
+@pytest.fixture
+def graph():
+    """Graph over 1 <- 2 <- 4 and 1 <- 3, with 5 independent"""
+    collection = TaskCollection(tasks=[
+        Task(id="1", title="Design", priority="low"),
+        Task(id="2", title="Build", dependencies=["1"]),
+        Task(id="3", title="Docs", dependencies=["1"]),
+        Task(id="4", title="Release", dependencies=["2", "3"]),
+        Task(id="5", title="Triage", priority="high"),
+    ])
+    return DependencyGraph(collection)
+
+
+@pytest.fixture(autouse=True)
+def reset_graphs():
+    clear_dependency_graphs()
+    yield
+    clear_dependency_graphs()
+
+
+def ready_ids(graph):
+    return [task.id for task in graph.ready()]
+
+
+class TestDependencyGraph:
+    """Dependency graph test class"""
+
+    def test_initial_ready_set(self, graph):
+        """Test only tasks without unmet dependencies are ready, by priority"""
+        assert ready_ids(graph) == ["5", "1"]
+        assert graph.unmet_count("4") == 2
+
+    def test_status_changes_update_ready_set(self, graph):
+        """Test completing and reopening a task updates dependents incrementally"""
+        graph.collection["1"].status = "done"
+        assert ready_ids(graph) == ["5", "2", "3"]
+        assert not graph.is_ready("1")
+
+        graph.collection.update("2", status="completed")
+        graph.collection.update("3", status="done")
+        assert graph.is_ready("4")
+
+        graph.collection.update("1", status="in_progress")
+        assert graph.unmet_count("2") == 1
+        assert graph.is_ready("4")
+        assert graph.is_ready("1")
+
+    def test_missing_dependency_counts_as_unmet(self, graph):
+        """Test unknown dependency IDs block until the task exists and is done"""
+        graph.collection.add(Task(id="6", title="Deploy", dependencies=["7"]))
+        assert graph.blockers("6") == ["7"]
+        assert not graph.is_ready("6")
+
+        graph.collection.add(Task(id="7", title="Provision", status="done"))
+        assert graph.is_ready("6")
+
+        graph.collection.remove("7")
+        assert graph.is_ready("6")
+        assert graph.collection["6"].dependencies == ()
+
+    def test_dependency_changes(self, graph):
+        """Test adding and removing edges keeps counts current"""
+        graph.remove_dependency("2", "1")
+        assert graph.is_ready("2")
+        graph.add_dependency("5", "2")
+        assert not graph.is_ready("5")
+        assert graph.blockers("5") == ["2"]
+
+    def test_cycle_rejected_on_insert(self, graph):
+        """Test an edge closing a cycle is rejected and leaves the graph unchanged"""
+        with pytest.raises(DependencyCycleError) as error:
+            graph.add_dependency("1", "4")
+        assert error.value.cycle[0] == "1" and error.value.cycle[-1] == "1"
+        assert graph.collection["1"].dependencies == ()
+        assert graph.is_ready("1")
+
+        with pytest.raises(DependencyCycleError):
+            graph.add_dependency("5", "5")
+
+    def test_cycle_rejected_on_add(self, graph):
+        """Test adding a task whose subtasks wait on each other is rejected"""
+        with pytest.raises(DependencyCycleError):
+            graph.collection.add(Task(id="6", title="Loop", subtasks=[
+                {"id": "6.1", "title": "A", "dependencies": ["6.2"]},
+                {"id": "6.2", "title": "B", "dependencies": ["6.1"]},
+            ]))
+        assert "6" not in graph.collection
+
+    def test_would_create_cycle(self, graph):
+        """Test checking an edge without applying it"""
+        cycle = graph.would_create_cycle("1", "4")
+        assert cycle[:2] == ["1", "4"] and cycle[-1] == "1" and len(cycle) == 4
+        assert graph.would_create_cycle("5", "4") is None
+
+    def test_critical_path(self, graph):
+        """Test the longest chain of remaining work is returned in order"""
+        assert [task.id for task in graph.critical_path()][::2] == ["1", "4"]
+        assert len(graph.critical_path()) == 3
+
+        graph.collection["1"].status = "done"
+        assert len(graph.critical_path()) == 2
+
+    def test_cycles_in_loaded_data(self):
+        """Test cycles present in loaded data are reported rather than rejected"""
+        collection = TaskCollection(tasks=[
+            Task(id="1", title="A", dependencies=["2"]),
+            Task(id="2", title="B", dependencies=["1"]),
+            Task(id="3", title="C"),
+        ])
+        graph = DependencyGraph(collection)
+        assert [sorted(cycle) for cycle in graph.cycles()] == [["1", "2"]]
+        assert [task.id for task in graph.critical_path()] == ["3"]
+
+    def test_close_stops_updates(self, graph):
+        """Test a closed graph no longer follows the collection"""
+        graph.close()
+        graph.collection["1"].status = "done"
+        assert graph.is_ready("1")
+
+
+class TestProjectGraphs:
+    """Project graph loading test class"""
+
+    def test_loads_shrimp_tasks(self, tmp_path):
+        """Test shrimp-task-manager files are converted and re-read when they change"""
+        tasks_file = tmp_path / "tasks.json"
+        tasks_file.write_text(json.dumps({"tasks": [
+            {"id": "a", "name": "First", "status": "completed", "dependencies": []},
+            {"id": "b", "name": "Second", "status": "pending", "dependencies": [{"taskId": "a"}]},
+        ]}))
+        graph = get_dependency_graph(str(tmp_path))
+        assert ready_ids(graph) == ["b"]
+        assert get_dependency_graph(str(tmp_path)) is graph
+
+        tasks_file.write_text(json.dumps({"tasks": [
+            {"id": "a", "name": "First", "status": "pending", "dependencies": []},
+            {"id": "b", "name": "Second", "status": "pending", "dependencies": [{"taskId": "a"}]},
+        ]}))
+        os.utime(tasks_file, ns=(0, 0))
+        assert ready_ids(get_dependency_graph(str(tmp_path))) == ["a"]
+
+    def test_follows_task_store(self, tmp_path):
+        """Test TaskStore collections are preferred and followed without rebuilding"""
+        store = get_task_store(str(tmp_path))
+        store.save(TaskCollection(tasks=[Task(id="1", title="A"), Task(id="2", title="B", dependencies=["1"])]))
+        graph = get_dependency_graph(str(tmp_path))
+
+        collection = graph.collection
+        collection["1"].status = "done"
+        store.save(collection)
+        assert get_dependency_graph(str(tmp_path)) is graph
+        assert ready_ids(graph) == ["2"]
+
+
+class TestDependencyTools:
+    """Dependency agent tools test class"""
+
+    def test_tool_schemas(self):
+        """Test tools are created with argument schemas"""
+        tools = {tool.name: tool for tool in make_dependency_tools()}
+        assert set(tools) == {"ready_tasks", "blocked_tasks", "critical_path", "dependency_cycles", "check_dependency"}
+        assert set(tools["check_dependency"].args) == {"taskId", "dependsOn"}
+
+    @pytest.mark.asyncio
+    async def test_tools_use_bound_data_dir(self, tmp_path):
+        """Test tools answer from the data directory of the bound tool context"""
+        TaskStore(str(tmp_path)).save(TaskCollection(tasks=[
+            Task(id="1", title="A"),
+            Task(id="2", title="B", dependencies=["1"]),
+        ]))
+        with bind_tool_context(str(tmp_path), []):
+            ready = json.loads(await ready_tasks())
+            path = json.loads(await critical_path())
+            check = json.loads(await check_dependency("1", "2"))
+        assert [task["id"] for task in ready["tasks"]] == ["1"]
+        assert path["length"] == 2
+        assert check == {"allowed": False, "cycle": ["1", "2", "1"]}
+
+    @pytest.mark.asyncio
+    async def test_tools_need_context(self):
+        """Test tools fail clearly outside a make_graph context"""
+        with pytest.raises(RuntimeError):
+            await ready_tasks()
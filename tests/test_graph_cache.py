@@ -0,0 +1,184 @@
+"""
+Graph Cache Module Tests
+"""
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from langchain_core.tools import StructuredTool
+
+from omni_task_agent.graph_cache import GraphCache, tool_fingerprint
+
+
+def make_tool(name, description="A tool", schema=None):
+    """Create a tool with a JSON schema like the MCP adapters produce"""
+    async def call_tool(**arguments):
+        return f"{name} called", None
+
+    return StructuredTool(
+        name=name,
+        description=description,
+        args_schema=schema or {"type": "object", "properties": {"id": {"type": "string"}}},
+        coroutine=call_tool,
+        response_format="content_and_artifact",
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_provider_keys(monkeypatch):
+    """Build the plain ChatOpenAI client regardless of the API keys in the environment"""
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+
+class TestGraphCache:
+    """Graph Cache Test Class"""
+
+    def test_fingerprint_is_order_independent(self):
+        """Tool order does not change the fingerprint"""
+        tools = [make_tool("list_tasks"), make_tool("get_task_detail")]
+        assert tool_fingerprint(tools) == tool_fingerprint(list(reversed(tools)))
+
+    def test_fingerprint_tracks_schema_changes(self):
+        """A changed argument schema produces a new fingerprint"""
+        before = [make_tool("list_tasks")]
+        after = [make_tool("list_tasks", schema={"type": "object", "properties": {"status": {"type": "string"}}})]
+        assert tool_fingerprint(before) != tool_fingerprint(after)
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langgraph.prebuilt.create_react_agent")
+    @patch("langchain_openai.ChatOpenAI")
+    def test_graph_built_once_per_configuration(self, mock_chat, mock_create):
+        """Same model and tool schemas reuse the compiled graph and LLM"""
+        mock_create.side_effect = lambda **kwargs: MagicMock()
+        cache = GraphCache()
+
+        first = cache.get_graph([make_tool("list_tasks")])
+        second = cache.get_graph([make_tool("list_tasks")])
+
+        assert first is second
+        assert mock_create.call_count == 1
+        assert mock_chat.call_count == 1
+        assert cache.stats == {"hits": 1, "misses": 1}
+
+    @patch("langchain_openai.ChatOpenAI")
+    def test_sampling_settings_passed(self, mock_chat):
+        """TEMPERATURE and MAX_TOKENS reach the chat model"""
+        with patch.dict(os.environ, {"LLM_MODEL": "test-model", "TEMPERATURE": "0.7", "MAX_TOKENS": "1234"}):
+            GraphCache().get_llm()
+        assert mock_chat.call_args.kwargs["temperature"] == 0.7
+        assert mock_chat.call_args.kwargs["max_tokens"] == 1234
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langgraph.prebuilt.create_react_agent")
+    def test_set_llm_rebuilds_graph(self, mock_create):
+        """An injected model replaces the configured one and drops stale graphs"""
+        mock_create.side_effect = lambda **kwargs: MagicMock()
+        cache = GraphCache()
+        fake = MagicMock()
+
+        cache.set_llm(MagicMock())
+        first = cache.get_graph([make_tool("list_tasks")])
+        cache.set_llm(fake)
+        second = cache.get_graph([make_tool("list_tasks")])
+
+        assert first is not second
+        assert cache.get_llm() is fake
+        # The model is wrapped for per-call tool routing and for deadlines and retries
+        assert mock_create.call_args.kwargs["model"].model.model is fake
+        with patch.dict(os.environ, {"TOOL_ROUTER": "false", "LLM_RESILIENCE": "false"}):
+            cache.invalidate()
+            cache.set_llm(fake)
+            cache.get_graph([make_tool("list_tasks")])
+        assert mock_create.call_args.kwargs["model"] is fake
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langgraph.prebuilt.create_react_agent")
+    @patch("langchain_openai.ChatOpenAI")
+    def test_new_model_builds_new_graph(self, mock_chat, mock_create):
+        """Changing LLM_MODEL yields a separate cache entry"""
+        mock_create.side_effect = lambda **kwargs: MagicMock()
+        cache = GraphCache()
+        tools = [make_tool("list_tasks")]
+
+        first = cache.get_graph(tools)
+        with patch.dict(os.environ, {"LLM_MODEL": "other-model"}):
+            second = cache.get_graph(tools)
+
+        assert first is not second
+        assert mock_chat.call_count == 2
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langchain_openai.ChatOpenAI")
+    def test_changed_settings_build_new_llm(self, mock_chat):
+        """Changing a sampling or routing setting at runtime replaces the cached LLM"""
+        cache = GraphCache()
+        first = cache.get_llm()
+        assert cache.get_llm() is first
+
+        for env in ({"TEMPERATURE": "0.9"}, {"MAX_TOKENS": "10"}, {"LLM_CACHE": "false"}, {"MODEL_ROUTER": "false"}):
+            mock_chat.return_value = MagicMock()
+            with patch.dict(os.environ, env):
+                assert cache.get_llm() is not first
+        assert cache.get_llm() is first
+        assert mock_chat.call_count == 5
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langgraph.prebuilt.create_react_agent")
+    @patch("langchain_openai.ChatOpenAI")
+    def test_changed_graph_settings_build_new_graph(self, mock_chat, mock_create):
+        """Changing a setting read while building the graph rebuilds it around the same LLM"""
+        mock_create.side_effect = lambda **kwargs: MagicMock()
+        cache = GraphCache()
+        tools = [make_tool("list_tasks")]
+        first = cache.get_graph(tools)
+
+        for env in ({"LLM_RETRIES": "5"}, {"LLM_RESILIENCE": "false"}, {"TOOL_ROUTER": "false"}):
+            with patch.dict(os.environ, env):
+                assert cache.get_graph(tools) is not first
+        assert cache.get_graph(tools) is first
+        assert mock_chat.call_count == 1
+
+    @patch.dict(os.environ, {"LLM_MODEL": "test-model"})
+    @patch("langgraph.prebuilt.create_react_agent")
+    @patch("langchain_openai.ChatOpenAI")
+    def test_invalidate(self, mock_chat, mock_create):
+        """Invalidation forces a rebuild"""
+        mock_create.side_effect = lambda **kwargs: MagicMock()
+        cache = GraphCache()
+        tools = [make_tool("list_tasks")]
+
+        first = cache.get_graph(tools)
+        cache.invalidate(model="test-model")
+        second = cache.get_graph(tools)
+
+        assert first is not second
+        assert mock_create.call_count == 2
+
+    @patch("langchain_openai.ChatOpenAI")
+    def test_llm_cache_opt_in(self, mock_chat, tmp_path):
+        """LLM_CACHE=true gives the chat model the persistent response cache"""
+        from omni_task_agent import llm_cache
+
+        with patch.dict(os.environ, {"LLM_MODEL": "test-model"}):
+            GraphCache().get_llm()
+        assert "cache" not in mock_chat.call_args.kwargs
+
+        env = {"LLM_MODEL": "test-model", "LLM_CACHE": "true", "LLM_CACHE_PATH": str(tmp_path / "llm.sqlite")}
+        with patch.dict(os.environ, env), patch.object(llm_cache, "_llm_cache", None):
+            GraphCache().get_llm()
+            cache = mock_chat.call_args.kwargs["cache"]
+            assert cache is llm_cache.get_llm_cache()
+            assert cache.path == str(tmp_path / "llm.sqlite")
+            cache.close()
+
+    @patch("langchain_anthropic.ChatAnthropic")
+    @patch("langchain_openai.ChatOpenAI")
+    def test_routes_between_configured_providers(self, mock_chat, mock_anthropic):
+        """With keys for two providers the LLM is a model router over both"""
+        env = {"LLM_MODEL": "test-model", "OPENAI_API_KEY": "sk-test", "ANTHROPIC_API_KEY": "sk-ant-test"}
+        with patch.dict(os.environ, env):
+            llm = GraphCache().get_llm()
+            assert [c.name for c in llm.router.candidates] == ["openai:test-model", "anthropic:claude-3-5-sonnet-latest"]
+            with patch.dict(os.environ, {"MODEL_ROUTER": "false"}):
+                assert GraphCache().get_llm() is mock_chat.return_value
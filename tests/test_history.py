@@ -0,0 +1,92 @@
+"""
+History Module Tests
+"""
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from omni_task_agent.history import (
+    SUMMARIZE,
+    SYSTEM_PLUS_LAST_N,
+    HistoryManager,
+)
+
+
+def one_token(message):
+    """Count every message as one token to make budgets easy to reason about"""
+    return 1
+
+
+def add_turns(history, count):
+    for i in range(count):
+        history.add(HumanMessage(content=f"question {i}"))
+        history.add(AIMessage(content=f"answer {i}"))
+
+
+class TestHistoryManager:
+    """History Manager Test Class"""
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_respects_budget(self):
+        """Only the most recent turns that fit are sent"""
+        history = HistoryManager(max_tokens=5, token_counter=one_token)
+        add_turns(history, 5)
+        history.add(HumanMessage(content="latest"))
+
+        window = await history.prepare()
+
+        assert len(window) <= 5
+        assert window[-1].content == "latest"
+        assert isinstance(window[0], HumanMessage)
+
+    @pytest.mark.asyncio
+    async def test_latest_message_always_kept(self):
+        """An oversized latest message is still sent"""
+        history = HistoryManager(max_tokens=1, token_counter=lambda m: 100)
+        add_turns(history, 2)
+        history.add(HumanMessage(content="latest"))
+
+        window = await history.prepare()
+
+        assert [m.content for m in window] == ["latest"]
+
+    @pytest.mark.asyncio
+    async def test_system_plus_last_n(self):
+        """System messages are kept alongside the last N messages"""
+        history = HistoryManager(max_tokens=100, strategy=SYSTEM_PLUS_LAST_N, keep_last=3, token_counter=one_token)
+        history.add(SystemMessage(content="rules"))
+        add_turns(history, 4)
+        history.add(HumanMessage(content="latest"))
+
+        window = await history.prepare()
+
+        assert window[0].content == "rules"
+        assert window[-1].content == "latest"
+        assert len(window) <= 4
+
+    @pytest.mark.asyncio
+    async def test_summarize_folds_old_turns_into_memo(self):
+        """Turns outside the window become a memo system message"""
+        calls = []
+
+        async def summarizer(messages, previous_memo):
+            calls.append(len(messages))
+            return "memo of earlier turns"
+
+        history = HistoryManager(max_tokens=4, strategy=SUMMARIZE, summarizer=summarizer, token_counter=one_token)
+        add_turns(history, 4)
+        history.add(HumanMessage(content="latest"))
+
+        window = await history.prepare()
+
+        assert calls
+        assert isinstance(window[0], SystemMessage)
+        assert "memo of earlier turns" in window[0].content
+        assert window[-1].content == "latest"
+        assert history.memo == "memo of earlier turns"
+        assert len(history.messages) < 9
+
+    def test_unknown_strategy(self):
+        """Invalid strategies are rejected"""
+        with pytest.raises(ValueError):
+            HistoryManager(strategy="everything")
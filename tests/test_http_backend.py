@@ -0,0 +1,151 @@
+"""
+HTTP Task Backend Module Tests
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from omni_task_agent.agent import call_tool, list_tools
+from omni_task_agent.backends import register_backend
+from omni_task_agent.dependencies import clear_dependency_graphs
+from omni_task_agent.http_backend import HttpBackend, TaskAPIClient, TaskAPIError, project_id
+from omni_task_agent.task_api import create_app
+from omni_task_agent.tool_cache import get_tool_cache
+
+
+@pytest.fixture
+def service(tmp_path):
+    """ASGI transport to a reference task service storing projects under tmp_path"""
+    clear_dependency_graphs()
+    get_tool_cache().invalidate()
+    yield httpx.ASGITransport(app=create_app(str(tmp_path / "service")))
+    clear_dependency_graphs()
+    get_tool_cache().invalidate()
+
+
+@pytest.fixture
+def backend(service, monkeypatch):
+    """HTTP backend selected with TASK_BACKEND"""
+    backend = HttpBackend(TaskAPIClient(base_url="http://test", transport=service, batch_window=0.005))
+    register_backend("test-http", lambda: backend)
+    monkeypatch.setenv("TASK_BACKEND", "test-http")
+    return backend
+
+
+class TestProjectId:
+    """Project naming test class"""
+
+    def test_project_id(self):
+        """Test project IDs are URL safe, readable and distinct per path"""
+        first = project_id("/home/me/My Project/data")
+        assert first.startswith("My-Project-")
+        assert first != project_id("/srv/My Project/data")
+        assert first == project_id("/home/me/My Project/data/")
+
+
+class TestTaskAPIClient:
+    """Pooled pipelining client test class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_a_request(self, service):
+        """Test calls issued together are sent as one bulk request and answered in order"""
+        client = TaskAPIClient(base_url="http://test", transport=service, batch_window=0.005)
+        await client.call("demo", "split_tasks", {"updateMode": "append", "tasks": [{"name": "A"}, {"name": "B"}]})
+        outputs = await asyncio.gather(*(client.call("demo", "query_task", {"query": q}) for q in ("A", "B", "A")))
+        await client.close()
+
+        assert [json.loads(output)["tasks"][0]["name"] for output in outputs] == ["A", "B", "A"]
+        assert client.stats["requests"] == 2
+        assert client.stats["largest_batch"] == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_limit_and_unbatched_mode(self, service):
+        """Test batches are capped and a zero window sends every call on its own"""
+        client = TaskAPIClient(base_url="http://test", transport=service, batch_window=1.0, batch_max=2)
+        await asyncio.gather(*(client.call("demo", "list_tasks", {}) for _ in range(4)))
+        assert client.stats["requests"] == 2
+
+        unbatched = TaskAPIClient(base_url="http://test", transport=service, batch_window=0)
+        await asyncio.gather(*(unbatched.call("demo", "list_tasks", {}) for _ in range(3)))
+        assert unbatched.stats == {"requests": 3, "calls": 3, "batched_calls": 0, "largest_batch": 1}
+        await client.close()
+        await unbatched.close()
+
+    @pytest.mark.asyncio
+    async def test_errors(self, service):
+        """Test rejected calls raise TaskAPIError without failing their batch neighbours"""
+        client = TaskAPIClient(base_url="http://test", transport=service, batch_window=0.005)
+        results = await asyncio.gather(
+            client.call("demo", "list_tasks", {}),
+            client.call("demo", "missing_tool", {}),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], TaskAPIError)
+        assert json.loads(results[0])["tasks"] == []
+        with pytest.raises(TaskAPIError):
+            await client.call("demo", "missing_tool", {})
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_results_fail_their_calls(self):
+        """Test calls left without a result by a short response fail instead of hanging"""
+        def handler(request):
+            return httpx.Response(200, json={"results": [{"result": "first"}]})
+
+        client = TaskAPIClient(base_url="http://test", transport=httpx.MockTransport(handler), batch_window=0.005)
+        results = await asyncio.wait_for(asyncio.gather(
+            *(client.call("demo", "list_tasks", {}) for _ in range(3)),
+            return_exceptions=True,
+        ), 5)
+        await client.close()
+
+        assert results[0] == "first"
+        assert all(isinstance(result, TaskAPIError) for result in results[1:])
+
+    def test_client_of_finished_loop_is_closed(self):
+        """Test a new event loop closes the previous loop's connection pool"""
+        client = TaskAPIClient(base_url="http://test", transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+        assert asyncio.run(client.health())
+        first = client._http
+        assert asyncio.run(client.health())
+
+        assert first.is_closed
+        assert client._http is not first and not client._http.is_closed
+        asyncio.run(client.close())
+
+    @pytest.mark.asyncio
+    async def test_bulk_tasks(self, service, sample_task_json):
+        """Test bulk task writes and reads"""
+        client = TaskAPIClient(base_url="http://test", transport=service)
+        assert (await client.put_tasks("demo", [sample_task_json]))["created"] == 1
+        tasks = await client.get_tasks("demo", ["1.1", "missing"])
+        assert tasks[0]["name"] == "Subtask 1" and tasks[1] is None
+        await client.close()
+
+
+class TestHttpBackend:
+    """HTTP backend test class"""
+
+    @pytest.mark.asyncio
+    async def test_agent_tools_from_service(self, backend, tmp_path):
+        """Test the agent's tools come from the service, dependency tools included once"""
+        root = str(tmp_path / "project")
+        names = [schema["name"] for schema in await list_tools(root)]
+        assert "split_tasks" in names
+        assert names.count("ready_tasks") == 1
+
+        await call_tool("split_tasks", {"updateMode": "append", "tasks": [{"name": "Remote"}]}, root)
+        listed = json.loads(await call_tool("list_tasks", {}, root))
+        assert [task["name"] for task in listed["tasks"]] == ["Remote"]
+        ready = json.loads(await call_tool("ready_tasks", {}, root))
+        assert [task["title"] for task in ready["tasks"]] == ["Remote"]
+        assert backend.metrics()["calls"] == 3
+        await backend.client.close()
+
+    def test_preflight_fails_fast(self):
+        """Test an unreachable service is reported at startup"""
+        backend = HttpBackend(TaskAPIClient(base_url="http://127.0.0.1:9"))
+        with pytest.raises(ConnectionError):
+            backend.preflight()
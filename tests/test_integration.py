@@ -15,8 +15,8 @@ class TestIntegration:
     """Integration Test Class"""
     
     @pytest.mark.asyncio
-    @patch("task_master_agent.agent.MultiServerMCPClient")
-    @patch("task_master_agent.agent.ChatOpenAI")
+    @patch("langchain_mcp_adapters.client.MultiServerMCPClient")
+    @patch("langchain_openai.ChatOpenAI")
     async def test_create_task_mocked(self, mock_chat, mock_client):
         """Test mocked task creation process"""
         # Mock task creation
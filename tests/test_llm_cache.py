@@ -0,0 +1,95 @@
+"""
+LLM Response Cache Tests
+"""
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from omni_task_agent.llm_cache import LLMResponseCache, make_key
+
+
+def generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.sqlite"), ttl=60, max_mb=1)
+    yield cache
+    cache.close()
+
+
+class TestLLMResponseCache:
+    """LLM response cache test class"""
+
+    def test_replays_identical_calls(self, cache):
+        """A repeated prompt is answered from the cache without calling the model"""
+        model = FakeListChatModel(responses=["first", "second"], cache=cache)
+        assert model.invoke([HumanMessage("list tasks")]).content == "first"
+        assert model.invoke([HumanMessage("list tasks")]).content == "first"
+        assert model.invoke([HumanMessage("plan a feature")]).content == "second"
+        assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_async_calls_share_cache(self, cache):
+        """The async model API reads entries written by sync calls"""
+        model = FakeListChatModel(responses=["first", "second"], cache=cache)
+        model.invoke([HumanMessage("list tasks")])
+        result = await model.ainvoke([HumanMessage("list tasks")])
+        assert result.content == "first"
+
+    def test_key_ignores_message_ids(self):
+        """Message IDs and provider metadata do not change the key"""
+        from langchain_core.load import dumps
+
+        first = dumps([HumanMessage("hi"), AIMessage("hello", id="run-1", response_metadata={"x": 1})])
+        second = dumps([HumanMessage("hi"), AIMessage("hello", id="run-2")])
+        assert make_key(first, "model") == make_key(second, "model")
+        assert make_key(first, "model") != make_key(first, "other-model")
+
+    def test_entries_expire(self, cache):
+        """Entries older than the TTL are misses"""
+        cache.update("prompt", "model", generation("old"))
+        cache._conn.execute("UPDATE responses SET created_at=?", (time.time() - 120,))
+        assert cache.lookup("prompt", "model") is None
+        assert cache.stats["expired"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Over the size limit the least recently read entries go first"""
+        cache = LLMResponseCache(path=str(tmp_path / "small.sqlite"), ttl=0, max_mb=0.01)
+        # Incompressible, about 4.5 KB stored: two entries fit the 10 KB limit, three do not
+        payload = base64.b64encode(os.urandom(4500)).decode()
+        try:
+            cache.update("a", "model", generation(payload + "a"))
+            cache.update("b", "model", generation(payload + "b"))
+            cache.lookup("a", "model")
+            cache.update("c", "model", generation(payload + "c"))
+
+            assert cache.lookup("b", "model") is None
+            assert cache.lookup("a", "model")[0].message.content.endswith("a")
+            assert cache.stats["evictions"] >= 1
+        finally:
+            cache.close()
+
+    def test_concurrent_use(self, cache, tmp_path):
+        """Threads and a second connection to the same file read and write safely"""
+        other = LLMResponseCache(path=cache.path, ttl=60, max_mb=1)
+
+        def work(i):
+            target = cache if i % 2 else other
+            target.update(f"prompt {i}", "model", generation(str(i)))
+            return target.lookup(f"prompt {i}", "model")[0].message.content
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(work, range(40)))
+        finally:
+            other.close()
+        assert results == [str(i) for i in range(40)]
+        assert cache.metrics()["entries"] == 40
@@ -0,0 +1,152 @@
+"""
+Model Router Tests
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from omni_task_agent.model_router import (
+    FAST,
+    ModelCandidate,
+    ModelRouter,
+    ProviderHealth,
+    is_simple_request,
+)
+
+
+class FakeModel:
+    """Chat model stand-in with a fixed delay, optionally failing"""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.tools = None
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return AIMessage(content=self.name)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return AIMessage(content=self.name)
+
+    def bind_tools(self, tools, **kwargs):
+        bound = FakeModel(self.name, self.delay, self.error)
+        bound.tools = [tool for tool in tools]
+        return bound
+
+
+def make_router(*models, tiers=None, timeout=5.0):
+    tiers = tiers or {}
+    candidates = [ModelCandidate(model.name, model, tiers.get(model.name, "primary")) for model in models]
+    return ModelRouter(candidates, ProviderHealth(alpha=0.5, cooldown=30, error_penalty=10), timeout=timeout)
+
+
+class TestProviderHealth:
+    """Provider health test class"""
+
+    def test_ewma_latency_and_errors(self):
+        """Latency and error rate are exponentially weighted"""
+        health = ProviderHealth(alpha=0.5, cooldown=0, error_penalty=10)
+        health.record_success("a", 1.0)
+        health.record_success("a", 3.0)
+        assert health.score("a") == 2.0
+        health.record_failure("a", 0.1)
+        assert health.metrics()["a"]["error_rate"] == 0.5
+        assert health.score("a") == 2.0 * 6
+        assert health.score("untried") == 0.0
+
+
+class TestModelRouter:
+    """Model router test class"""
+
+    @pytest.mark.asyncio
+    async def test_prefers_fastest_provider(self):
+        """After both providers are measured the faster one gets the calls"""
+        slow, fast = FakeModel("slow", delay=0.05), FakeModel("quick", delay=0.0)
+        runnable = make_router(slow, fast).as_runnable()
+        for _ in range(4):
+            result = await runnable.ainvoke([HumanMessage("plan the release")])
+        assert result.content == "quick"
+        assert slow.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_on_error(self):
+        """A failing provider is skipped for the next one and then cooled down"""
+        broken, backup = FakeModel("broken", error=RuntimeError("rate limited")), FakeModel("backup")
+        router = make_router(broken, backup)
+        runnable = router.as_runnable()
+
+        assert (await runnable.ainvoke([HumanMessage("hi")])).content == "backup"
+        assert (await runnable.ainvoke([HumanMessage("hi")])).content == "backup"
+        assert broken.calls == 1
+        assert router.stats["fallbacks"] == 1
+        assert router.health.metrics()["broken"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_on_timeout(self):
+        """A provider that exceeds the timeout counts as failed"""
+        stuck, backup = FakeModel("stuck", delay=1.0), FakeModel("backup")
+        router = make_router(stuck, backup, timeout=0.05)
+        result = await router.as_runnable().ainvoke([HumanMessage("hi")])
+        assert result.content == "backup"
+        assert router.health.metrics()["stuck"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_counts_as_timeout(self):
+        """A call cancelled by an outer deadline cools the stuck provider down"""
+        stuck, backup = FakeModel("stuck", delay=1.0), FakeModel("backup")
+        router = make_router(stuck, backup)
+        runnable = router.as_runnable()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(runnable.ainvoke([HumanMessage("hi")]), 0.05)
+
+        assert router.health.metrics()["stuck"]["timeouts"] == 1
+        assert (await runnable.ainvoke([HumanMessage("hi")])).content == "backup"
+
+    def test_default_timeout_below_llm_deadline(self, monkeypatch):
+        """MODEL_ROUTER_TIMEOUT defaults to half of LLM_TIMEOUT"""
+        monkeypatch.delenv("MODEL_ROUTER_TIMEOUT", raising=False)
+        monkeypatch.setenv("LLM_TIMEOUT", "30")
+        assert ModelRouter([ModelCandidate("a", FakeModel("a"))], ProviderHealth()).timeout == 15.0
+
+    def test_raises_when_all_fail(self):
+        """The last error surfaces when no provider answers"""
+        router = make_router(FakeModel("a", error=ValueError("a")), FakeModel("b", error=ValueError("b")))
+        with pytest.raises(ValueError, match="b"):
+            router.as_runnable().invoke([HumanMessage("hi")])
+
+    def test_simple_requests_use_fast_tier(self):
+        """Short plain requests go to the fast tier first, others to the primary tier"""
+        primary, cheap = FakeModel("primary"), FakeModel("cheap")
+        runnable = make_router(primary, cheap, tiers={"cheap": FAST}).as_runnable()
+        assert runnable.invoke([HumanMessage("list my pending tasks")]).content == "cheap"
+        assert runnable.invoke([HumanMessage("plan the login feature")]).content == "primary"
+        assert runnable.router.stats["fast"] == 1
+
+    def test_bind_tools_binds_every_provider(self):
+        """Bound routers call provider models with the tools bound and share statistics"""
+        router = make_router(FakeModel("a"), FakeModel("b"))
+        bound = router.bind_tools(["list_tasks"])
+        bound.invoke([HumanMessage("hi")])
+        assert all(c.model.tools == ["list_tasks"] for c in bound.router.candidates)
+        assert router.stats["calls"] == 1
+
+
+class TestSimpleRequest:
+    """Request classification test class"""
+
+    def test_classification(self):
+        """Short requests without analytical words are simple"""
+        assert is_simple_request([HumanMessage("show task 3")])
+        assert not is_simple_request([HumanMessage("why is task 3 blocked?")])
+        assert not is_simple_request([HumanMessage("x " * 200)])
+        assert not is_simple_request([AIMessage("no request")])
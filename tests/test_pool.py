@@ -0,0 +1,153 @@
+"""
+Session Pool Tests
+"""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from omni_task_agent.pool import SessionPool
+
+
+class FakeClient:
+    """Stand-in for MultiServerMCPClient that records its lifecycle"""
+
+    instances = []
+
+    def __init__(self, config):
+        self.config = config
+        self.entered = False
+        self.exited = False
+        self.session = MagicMock()
+        self.session.send_ping = AsyncMock()
+        self.sessions = {"shrimp-task-manager": self.session}
+        FakeClient.instances.append(self)
+
+    async def __aenter__(self):
+        self.entered = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.exited = True
+
+    def get_tools(self):
+        return []
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_clients():
+    FakeClient.instances = []
+
+
+class TestSessionPool:
+    """Session Pool Test Class"""
+
+    @pytest.mark.asyncio
+    async def test_reuses_session_for_same_key(self):
+        """Repeated acquires for one key share a single client"""
+        pool = SessionPool(max_size=4, client_factory=FakeClient)
+
+        async with pool.acquire("/a/data", {}) as first:
+            pass
+        async with pool.acquire("/a/data", {}) as second:
+            pass
+
+        assert first is second
+        assert len(FakeClient.instances) == 1
+        assert pool.stats["hits"] == 1
+        assert pool.stats["misses"] == 1
+        await pool.close()
+        assert first.exited
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """The least recently used idle session is closed when the pool is full"""
+        pool = SessionPool(max_size=2, client_factory=FakeClient)
+
+        for key in ["/a", "/b", "/a", "/c"]:
+            async with pool.acquire(key, {}):
+                pass
+
+        assert len(pool) == 2
+        assert pool.stats["evictions"] == 1
+        evicted = FakeClient.instances[1]
+        assert evicted.exited
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_spare_sessions_have_their_own_limit(self):
+        """Spare sessions never evict regular sessions and only make room among themselves"""
+        pool = SessionPool(max_size=2, max_spare=1, client_factory=FakeClient)
+
+        for key in ["/a", "/b"]:
+            async with pool.acquire(key, {}):
+                pass
+        for key in ["/a#read1", "/b#read1"]:
+            await pool.warm(key, {}, spare=True)
+
+        assert pool.is_warm("/a") and pool.is_warm("/b") and pool.is_warm("/b#read1")
+        assert not pool.is_warm("/a#read1")
+        assert pool.stats["evictions"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_ttl_expiry(self):
+        """Sessions idle past the TTL are closed on the next acquire"""
+        pool = SessionPool(max_size=4, idle_ttl=0, client_factory=FakeClient)
+
+        async with pool.acquire("/a", {}):
+            pass
+        async with pool.acquire("/b", {}):
+            pass
+
+        assert FakeClient.instances[0].exited
+        assert len(pool) == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reaper_expires_idle_sessions(self):
+        """The reaper closes idle sessions without another acquire and drops their key locks"""
+        pool = SessionPool(max_size=4, idle_ttl=0.05, reap_interval=0.02, client_factory=FakeClient)
+
+        for key in ["/a", "/b"]:
+            async with pool.acquire(key, {}):
+                pass
+        assert set(pool._key_locks) == {"/a", "/b"}
+
+        for _ in range(50):
+            if len(pool) == 0:
+                break
+            await asyncio.sleep(0.02)
+
+        assert len(pool) == 0
+        assert all(client.exited for client in FakeClient.instances)
+        assert pool._key_locks == {}
+        assert pool.stats["evictions"] == 2
+        await pool.close()
+        assert pool._reaper is None
+
+    @pytest.mark.asyncio
+    async def test_respawn_after_failed_health_check(self):
+        """A session that stops answering pings is replaced"""
+        pool = SessionPool(max_size=4, health_check_interval=0, client_factory=FakeClient)
+
+        async with pool.acquire("/a", {}) as first:
+            pass
+        first.session.send_ping.side_effect = ConnectionError("process exited")
+        async with pool.acquire("/a", {}) as second:
+            pass
+
+        assert first is not second
+        assert first.exited
+        assert pool.stats["respawns"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_pooling_disabled(self):
+        """max_size=0 creates and closes a client per acquire"""
+        pool = SessionPool(max_size=0, client_factory=FakeClient)
+
+        async with pool.acquire("/a", {}) as client:
+            assert client.entered
+        assert client.exited
+        assert len(pool) == 0
@@ -0,0 +1,185 @@
+"""
+Resilience Tests
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from omni_task_agent.model_router import ModelCandidate, ModelRouter, ProviderHealth
+from omni_task_agent.resilience import PhasePolicy, Resilience, ToolResilience, is_transient, with_resilience
+from omni_task_agent.tools import ToolContext
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider rate-limit error"""
+
+
+class Flaky:
+    """Async call failing a given number of times before answering"""
+
+    def __init__(self, failures, error=None, delay=0.0):
+        self.failures = failures
+        self.error = error or RateLimitError("slow down")
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, hedged=False):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        return f"ok {self.calls}"
+
+
+@pytest.fixture
+def resilience():
+    return Resilience(backoff_initial=0.001, backoff_max=0.01, hedge_percentile=95, hedge_min_samples=5)
+
+
+class TestTransientErrors:
+    """Transient error classification test class"""
+
+    def test_classification(self):
+        """Timeouts, retryable statuses and provider error names are transient"""
+        status_error = Exception("busy")
+        status_error.status_code = 503
+        assert is_transient(asyncio.TimeoutError())
+        assert is_transient(status_error)
+        assert is_transient(RateLimitError())
+        assert not is_transient(ValueError("bad arguments"))
+
+
+class TestResilience:
+    """Resilience layer test class"""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, resilience):
+        """Transient failures are retried until the call succeeds"""
+        call = Flaky(failures=2)
+        result = await resilience.run("llm", call, PhasePolicy(timeout=1, retries=2, hedge=False))
+        assert result == "ok 3"
+        assert resilience.stats["llm"]["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_not_retried(self, resilience):
+        """Non-transient errors surface at once"""
+        call = Flaky(failures=5, error=ValueError("bad"))
+        with pytest.raises(ValueError):
+            await resilience.run("llm", call, PhasePolicy(timeout=1, retries=3, hedge=False))
+        assert call.calls == 1
+        assert resilience.stats["llm"]["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeouts_counted_and_retried(self, resilience):
+        """An attempt past the deadline is abandoned and retried"""
+        slow_then_fast = iter([1.0, 0.0])
+
+        async def call(hedged):
+            await asyncio.sleep(next(slow_then_fast))
+            return "done"
+
+        result = await resilience.run("tool", call, PhasePolicy(timeout=0.05, retries=1, hedge=False))
+        assert result == "done"
+        assert resilience.stats["tool"]["timeouts"] == 1
+        assert resilience.stats["tool"]["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hedges_after_percentile(self, resilience):
+        """A call slower than the recent p95 gets a duplicate whose answer wins"""
+        policy = PhasePolicy(timeout=2, retries=0, hedge=True)
+        for _ in range(5):
+            await resilience.run("tool", Flaky(0, delay=0.01), policy, key="tool:list_tasks")
+        assert resilience.hedge_delay("tool:list_tasks") < 0.1
+
+        async def stuck_primary(hedged):
+            await asyncio.sleep(0.01 if hedged else 1.0)
+            return "hedge" if hedged else "primary"
+
+        assert await resilience.run("tool", stuck_primary, policy, key="tool:list_tasks") == "hedge"
+        assert resilience.stats["tool"]["hedges"] == 1
+        assert resilience.stats["tool"]["hedge_wins"] == 1
+
+
+class TestToolResilience:
+    """Tool middleware test class"""
+
+    @pytest.mark.asyncio
+    async def test_reads_retried_writes_not(self, resilience):
+        """Only idempotent tools are retried"""
+        middleware = ToolResilience(PhasePolicy(timeout=1, retries=2, hedge=False), resilience)
+        context = ToolContext(data_dir="/a/data")
+        read = Flaky(failures=1)
+        write = Flaky(failures=1)
+
+        assert await middleware(context, "list_tasks", {}, lambda name, arguments: read()) == "ok 2"
+        with pytest.raises(RateLimitError):
+            await middleware(context, "update_task", {}, lambda name, arguments: write())
+        assert write.calls == 1
+
+
+class TestResilientModel:
+    """LLM wrapper test class"""
+
+    @pytest.mark.asyncio
+    async def test_wraps_model_and_bound_tools(self):
+        """Model calls are retried and bind_tools keeps the wrapper"""
+        class FlakyModel:
+            def __init__(self):
+                self.calls = 0
+
+            async def ainvoke(self, input, config=None, **kwargs):
+                self.calls += 1
+                if self.calls == 1:
+                    raise RateLimitError("slow down")
+                return AIMessage(content="hi")
+
+            def bind_tools(self, tools, **kwargs):
+                return self
+
+        model = FlakyModel()
+        wrapped = with_resilience(model, PhasePolicy(timeout=1, retries=1, hedge=False)).bind_tools([])
+        assert wrapped.model is model
+        assert (await wrapped.ainvoke([HumanMessage("hello")])).content == "hi"
+        assert model.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_run_without_callbacks(self):
+        """Only the first attempt streams to the caller's callbacks"""
+        class FlakyModel:
+            def __init__(self):
+                self.callbacks = []
+
+            async def ainvoke(self, input, config=None, **kwargs):
+                self.callbacks.append((config or {}).get("callbacks"))
+                if len(self.callbacks) == 1:
+                    raise RateLimitError("slow down")
+                return AIMessage(content="hi")
+
+        model, handler = FlakyModel(), object()
+        wrapped = with_resilience(model, PhasePolicy(timeout=1, retries=1, hedge=False))
+        assert (await wrapped.ainvoke([HumanMessage("hello")], {"callbacks": [handler]})).content == "hi"
+        assert model.callbacks == [[handler], None]
+
+    @pytest.mark.asyncio
+    async def test_router_falls_back_before_outer_deadline(self):
+        """A hung provider behind a router hands the call to the next one"""
+        class Model:
+            def __init__(self, delay):
+                self.delay = delay
+
+            async def ainvoke(self, input, config=None, **kwargs):
+                await asyncio.sleep(self.delay)
+                return AIMessage(content=str(self.delay))
+
+        router = ModelRouter(
+            [ModelCandidate("stuck", Model(5.0)), ModelCandidate("backup", Model(0.0))],
+            ProviderHealth(cooldown=30),
+            timeout=0.1,
+        )
+        # The outer deadline alone would cancel the router before it falls back
+        wrapped = with_resilience(router.as_runnable(), PhasePolicy(timeout=0.05, retries=0, hedge=False))
+        assert wrapped.policy.timeout == 0
+        assert (await wrapped.ainvoke([HumanMessage("hello")])).content == "0.0"
+        assert router.stats["fallbacks"] == 1
+        assert router.health.metrics()["stuck"]["timeouts"] == 1
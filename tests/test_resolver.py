@@ -0,0 +1,70 @@
+"""
+Resolver Module Tests
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from omni_task_agent.resolver import (
+    ShrimpNotFoundError,
+    preflight,
+    reset_shrimp_resolution,
+    resolve_shrimp_command,
+)
+
+
+class TestResolver:
+    """Resolver Test Class"""
+
+    def setup_method(self):
+        reset_shrimp_resolution()
+
+    def teardown_method(self):
+        reset_shrimp_resolution()
+
+    @patch("omni_task_agent.resolver.os.path.exists", return_value=True)
+    def test_resolution_is_cached(self, mock_exists):
+        """The filesystem is searched only once per process"""
+        first = resolve_shrimp_command()
+        calls = mock_exists.call_count
+        second = resolve_shrimp_command()
+
+        assert first is second
+        assert first.source == "local"
+        assert mock_exists.call_count == calls
+
+    @patch("omni_task_agent.resolver._npm_global_root", return_value=None)
+    def test_global_install(self, mock_npm_root):
+        """A global npm install (as created by the Dockerfile) is found without npx"""
+        global_script = "/usr/lib/node_modules/mcp-shrimp-task-manager/dist/index.js"
+        with patch("omni_task_agent.resolver.os.path.exists", side_effect=lambda p: p == global_script):
+            resolved = resolve_shrimp_command()
+
+        assert resolved.source == "global"
+        assert resolved.args == [global_script]
+        assert not resolved.uses_npx
+
+    @patch.dict(os.environ, {"SHRIMP_TASK_MANAGER_PATH": "/opt/shrimp/index.js"})
+    def test_env_override(self):
+        """SHRIMP_TASK_MANAGER_PATH takes precedence"""
+        resolved = resolve_shrimp_command()
+
+        assert resolved.source == "env"
+        assert resolved.args == ["/opt/shrimp/index.js"]
+
+    @patch.dict(os.environ, {"SHRIMP_ALLOW_NPX": "false"})
+    @patch("omni_task_agent.resolver._npm_global_root", return_value=None)
+    @patch("omni_task_agent.resolver.os.path.exists", return_value=False)
+    def test_preflight_fails_fast_without_install(self, mock_exists, mock_npm_root):
+        """Preflight refuses the npx fallback unless explicitly allowed"""
+        with pytest.raises(ShrimpNotFoundError):
+            preflight()
+
+    @patch("omni_task_agent.resolver.shutil.which", return_value="/usr/bin/npx")
+    @patch("omni_task_agent.resolver._npm_global_root", return_value=None)
+    @patch("omni_task_agent.resolver.os.path.exists", return_value=False)
+    def test_preflight_allows_npx_when_configured(self, mock_exists, mock_npm_root, mock_which):
+        """Preflight accepts npx when allow_npx is set"""
+        resolved = preflight(allow_npx=True)
+
+        assert resolved.uses_npx
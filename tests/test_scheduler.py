@@ -0,0 +1,217 @@
+"""
+Tool Scheduler Tests
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from omni_task_agent.pool import SessionPool
+from omni_task_agent.scheduler import ProjectLock, ToolScheduler
+from omni_task_agent.tools import ToolContext
+
+
+class SlowTool:
+    """Tool stand-in whose calls take a fixed time on a one-request-at-a-time session"""
+
+    def __init__(self, name, session, delay=0.05):
+        self.name = name
+        self.session = session
+        self.delay = delay
+
+    async def coroutine(self, **arguments):
+        async with self.session["lock"]:
+            self.session["calls"].append((self.name, arguments))
+            await asyncio.sleep(self.delay)
+        return f"{self.name} {arguments}", None
+
+
+class FakeClient:
+    """Pooled client with its own serial session"""
+
+    sessions = []
+
+    def __init__(self, config):
+        self.session = {"lock": asyncio.Lock(), "calls": []}
+        FakeClient.sessions.append(self.session)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def get_tools(self):
+        return [SlowTool("get_task_detail", self.session)]
+
+
+class TestProjectLock:
+    """Reader-writer lock test class"""
+
+    @pytest.mark.asyncio
+    async def test_readers_share_writers_exclude(self):
+        """Readers overlap; a queued writer holds back later readers"""
+        lock = ProjectLock()
+        events = []
+
+        async def read(name, delay):
+            await lock.acquire_read()
+            events.append(f"{name} start")
+            await asyncio.sleep(delay)
+            events.append(f"{name} end")
+            await lock.release_read()
+
+        async def write(name):
+            await lock.acquire_write()
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+            await lock.release_write()
+
+        first = asyncio.create_task(read("r1", 0.03))
+        second = asyncio.create_task(read("r2", 0.03))
+        await asyncio.sleep(0)
+        writer = asyncio.create_task(write("w1"))
+        await asyncio.sleep(0)
+        late = asyncio.create_task(read("r3", 0))
+        await asyncio.gather(first, second, writer, late)
+
+        assert events[:2] == ["r1 start", "r2 start"]
+        assert events.index("w1 start") > events.index("r2 end")
+        assert events.index("r3 start") > events.index("w1 end")
+
+    @pytest.mark.asyncio
+    async def test_writers_run_in_arrival_order(self):
+        """Writers are admitted in the order they asked"""
+        lock = ProjectLock()
+        order = []
+
+        async def write(name, delay):
+            await lock.acquire_write()
+            order.append(name)
+            await asyncio.sleep(delay)
+            await lock.release_write()
+
+        await asyncio.gather(*(write(f"w{i}", 0.01 * (3 - i)) for i in range(3)))
+        assert order == ["w0", "w1", "w2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_writer_does_not_block(self):
+        """A writer cancelled while queued gives up its turn"""
+        lock = ProjectLock()
+        await lock.acquire_write()
+        waiting = asyncio.create_task(lock.acquire_write())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await lock.release_write()
+
+        await asyncio.wait_for(lock.acquire_read(), 1)
+        await lock.release_read()
+
+
+class TestToolScheduler:
+    """Tool scheduler test class"""
+
+    def setup_method(self):
+        FakeClient.sessions = []
+
+    @pytest.mark.asyncio
+    async def test_reads_fan_out_to_sibling_sessions(self):
+        """Overlapping reads take about as long as the slowest one"""
+        scheduler = ToolScheduler(read_sessions=4)
+        primary = {"lock": asyncio.Lock(), "calls": []}
+        primary_tool = SlowTool("get_task_detail", primary)
+        context = ToolContext(data_dir="/a/data", server_config={"fake": {}})
+
+        async def call_next(name, arguments):
+            return await primary_tool.coroutine(**arguments)
+
+        async def read_all():
+            return await asyncio.gather(*(
+                scheduler(context, "get_task_detail", {"taskId": str(i)}, call_next) for i in range(4)
+            ))
+
+        pool = SessionPool(max_size=8, client_factory=FakeClient)
+        with patch("omni_task_agent.scheduler.get_session_pool", return_value=pool):
+            # The first overlap starts sibling sessions in the background without waiting for them
+            await read_all()
+            assert len(primary["calls"]) == 4
+            await asyncio.gather(*scheduler._warming.values())
+
+            started = time.perf_counter()
+            results = await read_all()
+            elapsed = time.perf_counter() - started
+        await pool.close()
+
+        assert [result[0] for result in results] == [f"get_task_detail {{'taskId': '{i}'}}" for i in range(4)]
+        assert elapsed < 0.15
+        assert len(primary["calls"]) == 5
+        assert len(FakeClient.sessions) == 3
+        assert scheduler.stats["sibling_reads"] == 3
+        assert scheduler.stats["max_parallel_reads"] == 4
+
+    @pytest.mark.asyncio
+    async def test_reads_stay_on_session_without_config(self):
+        """Without a server configuration every read uses the request's session"""
+        scheduler = ToolScheduler(read_sessions=4)
+        calls = []
+
+        async def call_next(name, arguments):
+            calls.append(name)
+            return "ok", None
+
+        context = ToolContext(data_dir="/a/data")
+        await asyncio.gather(*(scheduler(context, "list_tasks", {}, call_next) for _ in range(3)))
+        assert calls == ["list_tasks"] * 3
+        assert scheduler.stats["sibling_reads"] == 0
+
+    @pytest.mark.asyncio
+    async def test_mutations_serialized_per_project(self):
+        """Mutations of one project run one at a time, in call order; other projects proceed"""
+        scheduler = ToolScheduler(read_sessions=1)
+        running = {"/a/data": 0, "/b/data": 0}
+        peak = {"/a/data": 0, "/b/data": 0}
+        order = []
+
+        def backend(data_dir):
+            async def call_next(name, arguments):
+                running[data_dir] += 1
+                peak[data_dir] = max(peak[data_dir], running[data_dir])
+                order.append((data_dir, arguments["taskId"]))
+                await asyncio.sleep(0.01)
+                running[data_dir] -= 1
+                return "ok", None
+            return call_next
+
+        project_a = ToolContext(data_dir="/a/data")
+        project_b = ToolContext(data_dir="/b/data")
+        await asyncio.gather(
+            *(scheduler(project_a, "update_task", {"taskId": str(i)}, backend("/a/data")) for i in range(3)),
+            *(scheduler(project_b, "update_task", {"taskId": str(i)}, backend("/b/data")) for i in range(2)),
+        )
+
+        assert peak == {"/a/data": 1, "/b/data": 1}
+        assert [task for root, task in order if root == "/a/data"] == ["0", "1", "2"]
+        assert order[:2] == [("/a/data", "0"), ("/b/data", "0")]
+        assert scheduler.stats["writes"] == 5
+
+    @pytest.mark.asyncio
+    async def test_stateless_tools_bypass_lock(self):
+        """Prompt-only tools run while a mutation holds the project"""
+        scheduler = ToolScheduler()
+        context = ToolContext(data_dir="/a/data")
+        release = asyncio.Event()
+
+        async def slow_mutation(name, arguments):
+            await release.wait()
+            return "ok", None
+
+        async def immediate(name, arguments):
+            return "analysis", None
+
+        mutation = asyncio.create_task(scheduler(context, "update_task", {}, slow_mutation))
+        await asyncio.sleep(0)
+        assert await asyncio.wait_for(scheduler(context, "analyze_task", {}, immediate), 1) == ("analysis", None)
+        release.set()
+        await mutation
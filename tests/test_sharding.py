@@ -0,0 +1,210 @@
+"""
+SSE Worker Sharding Module Tests
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+import textwrap
+import time
+
+import pytest
+
+from omni_task_agent.sharding import Dispatcher, HashRing, Worker, project_key
+
+# A small SSE server standing in for run_mcp: reports its pid and relays progress
+FAKE_WORKER = textwrap.dedent('''
+    import json
+    import os
+
+    import uvicorn
+    from mcp.server.fastmcp import Context, FastMCP
+
+    from omni_task_agent.warmup import Warmup, add_health_routes
+
+    mcp = FastMCP("fake worker")
+
+    @mcp.tool(name="where")
+    async def where(projectRoot: str = None) -> str:
+        return str(os.getpid())
+
+    @mcp.tool(name="steps")
+    async def steps(projectRoot: str = None, ctx: Context = None) -> str:
+        for step in (1, 2):
+            await ctx.report_progress(step)
+        await ctx.info("halfway")
+        return "done"
+
+    @mcp.tool(name="OmniTask Metrics")
+    async def metrics() -> str:
+        return json.dumps({"pid": os.getpid()})
+
+    app = mcp.sse_app()
+    warmup = Warmup()
+    warmup.skip()
+    add_health_routes(app, warmup)
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ["FASTMCP_PORT"]), log_level="warning", timeout_graceful_shutdown=1)
+''')
+
+
+def free_ports(count):
+    """Find a run of consecutive free local ports"""
+    for _ in range(50):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            base = sock.getsockname()[1]
+        if base + count >= 65535:
+            continue
+        try:
+            sockets = []
+            for port in range(base, base + count):
+                sock = socket.socket()
+                sockets.append(sock)
+                sock.bind(("127.0.0.1", port))
+        except OSError:
+            continue
+        finally:
+            for sock in sockets:
+                sock.close()
+        return base
+    raise RuntimeError("No free ports")
+
+
+@pytest.fixture
+def worker_command(tmp_path, monkeypatch):
+    """Command running the fake worker, which imports this repository's package"""
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    return [sys.executable, str(script)]
+
+
+class TestHashRing:
+    """Consistent hashing test class"""
+
+    def test_spread_and_stability(self):
+        """Test keys spread over every node and only a removed node's keys move"""
+        keys = [f"/projects/p{i}" for i in range(2000)]
+        ring = HashRing(["worker-0", "worker-1", "worker-2", "worker-3"])
+        owners = {key: ring.node_for(key) for key in keys}
+        counts = {node: list(owners.values()).count(node) for node in set(owners.values())}
+        assert len(counts) == 4 and min(counts.values()) > 300
+
+        smaller = HashRing(["worker-0", "worker-1", "worker-2"])
+        moved = [key for key in keys if smaller.node_for(key) != owners[key]]
+        assert all(owners[key] == "worker-3" for key in moved)
+        assert owners == {key: ring.node_for(key) for key in keys}
+
+    def test_project_key(self):
+        """Test project roots are normalized and missing ones share the default key"""
+        assert project_key({"projectRoot": "/a/b/"}) == project_key({"projectRoot": "/a/b"}) == os.path.abspath("/a/b")
+        assert project_key({}) == project_key({"projectRoot": None}) == project_key(None) == ""
+        with pytest.raises(ValueError):
+            HashRing([])
+
+
+class TestDispatcher:
+    """Dispatcher over real worker processes test class"""
+
+    def test_worker_server_config(self):
+        """Test a worker's pooled session is configured like any other MCP server"""
+        worker = Worker(1, 9001, ["run"])
+        assert worker.server_config == {"worker-1": {"transport": "sse", "url": "http://127.0.0.1:9001/sse"}}
+
+    @pytest.mark.asyncio
+    async def test_failed_restart_keeps_supervising(self, tmp_path):
+        """Test a worker that cannot be spawned is retried with backoff instead of stopping the supervisor"""
+        dispatcher = Dispatcher(command=[str(tmp_path / "missing")], workers=1, base_port=free_ports(1), check_interval=0.01)
+        worker = dispatcher.workers[0]
+        dispatcher._supervisor = asyncio.create_task(dispatcher._supervise())
+        try:
+            await asyncio.sleep(0.2)
+            assert not dispatcher._supervisor.done()
+            # The 2 s backoff holds off a second attempt
+            assert worker.failures == 1 and worker.next_start > time.monotonic()
+        finally:
+            await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_affinity_progress_and_restart(self, worker_command):
+        """Test calls stick to their project's worker, progress is relayed and a killed worker restarts alone"""
+        import httpx
+        import uvicorn
+        from mcp import ClientSession, types
+        from mcp.client.sse import sse_client
+
+        base = free_ports(3)
+        dispatcher = Dispatcher(command=worker_command, workers=2, base_port=base + 1, check_interval=0.1, start_timeout=30)
+        await dispatcher.start()
+        server = uvicorn.Server(uvicorn.Config(dispatcher.make_app(), host="127.0.0.1", port=base, log_level="warning", lifespan="off"))
+        serving = asyncio.create_task(server.serve())
+        url = f"http://127.0.0.1:{base}"
+        notifications = []
+
+        async def record(message):
+            if isinstance(message, types.ServerNotification):
+                notifications.append(type(message.root).__name__)
+
+        async def where(session, root):
+            return (await session.call_tool("where", {"projectRoot": root})).content[0].text
+
+        async def wait_ready():
+            async with httpx.AsyncClient() as http:
+                while True:
+                    try:
+                        if (await http.get(f"{url}/ready")).status_code == 200:
+                            return
+                    except httpx.ConnectError:
+                        pass
+                    await asyncio.sleep(0.1)
+
+        try:
+            await asyncio.wait_for(wait_ready(), 30)
+
+            roots = [f"/projects/p{i}" for i in range(8)]
+            owners = {root: dispatcher.worker_for({"projectRoot": root}) for root in roots}
+            assert len({worker.name for worker in owners.values()}) == 2
+
+            async with sse_client(f"{url}/sse") as streams:
+                async with ClientSession(*streams, message_handler=record) as session:
+                    await session.initialize()
+                    assert "where" in [tool.name for tool in (await session.list_tools()).tools]
+                    pids = {root: await where(session, root) for root in roots}
+                    assert all(pids[root] == str(owners[root].process.pid) for root in roots)
+                    assert await where(session, "/projects/p0/") == pids["/projects/p0"]
+
+                    request = types.ClientRequest(types.CallToolRequest(
+                        method="tools/call",
+                        params=types.CallToolRequestParams.model_validate({
+                            "name": "steps", "arguments": {}, "_meta": {"progressToken": "t1"},
+                        }),
+                    ))
+                    result = await session.send_request(request, types.CallToolResult)
+                    assert result.content[0].text == "done"
+                    assert notifications.count("ProgressNotification") == 2
+                    assert "LoggingMessageNotification" in notifications
+
+                    metrics = json.loads((await session.call_tool("OmniTask Metrics", {})).content[0].text)
+                    assert metrics["dispatcher"]["calls"] == 10
+                    assert {name: m["pid"] for name, m in metrics["workers"].items()} == {
+                        worker.name: worker.process.pid for worker in dispatcher.workers
+                    }
+
+                    # Kill one worker: it comes back on its own, the other keeps its process
+                    victim, other = dispatcher.workers
+                    other_pid = other.process.pid
+                    victim.process.kill()
+                    await asyncio.to_thread(victim.process.wait)
+                    root = next(root for root in roots if owners[root] is victim)
+                    restarted = await asyncio.wait_for(where(session, root), 30)
+                    assert restarted == str(victim.process.pid) != pids[root]
+                    assert victim.restarts == 1 and other.restarts == 0
+                    assert other.process.pid == other_pid
+        finally:
+            # Open SSE streams would hold a graceful shutdown
+            server.should_exit = server.force_exit = True
+            await serving
+            await dispatcher.stop()
+        assert not any(worker.alive for worker in dispatcher.workers)
@@ -0,0 +1,57 @@
+"""
+Startup Import Tests
+"""
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.bench_startup import HEAVY_MODULES, ROOT, measure
+from omni_task_agent.cli import main
+
+
+class TestStartup:
+    """Lazy import test class"""
+
+    @pytest.mark.parametrize("module", ["omni_task_agent", "omni_task_agent.cli", "omni_task_agent.agent"])
+    def test_import_is_lightweight(self, module):
+        """Test importing entry points does not load LangChain, LangGraph or MCP adapters"""
+        result = measure(module)
+        assert result["heavy_modules"] == []
+
+    def test_make_graph_loaded_lazily(self):
+        """Test make_graph is still exported from the package"""
+        code = (
+            "import omni_task_agent, sys; "
+            "from omni_task_agent.agent import make_graph; "
+            "assert omni_task_agent.make_graph is make_graph; "
+            "print('ok')"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        assert completed.stdout.strip() == "ok", completed.stderr
+
+    def test_unknown_attribute(self):
+        """Test unknown package attributes still raise AttributeError"""
+        import omni_task_agent
+        with pytest.raises(AttributeError):
+            omni_task_agent.not_an_attribute
+
+    @patch("omni_task_agent.cli.asyncio.run")
+    def test_version_command(self, mock_run, capsys):
+        """Test `ota version` answers without starting a session"""
+        with patch.object(sys, "argv", ["ota", "version"]):
+            main()
+        assert "OmniTask CLI v" in capsys.readouterr().out
+        mock_run.assert_not_called()
+
+    def test_benchmark_report(self):
+        """Test the startup benchmark emits JSON for every entry point"""
+        completed = subprocess.run(
+            [sys.executable, "benchmarks/bench_startup.py", "--repeat", "1"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        report = json.loads(completed.stdout)
+        assert set(report["imports"]) == {"omni_task_agent", "omni_task_agent.cli", "run_mcp"}
+        assert set(HEAVY_MODULES) >= set(report["imports"]["omni_task_agent"]["heavy_modules"])
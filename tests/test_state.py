@@ -0,0 +1,168 @@
+"""
+Task State Module Tests
+"""
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from omni_task_agent.utils.state import TASKS_FILE, Task, TaskCollection, TaskStore
+
+
+@pytest.fixture
+def collection(sample_task_json):
+    """Collection holding the sample task with its two subtasks"""
+    return TaskCollection(tasks=[sample_task_json])
+
+
+class TestTask:
+    """Task record test class"""
+
+    def test_slots(self):
+        """Test tasks are compact slot records"""
+        task = Task(id="1", title="Test")
+        assert not hasattr(task, "__dict__")
+        with pytest.raises(AttributeError):
+            task.unknown = True
+
+    def test_round_trip(self, sample_task_json):
+        """Test dumping a task keeps every fixture field and reloads unchanged"""
+        dumped = Task.from_dict(sample_task_json).model_dump()
+        assert {k: v for k, v in dumped.items() if k != "subtasks"} == {
+            k: v for k, v in sample_task_json.items() if k != "subtasks"
+        }
+        assert dumped["subtasks"][1]["dependencies"] == ["1.1"]
+        assert Task.from_dict(dumped).model_dump() == dumped
+
+
+class TestTaskCollection:
+    """Task collection test class"""
+
+    def test_indexes_cover_subtasks(self, collection):
+        """Test ID and status lookups include subtasks"""
+        assert len(collection) == 3
+        assert [t.id for t in collection.tasks] == ["1"]
+        assert collection["1.2"].title == "Subtask 2"
+        assert collection.parent_of("1.2").id == "1"
+        assert {t.id for t in collection.by_status("pending")} == {"1", "1.1", "1.2"}
+        assert "1.1" in collection and "9" not in collection
+
+    def test_dependency_adjacency(self, collection):
+        """Test forward and reverse dependency edges"""
+        assert [t.id for t in collection.dependencies_of("1.2")] == ["1.1"]
+        assert [t.id for t in collection.dependents_of("1.1")] == ["1.2"]
+        assert collection.dependents_of("1.2") == []
+
+    def test_status_change_reindexes(self, collection):
+        """Test setting status directly keeps the status index current"""
+        collection["1.1"].status = "done"
+        assert [t.id for t in collection.by_status("done")] == ["1.1"]
+        assert {t.id for t in collection.by_status("pending")} == {"1", "1.2"}
+        assert collection.status_counts() == {"pending": 2, "done": 1}
+
+    def test_update(self, collection):
+        """Test update changes fields and dependency edges"""
+        collection.update("1.2", dependencies=[], priority="high")
+        assert collection.dependents_of("1.1") == []
+        assert collection.filter(priority="high")[0].id == "1.2"
+        with pytest.raises(AttributeError):
+            collection.update("1", id="2")
+
+    def test_filter(self, collection):
+        """Test filters preserve document order and can skip subtasks"""
+        collection["1.2"].status = "done"
+        assert [t.id for t in collection.filter(status="pending")] == ["1", "1.1"]
+        assert [t.id for t in collection.filter(status="pending", top_level=True)] == ["1"]
+
+    def test_add_subtask_and_duplicates(self, collection):
+        """Test subtasks can be added and duplicate IDs are rejected atomically"""
+        collection.add(Task(id="1.3", title="Subtask 3", dependencies=["1.2"]), parent_id="1")
+        assert [t.id for t in collection.dependents_of("1.2")] == ["1.3"]
+        with pytest.raises(ValueError):
+            collection.add({"id": "2", "title": "New", "subtasks": [{"id": "1.1", "title": "Clash"}]})
+        assert "2" not in collection
+
+    def test_upsert(self, collection):
+        """Test upserts update existing tasks in place and add new subtasks"""
+        collection.add(Task(id="2", title="Follow-up", dependencies=["1"]))
+        added = collection.upsert({
+            "id": "1", "title": "Renamed", "status": "done",
+            "subtasks": [{"id": "1.1", "title": "Subtask 1"}, {"id": "1.3", "title": "New"}],
+        })
+        assert not added
+        assert collection["1"].title == "Renamed"
+        assert collection["2"].dependencies == ("1",)
+        assert collection.parent_of("1.3").id == "1"
+        assert len(collection) == 5
+        assert collection.upsert(Task(id="3", title="Other"))
+
+    def test_remove(self, collection):
+        """Test removal drops subtasks and dangling dependency edges"""
+        collection.add(Task(id="2", title="Follow-up", dependencies=["1.1", "1"]))
+        collection.remove("1")
+        assert len(collection) == 1
+        assert collection["2"].dependencies == ()
+        assert collection.by_status("pending") == [collection["2"]]
+
+    def test_missing_dependencies(self):
+        """Test dependencies on unknown tasks are reported"""
+        collection = TaskCollection(tasks=[Task(id="1", title="A", dependencies=["7"])])
+        assert collection.missing_dependencies() == {"1": ["7"]}
+
+    def test_model_dump_round_trip(self, collection):
+        """Test a dumped collection can be rebuilt from keyword arguments"""
+        data = json.loads(json.dumps(collection.model_dump()))
+        assert TaskCollection(**data).model_dump() == data
+
+
+class TestTaskStore:
+    """Task store test class"""
+
+    def test_save_and_load(self, tmp_path, collection):
+        """Test collections survive a save/load cycle in the data directory"""
+        store = TaskStore.for_project(str(tmp_path))
+        store.save(collection)
+
+        assert os.path.exists(tmp_path / "data" / TASKS_FILE)
+        loaded = TaskStore.for_project(str(tmp_path)).load()
+        assert loaded.model_dump() == collection.model_dump()
+
+    def test_load_is_cached_until_file_changes(self, tmp_path, collection):
+        """Test repeated loads reuse the parsed collection"""
+        store = TaskStore(str(tmp_path))
+        store.save(collection)
+        assert store.load() is store.load()
+
+        other = TaskStore(str(tmp_path))
+        other.save(TaskCollection(tasks=[Task(id="9", title="Other", details="changed size")]))
+        assert [t.id for t in store.load().tasks] == ["9"]
+
+    def test_missing_file_is_empty(self, tmp_path):
+        """Test a project without tasks loads an empty collection"""
+        assert len(TaskStore(str(tmp_path / "data")).load()) == 0
+
+    def test_failed_save_keeps_previous_file(self, tmp_path, collection):
+        """Test an interrupted save leaves the old file and no temporary files"""
+        store = TaskStore(str(tmp_path))
+        store.save(collection)
+        before = (tmp_path / TASKS_FILE).read_text()
+
+        with patch("omni_task_agent.utils.state.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                store.save(TaskCollection())
+
+        assert (tmp_path / TASKS_FILE).read_text() == before
+        assert sorted(os.listdir(tmp_path)) == [TASKS_FILE]
+
+    @pytest.mark.asyncio
+    async def test_async_saves_keep_the_newest_snapshot(self, tmp_path, collection):
+        """Test saves from coroutines persist, and an older snapshot never replaces a newer one"""
+        store = TaskStore(str(tmp_path))
+        newest = TaskCollection(tasks=[Task(id="9", title="Newest")])
+        await asyncio.gather(*(store.asave(collection) for _ in range(5)), store.asave(newest))
+
+        assert [t.id for t in TaskStore(str(tmp_path)).load().tasks] == ["9"]
+        assert store.load() is newest
+        assert sorted(os.listdir(tmp_path)) == [TASKS_FILE]
@@ -0,0 +1,101 @@
+"""
+Task API Server Module Tests
+"""
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from omni_task_agent.dependencies import clear_dependency_graphs
+from omni_task_agent.task_api import create_app
+
+
+@pytest.fixture
+def service(tmp_path):
+    """ASGI transport to a task service storing projects under tmp_path"""
+    clear_dependency_graphs()
+    yield httpx.ASGITransport(app=create_app(str(tmp_path)))
+    clear_dependency_graphs()
+
+
+def connect(service):
+    return httpx.AsyncClient(transport=service, base_url="http://test")
+
+
+class TestTaskAPI:
+    """Reference task service test class"""
+
+    @pytest.mark.asyncio
+    async def test_tools_listing(self, service):
+        """Test the service lists the task and dependency tools with their schemas"""
+        async with connect(service) as api:
+            assert (await api.get("/health")).json() == {"status": "ok"}
+            tools = {tool["name"]: tool for tool in (await api.get("/tools")).json()["tools"]}
+        assert "split_tasks" in tools and "ready_tasks" in tools
+        assert "taskId" in tools["get_task_detail"]["input_schema"]["properties"]
+
+    @pytest.mark.asyncio
+    async def test_single_and_bulk_calls(self, service):
+        """Test one call per request and several calls run in order in one request"""
+        async with connect(service) as api:
+            response = await api.post("/projects/demo/tools/list_tasks", json={})
+            assert response.status_code == 200
+            assert '"tasks": []' in response.json()["result"]
+
+            response = await api.post("/projects/demo/calls", json={"calls": [
+                {"name": "split_tasks", "arguments": {"updateMode": "append", "tasks": [{"name": "A"}]}},
+                {"name": "list_tasks", "arguments": {}},
+                {"name": "no_such_tool", "arguments": {}},
+                {"name": "get_task_detail", "arguments": {"wrong": "1"}},
+            ]})
+            results = response.json()["results"]
+            assert '"name": "A"' in results[1]["result"]
+            assert results[2] == {"error": "Unknown tool: no_such_tool"}
+            assert results[3]["error"].startswith("TypeError")
+
+            assert (await api.post("/projects/demo/tools/no_such_tool", json={})).status_code == 404
+            assert (await api.post("/projects/demo/tools/get_task_detail", json={"wrong": 1})).status_code == 422
+            assert (await api.post("/projects/.../tools/list_tasks", json={})).status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_tool_errors_are_not_server_errors(self, service):
+        """Test a failing tool answers 422, which the client does not retry, rather than 500"""
+        async with connect(service) as api:
+            with patch("omni_task_agent.task_api.run_tool", side_effect=RuntimeError("task store is corrupt")):
+                response = await api.post("/projects/demo/tools/list_tasks", json={})
+        assert response.status_code == 422
+        assert response.json()["detail"] == "RuntimeError: task store is corrupt"
+
+    @pytest.mark.asyncio
+    async def test_bulk_tool_key_error_is_not_unknown_tool(self, service):
+        """Test a KeyError raised inside a tool is reported as a tool error, not an unknown tool"""
+        async with connect(service) as api:
+            with patch("omni_task_agent.task_api.run_tool", side_effect=KeyError("dependencies")):
+                response = await api.post("/projects/demo/calls", json={"calls": [
+                    {"name": "list_tasks", "arguments": {}},
+                ]})
+        assert response.json()["results"] == [{"error": "KeyError: 'dependencies'"}]
+
+    @pytest.mark.asyncio
+    async def test_bulk_task_reads_and_writes(self, service, sample_task_json):
+        """Test tasks are upserted and read back in bulk"""
+        async with connect(service) as api:
+            response = await api.post("/projects/demo/tasks/put", json={"tasks": [sample_task_json, {"id": "2", "title": "B"}]})
+            assert response.json() == {"created": 2, "updated": 0, "total": 4}
+            response = await api.post("/projects/demo/tasks/put", json={"tasks": [{"id": "2", "title": "B2", "dependencies": ["1"]}]})
+            assert response.json()["updated"] == 1
+
+            tasks = (await api.post("/projects/demo/tasks/get", json={"ids": ["2", "1.2", "9"]})).json()["tasks"]
+            assert tasks[0]["name"] == "B2" and tasks[0]["dependencies"] == ["1"]
+            assert tasks[1]["dependencies"] == ["1.1"]
+            assert tasks[2] is None
+
+            # A cycle is rejected; the tasks before it are kept
+            response = await api.post("/projects/demo/tasks/put", json={"tasks": [
+                {"id": "3", "title": "C"},
+                {"id": "1", "title": "Test Task", "dependencies": ["2"]},
+            ]})
+            assert response.status_code == 422
+            tasks = (await api.post("/projects/demo/tasks/get", json={"ids": ["3", "1"]})).json()["tasks"]
+        assert tasks[0]["name"] == "C"
+        assert tasks[1]["dependencies"] == []
@@ -0,0 +1,183 @@
+"""
+Task Import and Export Module Tests
+"""
+import io
+import json
+
+import pytest
+
+from omni_task_agent.dependencies import clear_dependency_graphs, get_dependency_graph
+from omni_task_agent.task_io import (
+    TaskValidationError,
+    detect_format,
+    export_tasks,
+    import_tasks,
+    validate_task,
+)
+from omni_task_agent.utils.state import TaskStore
+
+
+@pytest.fixture(autouse=True)
+def reset_graphs():
+    clear_dependency_graphs()
+    yield
+    clear_dependency_graphs()
+
+
+def jsonl(*records):
+    return io.StringIO("".join(json.dumps(record) + "\n" for record in records))
+
+
+class TestValidation:
+    """Task shape validation test class"""
+
+    def test_sample_task_is_valid(self, sample_task_json):
+        """Test the fixture task passes unchanged"""
+        assert validate_task(sample_task_json, 1) == sample_task_json
+
+    def test_normalizes_ids(self):
+        """Test numeric IDs and dependencies become strings"""
+        assert validate_task({"id": 7, "title": "A", "dependencies": [1, "2"]}, 1) == {
+            "id": "7", "title": "A", "dependencies": ["1", "2"],
+        }
+
+    @pytest.mark.parametrize("record, message", [
+        ([], "must be an object"),
+        ({"title": "A"}, "'id'"),
+        ({"id": "1"}, "'title'"),
+        ({"id": "1", "title": "A", "name": "A"}, "unknown fields: name"),
+        ({"id": "1", "title": "A", "priority": "urgent"}, "'priority'"),
+        ({"id": "1", "title": "A", "status": "finished"}, "'status'"),
+        ({"id": "1", "title": "A", "dependencies": "2"}, "'dependencies'"),
+        ({"id": "1", "title": "A", "subtasks": [{"id": "1.1"}]}, "subtask 0 of 1"),
+    ])
+    def test_rejects_invalid_records(self, record, message):
+        """Test missing, unknown and mistyped fields are reported with the row"""
+        with pytest.raises(TaskValidationError, match=message) as error:
+            validate_task(record, 3)
+        assert error.value.row == 3
+
+    def test_detect_format(self):
+        """Test formats come from the option, else the extension"""
+        assert detect_format("tasks.CSV") == "csv"
+        assert detect_format("-") == "jsonl"
+        assert detect_format("tasks.csv", "jsonl") == "jsonl"
+        with pytest.raises(ValueError):
+            detect_format("tasks", "xml")
+
+
+class TestImport:
+    """Streaming import test class"""
+
+    def test_chunked_import(self, tmp_path, sample_task_json):
+        """Test rows are applied and saved per chunk, and re-imports update in place"""
+        data_dir = str(tmp_path)
+        records = [sample_task_json] + [{"id": str(i), "title": f"Task {i}", "dependencies": ["1"]} for i in range(2, 7)]
+        summary = import_tasks(jsonl(*records), data_dir, chunk_size=2)
+        assert (summary["rows"], summary["created"], summary["chunks"]) == (6, 6, 3)
+        assert summary["total"] == 8 and summary["rows_per_second"] > 0
+
+        collection = TaskStore(data_dir).load()
+        assert collection["1.2"].dependencies == ("1.1",)
+        assert sorted(t.id for t in collection.dependents_of("1")) == ["2", "3", "4", "5", "6"]
+
+        summary = import_tasks(jsonl({"id": "2", "title": "Renamed", "status": "done"}), data_dir)
+        assert summary["updated"] == 1
+        assert TaskStore(data_dir).load()["2"].title == "Renamed"
+        # The dependency graph followed the import
+        assert "2" not in {t.id for t in get_dependency_graph(data_dir).ready()}
+
+    def test_invalid_rows_are_skipped(self, tmp_path):
+        """Test bad JSON, bad records and cycles reject their row only"""
+        source = io.StringIO(
+            '{"id": "1", "title": "A", "dependencies": ["2"]}\n'
+            "{oops\n"
+            '{"id": "2", "title": "B", "dependencies": ["1"]}\n'
+            '{"id": "3"}\n'
+            '{"id": "4", "title": "D"}\n'
+        )
+        summary = import_tasks(source, str(tmp_path))
+        assert (summary["created"], summary["rejected"]) == (2, 3)
+        assert summary["errors"][0].startswith("Row 2: invalid JSON")
+        assert "Dependency cycle" in summary["errors"][1]
+        assert {t.id for t in TaskStore(str(tmp_path)).load()} == {"1", "4"}
+
+    def test_rejected_update_leaves_task_unchanged(self, tmp_path):
+        """Test an update closing a cycle applies none of its fields"""
+        data_dir = str(tmp_path)
+        import_tasks(jsonl({"id": "a", "title": "A", "dependencies": ["b"]}, {"id": "b", "title": "B"}), data_dir)
+
+        summary = import_tasks(
+            jsonl({"id": "b", "title": "B-renamed", "status": "completed", "dependencies": ["a"]}),
+            data_dir,
+        )
+        assert (summary["rejected"], summary["updated"]) == (1, 0)
+        assert "Dependency cycle" in summary["errors"][0]
+        clear_dependency_graphs()
+        task = TaskStore(data_dir).load()["b"]
+        assert (task.title, task.status, task.dependencies) == ("B", "pending", ())
+
+    def test_repeated_subtask_id_is_rejected(self, tmp_path):
+        """Test a row repeating an ID in its subtasks is rejected before anything is applied"""
+        data_dir = str(tmp_path)
+        import_tasks(jsonl({"id": "1", "title": "A"}), data_dir)
+        summary = import_tasks(jsonl({
+            "id": "1", "title": "Renamed", "subtasks": [{"id": "1.1", "title": "X"}, {"id": "1.1", "title": "Y"}],
+        }), data_dir)
+        assert summary["rejected"] == 1 and "repeats a task ID" in summary["errors"][0]
+        collection = TaskStore(data_dir).load()
+        assert collection["1"].title == "A" and len(collection) == 1
+
+    def test_strict_stops_and_keeps_earlier_rows(self, tmp_path):
+        """Test strict mode raises at the first invalid row after saving the rows before it"""
+        with pytest.raises(TaskValidationError, match="Row 2"):
+            import_tasks(jsonl({"id": "1", "title": "A"}, {"id": "2"}, {"id": "3", "title": "C"}), str(tmp_path), strict=True)
+        assert [t.id for t in TaskStore(str(tmp_path)).load()] == ["1"]
+
+    def test_csv_round_trip(self, tmp_path, sample_task_json):
+        """Test CSV export and import keep subtasks, dependencies and fields"""
+        import_tasks(jsonl(sample_task_json, {"id": "2", "title": "B, quoted", "dependencies": ["1", "1.2"]}), str(tmp_path / "a"))
+        output = io.StringIO()
+        assert export_tasks(output, str(tmp_path / "a"), "csv")["rows"] == 4
+        lines = output.getvalue().splitlines()
+        assert lines[0] == "id,title,description,status,priority,dependencies,details,test_strategy,parent_id"
+        assert lines[3].endswith(",1")
+
+        summary = import_tasks(io.StringIO(output.getvalue()), str(tmp_path / "b"), "csv")
+        assert summary["created"] == 4 and summary["rejected"] == 0
+        assert TaskStore(str(tmp_path / "b")).load().model_dump() == TaskStore(str(tmp_path / "a")).load().model_dump()
+
+    def test_csv_unknown_parent(self, tmp_path):
+        """Test CSV subtasks must follow their parent"""
+        source = io.StringIO("id,title,parent_id\n1.1,Sub,1\n")
+        summary = import_tasks(source, str(tmp_path), "csv")
+        assert summary["rejected"] == 1 and "unknown parent_id" in summary["errors"][0]
+        with pytest.raises(TaskValidationError, match="header"):
+            import_tasks(io.StringIO("name\nA\n"), str(tmp_path), "csv")
+
+
+class TestExport:
+    """Streaming export test class"""
+
+    def test_jsonl_export(self, tmp_path, sample_task_json):
+        """Test JSON lines exports nest subtasks and filter by status"""
+        import_tasks(jsonl(sample_task_json, {"id": "2", "title": "B", "status": "done"}), str(tmp_path))
+        output = io.StringIO()
+        summary = export_tasks(output, str(tmp_path), chunk_size=1)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert summary["rows"] == 2
+        assert {key: records[0][key] for key in sample_task_json if key != "subtasks"} == {
+            key: value for key, value in sample_task_json.items() if key != "subtasks"
+        }
+        assert [subtask["dependencies"] for subtask in records[0]["subtasks"]] == [[], ["1.1"]]
+
+        output = io.StringIO()
+        export_tasks(output, str(tmp_path), status="done")
+        assert [json.loads(line)["id"] for line in output.getvalue().splitlines()] == ["2"]
+
+    def test_exports_shrimp_tasks(self, tmp_path):
+        """Test a project with only shrimp-task-manager's tasks.json can be exported"""
+        (tmp_path / "tasks.json").write_text(json.dumps({"tasks": [{"id": "s1", "name": "Shrimp task"}]}))
+        output = io.StringIO()
+        export_tasks(output, str(tmp_path))
+        assert json.loads(output.getvalue())["title"] == "Shrimp task"
@@ -0,0 +1,128 @@
+"""
+Tool Result Cache Tests
+"""
+import asyncio
+
+import pytest
+
+from omni_task_agent.tool_cache import ToolResultCache
+from omni_task_agent.tools import ToolContext
+
+
+class CountingBackend:
+    """Records how often each tool actually reaches the backend"""
+
+    def __init__(self):
+        self.calls = []
+        self.version = 0
+
+    async def __call__(self, name, arguments):
+        self.calls.append(name)
+        if name != "list_tasks":
+            self.version += 1
+        return f"tasks v{self.version}", None
+
+
+class TestToolResultCache:
+    """Tool Result Cache Test Class"""
+
+    @pytest.mark.asyncio
+    async def test_read_only_results_are_cached(self):
+        """Repeated read-only calls with the same arguments hit the cache"""
+        cache = ToolResultCache(ttl=60, max_entries=10)
+        backend = CountingBackend()
+        context = ToolContext(data_dir="/a/data")
+
+        first = await cache(context, "list_tasks", {"status": "all"}, backend)
+        second = await cache(context, "list_tasks", {"status": "all"}, backend)
+        await cache(context, "list_tasks", {"status": "pending"}, backend)
+
+        assert first == second
+        assert backend.calls == ["list_tasks", "list_tasks"]
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_mutation_invalidates_only_its_project(self):
+        """A mutating tool drops the project's cached reads but not other projects'"""
+        cache = ToolResultCache(ttl=60, max_entries=10)
+        backend = CountingBackend()
+        project_a = ToolContext(data_dir="/a/data")
+        project_b = ToolContext(data_dir="/b/data")
+
+        await cache(project_a, "list_tasks", {}, backend)
+        await cache(project_b, "list_tasks", {}, backend)
+        await cache(project_a, "update_task", {"taskId": "1"}, backend)
+        refreshed = await cache(project_a, "list_tasks", {}, backend)
+        await cache(project_b, "list_tasks", {}, backend)
+
+        assert refreshed == ("tasks v1", None)
+        assert backend.calls.count("list_tasks") == 3
+        assert cache.stats["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Expired entries are fetched again"""
+        cache = ToolResultCache(ttl=0, max_entries=10)
+        backend = CountingBackend()
+        context = ToolContext(data_dir="/a/data")
+
+        await cache(context, "list_tasks", {}, backend)
+        await cache(context, "list_tasks", {}, backend)
+
+        assert backend.calls == ["list_tasks", "list_tasks"]
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self):
+        """The least recently used entry is evicted beyond max_entries"""
+        cache = ToolResultCache(ttl=60, max_entries=2)
+        backend = CountingBackend()
+        context = ToolContext(data_dir="/a/data")
+
+        for task_id in ["1", "2", "1", "3"]:
+            await cache(context, "get_task_detail", {"taskId": task_id}, backend)
+        await cache(context, "get_task_detail", {"taskId": "1"}, backend)
+
+        assert len(cache) == 2
+        assert cache.stats["evictions"] >= 1
+        assert cache.stats["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Failed reads are retried on the next call"""
+        cache = ToolResultCache(ttl=60, max_entries=10)
+        context = ToolContext(data_dir="/a/data")
+        attempts = []
+
+        async def flaky(name, arguments):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise RuntimeError("backend down")
+            return "ok", None
+
+        with pytest.raises(RuntimeError):
+            await cache(context, "list_tasks", {}, flaky)
+        assert await cache(context, "list_tasks", {}, flaky) == ("ok", None)
+
+    @pytest.mark.asyncio
+    async def test_read_overlapping_mutation_is_not_cached(self):
+        """A read that a mutation overtakes is not stored, and finished projects leave no bookkeeping"""
+        cache = ToolResultCache(ttl=60, max_entries=10)
+        backend = CountingBackend()
+        context = ToolContext(data_dir="/a/data")
+        release = asyncio.Event()
+
+        async def slow_read(name, arguments):
+            await release.wait()
+            return "stale", None
+
+        read = asyncio.create_task(cache(context, "list_tasks", {}, slow_read))
+        await asyncio.sleep(0)
+        await cache(context, "update_task", {"taskId": "1"}, backend)
+        release.set()
+        assert await read == ("stale", None)
+        assert await cache(context, "list_tasks", {}, backend) == ("tasks v1", None)
+
+        for i in range(50):
+            await cache(ToolContext(data_dir=f"/p{i}/data"), "update_task", {"taskId": "1"}, backend)
+        assert cache._generations == {} and cache._in_flight == {}
@@ -0,0 +1,142 @@
+"""
+Tool Router Module Tests
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from omni_task_agent.tool_router import RoutedChatModel, ToolIndex, ToolRouter
+
+
+def make_tool(name, description):
+    async def call_tool(**arguments):
+        return f"{name} called"
+
+    return StructuredTool(
+        name=name,
+        description=description,
+        args_schema={"type": "object", "properties": {"taskId": {"type": "string", "description": "Task ID"}}},
+        coroutine=call_tool,
+    )
+
+
+TOOLS = [
+    make_tool("plan_task", "Plan a new task from a description and requirements"),
+    make_tool("analyze_task", "Analyze a task concept for technical feasibility and risks"),
+    make_tool("reflect_task", "Reflect on an analysis and improve the solution"),
+    make_tool("split_tasks", "Split a plan into subtasks with dependencies"),
+    make_tool("list_tasks", "List all tasks, optionally filtered by status"),
+    make_tool("query_task", "Search tasks by keyword or ID"),
+    make_tool("get_task_detail", "Get the complete details of a task"),
+    make_tool("update_task", "Update the name, description or dependencies of a task"),
+    make_tool("delete_task", "Delete an unfinished task"),
+    make_tool("ready_tasks", "List incomplete tasks whose dependencies are all completed"),
+]
+
+
+@pytest.fixture
+def index():
+    return ToolIndex(TOOLS)
+
+
+class RecordingModel:
+    """Chat model stand-in recording the tools bound for each call"""
+
+    def __init__(self):
+        self.bound = []
+
+    def bind_tools(self, tools, **kwargs):
+        names = [tool.name for tool in tools]
+        self.bound.append(names)
+        return RunnableLambda(lambda messages: AIMessage(content=",".join(names)))
+
+
+class TestToolIndex:
+    """Tool index test class"""
+
+    def test_scores_name_and_keywords(self, index):
+        """Tool names and routing keywords outweigh description words"""
+        scores = index.score("Please split this into subtasks")
+        assert max(scores, key=scores.get) == "split_tasks"
+        assert index.score("What should I do next?")["ready_tasks"] > 0
+
+    def test_schema_tokens(self, index):
+        """Every tool has a schema token count and the total adds them up"""
+        assert all(entry.tokens > 0 for entry in index.entries.values())
+        assert index.total_tokens == index.tokens(index.names)
+
+
+class TestToolRouter:
+    """Tool router test class"""
+
+    def test_selects_relevant_subset(self, index):
+        """A focused request binds the matching tool plus the ID lookup tools"""
+        router = ToolRouter(max_tools=5, min_score=1.0)
+        names, fallback = router.select(index, [HumanMessage("Delete task 7")])
+        assert not fallback
+        assert names == ["list_tasks", "query_task", "delete_task"]
+
+    def test_adds_companion_tools(self, index):
+        """Planning brings the tools shrimp asks for afterwards"""
+        router = ToolRouter(max_tools=5, min_score=1.0)
+        names, _ = router.select(index, [HumanMessage("Plan a new feature for login")])
+        assert {"plan_task", "analyze_task", "reflect_task", "split_tasks"} <= set(names)
+        assert "delete_task" not in names
+
+    def test_falls_back_to_full_set(self, index):
+        """Requests that match nothing well bind every tool"""
+        router = ToolRouter(max_tools=5, min_score=1.0)
+        names, fallback = router.select(index, [HumanMessage("yes please")])
+        assert fallback
+        assert names == index.names
+
+    def test_keeps_tools_used_in_turn(self, index):
+        """Tools called or named after the request stay bound for the rest of the turn"""
+        router = ToolRouter(max_tools=5, min_score=1.0)
+        messages = [
+            HumanMessage("Delete task 7"),
+            AIMessage(content="", tool_calls=[{"name": "delete_task", "args": {"taskId": "7"}, "id": "1"}]),
+            ToolMessage(content="Deleted. Use get_task_detail to confirm.", tool_call_id="1"),
+        ]
+        names, _ = router.select(index, messages)
+        assert "get_task_detail" in names
+
+    def test_routes_latest_request(self, index):
+        """Only the latest user message decides the subset"""
+        router = ToolRouter(max_tools=5, min_score=1.0)
+        names, _ = router.select(index, [HumanMessage("Plan a new feature"), AIMessage("Done"), HumanMessage("Delete task 7")])
+        assert "plan_task" not in names
+
+    def test_records_tokens_saved(self, index):
+        """Saved tokens are the schemas left out of the call"""
+        router = ToolRouter()
+        saved = router.record(index, ["list_tasks"], fallback=False)
+        router.record(index, index.names, fallback=True)
+        assert saved == index.total_tokens - index.tokens(["list_tasks"])
+        metrics = router.metrics()
+        assert metrics["calls"] == 2 and metrics["fallbacks"] == 1
+        assert metrics["tokens_saved"] == saved
+        assert 0 < metrics["saved_ratio"] < 0.5
+
+
+class TestRoutedChatModel:
+    """Routed chat model test class"""
+
+    @pytest.mark.asyncio
+    async def test_binds_subset_per_call(self):
+        """Each call binds the routed subset; bindings are reused per subset"""
+        model = RecordingModel()
+        binding = RoutedChatModel(model, ToolRouter(max_tools=5, min_score=1.0)).bind_tools(TOOLS)
+        prompt = ChatPromptTemplate.from_messages([("system", "Assistant"), MessagesPlaceholder("messages")])
+        chain = prompt | binding
+
+        first = await chain.ainvoke({"messages": [HumanMessage("Delete task 7")]})
+        second = await chain.ainvoke({"messages": [HumanMessage("Delete task 8")]})
+        full = chain.invoke({"messages": [HumanMessage("ok")]})
+
+        assert first.content == "list_tasks,query_task,delete_task"
+        assert second.content == first.content
+        assert full.content.count(",") == len(TOOLS) - 1
+        assert len(model.bound) == 2
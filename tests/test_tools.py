@@ -0,0 +1,88 @@
+"""
+Tool Routing Module Tests
+"""
+import pytest
+
+from omni_task_agent.tools import (
+    ToolArgumentError,
+    bind_tool_context,
+    format_tool_result,
+    make_routed_tool,
+    validate_tool_arguments,
+)
+from tests.test_graph_cache import make_tool
+
+
+class TestToolRouting:
+    """Tool Routing Test Class"""
+
+    @pytest.mark.asyncio
+    async def test_routed_tool_uses_bound_session(self):
+        """A routed tool dispatches to the tools bound in the current context"""
+        template = make_tool("list_tasks")
+        routed = make_routed_tool(template)
+
+        async def project_a(**arguments):
+            return "project a", None
+
+        async def project_b(**arguments):
+            return "project b", None
+
+        tool_a = make_tool("list_tasks")
+        tool_a.coroutine = project_a
+        tool_b = make_tool("list_tasks")
+        tool_b.coroutine = project_b
+
+        with bind_tool_context("/a/data", [tool_a]):
+            result_a = await routed.ainvoke({"id": "1"})
+        with bind_tool_context("/b/data", [tool_b]):
+            result_b = await routed.ainvoke({"id": "1"})
+
+        assert result_a == "project a"
+        assert result_b == "project b"
+
+    @pytest.mark.asyncio
+    async def test_routed_tool_requires_context(self):
+        """Calling a routed tool without a bound session fails clearly"""
+        routed = make_routed_tool(make_tool("list_tasks"))
+
+        with pytest.raises(RuntimeError):
+            await routed.ainvoke({"id": "1"})
+
+
+class TestToolValidation:
+    """Direct Call Validation Test Class"""
+
+    SCHEMA = {
+        "type": "object",
+        "properties": {
+            "status": {"type": "string", "enum": ["all", "pending", "completed"]},
+            "limit": {"type": "integer"},
+        },
+        "required": ["status"],
+        "additionalProperties": False,
+    }
+
+    def test_valid_arguments(self):
+        """Arguments matching the schema pass"""
+        validate_tool_arguments(make_tool("list_tasks", schema=self.SCHEMA), {"status": "all", "limit": 5})
+
+    def test_invalid_arguments_are_reported_together(self):
+        """Missing, unknown, mistyped and out-of-enum arguments are all reported"""
+        tool = make_tool("list_tasks", schema=self.SCHEMA)
+
+        with pytest.raises(ToolArgumentError) as error:
+            validate_tool_arguments(tool, {"limit": True, "color": "red"})
+        message = str(error.value)
+
+        assert "missing required argument 'status'" in message
+        assert "unknown argument 'color'" in message
+        assert "'limit' must be of type integer" in message
+
+        with pytest.raises(ToolArgumentError):
+            validate_tool_arguments(tool, {"status": "archived"})
+
+    def test_format_tool_result(self):
+        """MCP content-and-artifact tuples are reduced to text"""
+        assert format_tool_result(("text", None)) == "text"
+        assert format_tool_result((["a", "b"], None)) == "a\nb"
@@ -0,0 +1,185 @@
+"""
+Tracing Module Tests
+"""
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from omni_task_agent.tracing import (
+    NOOP_SPAN,
+    InMemoryExporter,
+    JsonLinesExporter,
+    OpenTelemetryExporter,
+    Tracer,
+    current_span,
+    exporters_from_env,
+    make_llm_callback,
+)
+
+
+class TestTracer:
+    """Tracer test class"""
+
+    def test_disabled_without_exporters(self):
+        """Test spans are no-ops until an exporter is registered"""
+        tracer = Tracer()
+        with tracer.span("phase") as span:
+            assert span is NOOP_SPAN
+            span.set_attribute("ignored", True)
+        assert not tracer.enabled
+
+    def test_nested_spans(self):
+        """Test child spans share the trace and point at their parent"""
+        memory = InMemoryExporter()
+        tracer = Tracer([memory])
+        with tracer.span("request") as parent:
+            with tracer.span("tool.call", tool="list_tasks") as child:
+                assert current_span() is child
+            assert current_span() is parent
+
+        child, parent = memory.spans
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert parent.parent_id is None
+        assert child.attributes == {"tool": "list_tasks"}
+        assert parent.duration >= child.duration
+
+    def test_error_recorded(self):
+        """Test exceptions mark the span as failed and propagate"""
+        memory = InMemoryExporter()
+        tracer = Tracer([memory])
+        with pytest.raises(ValueError):
+            with tracer.span("phase"):
+                raise ValueError("boom")
+        assert memory.spans[0].status == "error"
+        assert memory.spans[0].error == "ValueError: boom"
+
+    def test_failing_exporter_is_isolated(self):
+        """Test an exporter error does not break the traced code"""
+        broken = MagicMock()
+        broken.export.side_effect = OSError("disk full")
+        memory = InMemoryExporter()
+        tracer = Tracer([broken, memory])
+        with tracer.span("phase"):
+            pass
+        assert len(memory.spans) == 1
+
+    def test_summary(self):
+        """Test per-name summary with token totals"""
+        memory = InMemoryExporter()
+        tracer = Tracer([memory])
+        with tracer.span("request") as request:
+            for tokens in (10, 5):
+                with tracer.span("llm.call", total_tokens=tokens):
+                    pass
+        with tracer.span("request"):
+            pass
+
+        summary = memory.summary(request.trace_id)
+        assert summary["llm.call"]["count"] == 2
+        assert summary["llm.call"]["total_tokens"] == 15
+        assert summary["request"]["count"] == 1
+        assert memory.summary()["request"]["count"] == 2
+
+    def test_memory_exporter_bounded(self):
+        """Test the in-memory exporter keeps only the newest spans"""
+        memory = InMemoryExporter(max_spans=2)
+        tracer = Tracer([memory])
+        for name in ("a", "b", "c"):
+            with tracer.span(name):
+                pass
+        assert [span.name for span in memory.spans] == ["b", "c"]
+
+    def test_jsonl_exporter(self, tmp_path):
+        """Test spans are appended as JSON lines"""
+        path = tmp_path / "traces.jsonl"
+        exporter = JsonLinesExporter(str(path))
+        tracer = Tracer([exporter])
+        with tracer.span("request", source="cli"):
+            with tracer.span("tool.call"):
+                pass
+        exporter.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["tool.call", "request"]
+        assert lines[1]["attributes"] == {"source": "cli"}
+        assert lines[0]["parent_id"] == lines[1]["span_id"]
+
+    def test_otel_exporter(self):
+        """Test spans are mirrored onto an OpenTelemetry tracer with parents"""
+        otel_tracer = MagicMock()
+        provider = MagicMock()
+        with patch("opentelemetry.trace.get_tracer", return_value=otel_tracer):
+            exporter = OpenTelemetryExporter(provider)
+        tracer = Tracer([exporter])
+        with tracer.span("request"):
+            with tracer.span("tool.call", tool="list_tasks"):
+                pass
+
+        names = [c.args[0] for c in otel_tracer.start_span.call_args_list]
+        assert names == ["request", "tool.call"]
+        assert otel_tracer.start_span.call_args_list[0].kwargs["context"] is None
+        assert otel_tracer.start_span.call_args_list[1].kwargs["context"] is not None
+        child = otel_tracer.start_span.return_value
+        child.set_attribute.assert_any_call("tool", "list_tasks")
+        assert child.end.call_count == 2
+
+    @patch.dict("os.environ", {"TRACE_EXPORTERS": "memory, jsonl, bogus"})
+    def test_exporters_from_env(self):
+        """Test exporters are built from TRACE_EXPORTERS, skipping unknown names"""
+        exporters = exporters_from_env()
+        assert [type(e) for e in exporters] == [InMemoryExporter, JsonLinesExporter]
+
+
+class TestLLMCallback:
+    """LLM callback test class"""
+
+    def test_token_counts_recorded(self):
+        """Test each model call becomes an llm.call span with token usage"""
+        memory = InMemoryExporter()
+        tracer = Tracer([memory])
+        callback = make_llm_callback(tracer)
+        run_id = uuid.uuid4()
+
+        callback.on_chat_model_start(
+            {}, [[HumanMessage(content="hi")]], run_id=run_id, invocation_params={"model": "gpt-4o"}
+        )
+        message = AIMessage(content="hello", usage_metadata={"input_tokens": 7, "output_tokens": 2, "total_tokens": 9})
+        callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+        span = memory.spans[0]
+        assert span.name == "llm.call"
+        assert span.attributes == {
+            "model": "gpt-4o",
+            "messages": 1,
+            "prompt_tokens": 7,
+            "completion_tokens": 2,
+            "total_tokens": 9,
+        }
+
+    def test_token_counts_from_llm_output(self):
+        """Test providers reporting usage only in llm_output"""
+        memory = InMemoryExporter()
+        callback = make_llm_callback(Tracer([memory]))
+        run_id = uuid.uuid4()
+
+        callback.on_chat_model_start({}, [[HumanMessage(content="hi")]], run_id=run_id)
+        result = LLMResult(
+            generations=[[ChatGeneration(message=AIMessage(content="hello"))]],
+            llm_output={"token_usage": {"prompt_tokens": 4, "completion_tokens": 1, "total_tokens": 5}},
+        )
+        callback.on_llm_end(result, run_id=run_id)
+        assert memory.spans[0].attributes["total_tokens"] == 5
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test the callback is inert while tracing is disabled"""
+        tracer = Tracer()
+        callback = make_llm_callback(tracer)
+        run_id = uuid.uuid4()
+        callback.on_chat_model_start({}, [[HumanMessage(content="hi")]], run_id=run_id)
+        callback.on_llm_error(RuntimeError("rate limited"), run_id=run_id)
+        assert not tracer.enabled
@@ -0,0 +1,128 @@
+"""
+Server Warm-up Module Tests
+"""
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.tools import StructuredTool
+from starlette.applications import Starlette
+
+from omni_task_agent.backends import register_backend
+from omni_task_agent.dependencies import clear_dependency_graphs
+from omni_task_agent.graph_cache import GraphCache
+from omni_task_agent.pool import SessionPool
+from omni_task_agent.warmup import Warmup, add_health_routes
+
+
+class FakeClient:
+    """Pooled stand-in for a shrimp-task-manager session"""
+
+    started = 0
+
+    def __init__(self, config):
+        FakeClient.started += 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def get_tools(self):
+        async def list_tasks(**arguments):
+            return "[]", None
+
+        return [StructuredTool(
+            name="list_tasks",
+            description="List tasks",
+            args_schema={"type": "object", "properties": {}},
+            coroutine=list_tasks,
+            response_format="content_and_artifact",
+        )]
+
+
+@pytest.fixture
+def graph_cache():
+    """Graph cache with a scripted model and no real graph compilation"""
+    cache = GraphCache()
+    cache.set_llm(FakeListChatModel(responses=["ready", "unused"]))
+    with patch("omni_task_agent.graph_cache.get_graph_cache", return_value=cache), \
+            patch("langgraph.prebuilt.create_react_agent", side_effect=lambda **kwargs: MagicMock()):
+        yield cache
+    clear_dependency_graphs()
+
+
+class TestWarmup:
+    """Warm-up test class"""
+
+    @pytest.mark.asyncio
+    async def test_local_backend(self, graph_cache, tmp_path, monkeypatch):
+        """Test warm-up lists the tools, builds the graph, calls the model and flips to ready"""
+        monkeypatch.setenv("TASK_BACKEND", "local")
+        warmup = Warmup(project_root=str(tmp_path), sessions=3, llm=True)
+        assert warmup.report()["status"] == "pending"
+
+        await warmup.run()
+
+        report = warmup.report()
+        assert warmup.ready and report["status"] == "ready"
+        # In-process tools have no sessions to pre-spawn
+        assert report["steps"]["tools"]["sessions"] == 1
+        assert report["steps"]["tools"]["tools"] == len(warmup.tool_schemas)
+        assert "split_tasks" in {schema["name"] for schema in warmup.tool_schemas}
+        assert "error" not in report["steps"]["llm"]
+        assert graph_cache.stats["misses"] == 1
+        assert graph_cache.get_llm().i == 1
+
+    @pytest.mark.asyncio
+    async def test_prespawns_read_sessions(self, graph_cache, tmp_path):
+        """Test the shrimp backend starts the request session and its read siblings"""
+        FakeClient.started = 0
+        pool = SessionPool(max_size=8, client_factory=FakeClient)
+        with patch("omni_task_agent.backends.get_session_pool", return_value=pool), \
+                patch("omni_task_agent.warmup.get_session_pool", return_value=pool):
+            warmup = Warmup(project_root=str(tmp_path), sessions=3)
+            await warmup.run()
+        await pool.close()
+
+        assert warmup.report()["steps"]["tools"]["sessions"] == 3
+        assert FakeClient.started == 3
+        assert "llm" not in warmup.report()["steps"]
+
+    @pytest.mark.asyncio
+    async def test_failed_step_still_ready(self, graph_cache, monkeypatch):
+        """Test a failing step is reported without holding readiness back"""
+        class BrokenBackend:
+            name = "broken"
+
+            def session(self, project_root=None):
+                raise ConnectionError("service down")
+
+        register_backend("broken", BrokenBackend)
+        monkeypatch.setenv("TASK_BACKEND", "broken")
+        warmup = Warmup()
+        await warmup.run()
+        assert warmup.ready
+        assert warmup.report()["steps"]["tools"]["error"] == "ConnectionError: service down"
+
+
+class TestHealthRoutes:
+    """Health and readiness endpoint test class"""
+
+    @pytest.mark.asyncio
+    async def test_ready_flips_after_warmup(self):
+        """Test /health answers at once and /ready only after warm-up"""
+        app = Starlette()
+        warmup = Warmup()
+        add_health_routes(app, warmup)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/health")).json() == {"status": "ok"}
+            response = await client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "pending"
+
+            warmup.skip()
+            assert (await client.get("/ready")).status_code == 200